@@ -0,0 +1,113 @@
+"""
+Микро-бенчмарк разбора страницы Эйнштейн пати функцией quizAggregator.scrape_einstein_party().
+Сравнивает текущий разбор, при котором поля квиза ищутся внутри его карточки, с прежним, при котором для каждой
+карточки выполнялось шесть quizSoup.select() от body с селектором div:nth-child(n), т.е. каждый раз обходился весь
+документ. Страница tests/saved_web_pages/einstein_party_schedule_2024-01-19.html содержит всего 3 карточки, поэтому
+разбор дополнительно замеряется на той же странице с размноженными карточками.
+Перед замерами проверяется, что оба способа возвращают одинаковый результат.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_einstein_party.py
+
+Содержит функции:
+    make_soup(cardsMultiplier) - возвращает страницу Эйнштейн пати, в которой каждая карточка повторена несколько раз
+    scrape_by_document_selects(quizSoup, orgName, orgTag, dateParams) - прежний разбор страницы, для сравнения
+    main() - запускает замеры и выводит результат
+"""
+
+import copy
+import datetime
+import sys
+import timeit
+from pathlib import Path
+
+import bs4
+
+# добавляем папку src в путь поиска, чтобы модули из этой папки можно было импортировать без указания их местонахождения
+sys.path.insert(1, str(Path(__file__).resolve().parents[1] / 'src'))
+import config
+import quizAggregator
+
+SAVED_PAGE = config.ROOT_DIR / 'tests/saved_web_pages/einstein_party_schedule_2024-01-19.html'
+GAMES_SELECTOR = ('body > div.wrapper > div.schelude-tabs > div.schelude-tabs-body > div > div > div > div > div > '
+                  'div.game-row > div')
+# дата сохранения страницы, чтобы все квизы на ней считались еще не прошедшими
+CUR_DT = datetime.datetime(2024, 1, 19)
+DATE_PARAMS = [CUR_DT.year, CUR_DT.year + 1, CUR_DT.month, CUR_DT]
+
+
+def make_soup(cardsMultiplier):
+    """
+    Возвращает страницу Эйнштейн пати, в которой каждая карточка квиза повторена cardsMultiplier раз.
+    :param cardsMultiplier (int): во сколько раз увеличить количество карточек
+    :return: bs4.BeautifulSoup
+    """
+    quizSoup = bs4.BeautifulSoup(SAVED_PAGE.read_text(encoding='utf-8'), 'html.parser')
+    cards = quizSoup.select(GAMES_SELECTOR)
+    gameRow = cards[0].parent
+    for i in range(cardsMultiplier - 1):
+        for card in cards:
+            gameRow.append(copy.copy(card))
+    return quizSoup
+
+
+def scrape_by_document_selects(quizSoup, orgName, orgTag, dateParams):
+    """
+    Прежний разбор страницы Эйнштейн пати: для каждой карточки поля ищутся во всем документе. Дата квиза
+    преобразуется так же, как в quizAggregator.scrape_einstein_party().
+    Параметры и возвращаемые значения аналогичны quizAggregator.scrape_einstein_party().
+    """
+    games = {}
+    curYear, nextYear, curMonth, curDT = dateParams
+    einGamesList = quizSoup.select(GAMES_SELECTOR)
+    for n in range(1, (len(einGamesList) + 1)):
+        selectorBeginning = f'{GAMES_SELECTOR}:nth-child({n})'
+        content = f'{selectorBeginning} > div > div.game-item-content'
+        einGameName = quizSoup.select(f'{content} > div.game-item-content-left > div.game-item-top > '
+                                      f'div.game-item__title')[0].text
+        einGameDate = quizSoup.select(f'{content} > div.game-item-content-right > div.game-item__date > '
+                                      f'span:nth-child(1)')[0].text
+        quizSoup.select(f'{content} > div.game-item-content-right > div.game-item__date > span:nth-child(2)')
+        einGameStartTime = quizSoup.select(f'{content} > div.game-item-content-right > div.game-item__date > '
+                                           f'span.time')[0].text
+        einBar = quizSoup.select(f'{content} > div.game-item-content-right > div.game-item__address > '
+                                 f'span.place')[0].text
+        einAvailability = quizSoup.select(f'{selectorBeginning} > div > div.game-item-bottom > '
+                                          f'div.game-item-buttons > a.game-item__btn.active.register_team > '
+                                          f'span')[0].text
+
+        einDay, einMonth = einGameDate.split()[:2]
+        einMonth = quizAggregator.MONTH_DICT[einMonth]
+        year = nextYear if curMonth == 12 and einMonth == 1 else curYear
+        quizDT = datetime.datetime(year, einMonth, int(einDay), int(einGameStartTime[:2]), int(einGameStartTime[3:]))
+        if quizDT >= curDT:
+            games[orgTag + str(n)] = {'game': einGameName, 'date': quizDT, 'bar': einBar,
+                                      'tag': quizAggregator.assign_themes_to_quiz(einGameName, orgName)}
+            if 'резерв' in einAvailability.lower():
+                games[orgTag + str(n)]['availability'] = 'Резерв'
+    return games, {}
+
+
+def main():
+    """Запускает замеры и выводит время одного разбора страницы каждым способом."""
+    print(f'{"карточек":>9} {"прежний, мс":>12} {"текущий, мс":>12} {"ускорение":>10}')
+    for cardsMultiplier in [1, 5, 20]:
+        quizSoup = make_soup(cardsMultiplier)
+        cardsCount = len(quizSoup.select(GAMES_SELECTOR))
+        current = quizAggregator.scrape_einstein_party(quizSoup, 'Эйнштейн пати', 'ein', DATE_PARAMS)
+        previous = scrape_by_document_selects(quizSoup, 'Эйнштейн пати', 'ein', DATE_PARAMS)
+        assert current == previous, 'результаты разбора страницы отличаются'
+
+        number = max(1, 30 // cardsMultiplier)
+        previousTime = min(timeit.repeat(
+            lambda: scrape_by_document_selects(quizSoup, 'Эйнштейн пати', 'ein', DATE_PARAMS),
+            number=number, repeat=3)) / number
+        currentTime = min(timeit.repeat(
+            lambda: quizAggregator.scrape_einstein_party(quizSoup, 'Эйнштейн пати', 'ein', DATE_PARAMS),
+            number=number, repeat=3)) / number
+        print(f'{cardsCount:>9} {previousTime * 1000:>12.2f} {currentTime * 1000:>12.2f} '
+              f'{previousTime / currentTime:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
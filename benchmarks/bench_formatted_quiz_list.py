@@ -0,0 +1,135 @@
+"""
+Бенчмарк функции quizAggregator.create_formatted_quiz_list() на синтетическом снимке расписания из 10 000 квизов.
+Сравнивает текущую фильтрацию по индексу scheduleIndex.ScheduleIndex с прежней, при которой на каждый запрос квизы
+сортировались заново, а для каждого квиза нормализовалось название бара и проверялись исключения пользователя.
+Перед замерами для всех комбинаций запросов проверяется, что оба способа возвращают одинаковый текст.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_formatted_quiz_list.py
+
+Содержит функции:
+    make_games(gamesCount) - возвращает синтетические записи о квизах
+    format_by_scan(games, organizatorErrors, **kwargs) - прежнее формирование списка квизов, для сравнения
+    main() - запускает замеры и выводит результат
+"""
+
+import datetime
+import itertools
+import random
+import sys
+import timeit
+from pathlib import Path
+
+# добавляем папку src в путь поиска, чтобы модули из этой папки можно было импортировать без указания их местонахождения
+sys.path.insert(1, str(Path(__file__).resolve().parents[1] / 'src'))
+import quizAggregator
+from barIndex import fold_bar_name
+from config import CITY_DICT, ORGANIZATORS_DICT, QUIZ_THEMES
+from quizGame import make_game
+from scheduleIndex import ScheduleIndex
+from userPreferences import parse_exclusions
+
+CUR_DT = datetime.datetime(2024, 1, 1)
+GAME_NAMES = ['Квиз, плиз! NSK #567', 'Кино и музыка СССР #6', '[новички] NSK #459', 'Черный квиз 18+ #2',
+              'Логика где? #14', 'Гарри Поттер лайт #29']
+# бары в том виде, в каком их пишут организаторы, в том числе отсутствующие в config.CITY_DICT и пустые
+RAW_BARS = ['Три Лося', 'Бар Арт П.А.Б.', 'Типография', 'Harat`s pub', 'Бар-ресторан Друзья', 'MISHKIN&MISHKIN', '',
+            'Руки ВВерх!'] + [f'Бар #{n}' for n in range(40)]
+QUERIES = {
+    'dow': [[1, 2, 3, 4, 5], [6, 7], [1, 2, 3, 4, 5, 6, 7]],
+    'selected_theme': QUIZ_THEMES,
+    'excl_bar': ['None', 'Три лося', "Арт П.А.Б.;Harat's pub"],
+    'excl_theme': ['None', 'Ностальгия;18+'],
+    'excl_orgs': ['None', 'Квиз Плиз;Вау Квиз'],
+}
+
+
+def make_games(gamesCount):
+    """
+    Возвращает синтетические записи о квизах всех организаторов за полгода.
+    :param gamesCount (int): количество квизов
+    :return: list of quizGame.Game
+    """
+    rnd = random.Random(gamesCount)
+    orgTags = [orgInfo[0] for orgInfo in ORGANIZATORS_DICT.values()]
+    games = []
+    for n in range(gamesCount):
+        name = rnd.choice(GAME_NAMES)
+        date = CUR_DT + datetime.timedelta(days=rnd.randint(0, 180), hours=rnd.choice([12, 16, 19]))
+        games.append(make_game(rnd.choice(orgTags), n, name, date, rnd.choice(RAW_BARS),
+                               quizAggregator.assign_themes_to_quiz(name, ''), rnd.choice(['', 'Резерв'])))
+    return games
+
+
+def format_by_scan(games, organizatorErrors, **kwargs):
+    """
+    Прежнее формирование списка квизов: квизы сортируются на каждый запрос, для каждого квиза нормализуется название
+    бара и проверяются исключения. Исключения сравниваются с названиями целиком, как в
+    scheduleIndex.ScheduleIndex.query_masks(). Параметры и возвращаемые значения аналогичны
+    quizAggregator.create_formatted_quiz_list().
+    """
+    quizList = []
+    dow, selected_theme = kwargs['dow'], kwargs['selected_theme']
+    excl_bar = {fold_bar_name(bar) for bar in parse_exclusions(kwargs['excl_bar'])}
+    excl_theme = parse_exclusions(kwargs['excl_theme'])
+    excl_orgs = parse_exclusions(kwargs['excl_orgs'])
+    organizatorIndexMapping = {orgInfo[0]: orgName for orgName, orgInfo in ORGANIZATORS_DICT.items()}
+    k = 0
+    for game in sorted(games, key=lambda game: (game.date, game.gameId)):
+        curOrgName = organizatorIndexMapping[game.orgTag]
+        if curOrgName in excl_orgs:
+            continue
+        barNormalizedName = game.bar.replace("`", "'")
+        for bar in CITY_DICT['Новосибирск']['bars']:
+            if bar.lower() in barNormalizedName.lower():
+                barNormalizedName = bar
+                break
+        if fold_bar_name(barNormalizedName) in excl_bar:
+            continue
+        gameTags = game.tags
+        if selected_theme != QUIZ_THEMES[0] and selected_theme not in gameTags:
+            continue
+        if any(t in excl_theme for t in gameTags):
+            continue
+        quizAvailability = f'<b>{game.availability.upper()}</b>' if game.availability else ''
+        quizDate = game.date
+        if quizDate.isoweekday() in dow:
+            k += 1
+            quizMonth = list(quizAggregator.MONTH_DICT.keys())[
+                list(quizAggregator.MONTH_DICT.values()).index(quizDate.month)]
+            quizDateReadable = str(quizDate.day) + ' ' + quizMonth + ', ' + quizDate.time().isoformat('minutes')
+            quizList.append(f"{k}. <b>{curOrgName}</b>: {game.name}. Бар: {barNormalizedName}, "
+                            f"{quizAggregator.DOW_DICT[quizDate.isoweekday()]}, {quizDateReadable}. "
+                            f"{quizAvailability}\n")
+    if len(organizatorErrors) > 0:
+        quizList.append('\nК сожалению не удалось получить информацию по следующим организаторам: ')
+        quizList.extend(organizatorErrors)
+        quizList.append('\nПопробуй запросить информацию по ним позже.')
+    return quizList
+
+
+def main():
+    """Проверяет совпадение результатов и выводит время одного запроса пользователя каждым способом."""
+    games = make_games(10000)
+    index = ScheduleIndex(games, 'Новосибирск', quizAggregator.render_quiz_fragment)
+    queries = [dict(zip(QUERIES, values)) for values in itertools.product(*QUERIES.values())]
+    for kwargs in queries:
+        assert quizAggregator.create_formatted_quiz_list(index, {}, **kwargs) == format_by_scan(games, {}, **kwargs), \
+            f'результаты отличаются для запроса {kwargs}'
+    print(f'Проверено запросов: {len(queries)}, квизов в снимке: {len(games)}')
+
+    buildTime = min(timeit.repeat(lambda: ScheduleIndex(games, 'Новосибирск', quizAggregator.render_quiz_fragment),
+                                  number=1, repeat=3))
+    print(f'Построение индекса (один раз на снимок): {buildTime * 1000:.1f} мс')
+    print(f'{"запрос":<60} {"прежний, мс":>12} {"индекс, мс":>11} {"ускорение":>10}')
+    for kwargs in [queries[0], queries[len(queries) // 2], queries[-1]]:
+        previousTime = min(timeit.repeat(lambda: format_by_scan(games, {}, **kwargs), number=3, repeat=3)) / 3
+        currentTime = min(timeit.repeat(lambda: quizAggregator.create_formatted_quiz_list(index, {}, **kwargs),
+                                        number=3, repeat=3)) / 3
+        query = f"{kwargs['dow']} {kwargs['selected_theme']} {kwargs['excl_theme']}"
+        print(f'{query:<60} {previousTime * 1000:>12.1f} {currentTime * 1000:>11.1f} '
+              f'{previousTime / currentTime:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
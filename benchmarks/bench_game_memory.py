@@ -0,0 +1,113 @@
+"""
+Бенчмарк памяти, которую занимают записи о квизах. Сравнивает прежний формат (словарь с ключами 'game', 'date', 'bar',
+'tag', 'availability' и списком тематик на каждый квиз) с записями quizGame.Game. Строки, как и при скрейпинге,
+создаются заново для каждого квиза, поэтому в прежнем формате одинаковые названия баров хранятся отдельными копиями.
+Кроме того, замеряется, сколько памяти выделяет каждый запрос пользователя к scheduleCache.ScheduleCache.get_schedule():
+раньше на каждый запрос собирался новый словарь игр, сейчас возвращается общий снимок расписания.
+Память замеряется с помощью tracemalloc, т.е. учитывается всё, что выделил интерпретатор Python и что осталось занятым
+после построения расписания, включая строки и даты.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_game_memory.py
+
+Содержит функции:
+    make_scraped_values(gamesCount) - возвращает значения полей квизов в том виде, в каком их возвращает скрейпинг
+    make_dict_games(values) - прежний формат: словарь словарей
+    make_record_games(values) - текущий формат: словарь записей quizGame.Game
+    measure(build) - замеряет память, выделенную функцией
+    main() - запускает замеры и выводит результат
+"""
+
+import datetime
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+# добавляем папку src в путь поиска, чтобы модули из этой папки можно было импортировать без указания их местонахождения
+sys.path.insert(1, str(Path(__file__).resolve().parents[1] / 'src'))
+import quizAggregator
+import scheduleCache
+from quizGame import make_game
+
+CUR_DT = datetime.datetime.now()
+ORG_TAGS = ['qp', 'li', 'ein', 'wow', 'shaker', 'mama']
+GAME_NAMES = ['Квиз, плиз! NSK #567', 'Кино и музыка СССР #6', 'Угадай мелодию', 'Ностальгия 90-х', 'Гарри Поттер']
+BARS = ['Три Лося', 'Арт П.А.Б.', 'Типография', 'Mishkin&Mishkin', 'Руки ВВерх!']
+
+
+def make_scraped_values(gamesCount):
+    """
+    Возвращает значения полей квизов в том виде, в каком их возвращает скрейпинг: каждая строка - отдельный объект.
+    :param gamesCount (int): количество квизов
+    :return: list of tuple(orgTag, number, name, date, bar, tags, availability)
+    """
+    rnd = random.Random(gamesCount)
+    values = []
+    for n in range(gamesCount):
+        name = rnd.choice(GAME_NAMES).encode('utf-8').decode('utf-8')
+        bar = rnd.choice(BARS).encode('utf-8').decode('utf-8')
+        date = CUR_DT + datetime.timedelta(days=rnd.randint(1, 60), hours=rnd.choice([1, 2, 3]))
+        availability = rnd.choice(['', 'Резерв'])
+        values.append((rnd.choice(ORG_TAGS), n, name, date, bar, quizAggregator.assign_themes_to_quiz(name, ''),
+                       availability))
+    return values
+
+
+def make_dict_games(values):
+    """Прежний формат: {'wow10': {'game': ..., 'date': ..., 'bar': ..., 'tag': [...]}}"""
+    games = {}
+    for orgTag, number, name, date, bar, tags, availability in values:
+        games[orgTag + str(number)] = {'game': name, 'date': date, 'bar': bar, 'tag': list(tags)}
+        if availability:
+            games[orgTag + str(number)]['availability'] = availability
+    return games
+
+
+def make_record_games(values):
+    """Текущий формат: {'wow10': quizGame.Game}"""
+    games = {}
+    for orgTag, number, name, date, bar, tags, availability in values:
+        games[orgTag + str(number)] = make_game(orgTag, number, name, date, bar, tags, availability)
+    return games
+
+
+def measure(build):
+    """
+    Замеряет память, которая осталась выделенной после вызова функции, т.е. память под её результат.
+    :param build: функция без параметров
+    :return: tuple(результат функции, память в КБ)
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, (after - before) / 1024
+
+
+def main():
+    """Запускает замеры и выводит память на 1000 квизов в каждом формате и память на один запрос пользователя."""
+    gamesCount = 1000
+    # первый вызов заполняет кэш тематик quizAggregator.classify_themes(), он не должен попасть в замеры
+    make_scraped_values(gamesCount)
+    # память замеряется вместе с полями квизов, но промежуточный список values к концу замера уже освобожден
+    dictGames, dictMemory = measure(lambda: make_dict_games(make_scraped_values(gamesCount)))
+    recordGames, recordMemory = measure(lambda: make_record_games(make_scraped_values(gamesCount)))
+    print(f'Память на {gamesCount} квизов, КБ: словари {dictMemory:.0f}, записи Game {recordMemory:.0f}')
+
+    def collect(cityOrganizators, cityLinks, localHTMLs=None):
+        return recordGames, {}
+
+    cache = scheduleCache.ScheduleCache(collectFunction=collect)
+    cache.get_schedule('Новосибирск')
+    games, requestMemory = measure(lambda: cache.get_schedule('Новосибирск'))
+    # прежний ScheduleCache.get_schedule() собирал новый словарь из всех еще не прошедших квизов
+    previousRequest, previousMemory = measure(lambda: {gameId: game for gameId, game in dictGames.items()
+                                                       if game['date'] >= CUR_DT})
+    print(f'Память на один запрос расписания пользователем, КБ: прежний кэш {previousMemory:.0f}, '
+          f'снимок расписания {requestMemory:.0f}')
+
+
+if __name__ == '__main__':
+    main()
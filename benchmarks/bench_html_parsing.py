@@ -0,0 +1,77 @@
+"""
+Бенчмарк построения дерева HTML-кода страниц организаторов из папки tests/saved_web_pages.
+Для каждой страницы замеряются время разбора и пиковый объем памяти (tracemalloc) тремя способами:
+    text + html.parser      - как раньше: res.text, встроенный в Python парсер, вся страница
+    bytes + <парсер>        - байты ответа, парсер quizAggregator.HTML_PARSER_BACKEND, вся страница
+    bytes + <парсер> + фильтр - quizAggregator.parse_web_page(): то же самое, но только часть страницы из
+                              quizAggregator.SOUP_STRAINERS, если для организатора она задана
+tracemalloc учитывает только память, выделенную интерпретатором Python, т.е. дерево bs4. Временные структуры
+самого lxml в замер не попадают, но они освобождаются сразу после разбора.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_html_parsing.py
+
+Содержит функции:
+    measure(parse) - замеряет время и пиковую память разбора страницы
+    main() - запускает замеры и выводит результат
+"""
+
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+import bs4
+import requests
+
+# добавляем папку src в путь поиска, чтобы модули из этой папки можно было импортировать без указания их местонахождения
+sys.path.insert(1, str(Path(__file__).resolve().parents[1] / 'src'))
+import config
+import quizAggregator
+
+# сохраненные страницы организаторов: {тэг организатора: имя файла}
+SAVED_PAGES = {
+    'ein': 'einstein_party_schedule_2024-01-19.html',
+    'li': 'ligaindigo_schedule_2023-12-14.html',
+    'mama': 'mamaquiz_schedule_2023-12-14.html',
+    'qp': 'quizplease_schedule_2023-12-14.html',
+    'wow': 'wowquiz_schedule_2023-12-20.html',
+}
+
+
+def measure(parse):
+    """
+    Замеряет время и пиковую память разбора страницы.
+    :param parse: функция без параметров, которая строит дерево страницы
+    :return: tuple(время одного разбора в мс, пиковая память в МБ)
+    """
+    parseTime = min(timeit.repeat(parse, number=3, repeat=3)) / 3
+    tracemalloc.start()
+    quizSoup = parse()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del quizSoup
+    return parseTime * 1000, peak / 2 ** 20
+
+
+def main():
+    """Запускает замеры и выводит время разбора и пиковую память по каждой странице."""
+    backend = quizAggregator.HTML_PARSER_BACKEND
+    methods = ['text + html.parser', f'bytes + {backend}', f'bytes + {backend} + фильтр']
+    print(f'{"страница":<42} {"способ":<28} {"время, мс":>10} {"память, МБ":>11}')
+    for orgTag, fileName in SAVED_PAGES.items():
+        res = requests.Response()
+        res._content = (config.ROOT_DIR / 'tests/saved_web_pages' / fileName).read_bytes()
+        res.encoding = 'utf-8'
+        parsers = [
+            lambda: bs4.BeautifulSoup(res.text, 'html.parser'),
+            lambda: bs4.BeautifulSoup(res.content, backend, from_encoding=res.encoding),
+            lambda: quizAggregator.parse_web_page(res, orgTag),
+        ]
+        for method, parse in zip(methods, parsers):
+            parseTime, peak = measure(parse)
+            print(f'{fileName:<42} {method:<28} {parseTime:>10.1f} {peak:>11.1f}')
+
+
+if __name__ == '__main__':
+    main()
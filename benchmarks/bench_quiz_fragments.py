@@ -0,0 +1,79 @@
+"""
+Бенчмарк формирования списка квизов quizAggregator.create_formatted_quiz_list() на синтетическом снимке расписания
+из 5000 квизов. Сравнивает текущий способ, при котором строки о квизах отформатированы один раз при построении снимка
+(scheduleIndex.ScheduleIndex.fragments), а на запрос пользователя к ним только добавляются порядковые номера, с прежним,
+при котором на каждый запрос для каждого отобранного квиза заново вычислялись название месяца, день недели и время и
+собиралась вся строка. Отбор квизов в обоих случаях одинаковый - по индексу снимка.
+Перед замерами для всех комбинаций запросов проверяется, что оба способа возвращают одинаковый текст.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_quiz_fragments.py
+
+Содержит функции:
+    format_per_request(index, organizatorErrors, **kwargs) - прежнее форматирование строк на каждый запрос
+    main() - запускает замеры и выводит результат
+"""
+
+import itertools
+import sys
+import timeit
+from pathlib import Path
+
+# добавляем папку src в путь поиска, чтобы модули из этой папки можно было импортировать без указания их местонахождения
+sys.path.insert(1, str(Path(__file__).resolve().parents[1] / 'src'))
+import quizAggregator
+from bench_formatted_quiz_list import QUERIES, make_games
+from config import ORGANIZATORS_DICT
+from scheduleIndex import ScheduleIndex
+
+
+def format_per_request(index, organizatorErrors, **kwargs):
+    """
+    Прежнее формирование списка квизов: строка о каждом отобранном квизе форматируется на каждый запрос.
+    Параметры и возвращаемые значения аналогичны quizAggregator.create_formatted_quiz_list().
+    """
+    organizatorIndexMapping = {orgInfo[0]: orgName for orgName, orgInfo in ORGANIZATORS_DICT.items()}
+    quizList = []
+    positions = index.select(kwargs['dow'], kwargs['selected_theme'], kwargs['excl_bar'], kwargs['excl_theme'],
+                             kwargs['excl_orgs'])
+    for k, n in enumerate(positions, start=1):
+        game = index.games[n]
+        quizAvailability = f'<b>{game.availability.upper()}</b>' if game.availability else ''
+        quizDate = game.date
+        quizMonth = list(quizAggregator.MONTH_DICT.keys())[
+            list(quizAggregator.MONTH_DICT.values()).index(quizDate.month)]
+        quizDateReadable = str(quizDate.day) + ' ' + quizMonth + ', ' + quizDate.time().isoformat('minutes')
+        quizList.append(f"{k}. <b>{organizatorIndexMapping[game.orgTag]}</b>: {game.name}. Бар: {index.bars[n]}, "
+                        f"{quizAggregator.DOW_DICT[quizDate.isoweekday()]}, {quizDateReadable}. {quizAvailability}\n")
+    if len(organizatorErrors) > 0:
+        quizList.append('\nК сожалению не удалось получить информацию по следующим организаторам: ')
+        quizList.extend(organizatorErrors)
+        quizList.append('\nПопробуй запросить информацию по ним позже.')
+    return quizList
+
+
+def main():
+    """Проверяет совпадение результатов и выводит время одного запроса пользователя каждым способом."""
+    games = make_games(5000)
+    index = ScheduleIndex(games, 'Новосибирск', quizAggregator.render_quiz_fragment)
+    queries = [dict(zip(QUERIES, values)) for values in itertools.product(*QUERIES.values())]
+    for kwargs in queries:
+        quizList = quizAggregator.create_formatted_quiz_list(index, {}, **kwargs)
+        assert quizList == format_per_request(index, {}, **kwargs), f'результаты отличаются для запроса {kwargs}'
+    print(f'Проверено запросов: {len(queries)}, квизов в снимке: {len(games)}')
+
+    renderTime = min(timeit.repeat(lambda: [quizAggregator.render_quiz_fragment(game, bar)
+                                            for game, bar in zip(index.games, index.bars)], number=1, repeat=3))
+    print(f'Форматирование строк о квизах (один раз на снимок): {renderTime * 1000:.1f} мс')
+    print(f'{"запрос":<60} {"прежний, мс":>12} {"строки, мс":>11} {"ускорение":>10}')
+    for kwargs in [queries[0], queries[len(queries) // 2], queries[-1]]:
+        previousTime = min(timeit.repeat(lambda: format_per_request(index, {}, **kwargs), number=5, repeat=3)) / 5
+        currentTime = min(timeit.repeat(lambda: quizAggregator.create_formatted_quiz_list(index, {}, **kwargs),
+                                        number=5, repeat=3)) / 5
+        query = f"{kwargs['dow']} {kwargs['selected_theme']} {kwargs['excl_theme']}"
+        print(f'{query:<60} {previousTime * 1000:>12.2f} {currentTime * 1000:>11.2f} '
+              f'{previousTime / currentTime:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
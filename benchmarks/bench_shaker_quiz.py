@@ -0,0 +1,114 @@
+"""
+Бенчмарк разбора страницы Шейкер Квиз функцией quizAggregator.scrape_shaker_quiz() на синтетическом расписании
+из тысяч игр. Сравнивает текущий разбор (JSON из __NEXT_DATA__ извлекается регулярным выражением, бары индексируются
+по id игры) с прежним (дерево всей страницы в bs4, бар каждой игры ищется перебором всего списка мест проведения).
+Перед замерами проверяется, что оба способа возвращают одинаковый результат.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_shaker_quiz.py
+
+Содержит функции:
+    make_shaker_page(gamesCount) - возвращает ответ с синтетической страницей Шейкер Квиз
+    scrape_with_soup_and_scan(res, orgName, orgTag, dateParams) - прежний разбор страницы, для сравнения
+    main() - запускает замеры и выводит результат
+"""
+
+import datetime
+import json
+import random
+import sys
+import timeit
+from pathlib import Path
+
+import bs4
+import requests
+
+# добавляем папку src в путь поиска, чтобы модули из этой папки можно было импортировать без указания их местонахождения
+sys.path.insert(1, str(Path(__file__).resolve().parents[1] / 'src'))
+import quizAggregator
+
+CUR_DT = datetime.datetime(2024, 1, 1)
+DATE_PARAMS = [CUR_DT.year, CUR_DT.year + 1, CUR_DT.month, CUR_DT]
+GAME_NAMES = ['Классика', 'Кино и музыка', 'Угадай мелодию', 'Ностальгия 90-х', 'Гарри Поттер']
+BARS = ['Три Лося', 'Арт П.А.Б.', 'Типография', 'Mishkin&Mishkin', 'Руки ВВерх!']
+
+
+def make_shaker_page(gamesCount):
+    """
+    Возвращает ответ с синтетической страницей Шейкер Квиз: в __NEXT_DATA__ лежат gamesCount игр за полгода и по
+    одному месту проведения на игру в перемешанном порядке, а сама страница дополнена разметкой, как у настоящего
+    сайта на Next.js.
+    :param gamesCount (int): количество игр
+    :return: requests.Response
+    """
+    rnd = random.Random(gamesCount)
+    games, venues = [], []
+    for gameId in range(gamesCount):
+        eventTime = CUR_DT + datetime.timedelta(days=rnd.randint(-30, 180), hours=rnd.choice([12, 14, 15]))
+        games.append({'id': gameId, 'name': rnd.choice(GAME_NAMES), 'number': rnd.randint(1, 200),
+                      'event_time': eventTime.isoformat() + '.000Z', 'status': 'publish'})
+        venues.append({'game_id': gameId, 'name': rnd.choice(BARS)})
+    rnd.shuffle(venues)
+    nextData = json.dumps({'props': {'pageProps': {'store': [
+        ['GET/games/search', games], ['GET/games/venue/:venue/search', venues]
+    ]}}}, ensure_ascii=False)
+    cards = ''.join(f'<div class="game-card"><h3>{game["name"]}</h3><p>{game["event_time"]}</p></div>'
+                    for game in games)
+    content = (f'<html><head><script src="/_next/static/main.js"></script></head><body><div id="__next">{cards}'
+               f'</div><script id="__NEXT_DATA__" type="application/json">{nextData}</script></body></html>')
+    res = requests.Response()
+    res._content = content.encode('utf-8')
+    res.encoding = 'utf-8'
+    return res
+
+
+def scrape_with_soup_and_scan(res, orgName, orgTag, dateParams):
+    """
+    Прежний разбор страницы Шейкер Квиз: дерево всей страницы строится в bs4, бар каждой игры ищется перебором всего
+    списка мест проведения. Параметры и возвращаемые значения аналогичны quizAggregator.scrape_shaker_quiz().
+    """
+    games = {}
+    curYear, nextYear, curMonth, curDT = dateParams
+    quizSoup = bs4.BeautifulSoup(res.text, 'html.parser')
+    shakerData = json.loads(quizSoup.find('script', id='__NEXT_DATA__').string)
+    for shakerInfoList in shakerData['props']['pageProps']['store']:
+        if shakerInfoList[0] == 'GET/games/search':
+            shakerGamesList = shakerInfoList[1]
+        elif shakerInfoList[0] == 'GET/games/venue/:venue/search':
+            shakerVenuesList = shakerInfoList[1]
+
+    for n, shakerGame in enumerate(shakerGamesList):
+        shakerGameName = shakerGame['name']
+        if shakerGame.get('number'):
+            shakerGameName += f" #{shakerGame['number']}"
+        shakerDT = datetime.datetime.fromisoformat(shakerGame['event_time'].replace('Z', '+07:00')).replace(tzinfo=None)
+        shakerBar = ''
+        for venueInfo in shakerVenuesList:
+            if venueInfo['game_id'] == shakerGame['id']:
+                shakerBar = venueInfo['name']
+                break
+        if shakerGame['status'].lower() == 'publish' and shakerDT >= curDT:
+            games[orgTag + str(n + 1)] = {'game': shakerGameName, 'date': shakerDT, 'bar': shakerBar,
+                                          'tag': quizAggregator.assign_themes_to_quiz(shakerGameName, orgName)}
+    return games, {}
+
+
+def main():
+    """Запускает замеры и выводит время одного разбора страницы каждым способом."""
+    print(f'{"игр":>6} {"страница, КБ":>13} {"прежний, мс":>12} {"текущий, мс":>12} {"ускорение":>10}')
+    for gamesCount in [500, 2000, 5000]:
+        res = make_shaker_page(gamesCount)
+        current = quizAggregator.scrape_shaker_quiz(res, 'Шейкер Квиз', 'shaker', DATE_PARAMS)
+        previous = scrape_with_soup_and_scan(res, 'Шейкер Квиз', 'shaker', DATE_PARAMS)
+        assert current == previous, 'результаты разбора страницы отличаются'
+
+        previousTime = min(timeit.repeat(
+            lambda: scrape_with_soup_and_scan(res, 'Шейкер Квиз', 'shaker', DATE_PARAMS), number=1, repeat=3))
+        currentTime = min(timeit.repeat(
+            lambda: quizAggregator.scrape_shaker_quiz(res, 'Шейкер Квиз', 'shaker', DATE_PARAMS), number=1, repeat=3))
+        print(f'{gamesCount:>6} {len(res.content) / 1024:>13.0f} {previousTime * 1000:>12.1f} '
+              f'{currentTime * 1000:>12.1f} {previousTime / currentTime:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
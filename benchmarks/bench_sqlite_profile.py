@@ -0,0 +1,126 @@
+"""
+Бенчмарк профиля производительности SQLite (config.SQLITE_PROFILE) в сравнении с настройками SQLite по умолчанию
+(журнал отката, synchronous FULL, без mmap). Для каждого профиля на новой БД во временной папке замеряется:
+    * запись: сохранение пользователей по одному dbOperations.upsert_user_preferences(), каждое - отдельная транзакция;
+    * чтение: запросы dbOperations.get_user_preferences() по сохраненным пользователям;
+    * смешанная нагрузка: несколько потоков читают, пока один поток пишет, как хэндлеры бота в пуле
+      userDatabase.UserDatabase. В режиме журнала отката читатели ждут, пока писатель держит блокировку.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_sqlite_profile.py
+
+Содержит функции:
+    measure_writes(engine) - количество сохранений в секунду
+    measure_reads(engine) - количество чтений в секунду
+    measure_mixed(engine) - количество чтений и сохранений в секунду при одновременной работе потоков
+    main() - запускает замеры и выводит результат
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# добавляем папку src в путь поиска, чтобы модули из этой папки можно было импортировать без указания их местонахождения
+sys.path.insert(1, str(Path(__file__).resolve().parents[1] / 'src'))
+import dbOperations
+from config import SQLITE_PROFILE
+
+USERS_COUNT = 1000
+READS_COUNT = 20000
+MIXED_READERS = 3
+MIXED_DURATION = 3
+
+
+def make_row(telegramId):
+    """Возвращает параметры предпочтений пользователя для функций dbOperations."""
+    return telegramId, 'Новосибирск', f'Бар {telegramId % 7};Типография', '18+', 'None'
+
+
+def measure_writes(engine):
+    """Сохраняет USERS_COUNT пользователей по одному и возвращает количество сохранений в секунду."""
+    with engine.connect() as conn:
+        start = time.perf_counter()
+        for telegramId in range(USERS_COUNT):
+            assert dbOperations.upsert_user_preferences(conn, *make_row(telegramId))
+        return USERS_COUNT / (time.perf_counter() - start)
+
+
+def measure_reads(engine):
+    """Делает READS_COUNT запросов предпочтений и возвращает количество чтений в секунду."""
+    with engine.connect() as conn:
+        start = time.perf_counter()
+        for n in range(READS_COUNT):
+            assert dbOperations.get_user_preferences(conn, n % USERS_COUNT) is not None
+        return READS_COUNT / (time.perf_counter() - start)
+
+
+def measure_mixed(engine):
+    """
+    MIXED_READERS потоков читают предпочтения, а один поток сохраняет их, в течение MIXED_DURATION секунд.
+    :return: tuple(чтений в секунду, сохранений в секунду, неудавшихся операций)
+    """
+    stopEvent = threading.Event()
+    counts = {'reads': 0, 'writes': 0, 'failures': 0}
+    countsLock = threading.Lock()
+
+    def reader(offset):
+        reads = failures = 0
+        with engine.connect() as conn:
+            n = offset
+            while not stopEvent.is_set():
+                if dbOperations.get_user_preferences(conn, n % USERS_COUNT) is None:
+                    failures += 1
+                reads += 1
+                n += 1
+        with countsLock:
+            counts['reads'] += reads
+            counts['failures'] += failures
+
+    def writer():
+        writes = failures = 0
+        with engine.connect() as conn:
+            n = 0
+            while not stopEvent.is_set():
+                if not dbOperations.upsert_user_preferences(conn, *make_row(n % USERS_COUNT)):
+                    failures += 1
+                writes += 1
+                n += 1
+        with countsLock:
+            counts['writes'] += writes
+            counts['failures'] += failures
+
+    threads = [threading.Thread(target=reader, args=(i * 100,)) for i in range(MIXED_READERS)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(MIXED_DURATION)
+    stopEvent.set()
+    for thread in threads:
+        thread.join()
+    return counts['reads'] / MIXED_DURATION, counts['writes'] / MIXED_DURATION, counts['failures']
+
+
+def run(sqliteProfile):
+    """Выполняет все замеры на новой БД во временной папке с заданным профилем SQLite."""
+    with tempfile.TemporaryDirectory() as tmpDir:
+        engine = dbOperations.create_pooled_engine(f'sqlite:///{tmpDir}/a4av.db', MIXED_READERS + 1, sqliteProfile)
+        dbOperations.create_table(engine)
+        try:
+            return measure_writes(engine), measure_reads(engine), *measure_mixed(engine)
+        finally:
+            engine.dispose()
+
+
+def main():
+    """Выводит результаты замеров для настроек SQLite по умолчанию и для config.SQLITE_PROFILE."""
+    print(f'{"профиль":<24} {"запись/с":>9} {"чтение/с":>9} {"смеш. чтение/с":>15} {"смеш. запись/с":>15} '
+          f'{"ошибок":>7}')
+    for name, sqliteProfile in [('по умолчанию', {}), ('config.SQLITE_PROFILE', SQLITE_PROFILE)]:
+        writes, reads, mixedReads, mixedWrites, failures = run(sqliteProfile)
+        print(f'{name:<24} {writes:>9.0f} {reads:>9.0f} {mixedReads:>15.0f} {mixedWrites:>15.0f} {failures:>7}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Бенчмарк доступа к БД из хэндлеров бота на 1000 одновременных пользователей. Каждый пользователь проходит сценарий
+/start -> /preferences: запрос предпочтений (SELECT), сохранение новых (INSERT), изменение (UPDATE) и повторный
+запрос, а между запросами хэндлер ждет ответа Telegram (asyncio.sleep). Сравнивает прежний способ, при котором
+хэндлеры вызывали функции dbOperations синхронно на одном общем подключении, с userDatabase.UserDatabase, который
+выполняет их в пуле потоков с пулом подключений. Кроме пропускной способности измеряется, насколько event loop
+запаздывает с обработкой других сообщений: пока синхронный запрос пишет на диск, бот не отвечает никому.
+БД SQLite создается во временной папке.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_user_database.py
+
+Содержит функции:
+    run_blocking(dbPath, usersCount) - сценарий с синхронными вызовами dbOperations на общем подключении
+    run_pooled(dbPath, usersCount) - сценарий с userDatabase.UserDatabase
+    main() - запускает замеры и выводит результат
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# добавляем папку src в путь поиска, чтобы модули из этой папки можно было импортировать без указания их местонахождения
+sys.path.insert(1, str(Path(__file__).resolve().parents[1] / 'src'))
+import dbOperations
+from userDatabase import UserDatabase
+
+USERS_COUNT = 1000
+# сколько хэндлер ждет ответа Telegram между запросами к БД, в секундах
+TELEGRAM_LATENCY = 0.005
+# период, с которым event loop должен будить корутину, измеряющую его запаздывание, в секундах
+TICK_INTERVAL = 0.005
+
+
+async def measure_lag(stopEvent, lags):
+    """Запоминает, на сколько позже положенного event loop будит корутину, пока не установлено stopEvent."""
+    while not stopEvent.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_INTERVAL)
+        lags.append(time.perf_counter() - start - TICK_INTERVAL)
+
+
+async def run_scenario(handler, usersCount):
+    """
+    Запускает usersCount хэндлеров одновременно.
+    :return: tuple(время выполнения всех хэндлеров в секундах, максимальное запаздывание event loop в секундах)
+    """
+    lags = []
+    stopEvent = asyncio.Event()
+    lagTask = asyncio.create_task(measure_lag(stopEvent, lags))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(handler(telegramId) for telegramId in range(usersCount)))
+    elapsed = time.perf_counter() - start
+    stopEvent.set()
+    await lagTask
+    assert all(results), 'не все хэндлеры сохранили предпочтения'
+    return elapsed, max(lags, default=0)
+
+
+def run_blocking(dbPath, usersCount):
+    """Прежний способ: хэндлеры вызывают функции dbOperations синхронно на одном общем подключении."""
+    engine, conn = dbOperations.create_connection(dbPath)
+    dbOperations.create_table(engine)
+
+    async def handler(telegramId):
+        dbOperations.get_user_preferences(conn, telegramId)
+        await asyncio.sleep(TELEGRAM_LATENCY)
+        isSaved = dbOperations.insert_new_user(conn, telegramId, 'Новосибирск', 'Типография', 'None', 'None')
+        await asyncio.sleep(TELEGRAM_LATENCY)
+        isSaved &= dbOperations.update_user_preferences(conn, telegramId, 'Новосибирск', 'None', '18+', 'None')
+        return isSaved and dbOperations.get_user_preferences(conn, telegramId) is not None
+
+    try:
+        return asyncio.run(run_scenario(handler, usersCount))
+    finally:
+        conn.close()
+        engine.dispose()
+
+
+def run_pooled(dbPath, usersCount):
+    """Текущий способ: хэндлеры ждут запросы, выполняемые userDatabase.UserDatabase в пуле потоков."""
+    database = UserDatabase(dbPath)
+    database.create_table()
+
+    async def handler(telegramId):
+        await database.get_user_preferences(telegramId)
+        await asyncio.sleep(TELEGRAM_LATENCY)
+        isSaved = await database.insert_new_user(telegramId, 'Новосибирск', 'Типография', 'None', 'None')
+        await asyncio.sleep(TELEGRAM_LATENCY)
+        isSaved &= await database.update_user_preferences(telegramId, 'Новосибирск', 'None', '18+', 'None')
+        return isSaved and await database.get_user_preferences(telegramId) is not None
+
+    try:
+        return asyncio.run(run_scenario(handler, usersCount))
+    finally:
+        database.close()
+
+
+def main():
+    """Выводит пропускную способность хэндлеров и максимальное запаздывание event loop для каждого способа."""
+    print(f'{"способ":<40} {"время, с":>9} {"хэндлеров/с":>12} {"макс. задержка loop, мс":>24}')
+    for name, run in [('синхронно, одно подключение', run_blocking), ('UserDatabase, пул потоков', run_pooled)]:
+        with tempfile.TemporaryDirectory() as tmpDir:
+            elapsed, maxLag = run(f'sqlite:///{tmpDir}/a4av.db', USERS_COUNT)
+        print(f'{name:<40} {elapsed:>9.2f} {USERS_COUNT / elapsed:>12.0f} {maxLag * 1000:>24.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Бенчмарк сохранения предпочтений пользователей в SQLite функцией dbOperations.upsert_user_preferences() в сравнении с
+прежним способом, при котором перед сохранением делался SELECT запрос, и по его результату выбирался INSERT или
+UPDATE. Замеряется:
+    * задержка сохранения одного пользователя (половина пользователей новые, половина уже есть в БД);
+    * сохранение одних и тех же пользователей из нескольких потоков одновременно: при прежнем способе между SELECT и
+      INSERT другой поток успевает добавить пользователя, и INSERT не удается;
+    * массовый импорт: по одному upsert запросу на пользователя и dbOperations.upsert_user_preferences_batch().
+БД SQLite создается во временной папке.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_user_upsert.py
+
+Содержит функции:
+    save_by_select(conn, row) - прежнее сохранение: SELECT, затем INSERT или UPDATE
+    save_by_upsert(conn, row) - сохранение одним upsert запросом
+    main() - запускает замеры и выводит результат
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# добавляем папку src в путь поиска, чтобы модули из этой папки можно было импортировать без указания их местонахождения
+sys.path.insert(1, str(Path(__file__).resolve().parents[1] / 'src'))
+import dbOperations
+
+LATENCY_USERS = 1000
+CONTENTION_THREADS = 8
+CONTENTION_USERS = 200
+IMPORT_USERS = 5000
+
+
+def make_row(telegramId, version=0):
+    """Возвращает параметры предпочтений пользователя для функций dbOperations."""
+    return telegramId, 'Новосибирск', f'Бар {telegramId % 7};Типография', '18+' if version % 2 else 'None', 'None'
+
+
+def save_by_select(conn, row):
+    """Прежнее сохранение: SELECT запрос, затем INSERT, если пользователя нет в БД, или UPDATE, если есть."""
+    if dbOperations.get_user_preferences(conn, row[0]):
+        return dbOperations.update_user_preferences(conn, *row)
+    return dbOperations.insert_new_user(conn, *row)
+
+
+def save_by_upsert(conn, row):
+    """Сохранение одним upsert запросом."""
+    return dbOperations.upsert_user_preferences(conn, *row)
+
+
+def measure_latency(engine, save):
+    """Возвращает среднюю задержку сохранения одного пользователя в секундах."""
+    with engine.connect() as conn:
+        # половина пользователей уже есть в БД
+        dbOperations.upsert_user_preferences_batch(conn, [make_row(n) for n in range(0, LATENCY_USERS, 2)])
+        start = time.perf_counter()
+        for n in range(LATENCY_USERS):
+            assert save(conn, make_row(n, version=1))
+        return (time.perf_counter() - start) / LATENCY_USERS
+
+
+def measure_contention(engine, save):
+    """
+    Каждый из потоков сохраняет одних и тех же новых пользователей.
+    :return: tuple(время в секундах, количество неудавшихся сохранений)
+    """
+    failures = []
+
+    def worker(threadNumber):
+        with engine.connect() as conn:
+            for n in range(CONTENTION_USERS):
+                if not save(conn, make_row(n, version=threadNumber)):
+                    failures.append(n)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(CONTENTION_THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, len(failures)
+
+
+def measure_import(engine, batch):
+    """Возвращает время импорта IMPORT_USERS пользователей в секундах."""
+    rows = [make_row(n) for n in range(IMPORT_USERS)]
+    with engine.connect() as conn:
+        start = time.perf_counter()
+        if batch:
+            assert dbOperations.upsert_user_preferences_batch(conn, rows)
+        else:
+            for row in rows:
+                assert dbOperations.upsert_user_preferences(conn, *row)
+        return time.perf_counter() - start
+
+
+def run(measure, *args):
+    """Выполняет замер на новой БД во временной папке."""
+    with tempfile.TemporaryDirectory() as tmpDir:
+        engine = dbOperations.create_pooled_engine(f'sqlite:///{tmpDir}/a4av.db', CONTENTION_THREADS)
+        dbOperations.create_table(engine)
+        try:
+            return measure(engine, *args)
+        finally:
+            engine.dispose()
+
+
+def main():
+    """Выводит результаты замеров для прежнего способа и upsert."""
+    print(f'Задержка сохранения одного пользователя ({LATENCY_USERS} пользователей):')
+    for name, save in [('SELECT + INSERT/UPDATE', save_by_select), ('upsert', save_by_upsert)]:
+        print(f'    {name:<25} {run(measure_latency, save) * 1000:>8.2f} мс')
+
+    print(f'Одновременное сохранение {CONTENTION_USERS} пользователей из {CONTENTION_THREADS} потоков:')
+    for name, save in [('SELECT + INSERT/UPDATE', save_by_select), ('upsert', save_by_upsert)]:
+        elapsed, failures = run(measure_contention, save)
+        print(f'    {name:<25} {elapsed:>8.2f} с, не сохранено: {failures}')
+
+    print(f'Импорт {IMPORT_USERS} пользователей:')
+    for name, batch in [('upsert по одному', False), ('upsert_user_preferences_batch', True)]:
+        print(f'    {name:<30} {run(measure_import, batch):>8.2f} с')
+
+
+if __name__ == '__main__':
+    main()
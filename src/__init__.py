@@ -2,11 +2,20 @@
 Телеграм-бот, создающий список квизов, проходящих в Новосибирске.
 
 Модули:
+    barIndex.py - нормализация названий баров с сайтов организаторов по config.CITY_DICT города
+    browserPool.py - пул браузеров Google Chrome для скрейперов на Selenium
     config.py - конфигурация бота
     dbOperations.py - операции с базой данных
+    httpClient.py - общий HTTP-клиент с пулом keep-alive соединений для скрейпинга сайтов организаторов
     quizAggregator.py - сбор и форматирование информации о проводимых квизах с сайтов организаторов
+    quizGame.py - неизменяемая запись о квизе, которую возвращают скрейперы
+    scheduleCache.py - общий для всех пользователей кэш расписаний квизов по городам
+    scheduleIndex.py - индекс снимка расписания для быстрой фильтрации квизов под предпочтения пользователя
     secrets.py - пароли
+    seleniumWaits.py - ожидания готовности страниц для скрейперов на Selenium
     telegramBot.py - телеграм-бот, именно этот файл нужно запустить для работы программы
+    userDatabase.py - неблокирующий доступ к БД для хэндлеров бота через пул потоков и пул подключений
+    userPreferences.py - предпочтения пользователей, разобранные в множества исключений и закэшированные по telegram_id
 """
 
 # TODO LIST:
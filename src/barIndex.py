@@ -0,0 +1,135 @@
+"""
+Модуль нормализации названий баров, в которых проходят квизы.
+Организаторы пишут название одного и того же бара по-разному: 'Бар Три Лося', 'Три лося, пр. Карла Маркса, 5',
+'Harat`s pub'. Чтобы пользователь видел единое название и мог исключить бар в /preferences, название приводится к
+написанию из config.CITY_DICT того города, по которому строится расписание.
+Для каждого города один раз строится индекс: названия баров из config.CITY_DICT в свернутом виде (в нижнем регистре,
+с обратной кавычкой вместо апострофа и пробелами вместо знаков препинания). Результат нормализации запоминается по
+каждой строке с сайта организатора, поэтому при обновлении расписания уже встречавшиеся названия не разбираются заново.
+Названия, для которых бар в config.CITY_DICT не нашелся, подсчитываются, чтобы по статистике можно было дополнить
+config.
+
+Содержит классы:
+    BarIndex - индекс нормализации названий баров одного города
+Содержит функции:
+    fold_bar_name(bar) - сворачивает название бара для сравнения
+    get_bar_index(city) - возвращает индекс нормализации названий баров города
+    get_unknown_bars() - возвращает статистику названий баров, которых нет в config.CITY_DICT, по городам
+Содержит константы:
+    BAR_INDEXES - индексы нормализации названий баров по городам, создаются при первом обращении
+    BAR_INDEXES_LOCK - блокировка, защищающая создание индексов в BAR_INDEXES
+    PUNCTUATION_REGEX - регулярное выражение для знаков препинания и пробелов в названии бара
+"""
+
+import collections
+import logging
+import re
+import threading
+
+from config import CITY_DICT
+
+# начать логирование в модуле
+logger = logging.getLogger(__name__)
+
+PUNCTUATION_REGEX = re.compile(r'[\W_]+')
+BAR_INDEXES = {}
+# блокировка защищает создание индексов в BAR_INDEXES
+BAR_INDEXES_LOCK = threading.Lock()
+
+
+def fold_bar_name(bar):
+    """
+    Сворачивает название бара для сравнения: нижний регистр, знаки препинания заменяются пробелами.
+    'Арт П.А.Б.' -> 'арт п а б', 'Harat`s pub' -> 'harat s pub'.
+    :param bar (str): название бара
+    :return: str
+    """
+    bar = bar.replace("`", "'")  # для единообразного написания Harat's pub
+    return PUNCTUATION_REGEX.sub(' ', bar.lower()).strip()
+
+
+class BarIndex:
+    """
+    Индекс нормализации названий баров одного города. Создается один раз на город (см. get_bar_index()) и живет
+    между обновлениями расписания.
+
+    Атрибуты:
+        city (str) - название города
+        bars (tuple) - tuple (свернутое название, название из config.CITY_DICT) в порядке config.CITY_DICT
+    Содержит методы:
+        normalize(bar) - приводит название бара к написанию из config.CITY_DICT
+        get_unknown() - возвращает названия баров, которых нет в config.CITY_DICT, и сколько раз они встретились
+    """
+
+    def __init__(self, city):
+        """
+        :param city (str): название города; если его нет в config.CITY_DICT, то ни один бар не нормализуется
+        """
+        self.city = city
+        self.bars = tuple((fold_bar_name(bar), bar) for bar in CITY_DICT.get(city, {}).get('bars', []))
+        # результаты нормализации по строкам с сайтов организаторов: {строка: (название, известен ли бар)}
+        self._memo = {}
+        self._unknown = collections.Counter()
+        self._lock = threading.Lock()
+
+    def normalize(self, bar):
+        """
+        Приводит название бара к написанию из config.CITY_DICT: 'Бар Три Лося' -> 'Три лося'. Бар из config
+        подходит, если его свернутое название входит в свернутое название с сайта; если подходят несколько, то
+        берется первый по порядку в config.CITY_DICT. Если не подошел ни один, то название остается как есть (с
+        апострофом вместо обратной кавычки), а в статистике неизвестных баров увеличивается счетчик этого названия.
+        :param bar (str): название бара с сайта организатора
+        :return: str
+        """
+        result = self._memo.get(bar)
+        if result is None:
+            foldedBar = fold_bar_name(bar)
+            result = (bar.replace("`", "'"), False)
+            for foldedCityBar, cityBar in self.bars:
+                if foldedCityBar in foldedBar:
+                    result = (cityBar, True)
+                    break
+            self._memo[bar] = result
+            if not result[1]:
+                logger.info(f'Бара "{bar}" нет в config.CITY_DICT по городу {self.city}')
+
+        barNormalizedName, isKnown = result
+        if not isKnown:
+            with self._lock:
+                self._unknown[bar] += 1
+        return barNormalizedName
+
+    def get_unknown(self):
+        """
+        Возвращает названия баров с сайтов организаторов, которых нет в config.CITY_DICT, и сколько раз они
+        встретились при построении снимков расписания, начиная с самых частых.
+        :return: dict вида {'MISHKIN&MISHKIN': 12}
+        """
+        with self._lock:
+            return dict(self._unknown.most_common())
+
+
+def get_bar_index(city):
+    """
+    Возвращает индекс нормализации названий баров города, при первом обращении создает его.
+    :param city (str): название города
+    :return: BarIndex
+    """
+    barIndex = BAR_INDEXES.get(city)
+    if barIndex is None:
+        with BAR_INDEXES_LOCK:
+            barIndex = BAR_INDEXES.setdefault(city, BarIndex(city))
+    return barIndex
+
+
+def get_unknown_bars():
+    """
+    Возвращает статистику названий баров, которых нет в config.CITY_DICT, по городам, для мониторинга.
+    :return: dict вида {'Новосибирск': {'MISHKIN&MISHKIN': 12}}
+    """
+    unknownBars = {}
+    for city, barIndex in list(BAR_INDEXES.items()):
+        cityUnknownBars = barIndex.get_unknown()
+        if cityUnknownBars:
+            unknownBars[city] = cityUnknownBars
+    return unknownBars
@@ -0,0 +1,323 @@
+"""
+Модуль пула браузеров Google Chrome для скрейперов на Selenium.
+Запуск headless Chrome занимает несколько секунд и сотни МБ памяти, поэтому браузеры не создаются на каждый скрейпинг,
+а берутся из пула и возвращаются в него после скрейпинга. Размер пула ограничен (config.BROWSER_POOL_SIZE): если все
+браузеры заняты, скрейпер ждет освобождения одного из них. Браузер перезапускается, если он перестал отвечать, если
+скрейпинг с ним завершился ошибкой, либо после config.BROWSER_MAX_USES скрейпингов.
+
+Каждый браузер - это дерево процессов: chromedriver и запущенные им процессы Google Chrome. Если driver.quit() не
+завершил какие-то из них (например, chromedriver уже упал), то пул добивает оставшиеся процессы сам. Кроме того,
+telegramBot.reap_browsers_job() периодически вызывает BrowserPool.reap_orphans(), который находит и завершает процессы
+chrome/ chromedriver бота, не принадлежащие ни одному браузеру пула.
+
+Содержит классы:
+    BrowserPool - пул браузеров
+Содержит функции:
+    create_driver() - запускает новый headless Google Chrome
+"""
+
+import logging
+import threading
+import time
+
+import psutil
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from config import (
+    BROWSER_CHECKOUT_TIMEOUT,
+    BROWSER_MAX_USES,
+    BROWSER_POOL_SIZE,
+    BROWSER_QUIT_TIMEOUT,
+    BROWSER_USER_AGENT
+)
+
+# начать логирование в модуле
+logger = logging.getLogger(__name__)
+
+
+def create_driver():
+    """
+    Запускает новый headless Google Chrome.
+    :return: selenium.webdriver.Chrome
+    """
+    options = Options()  # настройки для запуска Google Chrome с помощью ChromeDriver
+    options.add_argument('--no-sandbox')  # чтобы можно было запускать от root
+    options.add_argument('--headless=new')  # чтобы не открывалось само приложение Google Chrome
+    options.add_argument(f'--user-agent={BROWSER_USER_AGENT}')
+    return webdriver.Chrome(options=options)
+
+
+def _is_browser_process(process):
+    """Проверяет, что процесс - это chromedriver или один из процессов Google Chrome/ Chromium."""
+    try:
+        return 'chrom' in process.name().lower()
+    except psutil.Error:
+        return False
+
+
+def _process_tree(driver):
+    """
+    Возвращает процессы браузера: chromedriver и все его дочерние процессы.
+    :param driver (selenium.webdriver.Chrome): браузер
+    :return: list of psutil.Process; пустой список, если процесс chromedriver неизвестен или уже завершился
+    """
+    try:
+        driverProcess = psutil.Process(driver.service.process.pid)
+        return [driverProcess] + driverProcess.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return []
+
+
+def _kill_processes(processes, timeout=BROWSER_QUIT_TIMEOUT):
+    """
+    Завершает процессы, которые еще работают.
+    :param processes (list): list of psutil.Process
+    :param timeout (int): сколько секунд ждать завершения процессов после SIGKILL
+    :return: int, сколько процессов пришлось завершить
+    """
+    alive = []
+    # один и тот же процесс может попасть в список несколько раз, оставляем по одному объекту на pid
+    for process in {process.pid: process for process in processes}.values():
+        try:
+            # is_running() сверяет время запуска процесса, поэтому чужой процесс с тем же pid не будет завершен
+            if process.is_running() and process.status() != psutil.STATUS_ZOMBIE:
+                process.kill()
+                alive.append(process)
+        except psutil.Error:
+            pass
+    psutil.wait_procs(alive, timeout=timeout)
+    return len(alive)
+
+
+class BrowserPool:
+    """
+    Пул долгоживущих браузеров. Браузеры создаются по мере необходимости, но не больше size одновременно.
+
+    Содержит методы:
+        checkin(driver, failed=False) - возвращает браузер в пул
+        checkout(timeout=None) - берет браузер из пула
+        close() - закрывает все браузеры пула
+        get_stats() - возвращает статистику работы пула
+        reap_orphans(process=None) - завершает процессы браузеров, не принадлежащие пулу
+    """
+
+    def __init__(self, size=BROWSER_POOL_SIZE, maxUses=BROWSER_MAX_USES, driverFactory=create_driver):
+        """
+        :param size (int): сколько браузеров может быть запущено одновременно
+        :param maxUses (int): после скольких использований браузер перезапускается
+        :param driverFactory: функция, которая запускает новый браузер; подменяется в unit-тестах
+        """
+        self._size = size
+        self._maxUses = maxUses
+        self._driverFactory = driverFactory
+        # свободные браузеры, готовые к использованию
+        self._idle = []
+        # сколько раз использован каждый запущенный браузер: {driver: int}
+        self._uses = {}
+        # сколько браузеров запускается прямо сейчас, пока они запускаются место в пуле за ними зарезервировано
+        self._starting = 0
+        # идет поиск процессов-сирот: пока он не закончится, новые браузеры не запускаются, иначе их процессы, еще не
+        # известные пулу, будут приняты за сирот
+        self._reaping = False
+        # процессы браузеров на момент последнего возврата в пул, чтобы добить их, даже если chromedriver упал:
+        # {driver: list of psutil.Process}
+        self._processes = {}
+        self._created = 0
+        self._recycled = 0
+        self._checkouts = 0
+        self._killedOnQuit = 0
+        self._leaked = 0
+        self._reaped = 0
+        self._closed = False
+        # условие защищает все поля пула, на нем же ждут освобождения браузера
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def _is_healthy(driver):
+        """Проверяет, что браузер отвечает на команды."""
+        try:
+            return driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def _remove(self, driver):
+        """Убирает браузер из пула, освобождая место под новый. Вызывается под блокировкой self._condition.
+        Возвращает процессы браузера, запомненные при последнем возврате в пул."""
+        self._uses.pop(driver, None)
+        self._recycled += 1
+        self._condition.notify()
+        return self._processes.pop(driver, [])
+
+    def _quit(self, driver, knownProcesses, reason):
+        """
+        Закрывает браузер и завершает все его процессы, которые остались после driver.quit().
+        Вызывается без блокировки, т.к. закрытие браузера может занять несколько секунд.
+        """
+        processes = knownProcesses + _process_tree(driver)
+        logger.info(f'Пул браузеров: браузер закрыт, причина: {reason}')
+        try:
+            driver.quit()
+        except Exception as err:
+            logger.error(f'Пул браузеров: ошибка при закрытии браузера: {err}')
+        killed = _kill_processes(processes)
+        if killed:
+            logger.warning(f'Пул браузеров: после закрытия браузера пришлось завершить {killed} процессов')
+            with self._condition:
+                self._killedOnQuit += killed
+
+    def checkout(self, timeout=BROWSER_CHECKOUT_TIMEOUT):
+        """
+        Берет из пула свободный браузер. Если свободных нет, но пул еще не заполнен, запускает новый браузер. Если пул
+        заполнен, ждет освобождения браузера.
+        :param timeout (int): сколько секунд ждать свободный браузер
+        :return: selenium.webdriver.Chrome
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._condition:
+                if self._closed:
+                    raise RuntimeError('Пул браузеров закрыт')
+                if self._idle:
+                    # браузер убран из свободных, но остается в _uses, поэтому другие потоки его не возьмут
+                    driver = self._idle.pop()
+                elif len(self._uses) + self._starting < self._size and not self._reaping:
+                    # резервируем место под новый браузер до окончания его запуска
+                    self._starting += 1
+                    break
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f'Нет свободного браузера в пуле в течение {timeout} сек.')
+                    self._condition.wait(remaining)
+                    continue
+            # проверяем что браузер не упал, пока лежал в пуле. Проверка - это запрос к chromedriver, который может
+            # зависнуть, поэтому она выполняется без блокировки, чтобы не останавливать остальные потоки
+            if self._is_healthy(driver):
+                with self._condition:
+                    self._checkouts += 1
+                return driver
+            with self._condition:
+                knownProcesses = self._remove(driver)
+            self._quit(driver, knownProcesses, 'браузер не отвечает')
+
+        # запуск браузера долгий, поэтому выполняется без блокировки
+        try:
+            driver = self._driverFactory()
+        except Exception:
+            with self._condition:
+                self._starting -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._starting -= 1
+            self._uses[driver] = 0
+            self._created += 1
+            self._checkouts += 1
+        logger.info('Пул браузеров: запущен новый браузер')
+        return driver
+
+    def checkin(self, driver, failed=False):
+        """
+        Возвращает браузер в пул. Браузер закрывается, если скрейпинг с ним завершился ошибкой, если он перестал
+        отвечать или если он отработал maxUses раз.
+        :param driver (selenium.webdriver.Chrome): браузер, полученный из checkout()
+        :param failed (bool): завершился ли скрейпинг ошибкой
+        :return: None
+        """
+        # очищаем состояние браузера, чтобы следующий скрейпер начинал с чистой страницы. если браузер упал,
+        # то очистка завершится ошибкой
+        healthy = False
+        if not failed:
+            try:
+                driver.delete_all_cookies()
+                driver.get('about:blank')
+                healthy = True
+            except Exception:
+                pass
+        processes = _process_tree(driver)
+
+        with self._condition:
+            self._uses[driver] = self._uses.get(driver, 0) + 1
+            if self._closed:
+                reason = 'пул закрыт'
+            elif failed:
+                reason = 'скрейпинг завершился ошибкой'
+            elif not healthy:
+                reason = 'браузер не отвечает'
+            elif self._uses[driver] >= self._maxUses:
+                reason = f'браузер использован {self._uses[driver]} раз'
+            else:
+                if processes:
+                    self._processes[driver] = processes
+                self._idle.append(driver)
+                self._condition.notify()
+                return
+            knownProcesses = self._remove(driver)
+        self._quit(driver, knownProcesses + processes, reason)
+
+    def close(self):
+        """
+        Закрывает все свободные браузеры. Занятые браузеры закроются при возврате в пул.
+        :return: None
+        """
+        with self._condition:
+            self._closed = True
+            toQuit = [(driver, self._remove(driver)) for driver in self._idle]
+            self._idle.clear()
+            self._condition.notify_all()
+        for driver, knownProcesses in toQuit:
+            self._quit(driver, knownProcesses, 'пул закрыт')
+
+    def reap_orphans(self, process=None):
+        """
+        Находит среди дочерних процессов бота процессы chrome/ chromedriver, которые не принадлежат ни одному
+        запущенному браузеру пула, и завершает их. Пока какой-то браузер запускается, проверка не выполняется, т.к.
+        его процессы еще не известны пулу, а во время проверки новые браузеры не запускаются.
+        :param process (psutil.Process): процесс, дочерние процессы которого проверяются, по умолчанию - текущий
+        :return: int, сколько найдено и завершено процессов-сирот
+        """
+        if process is None:
+            process = psutil.Process()
+        with self._condition:
+            if self._starting:
+                return 0
+            self._reaping = True
+            drivers = list(self._uses)
+            knownProcesses = [p for processes in self._processes.values() for p in processes]
+
+        try:
+            livePids = {p.pid for p in knownProcesses}
+            for driver in drivers:
+                livePids.update(p.pid for p in _process_tree(driver))
+            try:
+                children = process.children(recursive=True)
+            except psutil.Error:
+                children = []
+            orphans = [child for child in children if child.pid not in livePids and _is_browser_process(child)]
+            leaked = _kill_processes(orphans)
+        finally:
+            with self._condition:
+                self._reaping = False
+                # будим потоки, которые ждут возможности запустить новый браузер
+                self._condition.notify_all()
+
+        with self._condition:
+            self._leaked = leaked
+            self._reaped += leaked
+        if leaked:
+            logger.warning(f'Пул браузеров: найдено и завершено {leaked} процессов chrome/ chromedriver вне пула')
+        return leaked
+
+    def get_stats(self):
+        """
+        Возвращает статистику работы пула для мониторинга. leaked - сколько процессов-сирот нашла последняя проверка
+        reap_orphans(), reaped - сколько их найдено всего, killedOnQuit - сколько процессов пришлось завершить
+        принудительно после driver.quit().
+        :return: dict вида {'size': 2, 'running': 1, 'idle': 1, 'created': 3, 'recycled': 2, 'checkouts': 40,
+                            'killedOnQuit': 0, 'leaked': 0, 'reaped': 0}
+        """
+        with self._condition:
+            return {'size': self._size, 'running': len(self._uses), 'idle': len(self._idle),
+                    'created': self._created, 'recycled': self._recycled, 'checkouts': self._checkouts,
+                    'killedOnQuit': self._killedOnQuit, 'leaked': self._leaked, 'reaped': self._reaped}
@@ -5,20 +5,46 @@
 
 Константы, используемые в других модулях:
     BOT_TOKEN (str) - токен для подключения к боту, импортируется из secrets.py (файл исключен из GIT)
+    BROWSER_CHECKOUT_TIMEOUT (int) - сколько секунд скрейпер ждет свободный браузер из пула
+    BROWSER_MAX_USES (int) - после скольких скрейпингов браузер из пула перезапускается
+    BROWSER_POOL_SIZE (int) - сколько запущенных Google Chrome может одновременно держать пул браузеров
+    BROWSER_QUIT_TIMEOUT (int) - сколько секунд ждать завершения процессов браузера после их принудительной остановки
+    BROWSER_REAPER_INTERVAL (int) - период поиска и завершения процессов chrome/ chromedriver вне пула, в секундах
+    BROWSER_USER_AGENT (str) - User-agent браузеров из пула
     CITY_DICT (dict) - информация о городах, которые поддерживает бот
     DBPATH (str) - строка подключения к БД для SQLAlchemy
+    DB_POOL_SIZE (int) - сколько подключений к БД и потоков для запросов к ней использует бот
+    HTML_PARSER (str) - парсер HTML-кода страниц организаторов для bs4, если он установлен
+    HTTP_CACHE_DIR (pathlib.Path) - папка дискового кэша веб-страниц организаторов для условных GET-запросов
+    HTTP_POOL_CONNECTIONS (int) - по скольким хостам общий HTTP-клиент хранит пулы keep-alive соединений
+    HTTP_POOL_MAXSIZE (int) - сколько соединений общий HTTP-клиент может держать к одному хосту
+    HTTP_TIMEOUT (tuple) - таймауты HTTP-запросов к сайтам организаторов (на подключение, на чтение), в секундах
     logger - объект класса logger, с помощью которого ведется логирование
     ORGANIZATORS_DICT (dict) - информация об организаторах, с сайтов которых бот может получить информацию о квизах
+    QUIZ_LIST_CACHE_SIZE (int) - сколько отформатированных списков квизов хранит общий кэш расписаний бота
     QUIZ_THEMES (dict) - перечень возможных тематик, которые присваиваются квизам и по к-ым можно фильтровать
     ROOT_DIR (pathlib.Path) - путь до корневого каталога проекта
+    SCHEDULE_CACHE_ERROR_TTL (int) - время жизни в кэше результата скрейпинга, завершившегося ошибкой, в секундах
+    SCHEDULE_CACHE_TTL (dict) - время жизни расписания организатора в общем кэше бота, в секундах
+    SCHEDULE_REFRESH_INTERVAL (dict) - период фонового обновления расписания организатора, в секундах
+    SCHEDULE_REFRESH_STAGGER (int) - сдвиг первого запуска фоновых обновлений друг относительно друга, в секундах
+    SCRAPER_MAX_WORKERS (int) - сколько сайтов организаторов можно скрейпить одновременно
+    SELENIUM_POLL_INTERVAL (float) - как часто скрейперы на Selenium проверяют готовность страницы, в секундах
+    SELENIUM_STABLE_PERIOD (float) - сколько секунд не должно меняться количество карточек квизов на странице
+    SELENIUM_WAIT_BUDGETS (dict) - максимальное время ожиданий готовности страниц по организаторам, в секундах
+    SQLITE_PROFILE (dict) - настройки производительности SQLite (PRAGMA), применяемые к каждому подключению к БД
+    THEME_CACHE_SIZE (int) - для скольких последних названий квизов запоминаются определенные по ним тематики
     THEME_MAPPING_DICT - словарь для определения тематики квиза по словам, входящим в его название
+    USER_PREFERENCES_CACHE_SIZE (int) - для скольких пользователей предпочтения хранятся в памяти бота
 
 Для заведения нового организатора, который проводит игры в разных городах:
 * добавь его название, тэг и baseUrl в ORGANIZATORS_DICT
 * добавь его во все города присутствия в словарь CITY_DICT
+* при необходимости задай время жизни его расписания в кэше в словаре SCHEDULE_CACHE_TTL и период фонового обновления
+в словаре SCHEDULE_REFRESH_INTERVAL
 * если у него есть исключения при формировании итогового URL, то пропиши их в quizAggregator.create_info_by_city()
 * добавь в quizAggregator функцию для скрейпинга HTML-страницы с расписанием игр по аналогии с scrape_quiz_please()
-* добавь в quizAggregator.collect_quiz_data() вызов функции скрейпинга из прошлого пункта
+* добавь в quizAggregator.scrape_organizator() вызов функции скрейпинга из прошлого пункта
 * пополни словарь THEME_MAPPING_DICT специфическими названиями игр организатора, чтобы корректно определять тематику
 * если тематику сложно определить с помощью словаря, то добавь regexp или другую логику в
 quizAggregator.assign_themes_to_quiz()
@@ -37,6 +63,25 @@ from secrets import BOT_TOKEN
 # выход в родительский каталог сделан потому что создание БД запускается из ./src/dbOperations.py,
 # а база данных должна быть создана в ./app_db
 DBPATH = 'sqlite:///../app_db/a4av.db'
+# сколько подключений к БД держит пул (dbOperations.create_pooled_engine()) и сколько потоков выполняют запросы к БД из
+# хэндлеров бота (userDatabase.UserDatabase). Запросы сверх этого количества ждут в очереди, не блокируя event loop
+DB_POOL_SIZE = 4
+# настройки производительности SQLite, которые dbOperations.apply_sqlite_profile() применяет к каждому новому
+# подключению. Все ключи, кроме cached_statements, - это PRAGMA (https://www.sqlite.org/pragma.html):
+# * journal_mode WAL - читатели не блокируют писателя и наоборот, запись идет в журнал -wal рядом с файлом БД;
+# * synchronous NORMAL - в режиме WAL fsync делается при checkpoint, а не на каждую транзакцию: БД не повреждается,
+#   но при отключении питания могут потеряться последние сохраненные настройки пользователей;
+# * busy_timeout - сколько миллисекунд ждать, пока БД заблокирована другим подключением, прежде чем вернуть ошибку;
+# * mmap_size - сколько байт файла БД читать через отображение в память, без копирования в кэш страниц SQLite.
+# cached_statements - сколько скомпилированных SQL-запросов хранит каждое подключение sqlite3.
+# пустой словарь - настройки SQLite по умолчанию
+SQLITE_PROFILE = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 64 * 1024 * 1024,
+    'cached_statements': 256,
+}
 
 # путь до корневого каталога проекта
 curFileLocation = os.path.abspath(__file__)   # D:\Python\userdir\A4AV_quiz_bot\src\config.py
@@ -100,6 +145,9 @@ THEME_MAPPING_DICT = {
     'Ностальгия': ['ссср', 'советск', '10-', '00-', '90-', '80-', '10е', '00е', '90е', '08е'],
     '18+': ['18+', 'чёрный квиз', 'черный квиз']
 }
+# тематики, определенные по названию квиза, запоминаются (quizAggregator.assign_themes_to_quiz()): названия игр
+# повторяются от обновления к обновлению расписания, поэтому заново они не разбираются
+THEME_CACHE_SIZE = 4096
 
 # словарь для организаторов, которые проводят квизы во многих городах
 # присваивиаем организаторам короктие тэги, которые будет использоваться при фильтрации под предпочтения пользователя
@@ -114,6 +162,88 @@ ORGANIZATORS_DICT = {
     'Эйнштейн пати': ['ein', ' https://<city_tag>.albertparty.ru/schedule']        # https://nsk.albertparty.ru/schedule
 }
 
+# время жизни (в секундах) расписания организатора в общем для всех пользователей кэше бота (scheduleCache.py).
+# ключ словаря - тэг организатора из ORGANIZATORS_DICT, если организатора в словаре нет - берется значение 'default'.
+# пока расписание в кэше не устарело, сайт организатора повторно не скрейпится
+SCHEDULE_CACHE_TTL = {
+    'default': 3600,
+    'mama': 7200,   # расписание Мама Квиз меняется редко
+    'qp': 3600,
+    'wow': 3600,
+}
+# если при скрейпинге организатора произошла ошибка, то повторяем попытку не раньше чем через столько секунд
+SCHEDULE_CACHE_ERROR_TTL = 300
+# сколько отформатированных списков квизов (по всем городам) хранит общий кэш расписаний. Разных запросов немного:
+# 3 варианта дней недели x 6 тематик, умноженные на число различающихся наборов исключений из /preferences.
+# при переполнении вытесняется список, который дольше всего не запрашивали
+QUIZ_LIST_CACHE_SIZE = 256
+# для скольких пользователей разобранные предпочтения из /preferences (userPreferences.py) хранятся в памяти, чтобы не
+# запрашивать их из БД на каждую команду /start. При переполнении вытесняется пользователь, к которому дольше всего не
+# обращались
+USER_PREFERENCES_CACHE_SIZE = 10000
+
+# период (в секундах) фонового обновления расписания организатора в кэше, задачи обновления регистрируются в
+# telegramBot.main() для каждого города из CITY_DICT. Ключи словаря аналогичны SCHEDULE_CACHE_TTL.
+# период должен быть меньше времени жизни в SCHEDULE_CACHE_TTL, тогда пользователи всегда получают расписание из
+# заранее прогретого кэша и не ждут скрейпинга
+SCHEDULE_REFRESH_INTERVAL = {
+    'default': 1800,
+    'mama': 5400,
+    'qp': 2700,
+    'wow': 2700,
+}
+# чтобы при старте бота все организаторы не скрейпились одновременно, первый запуск каждой следующей задачи
+# обновления сдвигается на столько секунд
+SCHEDULE_REFRESH_STAGGER = 10
+
+# сколько сайтов организаторов quizAggregator.collect_quiz_data() скрейпит одновременно. Часть организаторов
+# скрейпится через Selenium, и каждый такой поток держит запущенный Google Chrome, поэтому на слабом сервере значение
+# лучше не увеличивать
+SCRAPER_MAX_WORKERS = 3
+
+# настройки пула браузеров Google Chrome (browserPool.py), который используют скрейперы на Selenium.
+# каждый запущенный браузер занимает несколько сотен МБ памяти, поэтому на слабом сервере размер пула лучше не
+# увеличивать: если все браузеры заняты, скрейпер ждет освобождения браузера до BROWSER_CHECKOUT_TIMEOUT секунд.
+# после BROWSER_MAX_USES скрейпингов браузер перезапускается, чтобы не копилась занятая им память
+BROWSER_POOL_SIZE = 2
+BROWSER_MAX_USES = 20
+BROWSER_CHECKOUT_TIMEOUT = 120
+# если после driver.quit() процессы браузера еще работают, то пул завершает их принудительно и ждет их завершения
+BROWSER_QUIT_TIMEOUT = 5
+# раз в BROWSER_REAPER_INTERVAL секунд бот ищет и завершает свои процессы chrome/ chromedriver, которые не принадлежат
+# ни одному браузеру пула (см. telegramBot.reap_browsers_job())
+BROWSER_REAPER_INTERVAL = 600
+
+# бюджеты ожиданий готовности страниц в скрейперах на Selenium (seleniumWaits.py), в секундах. Ключ словаря - тэг
+# организатора из ORGANIZATORS_DICT, если ожидание для организатора не задано - берется значение из 'default'.
+# pageLoad - загрузка расписания после открытия страницы, pagination - смена страницы расписания (Квиз Плиз),
+# loadMore - подгрузка квизов кнопкой 'Загрузить еще' (Вау Квиз). Фактическое время ожиданий пишется в лог, по нему
+# бюджеты можно уточнить
+SELENIUM_WAIT_BUDGETS = {
+    'default': {'pageLoad': 15, 'pagination': 10, 'loadMore': 5},
+    'qp': {'pageLoad': 20},
+    'wow': {'pageLoad': 20, 'loadMore': 3}
+}
+SELENIUM_POLL_INTERVAL = 0.1
+# количество карточек квизов считается окончательным, если оно не менялось SELENIUM_STABLE_PERIOD секунд
+SELENIUM_STABLE_PERIOD = 0.5
+# без User-agent обычного браузера Квиз Плиз не отдает расписание headless-браузеру
+BROWSER_USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+                      'Chrome/125.0.0.0 Safari/537.36')
+
+# настройки общего HTTP-клиента (httpClient.py), через который скрейпятся сайты организаторов без Selenium.
+# соединений к одному хосту нужно не больше, чем потоков скрейпинга
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = SCRAPER_MAX_WORKERS
+HTTP_TIMEOUT = (5, 30)
+# в этой папке httpClient хранит последние скачанные версии страниц организаторов вместе с их ETag/ Last-Modified,
+# чтобы при следующем запросе сайт мог ответить 304 Not Modified вместо передачи страницы целиком
+HTTP_CACHE_DIR = ROOT_DIR / 'http_cache'
+
+# парсер, которым bs4 строит дерево HTML-кода страниц организаторов: 'lxml' работает в разы быстрее и расходует меньше
+# памяти, чем встроенный в Python 'html.parser'. Если пакет lxml не установлен, то используется 'html.parser'
+HTML_PARSER = 'lxml'
+
 # словарь с информацией о городах - какие организаторы есть, какой у этого организатора <city_tag> для формирования
 # ссылки на страницу с расписанием, на каких площадках проводят игры,
 # правила заполнения словаря: тэги должны совпадать с organizatorsTags;
@@ -1,13 +1,35 @@
 """
 Модуль операций с базой данных на основе SQLAlchemy.
+Предпочтения пользователей хранятся в двух таблицах: users - один пользователь на строку с telegram_id в качестве
+первичного ключа, и user_exclusions - по строке на каждый исключенный бар, тематику или организатора с индексом по
+(вид исключения, название), поэтому запросы вида "какие пользователи исключили бар X" не требуют полного просмотра
+таблицы и разбора строк. Функции модуля по-прежнему принимают и возвращают исключения строками вида
+'Арт П.А.Б.;Типография' (или 'None'), как хранилось в прежней таблице user_preferences; данные из нее один раз
+переносятся в новые таблицы функцией migrate_user_preferences().
+К каждому новому подключению к SQLite применяется профиль производительности config.SQLITE_PROFILE: журнал WAL, в
+котором чтение не блокирует запись, уровень synchronous, время ожидания блокировки, mmap и кэш скомпилированных
+запросов (см. apply_sqlite_profile()).
 
 Содержит функции:
-    create_connection(dbPath) - создает подключение к БД (и файл БД при использовании SQLite)
-    create_table(engine) - создает таблицы в БД
+    apply_sqlite_profile(engine, sqliteProfile) - применяет PRAGMA профиля к каждому новому подключению к SQLite
+    create_connection(dbPath, sqliteProfile) - создает подключение к БД (и файл БД при использовании SQLite)
+    create_pooled_engine(dbPath, poolSize, sqliteProfile) - создает Engine с пулом подключений для работы из нескольких
+        потоков
+    create_table(engine) - создает таблицы в БД и переносит в них данные из прежней таблицы user_preferences
+    migrate_user_preferences(engine) - переносит данные из прежней таблицы user_preferences в users и user_exclusions
     get_user_preferences(conn, telegram_id) - делает SELECT запрос
     insert_new_user(conn, telegram_id, city, excl_bar, excl_theme, excl_org) - делает INSERT запрос
     update_user_preferences(conn, telegram_id, city, excl_bar, excl_theme, excl_org) - делает UPDATE запрос
+    upsert_user_preferences(conn, telegram_id, city, excl_bar, excl_theme, excl_org) - делает INSERT ... ON CONFLICT
+        DO UPDATE запрос
+    upsert_user_preferences_batch(conn, preferencesRows) - делает INSERT ... ON CONFLICT DO UPDATE запрос для
+        нескольких пользователей
     delete_user(conn, telegram_id) - делает DELETE запрос
+Содержит константы:
+    EXCLUSION_KINDS - виды исключений в user_exclusions.kind в порядке параметров excl_bar, excl_theme, excl_org
+    EXCLUSIONS_SEPARATOR - разделитель исключений в строке
+    UPSERT_CHUNK_SIZE - по сколько пользователей upsert_user_preferences_batch() удаляет исключения одним запросом
+    NO_EXCLUSIONS - строка, означающая, что ничего не исключено
 
 Используемая документация:
 https://www.tutorialspoint.com/sqlalchemy/sqlalchemy_quick_guide.htm#
@@ -17,16 +39,40 @@ import logging
 import os
 from pathlib import Path
 
-from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String
+from sqlalchemy import create_engine, event, inspect, MetaData, Table, Column, ForeignKey, Index, Integer, String
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, StaticPool
 
 import config
 
 # начать логирование в модуле
 logger = logging.getLogger(__name__)
 
+EXCLUSION_KINDS = ('bar', 'theme', 'org')
+EXCLUSIONS_SEPARATOR = ';'
+NO_EXCLUSIONS = 'None'
+# количество параметров в одном запросе SQLite ограничено (999 в старых версиях), поэтому
+# DELETE ... WHERE telegram_id IN делается частями
+UPSERT_CHUNK_SIZE = 500
+
 meta = MetaData()
-userPreferences = Table(
-    'user_preferences', meta,
+users = Table(
+    'users', meta,
+    Column('telegram_id', Integer, primary_key=True, autoincrement=False),
+    Column('city', String, nullable=False, index=True),
+)
+userExclusions = Table(
+    'user_exclusions', meta,
+    Column('telegram_id', Integer, ForeignKey('users.telegram_id', ondelete='CASCADE'), primary_key=True),
+    Column('kind', String, primary_key=True),  # одно из значений EXCLUSION_KINDS
+    Column('name', String, primary_key=True),
+    # для запросов вида "какие пользователи исключили бар X"
+    Index('ix_user_exclusions_kind_name', 'kind', 'name'),
+)
+
+# прежняя таблица, в которой исключения хранились строками; не создается, используется только для переноса данных
+legacyUserPreferences = Table(
+    'user_preferences', MetaData(),
     Column('telegram_id', Integer, unique=True, index=True),
     Column('city', String, index=True),
     Column('exclude_bar', String),
@@ -34,16 +80,35 @@ userPreferences = Table(
     Column('exclude_org', String),
 )
 
-def create_connection(dbPath = config.DBPATH):
+
+def _split_exclusions(value):
     """
-    Создает подключение к базе данных.
-    Если в качестве СУБД используется SQLite, то создается локальный файл БД по адресу ./app_db/a4av.db. Если файл уже
-    создан, осуществляется подключение к нему.
-    :param dbPath (str): строка подключения к БД, по умолчанию задана в config.dbPath
-    :return: tuple с объектами Engine и Connection, к-е используются как входные параметры в других функциях модуля.
+    Разбирает строку исключений вида 'Арт П.А.Б.;Типография' в список названий без повторов. None, пустая строка и
+    'None' означают, что ничего не исключено.
+    :param value (str): строка исключений
+    :return: list of str
     """
+    if not value:
+        return []
+    names = (name.strip() for name in value.split(EXCLUSIONS_SEPARATOR))
+    return [name for name in dict.fromkeys(names) if name and name != NO_EXCLUSIONS]
+
 
-    # если используется SQLite: проверяем наличие всех нужных папок по пути к файлу БД, если их нет - создаём
+def _exclusion_rows(telegram_id, excl_bar, excl_theme, excl_org):
+    """
+    Формирует строки таблицы user_exclusions для одного пользователя.
+    :return: list of dict для executemany INSERT запроса
+    """
+    return [{'telegram_id': telegram_id, 'kind': kind, 'name': name}
+            for kind, value in zip(EXCLUSION_KINDS, (excl_bar, excl_theme, excl_org))
+            for name in _split_exclusions(value)]
+
+def _create_sqlite_dirs(dbPath):
+    """
+    Если используется SQLite: проверяет наличие всех нужных папок по пути к файлу БД, если их нет - создаёт.
+    :param dbPath (str): строка подключения к БД
+    :return: None
+    """
     if 'sqlite' in dbPath:
         logger.debug(f'Запрос на создание connection до файла БД {dbPath} в родительском каталоге каталога {Path.cwd()}')
         lastSlashIndex = dbPath.rfind(r'/')
@@ -53,8 +118,59 @@ def create_connection(dbPath = config.DBPATH):
             logger.debug(f'Создаем недостающие директории по пути {dirPath}')
             os.makedirs(dirPath)
 
+
+def _sqlite_connect_args(dbPath, sqliteProfile):
+    """
+    Возвращает параметры подключения sqlite3 из профиля производительности: размер кэша скомпилированных запросов.
+    :param dbPath (str): строка подключения к БД
+    :param sqliteProfile (dict): профиль производительности SQLite, см. config.SQLITE_PROFILE
+    :return: dict
+    """
+    if make_url(dbPath).get_backend_name() != 'sqlite' or 'cached_statements' not in sqliteProfile:
+        return {}
+    return {'cached_statements': sqliteProfile['cached_statements']}
+
+
+def apply_sqlite_profile(engine, sqliteProfile=config.SQLITE_PROFILE):
+    """
+    Регистрирует обработчик события connect, который выполняет PRAGMA из профиля производительности на каждом новом
+    подключении к SQLite, в том числе на подключениях, которые пул создаст позже. Ключ cached_statements - параметр
+    подключения sqlite3, а не PRAGMA, он передается в create_engine() (см. _sqlite_connect_args()). Для других СУБД
+    ничего не делает.
+    :param engine: объект класса Engine
+    :param sqliteProfile (dict): профиль производительности SQLite, см. config.SQLITE_PROFILE
+    :return: None
+    """
+    pragmas = {name: value for name, value in sqliteProfile.items() if name != 'cached_statements'}
+    if engine.url.get_backend_name() != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapiConnection, connectionRecord):
+        cursor = dbapiConnection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    logger.debug(f'Для подключений к {engine.url} задан профиль SQLite {sqliteProfile}')
+
+
+def create_connection(dbPath = config.DBPATH, sqliteProfile=config.SQLITE_PROFILE):
+    """
+    Создает подключение к базе данных.
+    Если в качестве СУБД используется SQLite, то создается локальный файл БД по адресу ./app_db/a4av.db. Если файл уже
+    создан, осуществляется подключение к нему.
+    :param dbPath (str): строка подключения к БД, по умолчанию задана в config.dbPath
+    :param sqliteProfile (dict): профиль производительности SQLite, по умолчанию задан в config.SQLITE_PROFILE
+    :return: tuple с объектами Engine и Connection, к-е используются как входные параметры в других функциях модуля.
+    """
+    _create_sqlite_dirs(dbPath)
     try:
-        engine = create_engine(dbPath, echo = False)  #echo = True - вывод логов в консоль
+        engine = create_engine(dbPath, echo = False,  #echo = True - вывод логов в консоль
+                               connect_args=_sqlite_connect_args(dbPath, sqliteProfile))
+        apply_sqlite_profile(engine, sqliteProfile)
         conn = engine.connect()
     except Exception as err:
         logger.error(f'Не удается создать create_engine по dbPath = {dbPath} с ошибкой {str(err)}')
@@ -62,10 +178,39 @@ def create_connection(dbPath = config.DBPATH):
     return engine, conn
 
 
+def create_pooled_engine(dbPath=config.DBPATH, poolSize=config.DB_POOL_SIZE, sqliteProfile=config.SQLITE_PROFILE):
+    """
+    Создает Engine с пулом подключений, из которого потоки userDatabase.UserDatabase берут каждый свое подключение.
+    Размер пула фиксирован (без overflow), поэтому потоков, работающих с БД, должно быть не больше poolSize.
+    Для SQLite подключения разрешено использовать не в том потоке, в котором они созданы; БД SQLite в памяти
+    существует только в пределах одного подключения, поэтому для нее все потоки используют одно подключение.
+    :param dbPath (str): строка подключения к БД, по умолчанию задана в config.DBPATH
+    :param poolSize (int): количество подключений в пуле
+    :param sqliteProfile (dict): профиль производительности SQLite, по умолчанию задан в config.SQLITE_PROFILE
+    :return: объект класса Engine
+    """
+    _create_sqlite_dirs(dbPath)
+    url = make_url(dbPath)
+    connectArgs = {'check_same_thread': False, **_sqlite_connect_args(dbPath, sqliteProfile)}
+    try:
+        if url.get_backend_name() != 'sqlite':
+            engine = create_engine(dbPath, pool_size=poolSize, max_overflow=0, pool_pre_ping=True)
+        elif url.database in (None, '', ':memory:'):
+            engine = create_engine(dbPath, poolclass=StaticPool, connect_args=connectArgs)
+        else:
+            engine = create_engine(dbPath, poolclass=QueuePool, pool_size=poolSize, max_overflow=0,
+                                   connect_args=connectArgs)
+        apply_sqlite_profile(engine, sqliteProfile)
+    except Exception as err:
+        logger.error(f'Не удается создать create_engine по dbPath = {dbPath} с ошибкой {str(err)}')
+        raise
+    return engine
+
+
 def create_table(engine):
     """
-    Создает таблицу из объекта Meta. По умолчанию на вход передается engine, сформированный при импорте функции
-    engine, conn = create_connection().
+    Создает таблицы из объекта Meta и, если в БД осталась прежняя таблица user_preferences, переносит из нее данные.
+    По умолчанию на вход передается engine, сформированный при импорте функции engine, conn = create_connection().
     Для тестирования необходимо формировать новый engine и передавать его на вход.
     :param engine: объект класса Engine
     :return: None
@@ -73,9 +218,54 @@ def create_table(engine):
     logger.debug(f'Получен запрос на создание таблицы в файле БД в родительском каталоге каталога {Path.cwd()} ')
     try:
         meta.create_all(engine)
-        logger.debug(f'Создана таблица {userPreferences.name}')
+        logger.debug(f'Созданы таблицы {users.name}, {userExclusions.name}')
+    except Exception as err:
+        logger.error(f'Не удается создать таблицы users, user_exclusions с ошибкой {str(err)}')
+        return
+    migrate_user_preferences(engine)
+
+
+def migrate_user_preferences(engine):
+    """
+    Переносит пользователей из прежней таблицы user_preferences, в которой исключения хранились строками, в таблицы
+    users и user_exclusions и удаляет прежнюю таблицу. Перенос выполняется в одной транзакции: если он не удался, то
+    прежняя таблица остается, и перенос повторится при следующем запуске. Если прежней таблицы нет, то ничего не
+    делает. Пользователи без города (в прежней таблице city мог быть NULL) не переносятся: в таблице users город
+    обязателен, и такой пользователь выберет город заново командой /start.
+    :param engine: объект класса Engine
+    :return: int - количество перенесенных пользователей
+    """
+    from sqlalchemy import insert, select
+    if not inspect(engine).has_table(legacyUserPreferences.name):
+        return 0
+
+    try:
+        with engine.begin() as conn:
+            legacyRows = conn.execute(select(legacyUserPreferences)).fetchall()
+            userRows = {}
+            exclusionRows = []
+            skippedIds = []
+            for telegram_id, city, excl_bar, excl_theme, excl_org in legacyRows:
+                if telegram_id is None or telegram_id in userRows:
+                    continue
+                if city is None:
+                    skippedIds.append(telegram_id)
+                    continue
+                userRows[telegram_id] = {'telegram_id': telegram_id, 'city': city}
+                exclusionRows.extend(_exclusion_rows(telegram_id, excl_bar, excl_theme, excl_org))
+            if userRows:
+                conn.execute(insert(users), list(userRows.values()))
+            if exclusionRows:
+                conn.execute(insert(userExclusions), exclusionRows)
+            legacyUserPreferences.drop(conn)
+        if skippedIds:
+            logger.warning(f'Из таблицы user_preferences не перенесены пользователи без города: {skippedIds}')
     except Exception as err:
-        logger.error(f'Не удается создать таблицу user_preferences с ошибкой {str(err)}')
+        logger.error(f'Не удалось перенести данные из таблицы user_preferences с ошибкой {str(err)}')
+        return 0
+    logger.info(f'Из таблицы user_preferences перенесено пользователей: {len(userRows)}, '
+                f'исключений: {len(exclusionRows)}')
+    return len(userRows)
 
 
 def get_user_preferences(conn, telegram_id):
@@ -84,12 +274,23 @@ def get_user_preferences(conn, telegram_id):
     :param conn: подключение к БД
     :param telegram_id (int): идентификатор пользователя в Telegram
     :return: tuple вида (123456, 'Новосибирск', 'ART pub', '18+', 'mama quiz') либо None, если такого пользователя нет.
+    Исключения одного вида собираются в строку через ';' в алфавитном порядке, если их нет - возвращается 'None'.
     """
     from sqlalchemy import select
-    stmt = select(userPreferences).where(userPreferences.c.telegram_id == telegram_id)
+    userStmt = select(users.c.city).where(users.c.telegram_id == telegram_id)
+    exclusionsStmt = (select(userExclusions.c.kind, userExclusions.c.name).
+                      where(userExclusions.c.telegram_id == telegram_id).
+                      order_by(userExclusions.c.kind, userExclusions.c.name))
     try:
-        result = conn.execute(stmt)
-        returnValue = result.fetchone()  # этой командой извлекаются результаты из объекта Result
+        userRow = conn.execute(userStmt).fetchone()  # этой командой извлекаются результаты из объекта Result
+        if userRow is None:
+            logger.debug(f'SELECT запрос по пользователю {telegram_id} вернул: None')
+            return None
+        exclusions = {kind: [] for kind in EXCLUSION_KINDS}
+        for kind, name in conn.execute(exclusionsStmt):
+            exclusions[kind].append(name)
+        returnValue = (telegram_id, userRow.city,
+                       *(EXCLUSIONS_SEPARATOR.join(exclusions[kind]) or NO_EXCLUSIONS for kind in EXCLUSION_KINDS))
         logger.debug(f'SELECT запрос по пользователю {telegram_id} вернул: {returnValue}')
         return returnValue
     except Exception as err:
@@ -109,18 +310,13 @@ def insert_new_user(conn, telegram_id, city, excl_bar, excl_theme, excl_org):
     :return: bool
     """
     from sqlalchemy import insert
-    stmt = (
-        insert(userPreferences).
-        values
-        (telegram_id=telegram_id,
-         city=city,
-         exclude_bar=excl_bar,
-         exclude_theme=excl_theme,
-         exclude_org=excl_org
-         )
-    )
+    exclusionRows = _exclusion_rows(telegram_id, excl_bar, excl_theme, excl_org)
     try:
-        result = conn.execute(stmt)
+        # пользователь и его исключения добавляются в одной транзакции
+        with conn.begin():
+            conn.execute(insert(users).values(telegram_id=telegram_id, city=city))
+            if exclusionRows:
+                conn.execute(insert(userExclusions), exclusionRows)
         return True
     except Exception as err:
         logger.error(f'INSERT запрос по пользователю {telegram_id} не удался со следующей ошибкой: {str(err)}')
@@ -129,47 +325,125 @@ def insert_new_user(conn, telegram_id, city, excl_bar, excl_theme, excl_org):
 
 def update_user_preferences(conn, telegram_id, city, excl_bar, excl_theme, excl_org):
     """
-    Функция для обновления предпочтений пользователя в БД с помощью UPDATE запроса.
+    Функция для обновления предпочтений пользователя в БД с помощью UPDATE запроса. Исключения пользователя
+    заменяются целиком: прежние удаляются, новые добавляются в той же транзакции.
     :param conn: подключение к БД
     :param telegram_id (int): идентификатор пользователя в Telegram
     :param city (str): город
     :param excl_bar (str): перечень баров, которые пользователь хочет исключить из выборки
     :param excl_theme (str): перечень  тематик, которые пользователь хочет исключить из выборки
     :param excl_org (str): перечень  организаторов, которые пользователь хочет исключить из выборки
-    :return: bool
+    :return: bool, False в том числе если такого пользователя нет в БД
     """
-    from sqlalchemy import update
-    stmt = (update(userPreferences).
-            where(userPreferences.c.telegram_id == telegram_id).
-            values(
-                city=city,
-                exclude_bar=excl_bar,
-                exclude_theme=excl_theme,
-                exclude_org=excl_org
-                )
-            )
+    from sqlalchemy import delete, insert, update
+    exclusionRows = _exclusion_rows(telegram_id, excl_bar, excl_theme, excl_org)
     try:
-        result = conn.execute(stmt)
+        with conn.begin():
+            result = conn.execute(update(users).where(users.c.telegram_id == telegram_id).values(city=city))
+            if result.rowcount == 0:
+                logger.warning(f'UPDATE запрос по пользователю {telegram_id}: такого пользователя нет в БД')
+                return False
+            conn.execute(delete(userExclusions).where(userExclusions.c.telegram_id == telegram_id))
+            if exclusionRows:
+                conn.execute(insert(userExclusions), exclusionRows)
         return True
     except Exception as err:
         logger.error(f'UPDATE запрос по пользователю {telegram_id} не удался со следующей ошибкой: {str(err)}')
         return False
 
 
+def _upsert_users_stmt(conn):
+    """
+    Формирует INSERT ... ON CONFLICT (telegram_id) DO UPDATE запрос в таблицу users для СУБД подключения.
+    :param conn: подключение к БД
+    :return: объект Insert либо None, если СУБД не поддерживает такой запрос
+    """
+    if conn.dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif conn.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    stmt = insert(users)
+    return stmt.on_conflict_do_update(index_elements=[users.c.telegram_id], set_={'city': stmt.excluded.city})
+
+
+def upsert_user_preferences(conn, telegram_id, city, excl_bar, excl_theme, excl_org):
+    """
+    Функция для сохранения предпочтений пользователя в БД независимо от того, есть ли он уже в БД: пользователь
+    добавляется или обновляется одним INSERT ... ON CONFLICT DO UPDATE запросом, а его исключения заменяются целиком в
+    той же транзакции. Поэтому не нужен предварительный SELECT, и результат не зависит от того, изменилась ли запись
+    пользователя после него.
+    :param conn: подключение к БД
+    :param telegram_id (int): идентификатор пользователя в Telegram
+    :param city (str): город
+    :param excl_bar (str): перечень баров, которые пользователь хочет исключить из выборки
+    :param excl_theme (str): перечень  тематик, которые пользователь хочет исключить из выборки
+    :param excl_org (str): перечень  организаторов, которые пользователь хочет исключить из выборки
+    :return: bool
+    """
+    return upsert_user_preferences_batch(conn, [(telegram_id, city, excl_bar, excl_theme, excl_org)])
+
+
+def upsert_user_preferences_batch(conn, preferencesRows):
+    """
+    Функция для сохранения предпочтений нескольких пользователей, например при массовом импорте, в одной транзакции:
+    пользователи добавляются или обновляются одним INSERT ... ON CONFLICT DO UPDATE запросом с executemany, их прежние
+    исключения удаляются, а новые добавляются. Для СУБД без ON CONFLICT каждый пользователь обновляется UPDATE запросом,
+    а если его еще нет в БД - добавляется INSERT запросом в той же транзакции. Если пользователь встречается несколько
+    раз, то сохраняется последняя запись. Если хотя бы один запрос не удался, то не сохраняется ничего.
+    :param conn: подключение к БД
+    :param preferencesRows: iterable из tuple вида (123456, 'Новосибирск', 'ART pub', '18+', 'None')
+    :return: bool
+    """
+    from sqlalchemy import delete, insert, update
+    rowsById = {}
+    try:
+        rowsById = {row[0]: row for row in preferencesRows}
+        if not rowsById:
+            return True
+        userRows = [{'telegram_id': telegram_id, 'city': city} for telegram_id, city, *exclusions in rowsById.values()]
+        exclusionRows = [exclusionRow for row in rowsById.values()
+                         for exclusionRow in _exclusion_rows(row[0], *row[2:])]
+        telegramIds = list(rowsById)
+        with conn.begin():
+            upsertStmt = _upsert_users_stmt(conn)
+            if upsertStmt is not None:
+                conn.execute(upsertStmt, userRows)
+            else:
+                for userRow in userRows:
+                    result = conn.execute(update(users).where(users.c.telegram_id == userRow['telegram_id'])
+                                          .values(city=userRow['city']))
+                    if result.rowcount == 0:
+                        conn.execute(insert(users).values(**userRow))
+            for i in range(0, len(telegramIds), UPSERT_CHUNK_SIZE):
+                chunk = telegramIds[i:i + UPSERT_CHUNK_SIZE]
+                conn.execute(delete(userExclusions).where(userExclusions.c.telegram_id.in_(chunk)))
+            if exclusionRows:
+                conn.execute(insert(userExclusions), exclusionRows)
+        return True
+    except Exception as err:
+        logger.error(f'UPSERT запрос по пользователям {list(rowsById)[:10]} (всего {len(rowsById)}) не удался со '
+                     f'следующей ошибкой: {str(err)}')
+        return False
+
+
 def delete_user(conn, telegram_id):
     """
     Функция для удаления пользователя из БД. На настоящий момент можно запустить функцию только вручную.
+    Предпочтения пользователя удаляются и из кэша userPreferences.USER_PREFERENCES_CACHE.
     :param conn: подключение к БД
     :param telegram_id (int): идентификатор пользователя в Telegram
     :return: bool
     """
     from sqlalchemy import delete
-    stmt = (
-        delete(userPreferences)
-        .where(userPreferences.c.telegram_id == telegram_id)
-    )
+    # userPreferences импортирует этот модуль, поэтому импорт внутри функции
+    from userPreferences import forget_user_preferences
     try:
-        result = conn.execute(stmt)
+        with conn.begin():
+            conn.execute(delete(userExclusions).where(userExclusions.c.telegram_id == telegram_id))
+            conn.execute(delete(users).where(users.c.telegram_id == telegram_id))
+        forget_user_preferences(telegram_id)
         return True
     except Exception as err:
         logger.error(f'DELETE запрос по пользователю {telegram_id} не удался со следующей ошибкой: {str(err)}')
@@ -177,7 +451,7 @@ def delete_user(conn, telegram_id):
 
 
 if __name__ == '__main__':
-    # Если требуется создать подключение, файл SQLite 'a4av.db' и таблицу user_preference в ручном режиме.
+    # Если требуется создать подключение, файл SQLite 'a4av.db' и таблицы users, user_exclusions в ручном режиме.
     # По умолчанию все это создается в ходе работы модуля telegramBot.py, либо в Unit-тестах.
 
     # применяем глобальную конфигурацию логирования, операция должна быть выполнена при запуске приложения
@@ -0,0 +1,235 @@
+"""
+Модуль общего HTTP-клиента для скрейпинга сайтов организаторов.
+Все запросы идут через одну сессию requests.Session. Так keep-alive соединения переиспользуются между организаторами и
+между фоновыми обновлениями кэша расписаний, и не нужно заново делать DNS-запрос, TCP и TLS рукопожатие.
+Размер пула соединений к одному хосту ограничен (config.HTTP_POOL_MAXSIZE). Если все соединения к хосту заняты, то
+поток ждет освобождения соединения, а не открывает новое. Сессия запрашивает сжатые ответы (gzip, а если установлен
+пакет brotli - то и br), у каждого запроса есть таймаут config.HTTP_TIMEOUT.
+Скрейпинг выполняется в потоках (см. quizAggregator.collect_quiz_data()), поэтому сессия синхронная.
+
+Функция fetch_conditional() хранит на диске (config.HTTP_CACHE_DIR) последнюю версию каждой страницы вместе с её
+ETag/ Last-Modified и отправляет их в заголовках If-None-Match/ If-Modified-Since. Если сайт ответил 304 Not Modified,
+то возвращается сохраненная версия страницы с признаком notModified=True, а quizAggregator.scrape_organizator() в этом
+случае берет уже разобранные ранее игры организатора, не разбирая страницу заново.
+
+Для unit-тестов вместо сети можно подключить свой транспорт (адаптер requests) функцией mount_transport(), см.
+tests/conftest.py/quiz_from_local_files().
+
+Содержит функции:
+    close_session() - закрывает общую сессию и все её соединения
+    fetch(url, headers=None, timeout=None) - делает GET-запрос через общую сессию
+    fetch_conditional(url, headers=None, timeout=None) - делает условный GET-запрос с использованием дискового кэша
+    get_cache_stats() - возвращает статистику условных запросов
+    get_session() - возвращает общую сессию, при первом вызове создает её
+    mount_transport(prefix, adapter) - подключает к общей сессии адаптер для ссылок, начинающихся с prefix
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import HTTP_CACHE_DIR, HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_TIMEOUT
+
+# начать логирование в модуле
+logger = logging.getLogger(__name__)
+
+# ответы в формате brotli requests умеет распаковывать, только если установлен пакет brotli или brotlicffi
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        ACCEPT_ENCODING = 'gzip, deflate'
+
+_session = None
+_sessionLock = threading.Lock()
+
+# статистика условных запросов: всего запросов, ответов 304, страниц скачано целиком и сколько байт скачано
+_cacheStats = {'requests': 0, 'notModified': 0, 'downloaded': 0, 'bytesDownloaded': 0}
+_cacheStatsLock = threading.Lock()
+
+
+def get_session():
+    """
+    Возвращает общую для всего приложения сессию requests.Session, при первом вызове создает её.
+    :return: requests.Session
+    """
+    global _session
+    with _sessionLock:
+        if _session is None:
+            session = requests.Session()
+            # pool_connections - по скольким хостам храним пулы соединений, pool_maxsize - размер пула к одному хосту,
+            # pool_block=True - не открывать соединений к хосту сверх pool_maxsize
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                                  pool_block=True)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+            _session = session
+            logger.debug(f'Создана общая HTTP-сессия, Accept-Encoding: {ACCEPT_ENCODING}')
+        return _session
+
+
+def mount_transport(prefix, adapter):
+    """
+    Подключает к общей сессии адаптер requests для ссылок, начинающихся с prefix. Используется в unit-тестах, чтобы
+    запросы шли в локальные копии веб-страниц, а не в сеть.
+    :param prefix (str): начало ссылки, например 'file://'
+    :param adapter (requests.adapters.BaseAdapter): адаптер, который будет обрабатывать запросы
+    :return: None
+    """
+    get_session().mount(prefix, adapter)
+
+
+def fetch(url, headers=None, timeout=None):
+    """
+    Делает GET-запрос через общую сессию и проверяет HTTP-статус ответа.
+    :param url (str): ссылка на веб-страницу
+    :param headers (dict): дополнительные HTTP-заголовки запроса
+    :param timeout: таймаут запроса (как в requests), по умолчанию config.HTTP_TIMEOUT
+    :return: requests.Response
+    """
+    if timeout is None:
+        timeout = HTTP_TIMEOUT
+    res = get_session().get(url, headers=headers, timeout=timeout)
+    res.raise_for_status()
+    return res
+
+
+def _cache_paths(url):
+    """Возвращает пути к файлам дискового кэша страницы: метаданные (ETag/ Last-Modified) и тело ответа."""
+    key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return HTTP_CACHE_DIR / f'{key}.json', HTTP_CACHE_DIR / f'{key}.html'
+
+
+def _load_cached_page(url):
+    """Читает из дискового кэша метаданные и тело страницы. Если страницы в кэше нет или файлы повреждены - None."""
+    metaPath, bodyPath = _cache_paths(url)
+    try:
+        with open(metaPath, encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(bodyPath, 'rb') as f:
+            body = f.read()
+    except (OSError, ValueError):
+        return None
+    if meta.get('url') != url:
+        return None
+    return meta, body
+
+
+def _save_cached_page(url, res):
+    """
+    Сохраняет в дисковый кэш тело страницы и её валидаторы. Страницы без ETag и Last-Modified не сохраняются, а
+    сохраненная ранее версия такой страницы удаляется, т.к. она устарела.
+    """
+    etag = res.headers.get('ETag')
+    lastModified = res.headers.get('Last-Modified')
+    metaPath, bodyPath = _cache_paths(url)
+    if etag is None and lastModified is None:
+        for path in (metaPath, bodyPath):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as err:
+                logger.error(f'Не удалось удалить устаревшую страницу {url} из дискового кэша: {err}')
+        return
+    meta = {'url': url, 'etag': etag, 'lastModified': lastModified, 'encoding': res.encoding}
+    try:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        # пишем во временные файлы и подменяем ими старые, чтобы параллельный поток не прочитал файл наполовину
+        for path, mode, content in ((bodyPath, 'wb', res.content), (metaPath, 'w', json.dumps(meta))):
+            tmpPath = path.with_name(f'{path.name}.{threading.get_ident()}.tmp')
+            with open(tmpPath, mode) as f:
+                f.write(content)
+            os.replace(tmpPath, path)
+    except OSError as err:
+        logger.error(f'Не удалось сохранить страницу {url} в дисковый кэш: {err}')
+
+
+def fetch_conditional(url, headers=None, timeout=None):
+    """
+    Делает условный GET-запрос через общую сессию. Если страница уже есть в дисковом кэше, то к запросу добавляются
+    заголовки If-None-Match/ If-Modified-Since. На ответ 304 Not Modified возвращается сохраненная версия страницы, а
+    если её нет в кэше - запрос повторяется без условных заголовков.
+    :param url (str): ссылка на веб-страницу
+    :param headers (dict): дополнительные HTTP-заголовки запроса
+    :param timeout: таймаут запроса (как в requests), по умолчанию config.HTTP_TIMEOUT
+    :return: requests.Response с дополнительным атрибутом notModified (bool) - True, если страница не изменилась
+    """
+    if timeout is None:
+        timeout = HTTP_TIMEOUT
+    requestHeaders = dict(headers or {})
+    cached = _load_cached_page(url)
+    if cached is not None:
+        meta, body = cached
+        if meta['etag']:
+            requestHeaders['If-None-Match'] = meta['etag']
+        if meta['lastModified']:
+            requestHeaders['If-Modified-Since'] = meta['lastModified']
+
+    res = get_session().get(url, headers=requestHeaders, timeout=timeout)
+
+    if res.status_code == 304 and cached is not None:
+        # подменяем пустое тело ответа 304 сохраненной версией страницы
+        res._content = body
+        res.encoding = meta['encoding']
+        res.notModified = True
+        with _cacheStatsLock:
+            _cacheStats['requests'] += 1
+            _cacheStats['notModified'] += 1
+        logger.debug(f'Страница {url} не изменилась (304), используется версия из дискового кэша')
+        return res
+
+    if res.status_code == 304:
+        # сохраненной версии страницы нет (или условные заголовки передал вызывающий код), а тело ответа 304 пустое.
+        # повторяем запрос без условных заголовков и просим промежуточные кэши не отвечать из своей копии
+        logger.warning(f'Страница {url} не изменилась (304), но её нет в дисковом кэше, запрашиваем её целиком')
+        retryHeaders = {name: value for name, value in requestHeaders.items()
+                        if name.lower() not in ('if-none-match', 'if-modified-since')}
+        retryHeaders['Cache-Control'] = 'no-cache'
+        res = get_session().get(url, headers=retryHeaders, timeout=timeout)
+        if res.status_code == 304:
+            raise requests.HTTPError(f'Сайт ответил 304 Not Modified на безусловный запрос страницы {url}',
+                                     response=res)
+
+    res.raise_for_status()
+    res.notModified = False
+    _save_cached_page(url, res)
+    with _cacheStatsLock:
+        _cacheStats['requests'] += 1
+        _cacheStats['downloaded'] += 1
+        _cacheStats['bytesDownloaded'] += len(res.content)
+    return res
+
+
+def get_cache_stats():
+    """
+    Возвращает статистику условных запросов fetch_conditional() для мониторинга.
+    :return: dict вида {'requests': 10, 'notModified': 7, 'downloaded': 3, 'bytesDownloaded': 260000,
+                        'notModifiedRate': 0.7}
+    """
+    with _cacheStatsLock:
+        stats = dict(_cacheStats)
+    stats['notModifiedRate'] = round(stats['notModified'] / stats['requests'], 3) if stats['requests'] else 0.0
+    return stats
+
+
+def close_session():
+    """
+    Закрывает общую сессию и все её соединения. Следующий вызов get_session() создаст новую сессию.
+    :return: None
+    """
+    global _session
+    with _sessionLock:
+        if _session is not None:
+            _session.close()
+            _session = None
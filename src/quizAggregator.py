@@ -3,43 +3,80 @@
 
 Содержит функции:
     assign_themes_to_quiz(gamename, organizator) - присваивает каждому квизу список тематик
+    classify_themes(gamename, organizator, version) - определяет тематики квиза, результат запоминается
     collect_quiz_data(cityOrganizators, cityLinks, localHTMLs=None) - собирает информацию о проводящихся в городе квизах
+    collect_quiz_data_async(cityOrganizators, cityLinks, localHTMLs=None) - то же самое, не блокируя event loop
     create_formatted_quiz_list(games, organizatorErrors, **kwargs) - создает итоговый список квизов для telegramBot.py
     create_info_by_city(city) - формирует информацию об организаторах, барах, ссылках на сайты для конкретного города
+    create_quiz_please_game(cardInfo, orgName, orgTag, number, dateParams) - создает запись об игре Квиз Плиз
+    create_wow_quiz_game(cardInfo, orgName, orgTag, number, dateParams) - создает запись об игре Вау Квиз
     get_data_from_web_page(orgName, orgLink, localHTMLs) - делает веб-запрос страницы организатора с расписанием квизов
+    get_element_text(element) - возвращает текст элемента HTML-кода так, как его показывает браузер
+    get_mama_quiz_cards(quizSoup) - извлекает из страницы Мама Квиз текст карточек регистрации на игры
+    get_next_data(res) - извлекает JSON с данными страницы на Next.js без построения дерева HTML-кода
+    get_parsed_games(orgLink, curDT) - возвращает расписание, разобранное при прошлом скрейпинге страницы
+    get_quiz_please_cards(quizSoup) - извлекает из страницы Квиз Плиз текст карточек игр
+    get_theme_classifier(checkMapping=False) - возвращает классификатор тематик, скомпилированный из
+        config.THEME_MAPPING_DICT
+    get_web_page(orgName, orgLink, localHTMLs) - делает условный веб-запрос страницы организатора
+    get_wow_quiz_cards(quizSoup) - извлекает из страницы Вау Квиз текст карточек игр
+    parse_web_page(res, orgTag=None) - строит объект bs4.BeautifulSoup из ответа с HTML-кодом страницы организатора
+    render_quiz_fragment(game, bar) - форматирует строку о квизе для вывода telegram-бота без порядкового номера
     scrape_einstein_party(quizSoup, orgName, orgTag, dateParams) скрейпит информацию с сайта Эйнштейн пати
     scrape_liga_indigo(quizSoup, orgName, orgTag, dateParams, localHTMLs=None) - скрейпит информацию с сайта Лига Индиго
-    scrape_mama_quiz(orgLink, orgName, orgTag, dateParams) - скрейпит информацию с сайта Мама Квиз
-    scrape_quiz_please(quizSoup, orgName, orgTag, dateParams) - скрейпит информацию с сайта Квиз Плиз
-    scrape_shaker_quiz(quizSoup, orgName, orgTag, dateParams) - скрейпит информацию с сайта Шейкер Квиз
-    scrape_wow_quiz(orgLink, orgName, orgTag, dateParams) - скрейпит информацию с сайта Вау Квиз
+    scrape_mama_quiz(quizSoup, orgName, orgTag, dateParams) - скрейпит информацию с сайта Мама Квиз
+    scrape_quiz_please(quizSoup, orgName, orgTag, dateParams) - скрейпит информацию с сайта Квиз Плиз без браузера
+    scrape_quiz_please_in_browser(orgLink, orgName, orgTag, dateParams) - скрейпит сайт Квиз Плиз в браузере
+    scrape_organizator(orgName, orgTag, orgLink, dateParams, localHTMLs) - скрейпит расписание одного организатора
+    scrape_organizator_in_browser(orgName, orgTag, orgLink, dateParams) - скрейпит расписание организатора в браузере
+    scrape_shaker_quiz(res, orgName, orgTag, dateParams) - скрейпит информацию с сайта Шейкер Квиз
+    scrape_wow_quiz(quizSoup, orgName, orgTag, dateParams) - скрейпит информацию с сайта Вау Квиз без браузера
+    scrape_wow_quiz_in_browser(orgLink, orgName, orgTag, dateParams) - скрейпит сайт Вау Квиз в браузере
 
 Содержит константы:
+    BROWSER_POOL - общий пул браузеров Google Chrome для скрейперов на Selenium
     DOW_DICT - словарь соответствия порядкового номера дня недели его названию (1: 'понедельник')
+    HTML_PARSER_BACKEND - парсер HTML-кода страниц организаторов для bs4
+    LI_GAME_NAME_REGEX - регулярное выражение для названий игр Лиги Индиго вида 'игра №2 сезон №7'
     MONTH_DICT - словарь соответствия названия месяца его порядковому номеру ('января': 1)
+    NEXT_DATA_REGEX - регулярное выражение для поиска тэга <script id="__NEXT_DATA__">
+    PARSED_GAMES_CACHE - разобранные расписания по ссылкам на страницы, для повторного использования при ответе 304
+    QP_SCHEDULE_SELECTOR - CSS-селектор расписания на странице Квиз Плиз
+    SCRAPER_EXECUTOR - общий пул потоков для параллельного скрейпинга сайтов организаторов
+    SOUP_STRAINERS - части страниц организаторов, которые нужны скрейперам
+    THEME_CLASSIFIER - классификатор тематик, скомпилированный из config.THEME_MAPPING_DICT
+    THEME_CLASSIFIER_VERSIONS - классификаторы тематик текущей и предыдущей версий
+    WOW_CARDS_SELECTOR - CSS-селектор карточек игр на странице Вау Квиз
 """
 
+import asyncio
+import atexit
 import datetime
+import functools
 import json
 import logging
 import re
-from time import sleep
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import bs4
-import requests
-from selenium import webdriver
 from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
 
 from config import (
     CITY_DICT,
+    HTML_PARSER,
     ORGANIZATORS_DICT,
-    QUIZ_THEMES,
+    SCRAPER_MAX_WORKERS,
+    THEME_CACHE_SIZE,
     THEME_MAPPING_DICT
 )
+import httpClient
+from browserPool import BrowserPool
+from quizGame import make_game
+from scheduleIndex import ScheduleIndex
+from seleniumWaits import get_wait_budget, wait_for_count_change, wait_for_stable_count, wait_for_value
 
 # начать логирование в модуле
 logger = logging.getLogger(__name__)
@@ -49,6 +86,51 @@ MONTH_DICT = {'января': 1, 'февраля': 2, 'марта': 3, 'апре
               'сентября': 9, 'октября': 10, 'ноября': 11, 'декабря': 12}
 DOW_DICT = {1: 'понедельник', 2: 'вторник', 3: 'среда', 4: 'четверг', 5: 'пятница', 6: 'суббота', 7: 'воскресенье'}
 
+# название игры Лиги Индиго вида 'игра №2 сезон №7', такие игры относятся к классике
+LI_GAME_NAME_REGEX = re.compile(r'^игра\s+№(\d+)\s+сезон.*')
+
+# классификатор тематик, скомпилированный из THEME_MAPPING_DICT: (отпечаток словаря, версия, кортеж пар (тематика,
+# re.Pattern)). Компилируется при первом вызове get_theme_classifier() и заново, если при проверке отпечаток словаря
+# изменился. Версия 0 - классификатор еще не скомпилирован
+THEME_CLASSIFIER = (None, 0, ())
+# скомпилированные классификаторы текущей и предыдущей версий: {версия: кортеж пар (тематика, re.Pattern)}, чтобы
+# classify_themes(), вызванная с версией, полученной до перекомпиляции, использовала классификатор этой версии
+THEME_CLASSIFIER_VERSIONS = {}
+THEME_CLASSIFIER_LOCK = threading.Lock()
+
+# общий для всех вызовов collect_quiz_data() пул потоков, в котором параллельно скрейпятся сайты организаторов.
+# пул общий, чтобы одновременное обновление нескольких городов не запускало больше SCRAPER_MAX_WORKERS скрейперов
+SCRAPER_EXECUTOR = ThreadPoolExecutor(max_workers=SCRAPER_MAX_WORKERS, thread_name_prefix='scraper')
+
+# разобранные расписания организаторов по ссылкам на их страницы: {orgLink: games}. Если при следующем скрейпинге сайт
+# ответит 304 Not Modified, то страница повторно не разбирается, а игры берутся отсюда
+PARSED_GAMES_CACHE = {}
+PARSED_GAMES_LOCK = threading.Lock()
+
+# общий пул браузеров для scrape_quiz_please_in_browser() и scrape_wow_quiz_in_browser(). Браузеры запускаются при
+# первом скрейпинге в браузере, а не при импорте модуля. При завершении программы все браузеры пула закрываются
+BROWSER_POOL = BrowserPool()
+atexit.register(BROWSER_POOL.close)
+
+# парсер HTML-кода страниц: config.HTML_PARSER, если он установлен, иначе встроенный в Python html.parser
+HTML_PARSER_BACKEND = HTML_PARSER if bs4.builder.builder_registry.lookup(HTML_PARSER) else 'html.parser'
+
+# части страниц, которые нужны скрейперам организаторов, по тэгам организаторов. bs4 строит дерево только из этих
+# элементов и их содержимого, а остальной HTML-код пропускает. Организаторы, которых нет в словаре, разбираются целиком
+SOUP_STRAINERS = {
+    'ein': bs4.SoupStrainer('div', class_='schelude-tabs'),
+    'li': bs4.SoupStrainer(id='info'),
+}
+
+# тэг <script id="__NEXT_DATA__"> с JSON-данными страницы на Next.js, см. get_next_data()
+NEXT_DATA_REGEX = re.compile(rb'<script[^>]*\sid=["\']?__NEXT_DATA__["\']?[^>]*>(.*?)</script>', re.DOTALL)
+
+# CSS-селекторы расписания в текущей верстке сайтов Квиз Плиз и Вау Квиз. По ним карточки игр ищутся как в HTML-коде
+# страницы, так и в браузере
+QP_SCHEDULE_SELECTOR = ('div > div > div > div > div:nth-child(2) > div > div > div.content-block > '
+                        'div.card-container')
+WOW_CARDS_SELECTOR = '#schedule > div.schedule__list .schedule-card'
+
 def create_info_by_city(city):
     """
     Формирует набор информации, индивидуальной для города проведения - организаторы, ссылки на их сайты, бары на
@@ -105,10 +187,80 @@ def create_info_by_city(city):
                  f'ссылок на сайты организаторов: {cityLinks}''')
     return cityBars, cityOrganizators, cityLinks
 
+def _theme_mapping_fingerprint():
+    """Возвращает отпечаток config.THEME_MAPPING_DICT, по которому видно, изменился ли словарь или списки слов в нем."""
+    return hash(tuple((theme, tuple(keywords)) for theme, keywords in THEME_MAPPING_DICT.items()))
+
+
+def get_theme_classifier(checkMapping=False):
+    """
+    Возвращает классификатор тематик, скомпилированный из config.THEME_MAPPING_DICT: для каждой тематики одно
+    регулярное выражение, в котором все слова тематики перечислены через '|'.
+    Сравнивать словарь с прошлой компиляцией при каждом вызове дорого, поэтому это делается только при
+    checkMapping=True: collect_quiz_data() проверяет словарь перед каждым скрейпингом. Если словарь изменился, то
+    классификатор компилируется заново и получает новую версию.
+    :param checkMapping (bool): проверить, не изменился ли THEME_MAPPING_DICT с прошлой компиляции
+    :return: tuple(version (int), patterns (tuple)): версия классификатора и кортеж пар (тематика, re.Pattern) в
+             порядке тематик в THEME_MAPPING_DICT
+    """
+    global THEME_CLASSIFIER
+    classifierFingerprint, version, patterns = THEME_CLASSIFIER
+    if version and not checkMapping:
+        return version, patterns
+
+    fingerprint = _theme_mapping_fingerprint()
+    if fingerprint != classifierFingerprint:
+        with THEME_CLASSIFIER_LOCK:
+            # классификатор мог скомпилировать другой поток, пока этот ждал блокировку
+            classifierFingerprint, version, patterns = THEME_CLASSIFIER
+            if fingerprint != classifierFingerprint:
+                patterns = tuple((theme, re.compile('|'.join(re.escape(keyword.lower()) for keyword in keywords)))
+                                 for theme, keywords in THEME_MAPPING_DICT.items())
+                version += 1
+                THEME_CLASSIFIER_VERSIONS[version] = patterns
+                THEME_CLASSIFIER_VERSIONS.pop(version - 2, None)
+                # кортеж заменяется целиком, поэтому другие потоки видят либо старый, либо новый классификатор
+                THEME_CLASSIFIER = (fingerprint, version, patterns)
+                logger.debug(f'Классификатор тематик скомпилирован, версия {version}')
+    return version, patterns
+
+
+@functools.lru_cache(maxsize=THEME_CACHE_SIZE)
+def classify_themes(gamename, organizator, version):
+    """
+    Определяет тематики квиза классификатором get_theme_classifier(). Результат запоминается по названию квиза,
+    организатору и версии классификатора, поэтому после изменения THEME_MAPPING_DICT запомненные тематики не
+    используются.
+    :param gamename (str): название квиза
+    :param organizator (str): название организатора, в формате как он указан в config.ORGANIZATORS_DICT
+    :param version (int): версия классификатора из get_theme_classifier()
+    :return: tuple, тематики квиза
+    """
+    # классификатор той версии, с которой вызвана функция, иначе тематики, посчитанные по новому словарю, запомнятся
+    # под старой версией. Если версия уже удалена, то тематики определяются текущей версией классификатора
+    patterns = THEME_CLASSIFIER_VERSIONS.get(version)
+    if patterns is None:
+        return classify_themes(gamename, organizator, get_theme_classifier()[0])
+
+    gamename = gamename.lower()
+    tags = []
+
+    # доп. проверка для игр с названием вида 'Игра №2 Сезон №7' у Лиги Индиго
+    # внимание, формат может периодически меняться
+    if organizator == 'Лига Индиго' and LI_GAME_NAME_REGEX.search(gamename) is not None:
+        tags.append('Классика')
+
+    # тематика присваивается, если в названии игры есть хотя бы одно из ее слов ('чёрный квиз')
+    for theme, pattern in patterns:
+        if pattern.search(gamename) is not None:
+            tags.append(theme)
+    return tuple(tags)
+
+
 def assign_themes_to_quiz(gamename, organizator):
     """
     Присваивает квизу список соответствующих ему тематик. Тематики определяются согласно словарю
-    config.THEME_MAPPING_DICT и уникальным правилам, описанным внутри этой функции.
+    config.THEME_MAPPING_DICT и уникальным правилам, описанным в classify_themes().
     Например, 'Кино и музыка СССР #6' будут присвоены тематики ['Мультимедиа', 'Ностальгия'],
     '[новички] NSK #459' будут присвоены тематики ['Классика', 'Новички']
 
@@ -116,60 +268,97 @@ def assign_themes_to_quiz(gamename, organizator):
     :param organizator (str): название организатора, в формате как он указан в config.ORGANIZATORS_DICT
     :return: tags (list): список тематик квиза
     """
-    # приводим название игры к строчному регистру для последующих проверок с помощью оператора in
-    # одновременно проверяем корректность типа переменной gamename
-    try:
-        gamename = gamename.lower()
-    except:
+    # проверяем корректность типа переменной gamename
+    if not isinstance(gamename, str):
         logger.error(f'Некорректное значение gamename: {gamename}, должно быть значения типа string')
         return
 
-    tags = []
+    version = get_theme_classifier()[0]
+    # каждый квиз получает собственный список тематик, чтобы изменение тематик одного квиза не затронуло другие
+    return list(classify_themes(gamename, organizator, version))
 
-    # доп. проверка для игр с названием вида 'Игра №2 Сезон №7' у Лиги Индиго
-    # внимание, формат может периодически меняться
-    if organizator == 'Лига Индиго':
-        liGameNameRegEx = re.compile(r'^игра\s+№(\d+)\s+сезон.*')  # 'игра №2 сезон №7'
-        mo = liGameNameRegEx.search(gamename)
-        if mo != None:
-            tags.append('Классика')
 
-    for k in THEME_MAPPING_DICT:          # перебираем все тематики ('Классика')
-         for j in THEME_MAPPING_DICT[k]:  # перебираем все тэги внутри тематики (['18+', 'чёрный квиз'])
-             if j.lower() in gamename:    # j = тэг из словаря ('чёрный квиз')
-                tags.append(k)
-                break  # прекращаем проверять другие тэги внутри уже присвоенной тематики, переходим к следующему k
-    return tags
-
-
-def get_data_from_web_page(orgName, orgLink, localHTMLs):
+def get_web_page(orgName, orgLink, localHTMLs):
     """Делает веб-запрос страницы с расписанием квиза данного организатора.
-    Возвращает объект bs4.BeautifulSoup с HTML-кодом страницы для последующего скрейпинга.
+    Запрос условный (см. httpClient.fetch_conditional()): если страница не изменилась с прошлого запроса, то сайт
+    отвечает 304, а функция возвращает сохраненную ранее версию страницы с атрибутом notModified=True.
     :param orgName (str): название организатора
     :param orgLink (str): ссылка на веб-страницу с расписанием квизов организатора в конкретном городе
     :param localHTMLs (dict): для unit-тестов, словарь в котором хранятся объекты requests.get с локальных копий
                               web-страниц. См. функцию tests/conftest.py/quiz_from_local_files()
-    :return quizSoup (bs4.BeautifulSoup): объект с текстом HTML-кода страницы с расписанием квизов
+    :return res (requests.Response): ответ с HTML-кодом страницы с расписанием квизов
     """
 
     # если скрейпим страницу Мама Квиз, нужно добавить в запрос HTTP-заголовк User-agent,
     # значение можно взять из своего браузера. без него вернет ошибку 403 Forbidden
+    # запросы идут через общую сессию httpClient, чтобы переиспользовать keep-alive соединения к сайтам
     if orgName in ['Квиз Плиз', 'Мама Квиз'] and len(localHTMLs) == 0:
         userAgent = {'User-agent':
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/113.0.0.0 Safari/537.36'}
-        res = requests.get(orgLink, headers=userAgent)
-        res.raise_for_status()
+        res = httpClient.fetch_conditional(orgLink, headers=userAgent)
 
     # если скрейпим настоящие web-страницы других организаторов
     elif len(localHTMLs) == 0:
-        res = requests.get(orgLink)
-        res.raise_for_status()
+        res = httpClient.fetch_conditional(orgLink)
 
     # если работаем с локальными копиями web-страниц
     else:
         res = localHTMLs[orgName]
 
-    return bs4.BeautifulSoup(res.text, 'html.parser')
+    return res
+
+
+def get_data_from_web_page(orgName, orgLink, localHTMLs):
+    """Делает веб-запрос страницы с расписанием квиза данного организатора.
+    Возвращает объект bs4.BeautifulSoup с HTML-кодом страницы для последующего скрейпинга.
+    :param orgName (str): название организатора
+    :param orgLink (str): ссылка на веб-страницу с расписанием квизов организатора в конкретном городе
+    :param localHTMLs (dict): для unit-тестов, словарь в котором хранятся объекты requests.get с локальных копий
+                              web-страниц. См. функцию tests/conftest.py/quiz_from_local_files()
+    :return quizSoup (bs4.BeautifulSoup): объект с текстом HTML-кода страницы с расписанием квизов
+    """
+    res = get_web_page(orgName, orgLink, localHTMLs)
+    return parse_web_page(res, ORGANIZATORS_DICT.get(orgName, [None])[0])
+
+
+def parse_web_page(res, orgTag=None):
+    """
+    Строит объект bs4.BeautifulSoup из ответа с HTML-кодом страницы организатора. Страница разбирается из байтов
+    ответа, без промежуточного декодирования в строку, парсером HTML_PARSER_BACKEND. Если для организатора задан
+    фильтр в SOUP_STRAINERS, то в дерево попадает только нужная скрейперу часть страницы.
+    :param res (requests.Response): ответ с HTML-кодом страницы с расписанием квизов
+    :param orgTag (str): тэг организатора ('li')
+    :return quizSoup (bs4.BeautifulSoup): объект с HTML-кодом страницы с расписанием квизов
+    """
+    # кодировку из HTTP-заголовков передаем парсеру, как ее использовал бы res.text. если сайт ее не указал, то bs4
+    # определит кодировку сам по тэгу <meta charset>
+    return bs4.BeautifulSoup(res.content, HTML_PARSER_BACKEND, parse_only=SOUP_STRAINERS.get(orgTag),
+                             from_encoding=res.encoding)
+
+
+def get_parsed_games(orgLink, curDT):
+    """
+    Возвращает расписание организатора, разобранное при прошлом скрейпинге страницы orgLink. Используется, когда сайт
+    ответил 304 Not Modified. Квизы, которые уже начались, в результат не попадают.
+    :param orgLink (str): ссылка на веб-страницу с расписанием квизов организатора
+    :param curDT (datetime.datetime): текущие дата и время
+    :return: tuple(games (dict), organizatorErrors (dict)), либо None, если страницу еще не разбирали
+    """
+    with PARSED_GAMES_LOCK:
+        games = PARSED_GAMES_CACHE.get(orgLink)
+    if games is None:
+        return None
+    return {gameId: game for gameId, game in games.items() if game.date >= curDT}, {}
+
+
+def get_element_text(element):
+    """
+    Возвращает текст элемента HTML-кода так, как его показывает браузер: пробелы и переносы строк схлопываются в один
+    пробел, пробелы в начале и в конце отрезаются.
+    :param element (bs4.element.Tag): элемент HTML-кода
+    :return: str
+    """
+    return ' '.join(element.get_text(' ').split())
 
 
 def scrape_einstein_party(quizSoup, orgName, orgTag, dateParams):
@@ -186,47 +375,41 @@ def scrape_einstein_party(quizSoup, orgName, orgTag, dateParams):
     curYear, nextYear, curMonth, curDT = dateParams
 
     try:
-        # извлекаем содержимое родительского HTML-элемента, в котором хранится информация о всех квизах
-        einGamesList = quizSoup.select('body > div.wrapper > div.schelude-tabs > div.schelude-tabs-body > div > div > '
-                                      'div > div > div > div.game-row > div')
-        for n in range(1, (len(einGamesList) + 1)):
-            # формируем корректный id квиза, который будет являться префиксом для CSS-селекторов нужных элементов
-            selectorBeginning = f'body > div.wrapper > div.schelude-tabs > div.schelude-tabs-body > div > div > div > '\
-                                f'div > div > div.game-row > div:nth-child({n})'
+        # извлекаем карточки всех квизов. Страница обходится один раз, все поля квиза дальше ищутся только внутри
+        # его карточки, а не по всему документу
+        einGamesList = quizSoup.select('div.schelude-tabs > div.schelude-tabs-body > div > div > div > div > div > '
+                                      'div.game-row > div')
+        for n, einCard in enumerate(einGamesList, start=1):
+            # информация об игре в левой части карточки, о дате, времени и баре - в правой
+            einCardLeft = ':scope > div > div.game-item-content > div.game-item-content-left'
+            einCardRight = ':scope > div > div.game-item-content > div.game-item-content-right'
 
             # извлекаем название игры в формате "Угадай мультфильм #4"
-            einGameName = quizSoup.select(f'{selectorBeginning} > div > div.game-item-content > '
-                                         f'div.game-item-content-left > div.game-item-top > div.game-item__title')
+            einGameName = einCard.select(f'{einCardLeft} > div.game-item-top > div.game-item__title')
             einGameName = einGameName[0].text
 
             # по названию игры добаляем тэг с тематикой игры
             einGameTag = assign_themes_to_quiz(einGameName, orgName)
 
             # извлекаем дату проведения квиза в формате "4 июня"
-            einGameDate = quizSoup.select(f'{selectorBeginning} > div > div.game-item-content > '
-                                          f'div.game-item-content-right > div.game-item__date > span:nth-child(1)')
+            einGameDate = einCard.select(f'{einCardRight} > div.game-item__date > span:nth-child(1)')
             einGameDate = einGameDate[0].text
 
             # извлекаем день недели в формате "суббота"
-            einGameDOW = quizSoup.select(f'{selectorBeginning} > div > div.game-item-content > '
-                                         f'div.game-item-content-right > div.game-item__date > span:nth-child(2)')
+            einGameDOW = einCard.select(f'{einCardRight} > div.game-item__date > span:nth-child(2)')
             einGameDOW = einGameDOW[0].text
 
             # извлекаем время начала квиза в формате "16:00"
-            einGameStartTime = quizSoup.select(f'{selectorBeginning} > div > div.game-item-content > '
-                                               f'div.game-item-content-right > div.game-item__date > span.time')
+            einGameStartTime = einCard.select(f'{einCardRight} > div.game-item__date > span.time')
             einGameStartTime = einGameStartTime[0].text
 
             # извлекаем название площадки проведения квиза в формате "Три Лося"
-            einBar = quizSoup.select(f'{selectorBeginning} > div > div.game-item-content > '
-                                     f'div.game-item-content-right > div.game-item__address > span.place')
+            einBar = einCard.select(f'{einCardRight} > div.game-item__address > span.place')
             einBar = einBar[0].text
 
             # извлекаем наличие мест на игру вида "Места есть"/ "Резерв"
-            einAvailability = quizSoup.select(f'{selectorBeginning} > div > div.game-item-bottom > '
-                                                  f'div.game-item-buttons > a.game-item__btn.active.register_team > '
-                                                  f'span')
-
+            einAvailability = einCard.select(':scope > div > div.game-item-bottom > div.game-item-buttons > '
+                                             'a.game-item__btn.active.register_team > span')
             einAvailability = einAvailability[0].text
 
             # преобразовываем дату проведения квиза в нужный формат
@@ -251,13 +434,9 @@ def scrape_einstein_party(quizSoup, orgName, orgTag, dateParams):
             # исключаем из выборки заведомо неподходящие квизы: квиз уже прошел
             # из остального формируем словарь games
             if quizDT >= curDT:
-                games[orgTag + str(n)] = {}
-                games[orgTag + str(n)]['game'] = einGameName
-                games[orgTag + str(n)]['date'] = quizDT
-                games[orgTag + str(n)]['bar'] = einBar
-                games[orgTag + str(n)]['tag'] = einGameTag
-                if 'резерв' in einAvailability.lower():
-                    games[orgTag + str(n)]['availability'] = 'Резерв'
+                einAvailability = 'Резерв' if 'резерв' in einAvailability.lower() else ''
+                games[orgTag + str(n)] = make_game(orgTag, n, einGameName, quizDT, einBar, einGameTag,
+                                                   einAvailability)
 
 
     except Exception as err:
@@ -344,11 +523,7 @@ def scrape_liga_indigo(quizSoup, orgName, orgTag, dateParams, localHTMLs=None):
             # из остального формируем словарь games
             # после "Есть места" может быть пробел/перенос строки, поэтому проверяем с помощью оператора in, а не ==
             if quizDT >= curDT and 'Есть места' in liAvailability:
-                games[orgTag + str(i)] = {}
-                games[orgTag + str(i)]['game'] = liGameName
-                games[orgTag + str(i)]['date'] = quizDT
-                games[orgTag + str(i)]['bar'] = liBar
-                games[orgTag + str(i)]['tag'] = liGameTag
+                games[orgTag + str(i)] = make_game(orgTag, i, liGameName, quizDT, liBar, liGameTag)
 
     except Exception as err:
         # если при скрэйпиге произошла ошибка, то сохраняем ее в organizatorsErrors
@@ -357,10 +532,49 @@ def scrape_liga_indigo(quizSoup, orgName, orgTag, dateParams, localHTMLs=None):
     return games, organizatorErrors
 
 
-def scrape_mama_quiz(orgLink, orgName, orgTag, dateParams):
+def get_mama_quiz_cards(quizSoup):
+    """
+    Извлекает из HTML-кода страницы Мама Квиз текст карточек регистрации на игры, за один проход по странице.
+    На сайте для каждой игры есть кнопка 'ЗАРЕГИСТРИРОВАТЬСЯ' со ссылкой вида '#kviz0401'. Окно регистрации, которое
+    открывает кнопка, уже есть в HTML-коде страницы: это блок с атрибутом data-tooltip-hook='#kviz0401', в котором
+    информация об игре лежит в родительском элементе тэга <strong> с текстом 'Игра'.
+    Строки карточки разделены тэгами <br>, они возвращаются в том же виде, в каком их показывает браузер:
+    ['Игра: Классика #132', 'Место проведения: MISHKIN&MISHKIN (ул. Нарымская, 37)', 'Дата: 18 февраля 2024',
+    'Сбор команд: 17:30', 'Начало игры: 18:00', 'Стоимость: 400 руб./человек']
+    :param quizSoup (bs4.BeautifulSoup): объект с HTML-кодом страницы с расписанием квизов
+    :return: list, по одному элементу на каждую кнопку регистрации в порядке кнопок на странице: список строк
+             карточки, либо None, если окно регистрации для кнопки не найдено
+    """
+    # окна регистрации по ссылкам, которые их открывают: {'#kviz0401': bs4.element.Tag}
+    popups = {popup['data-tooltip-hook']: popup for popup in quizSoup.find_all(attrs={'data-tooltip-hook': True})}
+
+    cards = []
+    for button in quizSoup.find_all('a', href=True):
+        if button.get_text(strip=True) != 'ЗАРЕГИСТРИРОВАТЬСЯ':
+            continue
+        popup = popups.get('#' + button['href'].partition('#')[2])
+        elemWithGame = None
+        if popup is not None:
+            elemWithGame = popup.find(lambda tag: tag.name == 'strong' and 'Игра' in tag.get_text())
+        if elemWithGame is None:
+            cards.append(None)
+            continue
+
+        # собираем строки карточки, <br> - конец строки. Пробелы внутри строки схлопываем, как это делает браузер
+        lines = ['']
+        for element in elemWithGame.parent.children:
+            if getattr(element, 'name', None) == 'br':
+                lines.append('')
+            else:
+                lines[-1] += element.get_text() if isinstance(element, bs4.element.Tag) else str(element)
+        cards.append([' '.join(line.split()) for line in lines])
+    return cards
+
+
+def scrape_mama_quiz(quizSoup, orgName, orgTag, dateParams):
     """
     Функция которая скрейпит информацию с сайта Мама Квиз и возвращает список квизов и возникших ошибок.
-    :param orgLink (str): ссылка на веб-страницу с расписанием квизов организатора в конкретном городе
+    :param quizSoup (bs4.BeautifulSoup): объект с HTML-кодом страницы с расписанием квизов
     :param orgName (str): имя организатора ('Мама Квиз')
     :param orgTag (str): тэг организатора ('mama')
     :param dateParams (list): список временных параметров из collect_quiz_data
@@ -370,83 +584,173 @@ def scrape_mama_quiz(orgLink, orgName, orgTag, dateParams):
     organizatorErrors = {}
     curYear, nextYear, curMonth, curDT = dateParams
 
-    # т.к. информация в HTML-коде сайта Мама Квиз неструктурирована и невозможно ее достоверно разобрать, то
-    # открываем сайт Мама Квиз с помощью браузера Google Chrome. На сайте для каждой игры есть кнопка
-    # 'ЗАРЕГИСТИРОВАТЬСЯ', нажав ее получаем всю информацию о конкретной игре
+    # на сайте для каждой игры есть кнопка 'ЗАРЕГИСТИРОВАТЬСЯ', в окне регистрации есть вся информация о конкретной
+    # игре. Все окна регистрации есть в HTML-коде страницы, поэтому разбираем их за один проход, без браузера
 
     try:
-        options = Options()  # настройки для запуска Google Chrome с помощью ChromeDriver
-        options.add_argument('--no-sandbox')  # чтобы можно было запускать от root
-        options.add_argument('--headless=new')  # чтобы не открывалось само приложение Google Chrome
-        driver = webdriver.Chrome(options=options)
-        driver.get(orgLink)
+        for b, curGameInfo in enumerate(get_mama_quiz_cards(quizSoup)):
+            if curGameInfo is None:
+                logger.error(f'Мама Квиз: не найдена карточка регистрации на {b} игру')
+                continue
 
-        # у каждой игры есть кнопка зарегистрироваться, находим все такие кнопки
-        registerButtons = driver.find_elements(By.LINK_TEXT, 'ЗАРЕГИСТРИРОВАТЬСЯ')
+            # текст карточки разбит на строки:
+            # ['Игра: Классика #132', 'Место проведения: MISHKIN&MISHKIN (ул. Нарымская, 37)', 'Дата: 18 февраля 2024',
+            # 'Сбор команд: 17:30', 'Начало игры: 18:00', 'Стоимость: 400 руб./человек']
+
+            # добавляем в списки информацию об игре.
+            # везде обрезаем заголовки вида "Игра: ", находя индекс элемента : и прибавляя к нему 2 позиции
+            mamaGameName = curGameInfo[0][curGameInfo[0].index(':') + 2:]
+            mamaGameTag = assign_themes_to_quiz(mamaGameName, orgName)
+
+            # информация о баре пишется в формате 'MISHKIN&MISHKIN (ул. Нарымская, 37)', отрезаем адрес бара
+            mamaBar = curGameInfo[1][curGameInfo[1].index(':') + 2:]
+            tempIndex = mamaBar.index('(')
+            mamaBar = mamaBar[:tempIndex - 1]  # отрезаем адрес и пробел перед ним
+
+            # информация о дате проведения пишется в формате '18 февраля 2024', разбираем это регулярными
+            # выражениями
+            mamaDateFullInfo = curGameInfo[2][curGameInfo[2].index(':') + 2:]
+            mamaDateRegEx = re.compile(r'^(\d{1,2})\s+([А-Яа-я]+)\s+(\d\d\d\d)$')
+            mo = mamaDateRegEx.search(mamaDateFullInfo)
+            mamaDay, mamaMonth, mamaYear = mo.groups()
+            # преобразуем текстовое название месяца в цифру с помощью словаря MONTH_DICT
+            mamaMonth = MONTH_DICT[mamaMonth]
 
-        elemWithGame = None
+            mamaStartTime = curGameInfo[4][curGameInfo[4].index(':') + 2:]
+            mamaHour = int(mamaStartTime[:2])
+            mamaMinute = int(mamaStartTime[3:])
 
-        # по очереди открываем модальное окно регистрации на каждую игру, извлекаем информацию
-        for b, button in enumerate(registerButtons):
-            sleep(0.5)  # ждем секунду после того как закрыли предыдущую форму, прежде чем кликнуть
-            try:
-                button.click()
-                # У каждого открывшегося окна регистрации отличается номер form, остальной CSS-селектор идентичный
-                # Информация об игре хранится в тэгах <strong>, находим все такие элементы и среди них находит элемент с
-                # тэгом Игра - такой найдется один на всю карточку
-                curGameWindow = driver.find_elements(By.TAG_NAME, 'strong')
-                for i in range(len(curGameWindow)):
-                    if 'Игра' in curGameWindow[i].text:
-                        elemWithGame = curGameWindow[i]
-                        break
-            except Exception as err:
-                logger.error(f'Мама Квиз: Произошла ошибка при открытии карточки регистрации на {b} игру')
-                continue
+            quizDT = datetime.datetime(int(mamaYear), mamaMonth, int(mamaDay), mamaHour, mamaMinute)
+
+            # если квиз еще не прошел, то добавляем его в словарь
+            if quizDT >= curDT:
+                games[orgTag + str(b)] = make_game(orgTag, b, mamaGameName, quizDT, mamaBar, mamaGameTag)
 
-            # если нашли такой элемент, то находим для него родительский элемент и извлекаем из него текст, разбиваем
-            # текст на элементы списка
-            # 'Игра: Классика #132\nМесто проведения: MISHKIN&MISHKIN (ул. Нарымская, 37)\nДата: 18 февраля 2024\n
-            # Сбор команд:17:30\nНачало игры: 18:00\nСтоимость: 400 руб./человек'
+    except Exception as err:
+        # если при скрэйпиге произошла ошибка, то сохраняем ее в organizatorsErrors
+        organizatorErrors[orgName] = str(err)
+
+    return games, organizatorErrors
+
+
+def create_quiz_please_game(cardInfo, orgName, orgTag, number, dateParams):
+    """
+    Создает запись об игре Квиз Плиз из текста карточки игры. Используется и при разборе HTML-кода страницы, и
+    при скрейпинге в браузере.
+    :param cardInfo (dict): текст карточки игры, словарь вида {'date': '12 июня, Воскресенье',
+                            'name': 'Квиз, плиз! NSK', 'number': '#567', 'bar': 'Арт П.А.Б.', 'startTime': 'в 20:00',
+                            'places': 'Осталось мало мест'}
+    :param orgName (str): имя организатора ('Квиз Плиз')
+    :param orgTag (str): тэг организатора ('qp')
+    :param number (int): номер карточки игры в расписании
+    :param dateParams (list): список временных параметров из collect_quiz_data
+    :return: quizGame.Game, либо None, если игра уже прошла или на нее нельзя записаться
+    """
+    curYear, nextYear, curMonth, curDT = dateParams
 
-            if elemWithGame:
-                curGameInfo = elemWithGame.find_element(By.XPATH, './..').text.split('\n')
+    # по названию игры добаляем тэг с тематикой
+    qpGameTag = assign_themes_to_quiz(cardInfo['name'], orgName)
+
+    # Информация о баре хранится в формате 'Бар-ресторан Друзья Информация о площадке', так как название бара лежит в самом элементе,
+    # а слова "Информация о площадке" лежат в его дочернем элементе. А text возвращает весь текст внутри элемента и его детей.
+    # Так как текст "Информация о площадке - стабильный, не будем делать сложную схему по удалению текста дочернего элемента, а вырежем просто"
+    qpBar = cardInfo['bar']
+    if 'Информация о площадке' in qpBar:
+        index_to_strip_bar = len(qpBar) - len("Информация о площадке") - 1
+        qpBar = qpBar[0:index_to_strip_bar]
+
+    # у Квиз Плиз время начали игры пишется в формате "в 20:00", поэтому 2 первых символа отрезаем
+    qpStartTime = cardInfo['startTime'][2:]
+    qpHour = int(qpStartTime[:2])
+    qpMinute = int(qpStartTime[3:])
+
+    # преобразовываем дату проведения квиза в нужный формат
+    # regexp для даты в формате '12 июня, Воскресенье'
+    qpDateRegEx = re.compile(r'''
+                            ^(\d|\d\d)\s    # одна или две цифры в начале строки, после пробел
+                            ([А-Яа-я]+),\s  # месяц, после него запятая пробел
+                            ([А-Яа-я]+)$    # день недели
+                            ''', re.VERBOSE)
+    mo = qpDateRegEx.search(cardInfo['date'])
+    qpDay, qpMonth, qpDOW = mo.groups()
+
+    # преобразуем текстовое название месяца в цифру с помощью словаря MONTH_DICT
+    qpMonth = MONTH_DICT[qpMonth]
+
+    # если сейчас декабрь, а расписание содержит январские квизы, то для них указываем в дате следующий год
+    if curMonth == 12 and qpMonth == 1:
+        quizDT = datetime.datetime(nextYear, qpMonth, int(qpDay), qpHour, qpMinute)
+    else:
+        quizDT = datetime.datetime(curYear, qpMonth, int(qpDay), qpHour, qpMinute)
 
-                # добавляем в списки информацию об игре.
-                # везде обрезаем заголовки вида "Игра: ", находя индекс элемента : и прибавляя к нему 2 позиции
-                mamaGameName = curGameInfo[0][curGameInfo[0].index(':') + 2:]
-                mamaGameTag = assign_themes_to_quiz(mamaGameName, orgName)
+    # исключаем из выборки заведомо неподходящие квизы: где нет мест, по инвайтам, квиз уже прошел
+    qpPlacesLeft = cardInfo['places']
+    if quizDT < curDT or 'Резерв заполнен' in qpPlacesLeft:
+        return None
 
-                # информация о баре пишется в формате 'MISHKIN&MISHKIN (ул. Нарымская, 37)', отрезаем адрес бара
-                mamaBar = curGameInfo[1][curGameInfo[1].index(':') + 2:]
-                tempIndex = mamaBar.index('(')
-                mamaBar = mamaBar[:tempIndex - 1]  # отрезаем адрес и пробел перед ним
+    logger.debug(f'TEST QP AVAILABILITY: {cardInfo["name"]}: {qpPlacesLeft}')
+    qpAvailability = 'Резерв' if 'резерв' in qpPlacesLeft.lower() else ''
+    return make_game(orgTag, number, cardInfo['name'] + ' ' + cardInfo['number'], quizDT, qpBar, qpGameTag,
+                     qpAvailability)
 
-                # информация о дате проведения пишется в формате '18 февраля 2024', разбираем это регулярными
-                # выражениями
-                mamaDateFullInfo = curGameInfo[2][curGameInfo[2].index(':') + 2:]
-                mamaDateRegEx = re.compile(r'^(\d{1,2})\s+([А-Яа-я]+)\s+(\d\d\d\d)$')
-                mo = mamaDateRegEx.search(mamaDateFullInfo)
-                mamaDay, mamaMonth, mamaYear = mo.groups()
-                # преобразуем текстовое название месяца в цифру с помощью словаря MONTH_DICT
-                mamaMonth = MONTH_DICT[mamaMonth]
 
-                mamaStartTime = curGameInfo[4][curGameInfo[4].index(':') + 2:]
-                mamaHour = int(mamaStartTime[:2])
-                mamaMinute = int(mamaStartTime[3:])
+def get_quiz_please_cards(quizSoup):
+    """
+    Извлекает из HTML-кода страницы Квиз Плиз текст карточек игр. Поддерживается текущая верстка сайта (карточки
+    div.game-card, их же разбирает scrape_quiz_please_in_browser()) и прежняя верстка (div.schedule-column), в которой
+    сохранена страница tests/saved_web_pages/quizplease_schedule_2023-12-14.html.
+    :param quizSoup (bs4.BeautifulSoup): объект с HTML-кодом страницы с расписанием квизов
+    :return: list of dict, текст карточек в формате параметра cardInfo функции create_quiz_please_game()
+    """
+    # CSS-селекторы верстки: карточка игры, дата, название и номер игры, бар, время начала, наличие мест
+    layouts = [
+        (QP_SCHEDULE_SELECTOR + ' > *', 'div > p.game-card__date', 'div > div.game-card__name-wrapper > *',
+         'p.game-card__location-text__title', 'div > div.game-card__location > div:nth-child(2) > p',
+         'div.game-card__bottom > div.game-card__sold > p, div.game-status.schedule-end > div'),
+        ('div.schedule-column', 'div.block-date-with-language-game', 'a.schedule-block-head > div',
+         'div.schedule-block-info-bar', 'div.schedule-info:nth-of-type(2) div.techtext', 'div.game-status'),
+    ]
+    for cardSel, dateSel, nameSel, barSel, timeSel, placesSel in layouts:
+        cards = quizSoup.select(cardSel)
+        if not cards:
+            continue
 
-                quizDT = datetime.datetime(int(mamaYear), mamaMonth, int(mamaDay), mamaHour, mamaMinute)
+        cardsInfo = []
+        for card in cards:
+            nameAndNumber = [get_element_text(element) for element in card.select(nameSel)]
+            placesElement = card.select_one(placesSel)
+            cardsInfo.append({
+                'date': get_element_text(card.select_one(dateSel)),
+                'name': nameAndNumber[0],
+                # у игр вида "ОТКРЫТИЕ ЛЕТНЕГО СЕЗОНА NSK" нет элемента с номером
+                'number': nameAndNumber[1] if len(nameAndNumber) > 1 else '',
+                'bar': get_element_text(card.select_one(barSel)),
+                'startTime': get_element_text(card.select_one(timeSel)),
+                'places': get_element_text(placesElement) if placesElement is not None else '',
+            })
+        return cardsInfo
+    return []
 
-                # если квиз еще не прошел, то добавляем его в словарь
-                if quizDT >= curDT:
-                    games[orgTag + str(b)] = {}
-                    games[orgTag + str(b)]['game'] = mamaGameName
-                    games[orgTag + str(b)]['date'] = quizDT
-                    games[orgTag + str(b)]['bar'] = mamaBar
-                    games[orgTag + str(b)]['tag'] = mamaGameTag
 
-            button.send_keys(Keys.ESCAPE)  # закрываем модальное окно регистрации на игру нажатием ESCAPE
+def scrape_quiz_please(quizSoup, orgName, orgTag, dateParams):
+    """
+    Функция которая скрейпит информацию с сайта Квиз Плиз по HTML-коду страницы, без браузера, и возвращает список
+    квизов и возникших ошибок. Если на странице не нашлось ни одной игры, то scrape_organizator() скрейпит сайт в
+    браузере функцией scrape_quiz_please_in_browser().
+    :param quizSoup (bs4.BeautifulSoup): объект с HTML-кодом страницы с расписанием квизов
+    :param orgName (str): имя организатора ('Квиз Плиз')
+    :param orgTag (str): тэг организатора ('qp')
+    :param dateParams (list): список временных параметров из collect_quiz_data
+    :return: games (dict), organizatorErrors (dict)
+    """
+    games = {}
+    organizatorErrors = {}
 
-        driver.close()  # закрываем браузер
+    try:
+        for i, cardInfo in enumerate(get_quiz_please_cards(quizSoup)):
+            game = create_quiz_please_game(cardInfo, orgName, orgTag, i, dateParams)
+            if game is not None:
+                games[orgTag + str(i)] = game
 
     except Exception as err:
         # если при скрэйпиге произошла ошибка, то сохраняем ее в organizatorsErrors
@@ -455,9 +759,10 @@ def scrape_mama_quiz(orgLink, orgName, orgTag, dateParams):
     return games, organizatorErrors
 
 
-def scrape_quiz_please(orgLink, orgName, orgTag, dateParams):
+def scrape_quiz_please_in_browser(orgLink, orgName, orgTag, dateParams):
     """
-    Функция которая скрейпит информацию с сайта Квиз Плиз и возвращает список квизов и возникших ошибок.
+    Функция которая скрейпит информацию с сайта Квиз Плиз в браузере и возвращает список квизов и возникших ошибок.
+    Используется, если в HTML-коде страницы не нашлось ни одной игры (см. scrape_quiz_please()).
     :param orgLink (str): ссылка на веб-страницу с расписанием квизов организатора в конкретном городе
     :param orgName (str): имя организатора ('Квиз Плиз')
     :param orgTag (str): тэг организатора ('qp')
@@ -466,62 +771,32 @@ def scrape_quiz_please(orgLink, orgName, orgTag, dateParams):
     """
     games = {}
     organizatorErrors = {}
-    curYear, nextYear, curMonth, curDT = dateParams
 
+    driver = None
     try:
-        options = Options()  # настройки для запуска Google Chrome с помощью ChromeDriver
-        options.add_argument('--no-sandbox')  # чтобы можно было запускать от root
-        options.add_argument('--headless=new')  # чтобы не открывалось само приложение Google Chrome
-        options.add_argument(
-            '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
-            '(KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36'
-        )
-        driver = webdriver.Chrome(options=options)
+        # браузер Google Chrome берем из общего пула браузеров, у браузеров пула уже задан User-agent
+        driver = BROWSER_POOL.checkout()
         driver.get(orgLink)
         # ждем чтобы подгрузился изначальный список квизов
-        import time
-        time.sleep(5)
-        logger.debug("Прождали 5 сек после открытия браузера")
+        qpCardsSelector = QP_SCHEDULE_SELECTOR + ' > *'
+        wait_for_stable_count(driver, qpCardsSelector, get_wait_budget(orgTag, 'pageLoad'),
+                              f'{orgName}: загрузка расписания')
 
         # Скрейпим страницу, затем ищем кнопку следующая страница
         for i in range(2):
             # получаем массив с расписанием каждой игры и проходим по нему
-            schedule_element = driver.find_element(By.CSS_SELECTOR,
-                                                   "div > div > div > div > div:nth-child(2) > div > div > div.content-block > div.card-container ")
+            schedule_element = driver.find_element(By.CSS_SELECTOR, QP_SCHEDULE_SELECTOR)
             qpElements = schedule_element.find_elements(By.XPATH, "./*")
             for i, curElement in enumerate(qpElements):
-                # извлекаем дату проведения квиза вида "12 июня, Воскресенье"
-                qpDateTime = curElement.find_element(By.CSS_SELECTOR, "div > p.game-card__date").text.strip()
-                # извлекаем название игры
+                # извлекаем название игры и ее номер
                 qpGameNameAndNumParent = curElement.find_element(By.CSS_SELECTOR, "div > div.game-card__name-wrapper")
                 qpGameNameAndNumChildren = qpGameNameAndNumParent.find_elements(By.XPATH, "./*")
-                qpGameName = qpGameNameAndNumChildren[0].text.strip()
                 # у игр вида "ОТКРЫТИЕ ЛЕТНЕГО СЕЗОНА NSK" нет элемента с номером
                 try:
                     qpGameNumber = qpGameNameAndNumChildren[1].text.strip()
                 except Exception:
                     qpGameNumber = ''
 
-                # по названию игры добаляем тэг с тематикой
-                qpGameTag = assign_themes_to_quiz(qpGameName, orgName)
-
-                # извлекаем название площадки проведения квиза
-                qpBar = curElement.find_element(By.CSS_SELECTOR,
-                                                "div > div.game-card__location > div:nth-child(1) > div > p.game-card__location-text__title").text.strip()
-                # Информация о баре хранится в формате 'Бар-ресторан Друзья Информация о площадке', так как название бара лежит в самом элементе,
-                # а слова "Информация о площадке" лежат в его дочернем элементе. А text возвращает весь текст внутри элемента и его детей.
-                # Так как текст "Информация о площадке - стабильный, не будем делать сложную схему по удалению текста дочернего элемента, а вырежем просто"
-                if 'Информация о площадке' in qpBar:
-                    index_to_strip_bar = len(qpBar) - len("Информация о площадке") - 1
-                    qpBar = qpBar[0:index_to_strip_bar]
-
-                qpStartTime = curElement.find_element(By.CSS_SELECTOR,
-                                                      "div > div.game-card__location > div:nth-child(2) > p").text.strip()
-                # у Квиз Плиз время начали игры пишется в формате "в 20:00", поэтому 2 первых символа отрезаем
-                qpStartTime = qpStartTime[2:]
-                qpHour = int(qpStartTime[:2])
-                qpMinute = int(qpStartTime[3:])
-
                 # извлекаем наличие мест на игру вида: "Нет мест! Но можно записаться в резерв"/ "Осталось мало мест"
                 # информация о том что места есть и о том что запись резерв хранится в разных элементах, запрашиваем их
                 # поочередно
@@ -535,58 +810,67 @@ def scrape_quiz_please(orgLink, orgName, orgTag, dateParams):
                         qpPlacesLeft = qpPlacesLeft[0].text.strip()
                 qpPlacesLeft = str(qpPlacesLeft)
 
-                # преобразовываем дату проведения квиза в нужный формат
-                # regexp для даты в формате '12 июня, Воскресенье'
-                qpDateRegEx = re.compile(r'''
-                                        ^(\d|\d\d)\s    # одна или две цифры в начале строки, после пробел
-                                        ([А-Яа-я]+),\s  # месяц, после него запятая пробел
-                                        ([А-Яа-я]+)$    # день недели
-                                        ''', re.VERBOSE)
-                mo = qpDateRegEx.search(qpDateTime)
-                qpDay, qpMonth, qpDOW = mo.groups()
-
-                # преобразуем текстовое название месяца в цифру с помощью словаря MONTH_DICT
-                qpMonth = MONTH_DICT[qpMonth]
-
-                # если сейчас декабрь, а расписание содержит январские квизы, то для них указываем в дате следующий год
-                if curMonth == 12 and qpMonth == 1:
-                    quizDT = datetime.datetime(nextYear, qpMonth, int(qpDay), qpHour, qpMinute)
-                else:
-                    quizDT = datetime.datetime(curYear, qpMonth, int(qpDay), qpHour, qpMinute)
-
-                # исключаем из выборки заведомо неподходящие квизы: где нет мест, по инвайтам, квиз уже прошел
-                # из остального формируем словарь games
-                if quizDT >= curDT and 'Резерв заполнен' not in qpPlacesLeft:
-                    games[orgTag + str(i)] = {}
-                    games[orgTag + str(i)]['game'] = qpGameName + ' ' + qpGameNumber
-                    games[orgTag + str(i)]['date'] = quizDT
-                    games[orgTag + str(i)]['bar'] = qpBar
-                    games[orgTag + str(i)]['tag'] = qpGameTag
-                    logger.debug(f'TEST QP AVAILABILITY: {qpGameName}: {qpPlacesLeft}')
-                    if 'резерв' in qpPlacesLeft.lower():
-                        games[orgTag + str(i)]['availability'] = 'Резерв'
+                cardInfo = {
+                    # дата проведения квиза вида "12 июня, Воскресенье"
+                    'date': curElement.find_element(By.CSS_SELECTOR, "div > p.game-card__date").text.strip(),
+                    'name': qpGameNameAndNumChildren[0].text.strip(),
+                    'number': qpGameNumber,
+                    'bar': curElement.find_element(By.CSS_SELECTOR,
+                                                   "div > div.game-card__location > div:nth-child(1) > div > p.game-card__location-text__title").text.strip(),
+                    'startTime': curElement.find_element(By.CSS_SELECTOR,
+                                                         "div > div.game-card__location > div:nth-child(2) > p").text.strip(),
+                    'places': qpPlacesLeft,
+                }
+                game = create_quiz_please_game(cardInfo, orgName, orgTag, i, dateParams)
+                if game is not None:
+                    games[orgTag + str(i)] = game
             # нажимаем кнопку перехода на следующую страницу
             try:
                 nextPageButton = driver.find_element(By.CSS_SELECTOR, "button.game-pagination__button.next")
+                firstCardText = qpElements[0].text if qpElements else ''
                 ActionChains(driver).move_to_element(nextPageButton).click().perform()
-                time.sleep(2)
+                # ждем, пока вместо карточек квизов текущей страницы появятся карточки следующей, и пока они догрузятся
+                wait_for_value(driver,
+                               lambda d: d.find_element(By.CSS_SELECTOR, qpCardsSelector).text != firstCardText,
+                               get_wait_budget(orgTag, 'pagination'), f'{orgName}: переход на следующую страницу')
+                wait_for_stable_count(driver, qpCardsSelector, get_wait_budget(orgTag, 'pagination'),
+                                      f'{orgName}: загрузка следующей страницы')
                 i += 1
             except NoSuchElementException:
                 break
             except Exception as e:
-                logger.debug(f'scrape_quiz_please. Exception while trying to push the next page button: {e}')
+                logger.debug(f'scrape_quiz_please_in_browser. Exception while trying to push the next page button: {e}')
 
     except Exception as err:
         # если при скрэйпиге произошла ошибка, то сохраняем ее в organizatorsErrors
         organizatorErrors[orgName] = str(err)
 
+    finally:
+        # возвращаем браузер в пул, в том числе после ошибки. после ошибки пул закроет браузер и все его процессы
+        if driver is not None:
+            BROWSER_POOL.checkin(driver, failed=orgName in organizatorErrors)
+
     return games, organizatorErrors
 
 
-def scrape_shaker_quiz(quizSoup, orgName, orgTag, dateParams):
+def get_next_data(res):
+    """
+    Извлекает JSON из тэга <script id="__NEXT_DATA__">, в котором сайты на Next.js (Шейкер Квиз) отдают данные
+    страницы. Тэг ищется регулярным выражением в байтах ответа, без построения дерева HTML-кода страницы.
+    :param res (requests.Response): ответ с HTML-кодом страницы
+    :return: dict с данными страницы
+    :raises ValueError: если на странице нет тэга __NEXT_DATA__
+    """
+    mo = NEXT_DATA_REGEX.search(res.content)
+    if mo is None:
+        raise ValueError('На странице нет тэга <script id="__NEXT_DATA__">')
+    return json.loads(mo.group(1).decode(res.encoding or 'utf-8'))
+
+
+def scrape_shaker_quiz(res, orgName, orgTag, dateParams):
     """
     Функция которая скрейпит информацию с сайта Шейкер Квиз и возвращает список квизов и возникших ошибок.
-    :param quizSoup (bs4.BeautifulSoup): объект с HTML-кодом страницы с расписанием квизов
+    :param res (requests.Response): ответ с HTML-кодом страницы с расписанием квизов
     :param orgName (str): имя организатора ('Шейкер Квиз')
     :param orgTag (str): тэг организатора ('shaker')
     :param dateParams (list): список временных параметров из collect_quiz_data
@@ -596,8 +880,7 @@ def scrape_shaker_quiz(quizSoup, orgName, orgTag, dateParams):
     organizatorErrors = {}
     curYear, nextYear, curMonth, curDT = dateParams
     try:
-        shakerData = quizSoup.find('script', id='__NEXT_DATA__')
-        shakerData = json.loads(shakerData.string)
+        shakerData = get_next_data(res)
 
         # судя по всему каждый раз список элементов приходит в разном порядке, поэтому определяем нужные элементы
         # по названию из нулевого элемента списка, сам список квизов/ мест проведения лежит в первом элементе списка
@@ -607,6 +890,12 @@ def scrape_shaker_quiz(quizSoup, orgName, orgTag, dateParams):
             elif shakerInfoList[0] == 'GET/games/venue/:venue/search':
                 shakerVenuesList = shakerInfoList[1]
 
+        # бары связаны с играми по id игры, индексируем их один раз: {id игры: название бара}.
+        # если у игры несколько мест проведения, то берем первое из списка
+        shakerBars = {}
+        for venueInfo in shakerVenuesList:
+            shakerBars.setdefault(venueInfo['game_id'], venueInfo['name'])
+
         for n, shakerGame in enumerate(shakerGamesList):
             shakerGameName = shakerGame['name']
             shakerGameNumber = shakerGame.get('number')
@@ -622,21 +911,127 @@ def scrape_shaker_quiz(quizSoup, orgName, orgTag, dateParams):
             # TODO: пока вижу только статус 'published', может есть другие нормальные
             shakerAvailability = shakerGame['status']
 
-            shakerBar = ''  # бары извлекаем из связанного списка по id игры
-            shakerGameId = shakerGame['id']
-            for venueInfo in shakerVenuesList:
-                if venueInfo['game_id'] == shakerGameId:
-                    shakerBar = venueInfo['name']
-                    break
+            shakerBar = shakerBars.get(shakerGame['id'], '')
 
             # исключаем из выборки заведомо неподходящие квизы: нет мест, квиз уже прошел
             # из остального формируем словарь games
             if shakerAvailability.lower() == 'publish' and shakerDT >= curDT:
-                games[orgTag + str(n + 1)] = {}
-                games[orgTag + str(n + 1)]['game'] = shakerGameName
-                games[orgTag + str(n + 1)]['date'] = shakerDT
-                games[orgTag + str(n + 1)]['bar'] = shakerBar
-                games[orgTag + str(n + 1)]['tag'] = shakerGameTag
+                games[orgTag + str(n + 1)] = make_game(orgTag, n + 1, shakerGameName, shakerDT, shakerBar,
+                                                       shakerGameTag)
+
+    except Exception as err:
+        # если при скрэйпиге произошла ошибка, то сохраняем ее в organizatorsErrors
+        organizatorErrors[orgName] = str(err)
+
+    return games, organizatorErrors
+
+
+def create_wow_quiz_game(cardInfo, orgName, orgTag, number, dateParams):
+    """
+    Создает запись об игре Вау Квиз из текста карточки игры. Используется и при разборе HTML-кода страницы, и
+    при скрейпинге в браузере.
+    :param cardInfo (dict): текст карточки игры, словарь вида {'name': 'Угадай мультфильм #4',
+                            'date': '15 апреля, вторник', 'startTime': '16:00', 'bar': 'Три Лося',
+                            'availability': 'Места есть'}
+    :param orgName (str): имя организатора ('Вау Квиз')
+    :param orgTag (str): тэг организатора ('wow')
+    :param number (int): номер карточки игры в расписании
+    :param dateParams (list): список временных параметров из collect_quiz_data
+    :return: quizGame.Game, либо None, если игра уже прошла или мест на нее нет
+    """
+    curYear, nextYear, curMonth, curDT = dateParams
+
+    # по названию игры добаляем тэг с тематикой игры
+    wowGameTag = assign_themes_to_quiz(cardInfo['name'], orgName)
+
+    # разделяем 15 апреля, вторник на две переменных; с помощью strip убираем пробел перед днём недели
+    wowGameDate, separator, wowGameDOW = cardInfo['date'].partition(",")
+    wowGameDOW = wowGameDOW.strip()
+
+    # преобразовываем дату проведения квиза в нужный формат
+    wowGameStartTime = cardInfo['startTime']
+    wowHour = int(wowGameStartTime[:2])
+
+    wowMinute = int(wowGameStartTime[3:])
+    wowDateRegEx = re.compile(r'''
+                            ^(\d|\d\d)\s        # одна или две цифры в начале строки, после пробел
+                             ([А-Яа-я]+)        # месяц
+                            ''', re.VERBOSE)
+    mo = wowDateRegEx.search(wowGameDate)
+    wowDay, wowMonth = mo.groups()
+    wowDay = int(wowDay)
+    # преобразуем текстовое название месяца в цифру с помощью словаря MONTH_DICT
+    wowMonth = MONTH_DICT[wowMonth]
+
+    # если сейчас декабрь, а расписание содержит январские квизы, то для них указываем в дате следующий год
+    if curMonth == 12 and wowMonth == 1:
+        quizDT = datetime.datetime(nextYear, wowMonth, wowDay, wowHour, wowMinute)
+    else:
+        quizDT = datetime.datetime(curYear, wowMonth, wowDay, wowHour, wowMinute)
+
+    # исключаем из выборки заведомо неподходящие квизы: нет мест, квиз уже прошел
+    wowAvailability = cardInfo['availability']
+    if wowAvailability.lower() in ['мест нет'] or quizDT < curDT:
+        return None
+
+    wowAvailability = 'Резерв' if wowAvailability.lower() == 'резерв' else ''
+    return make_game(orgTag, number, cardInfo['name'], quizDT, cardInfo['bar'], wowGameTag, wowAvailability)
+
+
+def get_wow_quiz_cards(quizSoup):
+    """
+    Извлекает из HTML-кода страницы Вау Квиз текст карточек игр. Поддерживается текущая верстка сайта (карточки
+    div.schedule-card, их же разбирает scrape_wow_quiz_in_browser()) и прежняя верстка (div.game-item), в которой
+    сохранена страница tests/saved_web_pages/wowquiz_schedule_2023-12-20.html.
+    :param quizSoup (bs4.BeautifulSoup): объект с HTML-кодом страницы с расписанием квизов
+    :return: list of dict, текст карточек в формате параметра cardInfo функции create_wow_quiz_game()
+    """
+    # CSS-селекторы верстки: карточка игры, название игры, дата и время начала (первый и второй найденные элементы),
+    # бар, наличие мест
+    layouts = [
+        (WOW_CARDS_SELECTOR, '.schedule-card__title', '.schedule-card__details-item', '.schedule-card__bar',
+         '.schedule-card__status'),
+        ('div.game-item', '.game-item__title', '.game-item__date > .date:first-child, .game-item__date > .time',
+         '.game-item__address > .place', '.game-item-content-right > span'),
+    ]
+    for cardSel, nameSel, dateAndTimeSel, barSel, availabilitySel in layouts:
+        cards = quizSoup.select(cardSel)
+        if not cards:
+            continue
+
+        cardsInfo = []
+        for card in cards:
+            dateAndTime = card.select(dateAndTimeSel)
+            cardsInfo.append({
+                'name': get_element_text(card.select_one(nameSel)),
+                'date': get_element_text(dateAndTime[0]),
+                'startTime': get_element_text(dateAndTime[1]),
+                'bar': get_element_text(card.select_one(barSel)),
+                'availability': get_element_text(card.select_one(availabilitySel)),
+            })
+        return cardsInfo
+    return []
+
+
+def scrape_wow_quiz(quizSoup, orgName, orgTag, dateParams):
+    """
+    Функция которая скрейпит информацию с сайтов Вау Квиз по HTML-коду страницы, без браузера, и возвращает список
+    квизов и возникших ошибок. Если на странице не нашлось ни одной игры, то scrape_organizator() скрейпит сайт в
+    браузере функцией scrape_wow_quiz_in_browser().
+    :param quizSoup (bs4.BeautifulSoup): объект с HTML-кодом страницы с расписанием квизов
+    :param orgName (str): имя организатора ('Вау Квиз')
+    :param orgTag (str): тэг организатора ('wow')
+    :param dateParams (list): список временных параметров из collect_quiz_data
+    :return: games (dict), organizatorErrors (dict)
+    """
+    games = {}
+    organizatorErrors = {}
+
+    try:
+        for n, cardInfo in enumerate(get_wow_quiz_cards(quizSoup)):
+            game = create_wow_quiz_game(cardInfo, orgName, orgTag, n, dateParams)
+            if game is not None:
+                games[orgTag + str(n)] = game
 
     except Exception as err:
         # если при скрэйпиге произошла ошибка, то сохраняем ее в organizatorsErrors
@@ -645,9 +1040,10 @@ def scrape_shaker_quiz(quizSoup, orgName, orgTag, dateParams):
     return games, organizatorErrors
 
 
-def scrape_wow_quiz(orgLink, orgName, orgTag, dateParams):
+def scrape_wow_quiz_in_browser(orgLink, orgName, orgTag, dateParams):
     """
-    Функция которая скрейпит информацию с сайтов Вау Квиз и возвращает список квизов и возникших ошибок.
+    Функция которая скрейпит информацию с сайтов Вау Квиз в браузере и возвращает список квизов и возникших ошибок.
+    Используется, если в HTML-коде страницы не нашлось ни одной игры (см. scrape_wow_quiz()).
     :param orgLink (str): ссылка на веб-страницу с расписанием квизов организатора в конкретном городе
     :param orgName (str): имя организатора ('Вау Квиз')
     :param orgTag (str): тэг организатора ('wow')
@@ -656,17 +1052,15 @@ def scrape_wow_quiz(orgLink, orgName, orgTag, dateParams):
     """
     games = {}
     organizatorErrors = {}
-    curYear, nextYear, curMonth, curDT = dateParams
 
+    driver = None
     try:
-        options = Options()  # настройки для запуска Google Chrome с помощью ChromeDriver
-        options.add_argument('--no-sandbox')  # чтобы можно было запускать от root
-        options.add_argument('--headless=new')  # чтобы не открывалось само приложение Google Chrome
-        driver = webdriver.Chrome(options=options)
+        # браузер Google Chrome берем из общего пула браузеров
+        driver = BROWSER_POOL.checkout()
         driver.get(orgLink)
         # ждем чтобы подгрузился изначальный список квизов
-        import time
-        time.sleep(5)
+        cardsCount = wait_for_stable_count(driver, WOW_CARDS_SELECTOR, get_wait_budget(orgTag, 'pageLoad'),
+                                           f'{orgName}: загрузка расписания')
 
         # нажимаем кнопку "Загрузить" несколько раз, чтобы загрузить полный список квизов. Когда загрузятся все квизы, кнопка "Загрузить" пропадет
         for i in range(10):
@@ -674,98 +1068,136 @@ def scrape_wow_quiz(orgLink, orgName, orgTag, dateParams):
                 loadMoreButton = driver.find_element(By.CSS_SELECTOR, ".btn.schedule__load-btn.outline-1")
                 # проскролливаем экран до кнопки, чтобы дать ей время полностью загрузиться. Когда она загрузилась - жмем кнопку
                 ActionChains(driver).move_to_element(loadMoreButton).click().perform()
-                time.sleep(0.3)
+                # ждем, пока подгрузятся следующие квизы
+                cardsCount = wait_for_count_change(driver, WOW_CARDS_SELECTOR, cardsCount,
+                                                   get_wait_budget(orgTag, 'loadMore'), f'{orgName}: подгрузка квизов')
                 i += 1
             except NoSuchElementException:
                 break
             except Exception as e:
-                logger.debug(f'scrape_wow_quiz. Exception while trying to push the button: {e}')
+                logger.debug(f'scrape_wow_quiz_in_browser. Exception while trying to push the button: {e}')
 
         # находим элемент с расписанием всех квизов, внутри него находим элементы с информацией по каждому квизу
         parentElement = driver.find_element(By.CSS_SELECTOR, "#schedule > div.schedule__list")
         quizList = parentElement.find_elements(By.CLASS_NAME, "schedule-card")
 
         for n, child in enumerate(quizList):
-            # извлекаем название игры в формате "Угадай мультфильм #4"
-            wowGameName = child.find_element(By.CLASS_NAME, "schedule-card__title")
-            wowGameName = wowGameName.text
-
-            # по названию игры добаляем тэг с тематикой игры
-            wowGameTag = assign_themes_to_quiz(wowGameName, orgName)
-
             # находим элемент details, в нем хранятся дата проведения, время начала и цена
             detailsElement = child.find_elements(By.CLASS_NAME, "schedule-card__details-item")
+            cardInfo = {
+                # название игры в формате "Угадай мультфильм #4"
+                'name': child.find_element(By.CLASS_NAME, "schedule-card__title").text,
+                # дата проведения квиза в формате "15 апреля, вторник"
+                'date': detailsElement[0].text,
+                # время начала квиза в формате "16:00"
+                'startTime': detailsElement[1].text,
+                # название площадки проведения квиза в формате "Три Лося"
+                'bar': child.find_element(By.CLASS_NAME, "schedule-card__bar").text,
+                # наличие мест на игру вида "Места есть"/ "Резерв"
+                'availability': child.find_element(By.CLASS_NAME, "schedule-card__status").text,
+            }
+            game = create_wow_quiz_game(cardInfo, orgName, orgTag, n, dateParams)
+            if game is not None:
+                games[orgTag + str(n)] = game
 
-            # извлекаем дату проведения квиза в формате "15 апреля, вторник"
-            wowGameDateAndDOW = detailsElement[0]
-            wowGameDateAndDOW = wowGameDateAndDOW.text
-            # разделяем 15 апреля, вторник на две переменных; с помощью strip убираем пробел перед днём недели
-            wowGameDate, separator, wowGameDOW = wowGameDateAndDOW.partition(",")
-            wowGameDOW = wowGameDOW.strip()
-
-            # извлекаем время начала квиза в формате "16:00"
-            wowGameStartTime = detailsElement[1]
-            wowGameStartTime = wowGameStartTime.text
-
-            # извлекаем название площадки проведения квиза в формате "Три Лося"
-            wowBar = child.find_element(By.CLASS_NAME, "schedule-card__bar")
-            wowBar = wowBar.text
-
-            # извлекаем наличие мест на игру вида "Места есть"/ "Резерв"
-            wowAvailability = child.find_element(By.CLASS_NAME, "schedule-card__status")
-            wowAvailability = wowAvailability.text
-
-            # преобразовываем дату проведения квиза в нужный формат
-            wowHour = int(wowGameStartTime[:2])
+    except Exception as err:
+        # если при скрэйпиге произошла ошибка, то сохраняем ее в organizatorsErrors
+        organizatorErrors[orgName] = str(err)
 
-            wowMinute = int(wowGameStartTime[3:])
-            wowDateRegEx = re.compile(r'''
-                                    ^(\d|\d\d)\s        # одна или две цифры в начале строки, после пробел
-                                     ([А-Яа-я]+)        # месяц
-                                    ''', re.VERBOSE)
-            mo = wowDateRegEx.search(wowGameDate)
-            wowDay, wowMonth = mo.groups()
-            wowDay = int(wowDay)
-            # преобразуем текстовое название месяца в цифру с помощью словаря MONTH_DICT
-            wowMonth = MONTH_DICT[wowMonth]
+    finally:
+        # возвращаем браузер в пул, в том числе после ошибки. после ошибки пул закроет браузер и все его процессы
+        if driver is not None:
+            BROWSER_POOL.checkin(driver, failed=orgName in organizatorErrors)
 
-            # если сейчас декабрь, а расписание содержит январские квизы, то для них указываем в дате следующий год
-            if curMonth == 12 and wowMonth == 1:
-                quizDT = datetime.datetime(nextYear, wowMonth, wowDay, wowHour, wowMinute)
-            else:
-                quizDT = datetime.datetime(curYear, wowMonth, wowDay, wowHour, wowMinute)
+    return games, organizatorErrors
 
-            # исключаем из выборки заведомо неподходящие квизы: нет мест, квиз уже прошел
-            # из остального формируем словарь games
-            if wowAvailability.lower() not in ['мест нет'] and quizDT >= curDT:
-                games[orgTag + str(n)] = {}
-                games[orgTag + str(n)]['game'] = wowGameName
-                games[orgTag + str(n)]['date'] = quizDT
-                games[orgTag + str(n)]['bar'] = wowBar
-                games[orgTag + str(n)]['tag'] = wowGameTag
-                if wowAvailability.lower() == 'резерв':
-                    games[orgTag + str(n)]['availability'] = 'Резерв'
-
-        # закрываем браузер
-        driver.close()
 
+def scrape_organizator(orgName, orgTag, orgLink, dateParams, localHTMLs):
+    """
+    Скрейпит расписание одного организатора, выбирая нужную функцию скрейпинга по его названию.
+    Вызывается из collect_quiz_data() в пуле потоков, по одному вызову на каждого организатора.
+    :param orgName (str): название организатора, как оно указано в config.ORGANIZATORS_DICT
+    :param orgTag (str): тэг организатора
+    :param orgLink (str): ссылка на веб-страницу с расписанием квизов организатора в конкретном городе
+    :param dateParams (list): список временных параметров из collect_quiz_data
+    :param localHTMLs (dict): для unit-тестов, словарь в котором хранятся объекты requests.get с локальных копий
+                              web-страниц. См. функцию tests/conftest.py/quiz_from_local_files()
+    :return: games (dict), organizatorErrors (dict)
+    """
+    # страницы всех организаторов сначала разбираются без браузера. Квиз Плиз и Вау Квиз, если на странице не нашлось
+    # ни одной игры или страницу не удалось скачать, скрейпятся в браузере с использованием Selenium
+    try:
+        res = get_web_page(orgName, orgLink, localHTMLs)
     except Exception as err:
-        # если при скрэйпиге произошла ошибка, то сохраняем ее в organizatorsErrors
-        organizatorErrors[orgName] = str(err)
-
+        if orgName not in ['Квиз Плиз', 'Вау Квиз'] or len(localHTMLs) != 0:
+            raise
+        logger.warning(f'{orgName}: не удалось скачать страницу {orgLink} ({err}), скрейпинг в браузере')
+        return scrape_organizator_in_browser(orgName, orgTag, orgLink, dateParams)
+    # если страница не изменилась с прошлого скрейпинга (ответ 304), то повторно её не разбираем
+    if getattr(res, 'notModified', False):
+        parsedResult = get_parsed_games(orgLink, dateParams[3])
+        if parsedResult is not None:
+            logger.info(f'{orgName}: страница {orgLink} не изменилась, использую разобранное ранее расписание')
+            return parsedResult
+    # расписание Шейкер Квиз лежит в JSON внутри одного тэга <script>, дерево HTML-кода для него не строим
+    if orgName == 'Шейкер Квиз':
+        games, organizatorErrors = scrape_shaker_quiz(res, orgName, orgTag, dateParams)
+    else:
+        quizSoup = parse_web_page(res, orgTag)
+        if orgName == 'Лига Индиго':
+            # при скрейпинге локальной копии веб-страницы у Лиги Индиго отличается CSS-селектор.
+            # чтобы выбрать корректный селектор, передаем на вход функции доп. аргумент localHTMLs
+            games, organizatorErrors = scrape_liga_indigo(quizSoup, orgName, orgTag, dateParams, localHTMLs)
+        elif orgName == 'Мама Квиз':
+            games, organizatorErrors = scrape_mama_quiz(quizSoup, orgName, orgTag, dateParams)
+        elif orgName == 'Квиз Плиз':
+            games, organizatorErrors = scrape_quiz_please(quizSoup, orgName, orgTag, dateParams)
+        elif orgName == 'Эйнштейн пати':
+            games, organizatorErrors = scrape_einstein_party(quizSoup, orgName, orgTag, dateParams)
+        elif orgName == 'Вау Квиз':
+            games, organizatorErrors = scrape_wow_quiz(quizSoup, orgName, orgTag, dateParams)
+        else:
+            return {}, {}
+
+    # расписание не нашлось в HTML-коде страницы: вероятно, сайт подгружает его скриптами, скрейпим его в браузере.
+    # такой результат не запоминается в PARSED_GAMES_CACHE, т.к. расписание могло измениться и без изменения страницы
+    if orgName in ['Квиз Плиз', 'Вау Квиз'] and not games and len(localHTMLs) == 0:
+        logger.warning(f'{orgName}: в HTML-коде страницы {orgLink} не найдено игр, скрейпинг в браузере')
+        return scrape_organizator_in_browser(orgName, orgTag, orgLink, dateParams)
+
+    # запоминаем разобранное расписание, чтобы использовать его при следующем ответе 304 от сайта
+    if len(localHTMLs) == 0 and not organizatorErrors:
+        with PARSED_GAMES_LOCK:
+            PARSED_GAMES_CACHE[orgLink] = games
     return games, organizatorErrors
 
 
+def scrape_organizator_in_browser(orgName, orgTag, orgLink, dateParams):
+    """
+    Скрейпит расписание организатора в браузере из пула BROWSER_POOL. Используется для Квиз Плиз и Вау Квиз, если
+    расписание не удалось разобрать по HTML-коду страницы.
+    Параметры и возвращаемые значения аналогичны scrape_organizator().
+    """
+    if orgName == 'Квиз Плиз':
+        return scrape_quiz_please_in_browser(orgLink, orgName, orgTag, dateParams)
+    elif orgName == 'Вау Квиз':
+        return scrape_wow_quiz_in_browser(orgLink, orgName, orgTag, dateParams)
+    return {}, {}
+
+
 def collect_quiz_data(cityOrganizators, cityLinks, localHTMLs=None):
     """
     Формирует перечень квизов для конкретного города.
     Собирает информацию с сайтов всех организаторов, которые указаны для данного города в config.CITY_DICT.
     Игры по приглашениям и игры у которых есть запись только в резерв исключаются из выборки.
+    Сайты организаторов скрейпятся параллельно в пуле потоков SCRAPER_EXECUTOR, поэтому общее время работы функции
+    близко ко времени скрейпинга самого медленного организатора. Результаты объединяются в порядке организаторов в
+    config.ORGANIZATORS_DICT, независимо от того, в каком порядке закончился их скрейпинг.
     :param cityOrganizators (list): список организаторов, которые проводят квизы в этом городе
     :param cityLinks (list): список ссылок на разделы сайтов, где хранится информация о квизах для этого города
     :param localHTMLs (dict): для unit-тестов, словарь в котором хранятся объекты requests.get с локальных копий
                               web-страниц. См. функцию tests/conftest.py/quiz_from_local_files()
-    :return games (dict): перечень квизов
+    :return games (dict): перечень квизов, {идентификатор квиза: quizGame.Game}
     :return organizatorErrors (dict): перечень ошибок по организаторам, скрейпинг с сайтов которых не удался
     """
     global ORGANIZATORS_DICT
@@ -784,55 +1216,80 @@ def collect_quiz_data(cityOrganizators, cityLinks, localHTMLs=None):
     if localHTMLs is None:
         localHTMLs = {}
 
-    # проверяем есть ли 'всероссийский' организатор в данном городе, если есть извлекаем информацию о его квизах
+    # если config.THEME_MAPPING_DICT изменился с прошлого скрейпинга, то классификатор тематик компилируется заново
+    get_theme_classifier(checkMapping=True)
+
+    # проверяем есть ли 'всероссийский' организатор в данном городе, если есть - отправляем скрейпинг его сайта в пул
+    # потоков. futures хранятся в порядке ORGANIZATORS_DICT
+    futures = []
     for orgName in ORGANIZATORS_DICT:
         if orgName in cityOrganizators:
             orgTag = ORGANIZATORS_DICT[orgName][0]
             orgLink = cityLinks[cityOrganizators.index(orgName)]
-            try:
-                # для части организаторов делаем скрейпинг с использованием Selenium, для остальных - стандартным
-                # способом
-                if orgName not in ('Вау Квиз', 'Квиз Плиз', 'Мама Квиз'):
-                    quizSoup = get_data_from_web_page(orgName, orgLink, localHTMLs)
-
-                if orgName == 'Квиз Плиз':
-                    gamesQP, orgErrorsQP = scrape_quiz_please(orgLink, orgName, orgTag, dateParams)
-                    games = {**games, **gamesQP}  # добавляем к словарю games полученные значения из словаря **gamesQP
-                    organizatorErrors = {**organizatorErrors, **orgErrorsQP}
-
-                elif orgName == 'Лига Индиго':
-                    # при скрейпинге локальной копии веб-страницы у Лиги Индиго отличается CSS-селектор.
-                    # чтобы выбрать корректный селектор, передаем на вход функции доп. аргумент localHTMLs
-                    gamesLI, orgErrorsLI = scrape_liga_indigo(quizSoup, orgName, orgTag, dateParams, localHTMLs)
-                    games = {**games, **gamesLI}
-                    organizatorErrors = {**organizatorErrors, **orgErrorsLI}
-
-                elif orgName == 'Мама Квиз':
-                    gamesMama, orgErrorsMama = scrape_mama_quiz(orgLink, orgName, orgTag, dateParams)
-                    games = {**games, **gamesMama}
-                    organizatorErrors = {**organizatorErrors, **orgErrorsMama}
-
-                elif orgName == 'Шейкер Квиз':
-                    gamesShaker, orgErrorsShaker = scrape_shaker_quiz(quizSoup, orgName, orgTag, dateParams)
-                    games = {**games, **gamesShaker}
-                    organizatorErrors = {**organizatorErrors, **orgErrorsShaker}
-
-                elif orgName == 'Эйнштейн пати':
-                    gamesWow, orgErrorsWow = scrape_einstein_party(quizSoup, orgName, orgTag, dateParams)
-                    games = {**games, **gamesWow}
-                    organizatorErrors = {**organizatorErrors, **orgErrorsWow}
-
-                elif orgName == 'Вау Квиз':
-                    gamesWow, orgErrorsWow = scrape_wow_quiz(orgLink, orgName, orgTag, dateParams)
-                    games = {**games, **gamesWow}
-                    organizatorErrors = {**organizatorErrors, **orgErrorsWow}
-
-            except Exception as err:
-                organizatorErrors[orgName] = str(err)
+            future = SCRAPER_EXECUTOR.submit(scrape_organizator, orgName, orgTag, orgLink, dateParams, localHTMLs)
+            futures.append((orgName, future))
+
+    # собираем результаты в порядке организаторов, добавляя к словарю games полученные значения из словаря orgGames
+    for orgName, future in futures:
+        try:
+            orgGames, orgErrors = future.result()
+            games = {**games, **orgGames}
+            organizatorErrors = {**organizatorErrors, **orgErrors}
+        except Exception as err:
+            organizatorErrors[orgName] = str(err)
 
     return games, organizatorErrors
 
 
+async def collect_quiz_data_async(cityOrganizators, cityLinks, localHTMLs=None):
+    """
+    Асинхронная версия collect_quiz_data() для вызова из корутин telegram-бота.
+    collect_quiz_data() полностью синхронная (requests, Selenium, sleep), поэтому выполняется в пуле потоков event
+    loop, а event loop тем временем продолжает обрабатывать сообщения других пользователей.
+    Параметры и возвращаемые значения аналогичны collect_quiz_data().
+    """
+    return await asyncio.to_thread(collect_quiz_data, cityOrganizators, cityLinks, localHTMLs)
+
+
+def render_quiz_fragment(game, bar):
+    """
+    Форматирует строку о квизе для вывода telegram-бота без порядкового номера, который у каждого пользователя свой:
+    <b>Лига Индиго</b>: Игра №1 Сезон №11. Бар: Три Лося, понедельник, 15 января, 19:30. \n
+    Вызывается один раз на квиз при построении снимка расписания (scheduleIndex.ScheduleIndex), а не на каждый запрос.
+
+    :param game (quizGame.Game): запись о квизе
+    :param bar (str): нормализованное название бара (barIndex.BarIndex.normalize())
+    :return: str
+    """
+    # по тэгу организатора вида 'li' находим название организатора вида 'Лига Индиго' и делаем форматирование, чтобы
+    # оно выводилось жирным шрифтом. '<b>Лига Индиго</b>'
+    for orgName, orgInfo in ORGANIZATORS_DICT.items():
+        if orgInfo[0] == game.orgTag:
+            organizator = '<b>' + orgName + '</b>'
+            break
+
+    # извлекаем информацию о доступности квиза, если еще есть запись в резерв, то отображаем это
+    quizAvailability = game.availability
+    if quizAvailability:
+        quizAvailability = f'<b>{quizAvailability.upper()}</b>'
+
+    # извлекаем информацию о дате проведения квиза и преобразуем время в читаемый формат HH:MM
+    quizDate = game.date
+    quizTime = quizDate.time().isoformat('minutes')
+
+    # получаем из словаря MONTH_DICT название месяца (key) по порядковому номеру месяца (value)
+    # https://stackoverflow.com/questions/8023306/get-key-by-value-in-dictionary
+    quizMonth = list(MONTH_DICT.keys())[list(MONTH_DICT.values()).index(quizDate.month)]
+
+    # извлекаем из словаря DOW_DICT название дня недели по его порядковому номеру (1 - Понедельник)
+    quizDOWReadable = DOW_DICT[quizDate.isoweekday()]
+
+    # приводим дату к читаемому виду "26 июня, 18:00"
+    quizDateReadable = str(quizDate.day) + ' ' + quizMonth + ', ' + quizTime
+
+    return f"{organizator}: {game.name}. Бар: {bar}, {quizDOWReadable}, {quizDateReadable}. {quizAvailability}\n"
+
+
 def create_formatted_quiz_list(games, organizatorErrors, **kwargs):
     """
     Упорядочивает квизы разных организаторов по дате проведения игры.
@@ -840,19 +1297,21 @@ def create_formatted_quiz_list(games, organizatorErrors, **kwargs):
     Преобразует информацию в необходимый для вывода telegram-бота формат:
     1. <b>Лига Индиго</b>: Игра №1 Сезон №11. Бар: Три Лося, понедельник, 15 января, 19:30\n'
 
-    :param games (dict): перечень квизов, формируется в collect_quiz_data()
+    :param games: записи quizGame.Game о квизах, либо индекс снимка расписания scheduleIndex.ScheduleIndex
     :param organizatorErrors (dict): перечень ошибок по организаторам, скрейпинг с сайтов которых не удался
     :param kwargs:
         dow (list): дни проведения квиза (будни/ выходные/ любой); выбираются в ходе чата
         selected_theme (str): тематика проведения квиза (Классика/ Мультимедиа / т.п.); выбирается в ходе чата
-        excl_bar (str): бары, которые нужно перманентно исключать из выборки; берется из пользовательских /preferences
-        excl_theme (str): тематики, которые нужно перманентно исключать; берется из пользовательских /preferences.
-        excl_orgs (str): организаторы, которых нужно перманентно исключать; берется из пользовательских /preferences
+        excl_bar: бары, которые нужно перманентно исключать из выборки; берется из пользовательских /preferences
+        excl_theme: тематики, которые нужно перманентно исключать; берется из пользовательских /preferences.
+        excl_orgs: организаторы, которых нужно перманентно исключать; берется из пользовательских /preferences
+            исключения передаются множествами (userPreferences.UserPreferences), либо строками в формате БД
+            'Арт П.А.Б.;Типография'
+        city (str): город, по написанию баров которого из config.CITY_DICT нормализуются названия баров; необязательный,
+                    по умолчанию 'Новосибирск'. Не используется, если games - уже построенный индекс снимка
     :return quizList (list): итоговый список квизов для отображения в telegram-боте
     """
 
-    dateList = []
-    indexList = []
     quizList = []
 
     # извлекаем все нужные для работы функции keyword arguments из **kwargs
@@ -867,113 +1326,25 @@ def create_formatted_quiz_list(games, organizatorErrors, **kwargs):
                      f'{kwargs}')
         return quizList
 
-    # формируем словарь соответствия тэга организатора (содержится в элементах games) названию организатора,
-    # чтобы можно было извлекать название организатора по индексу:
-    # {'qp': 'Квиз Плиз', 'li': 'Лига Индиго', 'mama': 'Мама Квиз', 'wow': 'WOW Quiz'},
-    organizatorIndexMapping = {}
-    for curOrgName in ORGANIZATORS_DICT:
-        curOrgIndex = ORGANIZATORS_DICT[curOrgName][0]
-        organizatorIndexMapping[curOrgIndex] = curOrgName
-
-    # формируем 2 списка для их последующей синхронной сортировки:
-    # indexList - индексы квиза вида li1, wow24, qp6, по которым далее будем извлекать информацию из games
-    # dateList - даты проведения квиза, по которым далее будем сортировать оба списка
-    for quizIndex in games:
-        indexList.append(quizIndex)
-        curGameParams = games.get(quizIndex)
-        curGameDate = curGameParams.get('date')
-        dateList.append(curGameDate)
-
-    # распологаем элементы списка индексов в том же порядке, в котором расположены элементы списка дат после
-    # сортировки по возрастанию
-    indexList = [indexList for _,indexList in sorted(zip(dateList, indexList))]
-
-    # извлекем из словаря games информацию в отсортированном порядке
-    k = 0 # порядковый номер квизов, попавших в итоговый вывод функции
-    for i in indexList:
-        # из индекса i вида li3, regexp-ом извлекаем тэг организатора вида 'li'
-        # по тэгу извлекаем название организатора вида 'Лига Индиго'
-        # если этот организатор исключен пользователем из выборки в /preferences, то переходим к следующему шагу цикла
-        orgIndexRegex = re.compile(r'^([a-zA-Z]+)(\d{1,})$')
-        mo = orgIndexRegex.search(i)
-        curOrgTag = mo[1]
-        curOrgName = organizatorIndexMapping[curOrgTag]
-        if curOrgName in excl_orgs:
-            continue
-        else:
-            # делаем форматирование, чтобы название организатора выводилось жирным шрифтом. '<b>Лига Индиго</b>'
-            organizator = '<b>' + curOrgName + '</b>'
-
-        # нормализуем название бара, если оно есть в config.CITY_DICT
-        # TODO: сделать параметризируемым, пока хардкод для Новосибирска
-        barNormalizedName = games[i]['bar']
-        barNormalizedName = barNormalizedName.replace("`", "'")  # для единообразного написания Harat's pub
-        cityBarList = CITY_DICT['Новосибирск']['bars']
-        for bar in cityBarList:
-            if bar.lower() in barNormalizedName.lower():
-                barNormalizedName = bar
-                break
-
-        # исключаем из выборки места проведения квизов, перманентно исключенные пользователем из выборки в /preferences
-        if barNormalizedName.lower() in excl_bar.lower():
-            continue
-
-        # оставляем только ту тематику, которую пользователь выбрал в ходе чата
-        # если пользователь выбрал вариант 'Оставить все' (QUIZ_THEMES[0]), то ничего не исключается
-        if selected_theme != QUIZ_THEMES[0] and selected_theme not in games[i]['tag']:
-            continue
-
-        # исключаем тематики, перманентно исключенные пользователем из выборки в /preferences.
-        # например, у игры 'Музыка СССР' есть тематики 'Мультимедиа' и 'Ностальгия'
-        # пользователь в чате выбрал 'Мультимедиа', а в исключениях у него 'Ностальгия'. такую игру исключаем.
-        # если пользователь в чате выбрал 'Оставить все', то игры с тематиками из /preferences все равно будут исключены
-        else:
-            # чтобы завершить внутренний цикл for t in games[i]['tag'] после первого же найденного совпадающего тэга
-            # и перейти к следующему шагу внешнего цикла for i in indexList используется переменная mainLoopState
-            mainLoopState = False
-            for t in games[i]['tag']:
-                if t in excl_theme:
-                    mainLoopState = True
-                    break  # прерываем inner loop
-            if mainLoopState:
-                continue  # прерываем outer loop
-
-        # извлекаем информацию о доступности квиза, если еще есть запись в резерв, то отображаем это
-        quizAvailability = games[i].get('availability', '')
-        if quizAvailability:
-            quizAvailability = f'<b>{quizAvailability.upper()}</b>'
-
-        # извлекаем информацию о дате проведения квиза
-        quizDate = games[i]['date']
-        quizTime = quizDate.time()
-
-        # преобразуем время в читаемый формат HH:MM
-        quizTime = quizTime.isoformat('minutes')
-
-        # исключаем дни недели не подходящие под выбранное пользователем значение dow
-        # например, если пользователь выбрал Выходные (dow = [6,7]), то исключаем все квизы проходящие в будние дни
-        quizDOW = quizDate.isoweekday()
-        if quizDOW in dow:
-            # после того как квиз прошел все возможные фильтрации и принято решение о его попадании в итоговую выборку
-            # ему присваивается уникальный порядковый номер, который будет виден в выводе telegram-бота
-            # по этому номеру можно будет создать голосование хочет ли ваша команда пойти на данную игру
-            k += 1
-
-            # получаем из словаря MONTH_DICT название месяца (key) по порядковому номеру месяца (value)
-            # https://stackoverflow.com/questions/8023306/get-key-by-value-in-dictionary
-            quizMonth = list(MONTH_DICT.keys())[list(MONTH_DICT.values()).index(quizDate.month)]
-
-            # извлекаем из словаря DOW_DICT название дня недели по его порядковому номеру (1 - Понедельник)
-            quizDOWReadable = DOW_DICT[quizDOW]
-
-            # приводим дату к читаемому виду "26 июня, 18:00"
-            quizDateReadable = str(quizDate.day) + ' ' + quizMonth + ', ' + quizTime
-
-            # делаем итоговое форматирование строки о квизе вида:
-            # 1. <b>Лига Индиго</b>: Игра №1 Сезон №11. Бар: Три Лося, понедельник, 15 января, 19:30\n'
-            quizReadable = f"{k}. {organizator}: {games[i]['game']}. Бар: {barNormalizedName}, {quizDOWReadable}, " \
-                           f"{quizDateReadable}. {quizAvailability}\n"
-            quizList.append(quizReadable)
+    # квизы в индексе уже упорядочены по дате, а строки о квизах отформатированы (см. render_quiz_fragment()).
+    # Снимок расписания из scheduleCache.ScheduleCache приходит уже в виде индекса, для остальных наборов квизов индекс
+    # строится здесь
+    if not isinstance(games, ScheduleIndex) or not games.fragments:
+        games = ScheduleIndex(games, kwargs.get('city', 'Новосибирск'), render_quiz_fragment)
+
+    # отбираем квизы под выбор пользователя в ходе чата (dow, selected_theme) и его перманентные исключения из
+    # /preferences (excl_bar, excl_theme, excl_orgs). Например, у игры 'Музыка СССР' есть тематики 'Мультимедиа' и
+    # 'Ностальгия': если пользователь в чате выбрал 'Мультимедиа', а в исключениях у него 'Ностальгия', то игру
+    # исключаем. Если пользователь в чате выбрал 'Оставить все', то игры с тематиками из /preferences все равно
+    # исключаются
+    selectedPositions = games.select(dow, selected_theme, excl_bar, excl_theme, excl_orgs)
+
+    # после того как квиз прошел все возможные фильтрации и принято решение о его попадании в итоговую выборку
+    # ему присваивается уникальный порядковый номер k, который будет виден в выводе telegram-бота
+    # по этому номеру можно будет создать голосование хочет ли ваша команда пойти на данную игру.
+    # остальная часть строки о квизе не зависит от пользователя и берется из снимка как есть
+    fragments = games.fragments
+    quizList = [f'{k}. {fragments[n]}' for k, n in enumerate(selectedPositions, start=1)]
 
     # если при запросе информации по каким-то организаторам были ошибки - выводим пользователю это сообщение
     if len(organizatorErrors) > 0:
@@ -0,0 +1,92 @@
+"""
+Модуль записи о квизе, которую возвращают все скрейперы quizAggregator.scrape_*().
+Запись неизменяемая и без __dict__ (slots), поэтому одну и ту же запись можно без копирования отдавать всем
+пользователям бота из общего кэша расписаний scheduleCache.ScheduleCache. Тэги организаторов и названия баров
+повторяются у сотен квизов, поэтому они интернируются: все записи ссылаются на одну и ту же строку.
+Тематики квиза хранятся битовой маской, бит тематики - её порядковый номер в config.QUIZ_THEMES без 'Оставить все'.
+
+Содержит классы:
+    Game - запись о квизе
+Содержит функции:
+    make_game(orgTag, number, name, date, bar, tags, availability='') - создает запись о квизе
+    mask_to_themes(themes) - возвращает список тематик по битовой маске
+    themes_to_mask(tags) - возвращает битовую маску по списку тематик
+Содержит константы:
+    THEME_BITS - словарь соответствия тематики её биту в маске ('Классика': 1)
+"""
+
+import datetime
+import sys
+from dataclasses import dataclass
+
+from config import QUIZ_THEMES
+
+# QUIZ_THEMES[0] - это 'Оставить все', такая тематика квизам не присваивается
+THEME_BITS = {theme: 1 << n for n, theme in enumerate(QUIZ_THEMES[1:])}
+
+
+def themes_to_mask(tags):
+    """
+    Возвращает битовую маску по списку тематик. Тематики, которых нет в config.QUIZ_THEMES, не учитываются.
+    :param tags (list): список тематик, например ['Мультимедиа', 'Ностальгия']
+    :return: int
+    """
+    mask = 0
+    for theme in tags:
+        mask |= THEME_BITS.get(theme, 0)
+    return mask
+
+
+def mask_to_themes(themes):
+    """
+    Возвращает список тематик по битовой маске, в порядке config.QUIZ_THEMES.
+    :param themes (int): битовая маска тематик
+    :return: list
+    """
+    return [theme for theme, bit in THEME_BITS.items() if themes & bit]
+
+
+@dataclass(frozen=True, slots=True)
+class Game:
+    """
+    Запись о квизе.
+
+    Атрибуты:
+        gameId (str) - уникальный в пределах расписания идентификатор квиза: тэг организатора и номер карточки ('wow10')
+        orgTag (str) - тэг организатора из config.ORGANIZATORS_DICT ('wow')
+        name (str) - название квиза
+        date (datetime.datetime) - дата и время начала квиза
+        bar (str) - место проведения в том виде, в каком оно указано на сайте организатора
+        themes (int) - битовая маска тематик квиза, см. THEME_BITS
+        availability (str) - 'Резерв', если осталась только запись в резерв, иначе пустая строка
+    Содержит свойства:
+        tags - список тематик квиза
+    """
+    gameId: str
+    orgTag: str
+    name: str
+    date: datetime.datetime
+    bar: str
+    themes: int
+    availability: str = ''
+
+    @property
+    def tags(self):
+        """Список тематик квиза, например ['Мультимедиа', 'Ностальгия']"""
+        return mask_to_themes(self.themes)
+
+
+def make_game(orgTag, number, name, date, bar, tags, availability=''):
+    """
+    Создает запись о квизе. Тэг организатора и название бара интернируются.
+    :param orgTag (str): тэг организатора из config.ORGANIZATORS_DICT
+    :param number (int): номер карточки квиза в расписании организатора
+    :param name (str): название квиза
+    :param date (datetime.datetime): дата и время начала квиза
+    :param bar (str): место проведения квиза
+    :param tags (list): тематики квиза, как их возвращает quizAggregator.assign_themes_to_quiz()
+    :param availability (str): 'Резерв', если осталась только запись в резерв
+    :return: Game
+    """
+    return Game(gameId=orgTag + str(number), orgTag=sys.intern(orgTag), name=name, date=date, bar=sys.intern(bar),
+                themes=themes_to_mask(tags or []), availability=availability)
@@ -0,0 +1,390 @@
+"""
+Модуль общего для всех пользователей бота кэша расписаний квизов.
+Расписание хранится по каждому городу отдельно, а внутри города - по каждому организатору со своим временем жизни
+(config.SCHEDULE_CACHE_TTL). Скрейпинг сайта организатора функцией quizAggregator.collect_quiz_data() запускается
+только если расписания этого организатора еще нет в кэше или оно устарело.
+Кроме того, telegramBot.main() регистрирует фоновые задачи, которые заранее обновляют кэш методом refresh() с
+периодом из config.SCHEDULE_REFRESH_INTERVAL. Фоновые задачи выполняются в отдельных потоках, поэтому все изменения
+кэша защищены блокировкой.
+По каждому городу кэш хранит снимок расписания - один общий для всех пользователей индекс scheduleIndex.ScheduleIndex
+с записями quizGame.Game, упорядоченными по дате, и уже отформатированными строками о квизах. Снимок собирается
+заново только после обновления расписания одного из организаторов города.
+Отформатированные списки квизов (quizAggregator.create_formatted_quiz_list()) тоже запоминаются: большинство
+пользователей выбирают одни и те же дни недели и тематики, а исключений в /preferences у многих нет вовсе. Ключ
+списка - версия снимка расписания и маски запроса в этом снимке, поэтому после обновления снимка старые списки больше
+не используются. Количество списков ограничено (config.QUIZ_LIST_CACHE_SIZE), первыми вытесняются те, которые дольше
+всего не запрашивали.
+
+Содержит классы:
+    ScheduleCache - кэш расписаний квизов по городам
+"""
+
+import asyncio
+import datetime
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from barIndex import get_unknown_bars
+from config import ORGANIZATORS_DICT, QUIZ_LIST_CACHE_SIZE, SCHEDULE_CACHE_ERROR_TTL, SCHEDULE_CACHE_TTL
+from quizAggregator import collect_quiz_data, create_formatted_quiz_list, create_info_by_city, render_quiz_fragment
+from scheduleIndex import ScheduleIndex
+
+# начать логирование в модуле
+logger = logging.getLogger(__name__)
+
+# сколько секунд ждать окончания скрейпинга организатора, запущенного другим потоком
+IN_FLIGHT_WAIT_TIMEOUT = 180
+
+
+class ScheduleCache:
+    """
+    Кэш расписаний квизов по городам. Создается один раз на всё приложение (см. telegramBot.main()) и хранится в
+    context.bot_data['scheduleCache'], чтобы все пользователи получали список квизов из одного снимка расписания.
+
+    Содержит методы:
+        get_schedule(city) - возвращает (games, organizatorErrors) по городу, при необходимости обновляя кэш
+        get_schedule_async(city) - то же самое, но не блокирует event loop, для вызова из хэндлеров бота
+        get_quiz_list(city, **kwargs) - возвращает (quizList, organizatorErrors): отформатированный список квизов
+        get_quiz_list_async(city, **kwargs) - то же самое, но не блокирует event loop, для вызова из хэндлеров бота
+        get_stats() - возвращает статистику попаданий/ промахов кэша, возраст снимков расписания по городам и
+            статистику кэша отформатированных списков квизов
+        get_ttl(orgName) - возвращает время жизни расписания организатора в кэше
+        invalidate(city=None) - сбрасывает кэш по городу или целиком
+        is_fresh(city) - проверяет, что по городу все расписания в кэше актуальны
+        refresh(city, orgNames=None) - принудительно обновляет расписания организаторов города
+        refresh_async(city, orgNames=None) - то же самое, но не блокирует event loop
+    """
+
+    def __init__(self, collectFunction=collect_quiz_data, ttl=None, errorTtl=SCHEDULE_CACHE_ERROR_TTL,
+                 clock=time.monotonic, quizListCacheSize=QUIZ_LIST_CACHE_SIZE):
+        """
+        :param collectFunction: функция скрейпинга с сигнатурой как у quizAggregator.collect_quiz_data()
+        :param ttl (dict): время жизни расписания по тэгам организаторов, по умолчанию config.SCHEDULE_CACHE_TTL
+        :param errorTtl (int): время жизни в кэше результата скрейпинга, завершившегося ошибкой
+        :param clock: функция, возвращающая текущее время в секундах; подменяется в unit-тестах
+        :param quizListCacheSize (int): сколько отформатированных списков квизов хранится в кэше
+        """
+        self._collectFunction = collectFunction
+        self._ttl = ttl if ttl is not None else SCHEDULE_CACHE_TTL
+        self._errorTtl = errorTtl
+        self._clock = clock
+        # {city: {orgName: {'games': dict, 'errors': dict, 'fetchedAt': float}}}
+        self._entries = {}
+        # снимки расписания по городам и их версии: {city: (version, scheduleIndex.ScheduleIndex)}
+        self._snapshots = {}
+        # версия снимка уникальна в пределах кэша: каждый новый снимок любого города получает следующий номер
+        self._snapshotVersions = itertools.count(1)
+        # отформатированные списки квизов в порядке последнего обращения к ним:
+        # {(city, version, start, dowMask, themeMask, exclMask): tuple of str}
+        self._quizLists = OrderedDict()
+        self._quizListCacheSize = quizListCacheSize
+        self._hits = 0
+        self._misses = 0
+        self._refreshes = 0
+        self._quizListHits = 0
+        self._quizListMisses = 0
+        # блокировка защищает _entries и счетчики, сам скрейпинг выполняется без блокировки
+        self._lock = threading.Lock()
+        # организаторы, скрейпинг которых выполняется прямо сейчас, и события окончания их скрейпинга:
+        # {(city, orgName): threading.Event}
+        self._inFlight = {}
+
+    def get_ttl(self, orgName):
+        """
+        Возвращает время жизни расписания организатора в кэше.
+        :param orgName (str): название организатора, как оно указано в config.ORGANIZATORS_DICT
+        :return: int, время жизни в секундах
+        """
+        orgTag = ORGANIZATORS_DICT.get(orgName, [None])[0]
+        return self._ttl.get(orgTag, self._ttl.get('default', 0))
+
+    def _is_expired(self, orgName, entry):
+        """Проверяет, устарела ли запись кэша по организатору. Для ошибок используется отдельное время жизни."""
+        if entry is None:
+            return True
+        ttl = self._errorTtl if entry['errors'] else self.get_ttl(orgName)
+        return self._clock() - entry['fetchedAt'] >= ttl
+
+    @staticmethod
+    def _city_organizators(city):
+        """Возвращает списки организаторов и ссылок по городу, оставляя только 'всероссийских' организаторов."""
+        bars, cityOrganizators, cityLinks = create_info_by_city(city)
+        orgsAndLinks = [(org, link) for org, link in zip(cityOrganizators, cityLinks) if org in ORGANIZATORS_DICT]
+        return orgsAndLinks
+
+    def is_fresh(self, city):
+        """
+        Проверяет, что по городу в кэше есть актуальное расписание всех организаторов.
+        :param city (str): название города
+        :return: bool
+        """
+        orgsAndLinks = self._city_organizators(city)
+        with self._lock:
+            cityEntries = self._entries.get(city, {})
+            return all(not self._is_expired(orgName, cityEntries.get(orgName)) for orgName, link in orgsAndLinks)
+
+    def get_schedule(self, city):
+        """
+        Возвращает расписание квизов по городу. Расписания организаторов, которых нет в кэше или которые устарели,
+        запрашиваются одним вызовом collectFunction, остальные берутся из кэша.
+        Квизы, которые уже начались с момента скрейпинга, в результат не попадают.
+        :param city (str): название города
+        :return: tuple(games (scheduleIndex.ScheduleIndex), organizatorErrors (dict)): games - индекс снимка
+                 расписания, записи quizGame.Game в нем упорядочены по дате; organizatorErrors в том же формате, что
+                 у collect_quiz_data()
+        """
+        version, games, organizatorErrors = self._get_versioned_schedule(city)
+        return games, organizatorErrors
+
+    def _get_versioned_schedule(self, city):
+        """
+        Возвращает расписание квизов по городу вместе с версией его снимка, при необходимости обновляя кэш.
+        :param city (str): название города
+        :return: tuple(version (int), games (scheduleIndex.ScheduleIndex), organizatorErrors (dict))
+        """
+        orgsAndLinks = self._city_organizators(city)
+        with self._lock:
+            cityEntries = self._entries.get(city, {})
+            expiredOrgs = [(org, link) for org, link in orgsAndLinks if self._is_expired(org, cityEntries.get(org))]
+            self._hits += len(orgsAndLinks) - len(expiredOrgs)
+            self._misses += len(expiredOrgs)
+
+        if expiredOrgs:
+            logger.info(f'Кэш расписаний по городу {city}: нет актуальных данных по организаторам '
+                        f'{[org for org, link in expiredOrgs]}, запускаю скрейпинг')
+            self._refresh(city, expiredOrgs, waitForOthers=True)
+
+        curDT = datetime.datetime.now()
+        with self._lock:
+            # копия записей города, т.к. сохранение результата скрейпинга изменяет словарь записей
+            cityEntries = dict(self._entries.get(city, {}))
+            versionedSnapshot = self._snapshots.get(city)
+        if versionedSnapshot is None:
+            # сборка снимка долгая (сортировка, нормализация баров, форматирование строк), поэтому выполняется без
+            # блокировки, чтобы не задерживать запросы по другим городам и сохранение результатов скрейпинга
+            snapshot = self._make_snapshot(city, cityEntries, orgsAndLinks)
+            with self._lock:
+                versionedSnapshot = self._snapshots.get(city)
+                if versionedSnapshot is not None:
+                    # пока снимок собирался, другой поток уже сохранил снимок города, используется он
+                    cityEntries = dict(self._entries.get(city, {}))
+                else:
+                    versionedSnapshot = (next(self._snapshotVersions), snapshot)
+                    # снимок сохраняется, только если за время сборки записи города не обновились, иначе он устарел
+                    # и соберется заново при следующем запросе
+                    curEntries = self._entries.get(city, {})
+                    if all(curEntries.get(orgName) is cityEntries.get(orgName) for orgName, link in orgsAndLinks):
+                        self._snapshots[city] = versionedSnapshot
+        version, snapshot = versionedSnapshot
+        organizatorErrors = {}
+        for orgName, link in orgsAndLinks:
+            entry = cityEntries.get(orgName)
+            if entry is not None:
+                organizatorErrors.update(entry['errors'])
+        # снимок упорядочен по дате, поэтому уже начавшиеся квизы - это его начало, они пропускаются без копирования
+        # снимка. Если таких квизов нет, то возвращается сам снимок
+        return version, snapshot.since(curDT), organizatorErrors
+
+    def get_quiz_list(self, city, dow, selected_theme, excl_bar, excl_theme, excl_orgs):
+        """
+        Возвращает отформатированный для вывода бота список квизов по городу под запрос пользователя. Параметры запроса
+        такие же, как у quizAggregator.create_formatted_quiz_list(). Если такой же список уже формировался по текущему
+        снимку расписания, то он берется из кэша. Ключ кэша строится по маскам запроса в снимке
+        (scheduleIndex.ScheduleIndex.query_masks()), поэтому пользователи с разным написанием одних и тех же
+        исключений получают один и тот же список.
+        :param city (str): название города
+        :return: tuple(quizList (tuple of str), organizatorErrors (dict)); quizList общий для всех пользователей,
+                 поэтому возвращается неизменяемым
+        """
+        version, games, organizatorErrors = self._get_versioned_schedule(city)
+        # start входит в ключ, т.к. по мере того, как квизы начинаются, они пропадают из списка, и нумерация меняется
+        key = (city, version, games.start) + games.query_masks(dow, selected_theme, excl_bar, excl_theme, excl_orgs)
+        with self._lock:
+            quizList = self._quizLists.get(key)
+            if quizList is not None:
+                self._quizListHits += 1
+                self._quizLists.move_to_end(key)
+                return quizList, organizatorErrors
+            self._quizListMisses += 1
+
+        quizList = tuple(create_formatted_quiz_list(games, organizatorErrors, dow=dow, selected_theme=selected_theme,
+                                                    excl_bar=excl_bar, excl_theme=excl_theme, excl_orgs=excl_orgs))
+        with self._lock:
+            # пока список форматировался, снимок мог обновиться: такой список уже никто не запросит
+            if self._snapshots.get(city, (None,))[0] == version:
+                self._quizLists[key] = quizList
+                while len(self._quizLists) > self._quizListCacheSize:
+                    self._quizLists.popitem(last=False)
+        return quizList, organizatorErrors
+
+    def _drop_quiz_lists(self, city=None):
+        """Удаляет из кэша отформатированные списки квизов по городу, либо все, если город не указан.
+        Вызывается под блокировкой вместе со сбросом снимка расписания."""
+        if city is None:
+            self._quizLists.clear()
+        else:
+            for key in [key for key in self._quizLists if key[0] == city]:
+                del self._quizLists[key]
+
+    @staticmethod
+    def _make_snapshot(city, cityEntries, orgsAndLinks):
+        """
+        Собирает снимок расписания города из записей кэша по организаторам.
+        :param city (str): название города
+        :param cityEntries (dict): записи кэша по организаторам города
+        :param orgsAndLinks (list): список tuple (название организатора, ссылка на расписание)
+        :return: scheduleIndex.ScheduleIndex
+        """
+        games = []
+        for orgName, link in orgsAndLinks:
+            # записи может не быть, если не дождались скрейпинга, запущенного другим потоком
+            entry = cityEntries.get(orgName)
+            if entry is not None:
+                games.extend(entry['games'].values())
+        return ScheduleIndex(games, city, render_quiz_fragment)
+
+    async def get_schedule_async(self, city):
+        """
+        Асинхронная версия get_schedule() для вызова из хэндлеров бота. Если по городу нужен скрейпинг, то он
+        выполняется в отдельном потоке и event loop продолжает обрабатывать сообщения других пользователей.
+        :param city (str): название города
+        :return: tuple(games (scheduleIndex.ScheduleIndex), organizatorErrors (dict))
+        """
+        return await asyncio.to_thread(self.get_schedule, city)
+
+    async def get_quiz_list_async(self, city, dow, selected_theme, excl_bar, excl_theme, excl_orgs):
+        """
+        Асинхронная версия get_quiz_list() для вызова из хэндлеров бота. Скрейпинг (если он нужен) и форматирование
+        списка выполняются в отдельном потоке.
+        :return: tuple(quizList (tuple of str), organizatorErrors (dict))
+        """
+        return await asyncio.to_thread(self.get_quiz_list, city, dow, selected_theme, excl_bar, excl_theme, excl_orgs)
+
+    async def refresh_async(self, city, orgNames=None):
+        """
+        Асинхронная версия refresh(), скрейпинг выполняется в отдельном потоке.
+        :param city (str): название города
+        :param orgNames (list): названия организаторов; если не указаны - обновляются все организаторы города
+        :return: None
+        """
+        await asyncio.to_thread(self.refresh, city, orgNames)
+
+    def refresh(self, city, orgNames=None):
+        """
+        Принудительно обновляет в кэше расписания организаторов города, независимо от их времени жизни.
+        Используется фоновыми задачами telegramBot.refresh_schedule_job(). Организаторы, скрейпинг которых уже
+        выполняется в другом потоке, повторно не скрейпятся.
+        :param city (str): название города
+        :param orgNames (list): названия организаторов; если не указаны - обновляются все организаторы города
+        :return: None
+        """
+        orgsAndLinks = self._city_organizators(city)
+        if orgNames is not None:
+            orgsAndLinks = [(org, link) for org, link in orgsAndLinks if org in orgNames]
+        if orgsAndLinks:
+            self._refresh(city, orgsAndLinks)
+
+    def _refresh(self, city, orgsAndLinks, waitForOthers=False):
+        """
+        Скрейпит расписания переданных организаторов и раскладывает результат по записям кэша города.
+        Организаторов, которых в этот момент уже скрейпит другой поток, повторно не скрейпит. Если передан
+        waitForOthers=True, то дожидается окончания их скрейпинга, чтобы вернуть пользователю полное расписание.
+        :param city (str): название города
+        :param orgsAndLinks (list): список tuple (название организатора, ссылка на расписание)
+        :param waitForOthers (bool): ждать ли окончания скрейпинга, запущенного другими потоками
+        :return: None
+        """
+        # отбираем организаторов, которых сейчас не скрейпит другой поток, и помечаем их как обновляемых
+        with self._lock:
+            othersEvents = [self._inFlight[(city, org)] for org, link in orgsAndLinks if (city, org) in self._inFlight]
+            orgsAndLinks = [(org, link) for org, link in orgsAndLinks if (city, org) not in self._inFlight]
+            ownEvent = threading.Event()
+            for org, link in orgsAndLinks:
+                self._inFlight[(city, org)] = ownEvent
+
+        if orgsAndLinks:
+            try:
+                self._scrape_and_store(city, orgsAndLinks)
+            finally:
+                # снимаем отметку только после записи результата в кэш, чтобы ожидающие потоки сразу его увидели
+                with self._lock:
+                    for org, link in orgsAndLinks:
+                        self._inFlight.pop((city, org), None)
+                ownEvent.set()
+
+        if waitForOthers:
+            for event in othersEvents:
+                if not event.wait(IN_FLIGHT_WAIT_TIMEOUT):
+                    logger.error(f'Не дождались окончания скрейпинга по городу {city}, запущенного другим потоком')
+
+    def _scrape_and_store(self, city, orgsAndLinks):
+        """
+        Вызывает collectFunction по переданным организаторам и сохраняет результат в кэш.
+        :param city (str): название города
+        :param orgsAndLinks (list): список tuple (название организатора, ссылка на расписание)
+        :return: None
+        """
+        # collect_quiz_data ожидает списки в формате create_info_by_city, где нулевой элемент - заглушка
+        cityOrganizators = ['Оставить всех организаторов'] + [org for org, link in orgsAndLinks]
+        cityLinks = ['placeholder'] + [link for org, link in orgsAndLinks]
+        games, organizatorErrors = self._collectFunction(cityOrganizators, cityLinks)
+
+        # раскладываем игры по организаторам по тэгу организатора в записи об игре
+        tagToOrgName = {ORGANIZATORS_DICT[org][0]: org for org, link in orgsAndLinks}
+        gamesByOrg = {org: {} for org, link in orgsAndLinks}
+        for gameId, game in games.items():
+            orgName = tagToOrgName.get(game.orgTag)
+            if orgName is not None:
+                gamesByOrg[orgName][gameId] = game
+
+        fetchedAt = self._clock()
+        with self._lock:
+            self._refreshes += 1
+            cityEntries = self._entries.setdefault(city, {})
+            for orgName, link in orgsAndLinks:
+                orgErrors = {orgName: organizatorErrors[orgName]} if orgName in organizatorErrors else {}
+                cityEntries[orgName] = {'games': gamesByOrg[orgName], 'errors': orgErrors, 'fetchedAt': fetchedAt}
+            # снимок расписания города соберется заново при следующем запросе, а списки квизов по старому снимку
+            # больше не нужны
+            self._snapshots.pop(city, None)
+            self._drop_quiz_lists(city)
+
+    def invalidate(self, city=None):
+        """
+        Сбрасывает кэш по городу, либо целиком, если город не указан.
+        :param city (str): название города
+        :return: None
+        """
+        with self._lock:
+            if city is None:
+                self._entries.clear()
+                self._snapshots.clear()
+            else:
+                self._entries.pop(city, None)
+                self._snapshots.pop(city, None)
+            self._drop_quiz_lists(city)
+
+    def get_stats(self):
+        """
+        Возвращает статистику работы кэша для мониторинга.
+        Возраст снимка расписания города - возраст самой старой записи по организаторам этого города.
+        unknownBars - названия баров с сайтов организаторов, которых нет в config.CITY_DICT, и сколько раз они
+        встретились (barIndex.get_unknown_bars()).
+        :return: dict вида {'hits': 10, 'misses': 2, 'refreshes': 3, 'snapshotAge': {'Новосибирск': 120.5},
+                 'quizLists': {'hits': 40, 'misses': 6, 'size': 6, 'maxSize': 256},
+                 'unknownBars': {'Новосибирск': {'MISHKIN&MISHKIN': 12}}}
+        """
+        now = self._clock()
+        snapshotAge = {}
+        with self._lock:
+            for city, cityEntries in self._entries.items():
+                if cityEntries:
+                    snapshotAge[city] = max(now - entry['fetchedAt'] for entry in cityEntries.values())
+            return {'hits': self._hits, 'misses': self._misses, 'refreshes': self._refreshes,
+                    'snapshotAge': snapshotAge,
+                    'quizLists': {'hits': self._quizListHits, 'misses': self._quizListMisses,
+                                  'size': len(self._quizLists), 'maxSize': self._quizListCacheSize},
+                    'unknownBars': get_unknown_bars()}
@@ -0,0 +1,160 @@
+"""
+Модуль индекса снимка расписания квизов для быстрой фильтрации под предпочтения пользователя.
+Индекс строится один раз на снимок расписания (см. scheduleCache.ScheduleCache) и используется всеми пользователями:
+квизы в нем уже упорядочены по дате, а для каждого квиза заранее вычислены нормализованное название бара, битовая
+маска, в которой отмечены день недели, тематики, организатор и бар квиза, и отформатированная строка о квизе для вывода
+telegram-бота без порядкового номера. Фильтрация квизов под запрос пользователя
+сводится к трем побитовым AND по массиву масок: маска запроса строится один раз на запрос, а не на каждый квиз.
+
+Раскладка битов в маске квиза (младшие биты справа):
+    [бары][организаторы][тематики][ALWAYS_BIT][дни недели 1-7]
+
+Содержит классы:
+    ScheduleIndex - индекс снимка расписания
+Содержит константы:
+    ALWAYS_BIT - бит, который есть в маске каждого квиза; используется, когда пользователь выбрал 'Оставить все'
+    DOW_BITS - словарь соответствия порядкового номера дня недели его биту в маске (1: 1, 2: 2, 3: 4 ...)
+    THEMES_SHIFT - на сколько бит сдвинуты тематики (quizGame.THEME_BITS) в маске квиза
+"""
+
+import bisect
+from operator import attrgetter
+
+from barIndex import fold_bar_name, get_bar_index
+from config import ORGANIZATORS_DICT, QUIZ_THEMES
+from quizGame import THEME_BITS
+from userPreferences import parse_exclusions
+
+DOW_BITS = {dow: 1 << (dow - 1) for dow in range(1, 8)}
+ALWAYS_BIT = 1 << 7
+THEMES_SHIFT = 8
+
+
+class ScheduleIndex:
+    """
+    Индекс снимка расписания. Неизменяемый после создания, поэтому один и тот же индекс можно использовать из разных
+    потоков без блокировок. Уже прошедшие квизы не удаляются из индекса, а пропускаются: since(curDT) возвращает
+    представление того же индекса, начинающееся с первого еще не начавшегося квиза.
+
+    Атрибуты:
+        games (tuple) - записи quizGame.Game по возрастанию даты, квизы с одинаковой датой - по идентификатору
+        bars (tuple) - нормализованные названия баров квизов, в том же порядке, что и games
+        masks (tuple) - битовые маски квизов, в том же порядке, что и games
+        fragments (tuple) - строки о квизах для вывода бота без порядкового номера, в том же порядке, что и games;
+            пустой, если при создании индекса не передана функция renderFragment
+        start (int) - позиция первого квиза представления в games
+    Содержит методы:
+        query_masks(dow, selected_theme, excl_bar, excl_theme, excl_orgs) - переводит запрос пользователя в маски
+        select(dow, selected_theme, excl_bar, excl_theme, excl_orgs) - возвращает позиции квизов под запрос
+        since(curDT) - возвращает представление индекса без квизов, которые начались раньше curDT
+    """
+    __slots__ = ('games', 'bars', 'masks', 'fragments', 'start', '_orgBits', '_barBits', '_themes')
+
+    def __init__(self, games, city, renderFragment=None):
+        """
+        :param games: записи quizGame.Game о квизах в любом порядке
+        :param city (str): название города, по написанию баров которого из config.CITY_DICT нормализуются названия
+                           баров квизов (barIndex.BarIndex)
+        :param renderFragment: функция (game, bar) -> str, форматирующая строку о квизе для вывода бота, например
+                               quizAggregator.render_quiz_fragment(); вызывается один раз на квиз
+        """
+        self.games = tuple(sorted(games, key=lambda game: (game.date, game.gameId)))
+        barIndex = get_bar_index(city)
+        self.bars = tuple(barIndex.normalize(game.bar) for game in self.games)
+        if renderFragment is not None:
+            self.fragments = tuple(renderFragment(game, bar) for game, bar in zip(self.games, self.bars))
+        else:
+            self.fragments = ()
+        self.start = 0
+        # биты организаторов и баров выдаются по мере того, как они встречаются в снимке: {тэг/ бар: бит}
+        self._orgBits = {}
+        self._barBits = {}
+        orgsShift = THEMES_SHIFT + len(THEME_BITS)
+        for game in self.games:
+            self._orgBits.setdefault(game.orgTag, 1 << (orgsShift + len(self._orgBits)))
+        barsShift = orgsShift + len(self._orgBits)
+        for bar in self.bars:
+            self._barBits.setdefault(bar, 1 << (barsShift + len(self._barBits)))
+        self.masks = tuple(DOW_BITS[game.date.isoweekday()] | ALWAYS_BIT | game.themes << THEMES_SHIFT |
+                           self._orgBits[game.orgTag] | self._barBits[bar] for game, bar in zip(self.games, self.bars))
+        # тематики, которые есть хотя бы у одного квиза снимка
+        self._themes = 0
+        for game in self.games:
+            self._themes |= game.themes
+
+    def __len__(self):
+        return len(self.games) - self.start
+
+    def __iter__(self):
+        for n in range(self.start, len(self.games)):
+            yield self.games[n]
+
+    def since(self, curDT):
+        """
+        Возвращает представление индекса без квизов, которые начались раньше curDT. Массивы индекса не копируются,
+        а если таких квизов нет, то возвращается сам индекс.
+        :param curDT (datetime.datetime): текущие дата и время
+        :return: ScheduleIndex
+        """
+        start = bisect.bisect_left(self.games, curDT, lo=self.start, key=attrgetter('date'))
+        if start == self.start:
+            return self
+        view = object.__new__(ScheduleIndex)
+        view.games, view.bars, view.masks, view.fragments = self.games, self.bars, self.masks, self.fragments
+        view._orgBits, view._barBits, view._themes = self._orgBits, self._barBits, self._themes
+        view.start = start
+        return view
+
+    def query_masks(self, dow, selected_theme, excl_bar, excl_theme, excl_orgs):
+        """
+        Переводит запрос пользователя в маски этого индекса. Параметры такие же, как у
+        quizAggregator.create_formatted_quiz_list(). Исключения - множества названий (userPreferences.UserPreferences),
+        либо строки в формате БД 'Арт П.А.Б.;Типография', которые разбираются userPreferences.parse_exclusions().
+        Бар исключается, если его нормализованное название есть среди исключенных (сравниваются свернутые названия,
+        см. barIndex.fold_bar_name()), тематика и организатор - если их название есть среди исключенных. Запросы,
+        которые отбирают одни и те же квизы, получают одинаковые маски, даже если исключения у пользователей
+        различаются, поэтому маски используются и как ключ кэша отформатированных списков квизов
+        (см. scheduleCache.ScheduleCache.get_quiz_list()).
+        :param dow (list): подходящие дни недели, 1 - понедельник
+        :param selected_theme (str): выбранная тематика, либо 'Оставить все' (QUIZ_THEMES[0])
+        :param excl_bar: исключенные бары
+        :param excl_theme: исключенные тематики
+        :param excl_orgs: исключенные организаторы
+        :return: tuple(dowMask (int), themeMask (int), exclMask (int))
+        """
+        dowMask = 0
+        for curDOW in dow:
+            dowMask |= DOW_BITS.get(curDOW, 0)
+
+        if selected_theme == QUIZ_THEMES[0]:
+            themeMask = ALWAYS_BIT
+        else:
+            themeMask = THEME_BITS.get(selected_theme, 0) << THEMES_SHIFT
+
+        # маска исключений строится по организаторам, барам и тематикам снимка, а не по каждому квизу
+        exclMask = 0
+        excl_orgs = parse_exclusions(excl_orgs)
+        organizatorIndexMapping = {orgInfo[0]: orgName for orgName, orgInfo in ORGANIZATORS_DICT.items()}
+        for orgTag, bit in self._orgBits.items():
+            if organizatorIndexMapping[orgTag] in excl_orgs:
+                exclMask |= bit
+        excl_bar = {fold_bar_name(bar) for bar in parse_exclusions(excl_bar)}
+        for bar, bit in self._barBits.items():
+            if fold_bar_name(bar) in excl_bar:
+                exclMask |= bit
+        excl_theme = parse_exclusions(excl_theme)
+        for theme, bit in THEME_BITS.items():
+            if bit & self._themes and theme in excl_theme:
+                exclMask |= bit << THEMES_SHIFT
+        return dowMask, themeMask, exclMask
+
+    def select(self, dow, selected_theme, excl_bar, excl_theme, excl_orgs):
+        """
+        Возвращает позиции в games квизов, подходящих под запрос пользователя, по возрастанию даты. Параметры такие
+        же, как у query_masks().
+        :return: list of int
+        """
+        dowMask, themeMask, exclMask = self.query_masks(dow, selected_theme, excl_bar, excl_theme, excl_orgs)
+        masks = self.masks
+        return [n for n in range(self.start, len(masks))
+                if masks[n] & dowMask and masks[n] & themeMask and not masks[n] & exclMask]
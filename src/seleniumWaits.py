@@ -0,0 +1,141 @@
+"""
+Модуль ожиданий готовности страниц для скрейперов на Selenium.
+Вместо фиксированных пауз (sleep) скрейперы ждут наступления нужного события на странице: появления контейнера с
+расписанием, окончания подгрузки карточек квизов. Быстрая страница возвращается за сотни миллисекунд, а медленная
+успевает загрузиться, пока не истечет бюджет ожидания организатора (config.SELENIUM_WAIT_BUDGETS). Фактическое время
+каждого ожидания пишется в лог, чтобы по нему можно было подобрать бюджеты.
+
+Содержит функции:
+    get_wait_budget(orgTag, waitName) - возвращает бюджет ожидания организатора в секундах
+    wait_for_count_change(driver, cssSelector, previousCount, budget, description) - ждет изменения количества элементов
+    wait_for_element(driver, cssSelector, budget, description) - ждет появления элемента на странице
+    wait_for_stable_count(driver, cssSelector, budget, description, minCount=1) - ждет окончания подгрузки элементов
+    wait_for_value(driver, condition, budget, description) - ждет, пока condition(driver) вернет истинное значение
+"""
+
+import logging
+import time
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions
+from selenium.webdriver.support.wait import WebDriverWait
+
+from config import SELENIUM_POLL_INTERVAL, SELENIUM_STABLE_PERIOD, SELENIUM_WAIT_BUDGETS
+
+# начать логирование в модуле
+logger = logging.getLogger(__name__)
+
+
+def get_wait_budget(orgTag, waitName):
+    """
+    Возвращает бюджет ожидания организатора из config.SELENIUM_WAIT_BUDGETS. Если для организатора бюджет не задан, то
+    берется значение из SELENIUM_WAIT_BUDGETS['default'].
+    :param orgTag (str): тэг организатора ('qp')
+    :param waitName (str): название ожидания ('pageLoad')
+    :return: float, максимальное время ожидания в секундах
+    """
+    orgBudgets = SELENIUM_WAIT_BUDGETS.get(orgTag, {})
+    return orgBudgets.get(waitName, SELENIUM_WAIT_BUDGETS['default'][waitName])
+
+
+def _log_wait(description, startTime, budget, success):
+    """Пишет в лог фактическое время ожидания."""
+    elapsed = time.monotonic() - startTime
+    if success:
+        logger.info(f'Ожидание "{description}": {elapsed:.2f} сек. из {budget} сек.')
+    else:
+        logger.warning(f'Ожидание "{description}": не дождались за {elapsed:.2f} сек., бюджет {budget} сек.')
+    return elapsed
+
+
+def wait_for_value(driver, condition, budget, description):
+    """
+    Ждет, пока condition(driver) вернет истинное значение. Исключения NoSuchElementException и
+    StaleElementReferenceException внутри condition считаются ложным значением: пока страница перерисовывается,
+    элементы могут пропадать и заменяться новыми.
+    :param driver (selenium.webdriver.Chrome): браузер
+    :param condition: функция от driver
+    :param budget (float): максимальное время ожидания в секундах
+    :param description (str): описание ожидания для лога
+    :return: значение, которое вернула condition
+    :raises TimeoutException: если не дождались за budget секунд
+    """
+    startTime = time.monotonic()
+    try:
+        value = WebDriverWait(driver, budget, poll_frequency=SELENIUM_POLL_INTERVAL,
+                              ignored_exceptions=(StaleElementReferenceException,)).until(condition)
+    except TimeoutException:
+        _log_wait(description, startTime, budget, False)
+        raise
+    _log_wait(description, startTime, budget, True)
+    return value
+
+
+def wait_for_element(driver, cssSelector, budget, description):
+    """
+    Ждет появления на странице элемента с CSS-селектором cssSelector.
+    :param driver (selenium.webdriver.Chrome): браузер
+    :param cssSelector (str): CSS-селектор элемента
+    :param budget (float): максимальное время ожидания в секундах
+    :param description (str): описание ожидания для лога
+    :return: selenium.webdriver.remote.webelement.WebElement
+    :raises TimeoutException: если элемент не появился за budget секунд
+    """
+    condition = expected_conditions.presence_of_element_located((By.CSS_SELECTOR, cssSelector))
+    return wait_for_value(driver, condition, budget, description)
+
+
+def wait_for_stable_count(driver, cssSelector, budget, description, minCount=1):
+    """
+    Ждет, пока на странице появится хотя бы minCount элементов с CSS-селектором cssSelector и их количество не будет
+    меняться в течение config.SELENIUM_STABLE_PERIOD секунд, т.е. пока страница не закончит подгружать карточки.
+    Если за budget секунд количество так и не стабилизировалось, то возвращает текущее количество: скрейпер
+    разберет то, что успело загрузиться.
+    :param driver (selenium.webdriver.Chrome): браузер
+    :param cssSelector (str): CSS-селектор элементов
+    :param budget (float): максимальное время ожидания в секундах
+    :param description (str): описание ожидания для лога
+    :param minCount (int): минимальное количество элементов
+    :return: int, количество элементов
+    """
+    startTime = time.monotonic()
+    deadline = startTime + budget
+    count = len(driver.find_elements(By.CSS_SELECTOR, cssSelector))
+    stableSince = time.monotonic()
+    while True:
+        now = time.monotonic()
+        if count >= minCount and now - stableSince >= SELENIUM_STABLE_PERIOD:
+            _log_wait(description, startTime, budget, True)
+            return count
+        if now >= deadline:
+            _log_wait(description, startTime, budget, False)
+            return count
+        time.sleep(SELENIUM_POLL_INTERVAL)
+        newCount = len(driver.find_elements(By.CSS_SELECTOR, cssSelector))
+        if newCount != count:
+            count = newCount
+            stableSince = time.monotonic()
+
+
+def wait_for_count_change(driver, cssSelector, previousCount, budget, description):
+    """
+    Ждет, пока количество элементов с CSS-селектором cssSelector станет отличным от previousCount, например после
+    нажатия кнопки подгрузки следующих квизов. Если за budget секунд количество не изменилось, то возвращает его как
+    есть, исключение не выбрасывается.
+    :param driver (selenium.webdriver.Chrome): браузер
+    :param cssSelector (str): CSS-селектор элементов
+    :param previousCount (int): количество элементов до действия на странице
+    :param budget (float): максимальное время ожидания в секундах
+    :param description (str): описание ожидания для лога
+    :return: int, количество элементов
+    """
+    def count_changed(driver):
+        count = len(driver.find_elements(By.CSS_SELECTOR, cssSelector))
+        # 0 - ложное значение для WebDriverWait, поэтому возвращаем количество в кортеже
+        return (count,) if count != previousCount else False
+
+    try:
+        return wait_for_value(driver, count_changed, budget, description)[0]
+    except TimeoutException:
+        return len(driver.find_elements(By.CSS_SELECTOR, cssSelector))
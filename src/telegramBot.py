@@ -18,6 +18,9 @@
     save_preferences(update, context) - сохраняет настройки пользователя в БД
     goodbye(update, context) - успешное заверешение чата
     badbye(update, context) - завершение чата в случае ошибки
+    refresh_schedule_job(context) - фоновая задача обновления расписания организатора в общем кэше
+    register_schedule_refresh_jobs(application) - регистрирует фоновые задачи обновления расписаний
+    reap_browsers_job(context) - фоновая задача поиска и завершения процессов браузеров вне пула
     main() - запускает telegram-бот
 
 Модуль написан на основе примеров с github разработчиков python-telegram-bot:
@@ -26,6 +29,8 @@ https://docs.python-telegram-bot.org/en/v20.7/examples.errorhandlerbot.html
 https://docs.python-telegram-bot.org/en/stable/examples.pollbot.html
 https://github.com/python-telegram-bot/python-telegram-bot/wiki/Storing-bot%2C-user-and-chat-related-data
 """
+import asyncio
+import dataclasses
 import logging
 import logging.config
 
@@ -42,9 +47,22 @@ from telegram.ext import (
     PollAnswerHandler
 )
 
-from config import LOGGING_CONFIG, QUIZ_THEMES, ROOT_DIR
-from quizAggregator import create_info_by_city, collect_quiz_data, create_formatted_quiz_list
-from dbOperations import create_connection, create_table, insert_new_user, get_user_preferences, update_user_preferences
+from config import (
+    BROWSER_REAPER_INTERVAL,
+    CITY_DICT,
+    LOGGING_CONFIG,
+    ORGANIZATORS_DICT,
+    QUIZ_THEMES,
+    ROOT_DIR,
+    SCHEDULE_REFRESH_INTERVAL,
+    SCHEDULE_REFRESH_STAGGER
+)
+from quizAggregator import BROWSER_POOL, create_info_by_city
+from scheduleCache import ScheduleCache
+from userDatabase import UserDatabase
+from userPreferences import (UserPreferences, format_exclusions, load_user_preferences_async,
+                             save_user_preferences_async)
+import httpClient
 
 # применяем глобальную конфигурацию логирования, операция должна быть выполнена при запуске приложения
 logging.config.dictConfig(LOGGING_CONFIG)
@@ -109,7 +127,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     logger.info(f'Начинаю чат с пользователем {user.id}')
 
     # город пока задан хардкодом, на будущее предусмотрена возможность выбора города пользователем
-    # при доработке нужно не забыть перенести строку preferencesList[0] = city из функции exclude_bar_result
+    # при доработке нужно не забыть перенести присвоение city в preferences из функции exclude_bar_result
     city = 'Новосибирск'
     context.user_data['city'] = city
 
@@ -125,8 +143,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         context.user_data['organizators'] = organizators
         context.user_data['links'] = links
     # удаляем из контекста пользователя значения, которые необходимо получать заново в каждом новом чате
-    keysToRemoveFromUserData = ['queryResult', 'preferencesList', 'DOWtext', 'DOW', 'games', 'organizatorErrors',
-                                'quizList']
+    keysToRemoveFromUserData = ['savedPreferences', 'preferences', 'DOWtext', 'DOW', 'quizList']
     for key in keysToRemoveFromUserData:
         context.user_data.pop(key, None)
 
@@ -140,20 +157,18 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         ]
     ]
 
-    preferencesList = []
-    # делаем запрос о предпочтениях пользователя в БД, если он неуспешен, то вернет None
-    queryResult = get_user_preferences(CONN, user.id)
-    if queryResult:
-        # БД возвращает tuple, переделываем его в List
-        preferencesList = list(queryResult)
+    # получаем предпочтения пользователя из кэша userPreferences, либо запросом в БД. Если пользователя нет в БД или
+    # запрос неуспешен, то вернется None
+    preferences = await load_user_preferences_async(context.bot_data['database'], user.id)
 
-    # сохраняем результаты в контексте этого пользователя
-    context.user_data['queryResult'] = queryResult
-    context.user_data['preferencesList'] = preferencesList
+    # сохраняем результаты в контексте этого пользователя: savedPreferences - то, что сохранено в БД, preferences -
+    # то, что пользователь настроит в /preferences в этом чате
+    context.user_data['savedPreferences'] = preferences
+    context.user_data['preferences'] = preferences
 
     # отправляем пользователю приветственное сообщение и inline-клавиатуру с вариантами ответа
     # приветствие выбирается в зависимости от того есть ли в БД информация о пользователе
-    if preferencesList:
+    if preferences:
         await update.message.reply_text(
             f'Привет! Рад снова тебя видеть.\nВ какой день вы хотели бы сходить на игру?',
             reply_markup=InlineKeyboardMarkup(reply_inline_keyboard)
@@ -182,7 +197,7 @@ async def choose_theme(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     global QUIZ_THEMES
     # извлекаем из контекста пользователя значения ранее присвоеннных параметров
-    preferencesList = context.user_data.get('preferencesList', [])
+    preferences = context.user_data.get('preferences')
 
     # извлекаем из ответа пользователя выбранные дни недели и преобразуем их в числовое представление
     DOWtext = query.data
@@ -202,11 +217,9 @@ async def choose_theme(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # если в /preferences пользователя есть исключенные тематики, то исключаем их из вывода
     themesCopy = QUIZ_THEMES.copy()  # создаем копию списка, чтобы при необходимости удалять элементы из него
 
-    if preferencesList:
-        exclThemes = preferencesList[3]
-        exclThemesList = exclThemes.split(';')
+    if preferences:
         # удаляем из списка themesCopy исключенные тематики, предварительно узнав их индекс в списке
-        for excl in exclThemesList:
+        for excl in preferences.excl_themes:
             if excl in themesCopy:
                 indexToDelete = themesCopy.index(excl)
                 del themesCopy[indexToDelete]
@@ -242,45 +255,41 @@ async def send_filtered_quiz(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
     # извлекаем из контекста пользователя значения ранее присвоеннных параметров
     city = context.user_data.get('city')
-    bars = context.user_data.get('bars')
-    organizators = context.user_data.get('organizators')
-    links = context.user_data.get('links')
-    preferencesList = context.user_data.get('preferencesList', [])
+    preferences = context.user_data.get('preferences')
     DOW = context.user_data.get('DOW', [])
     DOWtext = context.user_data.get('DOWtext', [])
 
     # если у пользователя еще нет /preferences, то присваиваем дефолтные значения - не исключаем из вывода ничего
-    if not preferencesList:
-        logger.info(f'Для пользователя {user.id} еще нет значений preferenceList, присваиваем значения по умолчанию. '
+    if not preferences:
+        logger.info(f'Для пользователя {user.id} еще нет значений preferences, присваиваем значения по умолчанию. '
                     f'Функция send_filtered_quiz')
-        preferencesList = [user.id, city, 'None', 'None', 'None']
-        context.user_data['preferencesList'] = preferencesList
+        preferences = UserPreferences(user.id, city)
+        context.user_data['preferences'] = preferences
 
     logger.info(f'Пользователь {user.id} выбрал следующую тематику: {theme}')
     logger.info(f'Готовлю фильтрованный список квизов пользователю {user.id}.')
 
-    # так как скрейпинг сайтов с расписаниями квизов занимает порядка 10 секунд, то выводим пользователю сообщение с
-    # просьбой подождать, чтобы он не думал что бот завис. Оно исчезнет, когда бот пришлет расписание квизов.
-    await query.edit_message_text(
-        'Дай мне минутку на подготовку списка квизов.', parse_mode='HTML'
-    )
+    # если в общем кэше нет актуального расписания по городу, то придется скрейпить сайты организаторов, а это
+    # занимает порядка 10 секунд. Выводим пользователю сообщение с просьбой подождать, чтобы он не думал что бот
+    # завис. Оно исчезнет, когда бот пришлет расписание квизов.
+    scheduleCache = context.bot_data['scheduleCache']
+    if not scheduleCache.is_fresh(city):
+        await query.edit_message_text(
+            'Дай мне минутку на подготовку списка квизов.', parse_mode='HTML'
+        )
 
-    # получаем полный неформатированный список квизов и список ошибок по отдельным организаторам
-    games, organizatorErrors = collect_quiz_data(organizators, links)
-    context.user_data['games'] = games
-    context.user_data['organizatorErrors'] = organizatorErrors
+    # получаем из общего кэша фильтрованный форматированный для вывода бота список квизов, с учетом выбора пользователя
+    # в ходе чата (желаемые дни проведения, интересующая тематика) и перманентых /preferences пользователя (какие бары,
+    # тематики и организаторов нужно исключать из вывода всегда), и список ошибок по отдельным организаторам.
+    # скрейпинг (если он нужен) выполняется в отдельном потоке, бот в это время отвечает другим пользователям
+    logger.debug(f'Запрашиваю для пользователя {user.id} список квизов с параметрами (DOW: {DOW}, '
+                 f'selected_theme: {theme}, preferences: {preferences}.')
+    quizList, organizatorErrors = await scheduleCache.get_quiz_list_async(preferences.city, DOW, theme,
+                                                                          preferences.excl_bars,
+                                                                          preferences.excl_themes,
+                                                                          preferences.excl_orgs)
     if len(organizatorErrors) > 0:
         logger.error(f'Ошибка при запросах к следующим организаторам: {organizatorErrors}')
-
-    # получаем фильтрованный форматированный для вывода бота список квизов, с учетом выбора пользователя в ходе чата
-    # (желаемые дни проведения, интересующая тематика) и перманентых /preferences пользователя (какие бары, тематики и
-    # организаторов нужно исключать из вывода всегда)
-    telegramId, city, excl_bar, excl_theme, excl_orgs = preferencesList
-    logger.debug(f'Запускаю для пользователя {user.id} метод create_formatted_quiz_list с параметрами (games:{games}, '
-                f'organizatorErrors: {organizatorErrors}, DOW: {DOW}, selected_theme: {theme}, excl_bar: {excl_bar}, '
-                f'excl_theme: {excl_theme}, excl_orgs: {excl_orgs}.')
-    quizList = create_formatted_quiz_list(games, organizatorErrors, dow=DOW, selected_theme=theme,
-                                          excl_bar=excl_bar, excl_theme=excl_theme, excl_orgs=excl_orgs)
     context.user_data['quizList'] = quizList
     logger.debug(f'Список квизов для пользователя {user.id}: {quizList}')
 
@@ -365,35 +374,28 @@ async def send_all_quizzes(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.message.from_user
     logger.info(f'Отправляю полный список квизов пользователю {user.id}.')
 
-    # извлекаем из контекста пользователя значения ранее присвоеннных параметров
-    bars = context.user_data.get('bars')
-    organizators = context.user_data.get('organizators')
-    links = context.user_data.get('links')
-    games = context.user_data.get('games', {})
-    organizatorErrors = context.user_data.get('organizatorErrors', {})
-
-    # если бот уже был в функции send_filtered_quiz и делал скрейпинг сайтов организаторов функцией collect_quiz_data,
-    # то не делаем эту операцию повторно.
-    if not games and not organizatorErrors:
-        logger.info(f'Пользователь {user.id} еще не запрашивал поиск квизов с фильтрами, делаем запрос '
-                    f'collect_quiz_data().')
+    # город пока задан хардкодом, как и в функции start. /all может прийти и до /start, поэтому берем значение по
+    # умолчанию
+    city = context.user_data.get('city', 'Новосибирск')
+
+    # расписание берется из общего для всех пользователей кэша. Скрейпинг сайтов организаторов запускается, только
+    # если в кэше нет актуального расписания по городу.
+    scheduleCache = context.bot_data['scheduleCache']
+    if not scheduleCache.is_fresh(city):
+        logger.info(f'В кэше нет актуального расписания по городу {city}, для пользователя {user.id} будет выполнен '
+                    f'скрейпинг сайтов организаторов.')
         # так как скрейпинг сайтов с расписаниями квизов занимает порядка 10 секунд, то выводим пользователю сообщение с
         # просьбой подождать, чтобы он не думал что бот завис. Оно исчезнет, когда бот пришлет расписание квизов.
         await update.message.reply_text(
             'Дай мне минутку на подготовку списка квизов.', reply_markup=ReplyKeyboardRemove(), parse_mode='HTML')
-        # получаем полный неформатированный список квизов и список ошибок по отдельным организаторам
-        games, organizatorErrors = collect_quiz_data(organizators, links)
-        context.user_data['games'] = games
-        context.user_data['organizatorErrors'] = organizatorErrors
-        if len(organizatorErrors) > 0:
-            logger.error(f'Ошибка при запросах к следующим организаторам: {organizatorErrors}')
-
-    # получаем форматированный для вывода бота полный список квизов
+    # получаем форматированный для вывода бота полный список квизов и список ошибок по отдельным организаторам.
     # задаем значения переменных исключающих любую фильтрацию
+    # скрейпинг (если он нужен) выполняется в отдельном потоке, бот в это время отвечает другим пользователям
     DOW = [1, 2, 3, 4, 5, 6, 7]
     theme = QUIZ_THEMES[0]  # 'Оставить все'
-    quizList = create_formatted_quiz_list(games, organizatorErrors, dow=DOW, selected_theme=theme,
-                                          excl_bar='None', excl_theme='None', excl_orgs='None')
+    quizList, organizatorErrors = await scheduleCache.get_quiz_list_async(city, DOW, theme, 'None', 'None', 'None')
+    if len(organizatorErrors) > 0:
+        logger.error(f'Ошибка при запросах к следующим организаторам: {organizatorErrors}')
     context.user_data['quizList'] = quizList
 
     # формируем сообщение для отправки пользователю, в зависимости от количества найденных квизов
@@ -526,17 +528,17 @@ async def preferences(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.message.from_user
 
     # извлекаем из контекста пользователя значения ранее присвоеннных параметров
-    queryResult = context.user_data.get('queryResult', [])
-    preferencesList = context.user_data.get('preferencesList', [])
+    savedPreferences = context.user_data.get('savedPreferences')
 
     # если в БД есть информация о сохраненных настройках пользователя, то выводим их пользователю
-    if queryResult:
+    if savedPreferences:
         logger.info(f'Пользователь {user.id} отправил команду /preferences. У него уже были настройки: '
-                    f'{preferencesList}.')
-        reply_text = f'На настоящий момент ты выбрал(а) город <b>{preferencesList[1]}</b> и исключил(а) из ' \
-                     f'поиска: \nбары <b>{preferencesList[2]}</b>;\n' \
-                     f'тематики <b>{preferencesList[3]}</b>;\n' \
-                     f'организаторов <b>{preferencesList[4]}</b>.\n\nХочешь внести изменения?'
+                    f'{savedPreferences}.')
+        reply_text = f'На настоящий момент ты выбрал(а) город <b>{savedPreferences.city}</b> и исключил(а) из ' \
+                     f'поиска: \nбары <b>{format_exclusions(savedPreferences.excl_bars)}</b>;\n' \
+                     f'тематики <b>{format_exclusions(savedPreferences.excl_themes)}</b>;\n' \
+                     f'организаторов <b>{format_exclusions(savedPreferences.excl_orgs)}</b>.\n\nХочешь внести ' \
+                     f'изменения?'
     else:
         logger.info(f'Пользователь {user.id} отправил команду /preferences. Ранее у него не было сохраненных настроек.')
         reply_text = 'У тебя еще не настроены предпочтения. Хочешь исключить какие-то бары/ тематики/ организаторов ' \
@@ -612,32 +614,23 @@ async def exclude_bar_result(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
     # извлекаем из контекста пользователя значения ранее присвоеннных параметров
     city = context.user_data.get('city')
-    preferencesList = context.user_data.get('preferencesList', [])
-
-    if not preferencesList:
-        preferencesList = [user.id, city, 'None', 'None', 'None']
-    else:
-        preferencesList[1] = city  # пока добавляем захардкоженный city здесь, потом надо перенести в новую функцию
+    preferences = context.user_data.get('preferences') or UserPreferences(user.id, city)
+    # пока добавляем захардкоженный city здесь, потом надо перенести в новую функцию
+    preferences = dataclasses.replace(preferences, city=city)
 
     # вариант 'Оставить все бары' хранится в 0-м индексе списка, если он был выбран, то ничего не исключаем
     if 0 in selected_options:
         logger.info(f'Пользователь {user.id} выбрал опцию "Оставить все бары"')
-        preferencesList[2] = 'None'
+        preferences = dataclasses.replace(preferences, excl_bars=frozenset())
         reply_text = 'Хорошо, оставляем в выборке все бары. Теперь жми "Выбрать тематики".'
     else:
-        excluded_bars = ""
-        for option_id in selected_options:
-            #  чтобы не ставить ; после последнего из баров
-            if option_id != selected_options[-1]:
-                excluded_bars += poll_options[option_id] + ";"
-            else:
-                excluded_bars += poll_options[option_id]
-        logger.info(f'Пользователь {user.id} исключил следующие бары: {excluded_bars}')
-        # записываем получившуюся строку вида 'Арт П.А.Б.;Типография;Руки вверх' в список предпочтений
-        preferencesList[2] = excluded_bars 
+        # записываем множество вида {'Арт П.А.Б.', 'Типография', 'Руки вверх'} в предпочтения
+        excluded_bars = frozenset(poll_options[option_id] for option_id in selected_options)
+        logger.info(f'Пользователь {user.id} исключил следующие бары: {format_exclusions(excluded_bars)}')
+        preferences = dataclasses.replace(preferences, excl_bars=excluded_bars)
         reply_text = 'Запомню твои предпочтения по барам. Теперь жми "Выбрать тематики".'
 
-    context.user_data['preferencesList'] = preferencesList
+    context.user_data['preferences'] = preferences
 
     # создаем единственный вариант ответа для перехода на следующий этап настроек предпочтений
     reply_keyboard = [['Выбрать тематики']]
@@ -709,27 +702,21 @@ async def exclude_theme_result(update: Update, context: ContextTypes.DEFAULT_TYP
     await context.bot.stop_poll(answered_poll["chat_id"], answered_poll["message_id"])
 
     # извлекаем из контекста пользователя значения ранее присвоеннных параметров
-    preferencesList = context.user_data.get('preferencesList', [])
+    preferences = context.user_data.get('preferences') or UserPreferences(user.id, context.user_data.get('city'))
 
     # вариант 'Оставить все тематики' хранится в 0-м индексе списка, если он был выбран, то ничего не исключаем
     if 0 in selected_options:
         logger.info(f'Пользователь {user.id} выбрал опцию "Оставить все тематики"')
-        preferencesList[3] = 'None'
+        preferences = dataclasses.replace(preferences, excl_themes=frozenset())
         reply_text = 'Ок, оставляем в выборке все тематики. Теперь жми "Выбрать организаторов".'
     else:
-        excluded_themes = ""
-        for option_id in selected_options:
-            #  чтобы не ставить ; после последнего из тематик
-            if option_id != selected_options[-1]:
-                excluded_themes += poll_options[option_id] + ";"
-            else:
-                excluded_themes += poll_options[option_id]
-        logger.info(f'Пользователь {user.id} исключил следующие тематики: {excluded_themes}')
-        # записываем получившуюся строку вида 'Ностальгические;18+' в список предпочтений
-        preferencesList[3] = excluded_themes
+        # записываем множество вида {'Ностальгические', '18+'} в предпочтения
+        excluded_themes = frozenset(poll_options[option_id] for option_id in selected_options)
+        logger.info(f'Пользователь {user.id} исключил следующие тематики: {format_exclusions(excluded_themes)}')
+        preferences = dataclasses.replace(preferences, excl_themes=excluded_themes)
         reply_text = 'Запомню твои предпочтения по тематикам. Теперь жми "Выбрать организаторов".'
 
-    context.user_data['preferencesList'] = preferencesList
+    context.user_data['preferences'] = preferences
 
     # создаем единственный вариант ответа для перехода на следующий этап настроек предпочтений
     reply_keyboard = [['Выбрать организаторов']]
@@ -803,27 +790,22 @@ async def exclude_organizators_result(update: Update, context: ContextTypes.DEFA
     await context.bot.stop_poll(answered_poll["chat_id"], answered_poll["message_id"])
 
     # извлекаем из контекста пользователя значения ранее присвоеннных параметров
-    preferencesList = context.user_data.get('preferencesList', [])
+    preferences = context.user_data.get('preferences') or UserPreferences(user.id, context.user_data.get('city'))
 
     # вариант 'Оставить всех организаторов' хранится в 0-м индексе списка, если он был выбран, то ничего не исключаем
     if 0 in selected_options:
         logger.info(f'Пользователь {user.id} выбрал опцию "Оставить всех организаторов"')
-        preferencesList[4] = 'None'
+        preferences = dataclasses.replace(preferences, excl_orgs=frozenset())
         reply_text = 'Оставляю в выборке всех организаторов. Теперь жми "Завершить настройку".'
     else:
-        exclude_organizators = ""
-        for option_id in selected_options:
-            #  чтобы не ставить ; после последнего из организаторов
-            if option_id != selected_options[-1]:
-                exclude_organizators += poll_options[option_id] + ";"
-            else:
-                exclude_organizators += poll_options[option_id]
-        logger.info(f'Пользователь {user.id} исключил следующих организаторов: {exclude_organizators}')
-        # записываем получившуюся строку вида 'Лига Индиго;Квиз Плиз' в список предпочтений
-        preferencesList[4] = exclude_organizators
+        # записываем множество вида {'Лига Индиго', 'Квиз Плиз'} в предпочтения
+        exclude_organizators = frozenset(poll_options[option_id] for option_id in selected_options)
+        logger.info(f'Пользователь {user.id} исключил следующих организаторов: '
+                    f'{format_exclusions(exclude_organizators)}')
+        preferences = dataclasses.replace(preferences, excl_orgs=exclude_organizators)
         reply_text = 'Запомню твои предпочтения по организаторам. Теперь жми "Завершить настройку".'
 
-    context.user_data['preferencesList'] = preferencesList
+    context.user_data['preferences'] = preferences
 
     # создаем единственный вариант ответа для перехода на следующий этап настроек предпочтений
     reply_keyboard = [['Завершить настройку']]
@@ -847,13 +829,16 @@ async def save_preferences(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.message.from_user
 
     # извлекаем из контекста пользователя значения ранее присвоеннных параметров
-    preferencesList = context.user_data.get('preferencesList', [])
-    queryResult = context.user_data.get('queryResult', '')
-    telegramId, city, excl_bar, excl_theme, excl_orgs = preferencesList
-
-    # если SELECT по пользователю что-то вернул, то для записи настроек используем UPDATE, если не вернул - то INSERT
-    if queryResult:
-        if update_user_preferences(CONN, user.id, city, excl_bar, excl_theme, excl_orgs):
+    preferences = context.user_data.get('preferences')
+    savedPreferences = context.user_data.get('savedPreferences')
+    # настройки сохраняются одним upsert запросом, есть ли пользователь в БД или нет; savedPreferences используется
+    # только для выбора текста сообщения
+    isSaved = await save_user_preferences_async(context.bot_data['database'], preferences)
+    if isSaved:
+        context.user_data['savedPreferences'] = preferences
+
+    if savedPreferences is not None:
+        if isSaved:
             logger.info(f'Пользователь {user.id} обновил свои предпочтения')
             message = 'Твои настройки обновлены! Теперь нажми команду /start, чтобы приступить к поиску квизов.'
         else:
@@ -861,7 +846,7 @@ async def save_preferences(update: Update, context: ContextTypes.DEFAULT_TYPE):
             message = 'К сожалению сейчас не удается обновить твои настройки, попробуй позже.\nЧтобы приступить к ' \
                       'поиску квизов нажми команду /start.',
     else:
-        if insert_new_user(CONN, user.id, city, excl_bar, excl_theme, excl_orgs):
+        if isSaved:
             logger.info(f'Пользователь {user.id} сохранил свои предпочтения в базу данных')
             message = 'Твои настройки сохранены! Теперь нажми команду /start, чтобы приступить к поиску квизов.'
         else:
@@ -903,12 +888,84 @@ async def goodbye(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     return ConversationHandler.END
 
+async def refresh_schedule_job(context: ContextTypes.DEFAULT_TYPE):
+    """
+    Фоновая задача, которая заранее обновляет расписание организатора в общем кэше, чтобы пользователи получали
+    список квизов сразу, без ожидания скрейпинга. Регистрируется в main() для каждой пары город-организатор.
+    Скрейпинг выполняется в отдельном потоке, поэтому event loop бота продолжает обрабатывать сообщения пользователей.
+    :return: None
+    """
+    city = context.job.data['city']
+    orgName = context.job.data['organizator']
+    scheduleCache = context.bot_data['scheduleCache']
+
+    logger.debug(f'Фоновое обновление расписания организатора {orgName} по городу {city}')
+    await scheduleCache.refresh_async(city, [orgName])
+    logger.info(f'Обновлено расписание организатора {orgName} по городу {city}. Статистика кэша: '
+                f'{scheduleCache.get_stats()}, статистика условных HTTP-запросов: {httpClient.get_cache_stats()}')
+
+
+async def reap_browsers_job(context: ContextTypes.DEFAULT_TYPE):
+    """
+    Фоновая задача, которая находит и завершает процессы chrome/ chromedriver бота, не принадлежащие ни одному браузеру
+    из пула quizAggregator.BROWSER_POOL. Такие процессы остаются, если браузер упал или не закрылся, и без этой задачи
+    копятся, пока не закончится память. Поиск процессов выполняется в отдельном потоке.
+    :return: None
+    """
+    leaked = await asyncio.to_thread(BROWSER_POOL.reap_orphans)
+    logger.info(f'Проверка процессов браузеров: найдено процессов вне пула: {leaked}. Статистика пула браузеров: '
+                f'{BROWSER_POOL.get_stats()}')
+
+
+def register_schedule_refresh_jobs(application):
+    """
+    Регистрирует в JobQueue приложения периодические задачи фонового обновления расписаний для каждого организатора
+    каждого города из config.CITY_DICT. Период обновления берется из config.SCHEDULE_REFRESH_INTERVAL, первый запуск
+    задач сдвигается на config.SCHEDULE_REFRESH_STAGGER секунд, чтобы организаторы не скрейпились одновременно.
+    :param application: объект класса telegram.ext.Application
+    :return: None
+    """
+    jobNumber = 0
+    for city in CITY_DICT:
+        # 'Образец Заполнения' - это пример заполнения словаря, а не настоящий город
+        if city == 'Образец Заполнения':
+            continue
+        bars, cityOrganizators, cityLinks = create_info_by_city(city)
+        for orgName in cityOrganizators:
+            if orgName not in ORGANIZATORS_DICT:
+                continue
+            orgTag = ORGANIZATORS_DICT[orgName][0]
+            interval = SCHEDULE_REFRESH_INTERVAL.get(orgTag, SCHEDULE_REFRESH_INTERVAL['default'])
+            application.job_queue.run_repeating(
+                refresh_schedule_job,
+                interval=interval,
+                first=jobNumber * SCHEDULE_REFRESH_STAGGER,
+                data={'city': city, 'organizator': orgName},
+                name=f'refresh_schedule_{city}_{orgTag}'
+            )
+            logger.debug(f'Зарегистрировано фоновое обновление расписания организатора {orgName} по городу {city} '
+                         f'каждые {interval} секунд')
+            jobNumber += 1
+
+
 def main():
     """Запускает telegram-бот."""
     # создаем объект класса Application, на вход передаем токен нашего бота
     from config import BOT_TOKEN
     application = Application.builder().token(BOT_TOKEN).build()
 
+    # создаем единый для всех пользователей кэш расписаний квизов по городам и задачи его фонового обновления
+    application.bot_data['scheduleCache'] = ScheduleCache()
+    # создаем пул подключений к БД, запросы к которой хэндлеры выполняют не блокируя event loop, и нужные таблицы
+    # (если еще не были созданы)
+    database = UserDatabase()
+    database.create_table()
+    application.bot_data['database'] = database
+    register_schedule_refresh_jobs(application)
+    # периодически завершаем процессы браузеров, которые остались после упавших скрейперов
+    application.job_queue.run_repeating(reap_browsers_job, interval=BROWSER_REAPER_INTERVAL,
+                                        first=BROWSER_REAPER_INTERVAL, name='reap_browsers')
+
     # добавляем в объект conversation handler, где описываем входну точку бота,
     # реакции на команды бота вида /cmd, описываем маршрутизацию из различных
     # состояний в зависимости от действий пользователя на момент окончания этого
@@ -951,9 +1008,8 @@ def main():
 
     # Непосредственный запуск бота. Работает пока не остановить программу.
     application.run_polling()
+    database.close()
 
 if __name__ == "__main__":
-    # при запуске модуля делаем подключение к БД и запускаем функцию main, создающую бота
-    ENGINE, CONN = create_connection()  # создаем объекты Engine и Connect к базе данных
-    create_table(ENGINE)  # создаем нужные таблицы (если еще не были созданы)
+    # при запуске модуля запускаем функцию main, создающую бота и подключение к БД
     main()
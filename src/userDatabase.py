@@ -0,0 +1,127 @@
+"""
+Модуль неблокирующего доступа к БД для хэндлеров бота.
+Функции dbOperations синхронные: пока SQLite пишет на диск, поток, в котором они вызваны, ждет. Если вызывать их прямо
+из асинхронных хэндлеров, то на это время останавливается event loop, и бот не отвечает остальным пользователям.
+UserDatabase выполняет функции dbOperations в собственном пуле потоков, а хэндлеры ждут результат через await.
+Пул потоков отдельный от пула asyncio.to_thread(), в котором идет скрейпинг (см. scheduleCache.py), поэтому запросы
+к БД не ждут в очереди за скрейпингом. Каждый поток берет свое подключение из пула подключений Engine
+(dbOperations.create_pooled_engine()), а не использует одно общее подключение.
+
+Содержит классы:
+    UserDatabase - пул потоков и подключений для асинхронного вызова функций dbOperations
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import dbOperations
+from config import DBPATH, DB_POOL_SIZE
+
+# начать логирование в модуле
+logger = logging.getLogger(__name__)
+
+
+class UserDatabase:
+    """
+    Пул потоков и подключений для асинхронного вызова функций dbOperations из хэндлеров бота. Создается один раз в
+    telegramBot.main() и хранится в application.bot_data['database'].
+
+    Атрибуты:
+        engine - объект класса Engine с пулом подключений
+    Содержит методы:
+        create_table() - создает таблицы в БД
+        get_user_preferences(telegram_id) - асинхронный dbOperations.get_user_preferences()
+        insert_new_user(telegram_id, city, excl_bar, excl_theme, excl_org) - асинхронный dbOperations.insert_new_user()
+        update_user_preferences(telegram_id, city, excl_bar, excl_theme, excl_org) - асинхронный
+            dbOperations.update_user_preferences()
+        upsert_user_preferences(telegram_id, city, excl_bar, excl_theme, excl_org) - асинхронный
+            dbOperations.upsert_user_preferences()
+        upsert_user_preferences_batch(preferencesRows) - асинхронный dbOperations.upsert_user_preferences_batch()
+        delete_user(telegram_id) - асинхронный dbOperations.delete_user()
+        close() - дожидается выполнения запросов и закрывает подключения
+    """
+
+    def __init__(self, dbPath=DBPATH, poolSize=DB_POOL_SIZE):
+        """
+        :param dbPath (str): строка подключения к БД, по умолчанию задана в config.DBPATH
+        :param poolSize (int): количество подключений в пуле и потоков, выполняющих запросы
+        """
+        self.engine = dbOperations.create_pooled_engine(dbPath, poolSize)
+        # с БД SQLite в памяти работает одно подключение, поэтому и запросы к ней выполняются по одному
+        if self.engine.url.get_backend_name() == 'sqlite' and self.engine.url.database in (None, '', ':memory:'):
+            poolSize = 1
+        # потоков не больше, чем подключений в пуле, поэтому поток никогда не ждет свободное подключение
+        self._executor = ThreadPoolExecutor(max_workers=poolSize, thread_name_prefix='userDatabase')
+
+    def _call(self, function, *args):
+        """Выполняет функцию dbOperations на подключении из пула и возвращает подключение в пул."""
+        with self.engine.connect() as conn:
+            return function(conn, *args)
+
+    async def _run(self, function, *args):
+        """Выполняет функцию dbOperations в пуле потоков, не блокируя event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(self._call, function, *args))
+
+    def create_table(self):
+        """
+        Создает таблицы в БД (и переносит данные из прежней таблицы user_preferences). Вызывается синхронно при
+        запуске бота, до начала обработки сообщений.
+        :return: None
+        """
+        dbOperations.create_table(self.engine)
+
+    async def get_user_preferences(self, telegram_id):
+        """
+        Асинхронная версия dbOperations.get_user_preferences().
+        :return: tuple вида (123456, 'Новосибирск', 'ART pub', '18+', 'mama quiz') либо None
+        """
+        return await self._run(dbOperations.get_user_preferences, telegram_id)
+
+    async def insert_new_user(self, telegram_id, city, excl_bar, excl_theme, excl_org):
+        """
+        Асинхронная версия dbOperations.insert_new_user().
+        :return: bool
+        """
+        return await self._run(dbOperations.insert_new_user, telegram_id, city, excl_bar, excl_theme, excl_org)
+
+    async def update_user_preferences(self, telegram_id, city, excl_bar, excl_theme, excl_org):
+        """
+        Асинхронная версия dbOperations.update_user_preferences().
+        :return: bool
+        """
+        return await self._run(dbOperations.update_user_preferences, telegram_id, city, excl_bar, excl_theme,
+                               excl_org)
+
+    async def upsert_user_preferences(self, telegram_id, city, excl_bar, excl_theme, excl_org):
+        """
+        Асинхронная версия dbOperations.upsert_user_preferences().
+        :return: bool
+        """
+        return await self._run(dbOperations.upsert_user_preferences, telegram_id, city, excl_bar, excl_theme,
+                               excl_org)
+
+    async def upsert_user_preferences_batch(self, preferencesRows):
+        """
+        Асинхронная версия dbOperations.upsert_user_preferences_batch().
+        :return: bool
+        """
+        return await self._run(dbOperations.upsert_user_preferences_batch, list(preferencesRows))
+
+    async def delete_user(self, telegram_id):
+        """
+        Асинхронная версия dbOperations.delete_user().
+        :return: bool
+        """
+        return await self._run(dbOperations.delete_user, telegram_id)
+
+    def close(self):
+        """
+        Дожидается выполнения уже отправленных запросов, останавливает потоки и закрывает подключения пула.
+        :return: None
+        """
+        self._executor.shutdown(wait=True)
+        self.engine.dispose()
+        logger.debug('Пул подключений к БД закрыт')
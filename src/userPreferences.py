@@ -0,0 +1,206 @@
+"""
+Модуль предпочтений пользователей: какие бары, тематики и организаторов пользователь исключил из выборки в /preferences.
+Функции dbOperations принимают и возвращают исключения строками вида 'Арт П.А.Б.;Типография', либо 'None', если
+ничего не исключено. Строки разбираются один раз - при загрузке из БД или сохранении - в неизменяемую
+запись UserPreferences с множествами frozenset, поэтому при фильтрации квизов исключения проверяются по вхождению в
+множество, а не поиском подстроки в строке. Записи запоминаются по telegram_id пользователя, чтобы не делать SELECT
+на каждую команду /start; все изменения предпочтений проходят через save_user_preferences(), которая обновляет и БД,
+и кэш, а dbOperations.delete_user() удаляет пользователя и из кэша.
+
+Содержит классы:
+    UserPreferences - неизменяемая запись о предпочтениях пользователя
+Содержит функции:
+    forget_user_preferences(telegram_id) - удаляет предпочтения пользователя из кэша
+    format_exclusions(items) - собирает множество исключений в строку для хранения в БД
+    load_user_preferences(conn, telegram_id) - возвращает предпочтения пользователя из кэша или из БД
+    load_user_preferences_async(database, telegram_id) - асинхронная версия load_user_preferences()
+    parse_exclusions(value) - разбирает строку исключений из БД в множество
+    preferences_from_row(row) - создает UserPreferences из результата dbOperations.get_user_preferences()
+    save_user_preferences(conn, preferences) - сохраняет предпочтения пользователя в БД и кэш
+    save_user_preferences_async(database, preferences) - асинхронная версия save_user_preferences()
+Содержит константы:
+    USER_PREFERENCES_CACHE - предпочтения пользователей по telegram_id в порядке последнего обращения
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from config import USER_PREFERENCES_CACHE_SIZE
+from dbOperations import EXCLUSIONS_SEPARATOR, NO_EXCLUSIONS, get_user_preferences, upsert_user_preferences
+
+# начать логирование в модуле
+logger = logging.getLogger(__name__)
+
+# {telegram_id: UserPreferences}
+USER_PREFERENCES_CACHE = OrderedDict()
+# пользователь удаляется из кэша в потоке, в котором выполняется dbOperations.delete_user(), в том числе в пуле потоков
+# userDatabase.UserDatabase, поэтому кэш защищен блокировкой
+_cacheLock = threading.Lock()
+
+
+def parse_exclusions(value):
+    """
+    Разбирает строку исключений в формате БД в множество: 'Арт П.А.Б.;Типография' -> {'Арт П.А.Б.', 'Типография'}.
+    Пустая строка, None и 'None' означают, что ничего не исключено. Если передана не строка, а уже готовая
+    коллекция исключений, то она приводится к frozenset.
+    :param value: строка исключений из БД, либо коллекция исключений
+    :return: frozenset of str
+    """
+    if value is None:
+        return frozenset()
+    if not isinstance(value, str):
+        return frozenset(value)
+    return frozenset(item.strip() for item in value.split(EXCLUSIONS_SEPARATOR)
+                     if item.strip() and item.strip() != NO_EXCLUSIONS)
+
+
+def format_exclusions(items):
+    """
+    Собирает множество исключений в строку для хранения в БД и вывода пользователю: {'Типография', 'Арт П.А.Б.'} ->
+    'Арт П.А.Б.;Типография'. Если ничего не исключено, то возвращает 'None'.
+    :param items: коллекция исключений
+    :return: str
+    """
+    return EXCLUSIONS_SEPARATOR.join(sorted(items)) if items else NO_EXCLUSIONS
+
+
+@dataclass(frozen=True, slots=True)
+class UserPreferences:
+    """
+    Неизменяемая запись о предпочтениях пользователя. Для изменения создается новая запись с помощью
+    dataclasses.replace().
+
+    Атрибуты:
+        telegram_id (int) - идентификатор пользователя в Telegram
+        city (str) - город
+        excl_bars (frozenset) - бары, которые пользователь исключил из выборки
+        excl_themes (frozenset) - тематики, которые пользователь исключил из выборки
+        excl_orgs (frozenset) - организаторы, которых пользователь исключил из выборки
+    """
+    telegram_id: int
+    city: str
+    excl_bars: frozenset = frozenset()
+    excl_themes: frozenset = frozenset()
+    excl_orgs: frozenset = frozenset()
+
+
+def preferences_from_row(row):
+    """
+    Создает UserPreferences из результата dbOperations.get_user_preferences(), в котором исключения - строки.
+    :param row: tuple вида (123456, 'Новосибирск', 'Арт П.А.Б.;Типография', '18+', 'None')
+    :return: UserPreferences
+    """
+    telegram_id, city, excl_bar, excl_theme, excl_org = row
+    return UserPreferences(telegram_id, city, parse_exclusions(excl_bar), parse_exclusions(excl_theme),
+                           parse_exclusions(excl_org))
+
+
+def _remember(telegram_id, preferences):
+    """Запоминает предпочтения пользователя в кэше, вытесняя пользователя, к которому дольше всего не обращались."""
+    with _cacheLock:
+        USER_PREFERENCES_CACHE[telegram_id] = preferences
+        USER_PREFERENCES_CACHE.move_to_end(telegram_id)
+        while len(USER_PREFERENCES_CACHE) > USER_PREFERENCES_CACHE_SIZE:
+            USER_PREFERENCES_CACHE.popitem(last=False)
+
+
+def _get_cached(telegram_id):
+    """Возвращает предпочтения пользователя из кэша, либо None, если их там нет."""
+    with _cacheLock:
+        preferences = USER_PREFERENCES_CACHE.get(telegram_id)
+        if preferences is not None:
+            USER_PREFERENCES_CACHE.move_to_end(telegram_id)
+        return preferences
+
+
+def forget_user_preferences(telegram_id):
+    """
+    Удаляет предпочтения пользователя из кэша. Вызывается из dbOperations.delete_user(), чтобы удаленный пользователь
+    не получал прежние город и исключения.
+    :param telegram_id (int): идентификатор пользователя в Telegram
+    :return: None
+    """
+    with _cacheLock:
+        USER_PREFERENCES_CACHE.pop(telegram_id, None)
+
+
+def _to_row(preferences):
+    """Возвращает параметры предпочтений для dbOperations.upsert_user_preferences(): исключения собраны в строки."""
+    return (preferences.telegram_id, preferences.city, format_exclusions(preferences.excl_bars),
+            format_exclusions(preferences.excl_themes), format_exclusions(preferences.excl_orgs))
+
+
+def load_user_preferences(conn, telegram_id):
+    """
+    Возвращает предпочтения пользователя. Если их еще нет в кэше, то делает SELECT запрос в БД и запоминает результат.
+    Отсутствие пользователя в БД не запоминается: get_user_preferences() возвращает None и при ошибке запроса, а
+    новый пользователь попадет в кэш, когда сохранит предпочтения.
+    :param conn: подключение к БД
+    :param telegram_id (int): идентификатор пользователя в Telegram
+    :return: UserPreferences либо None, если пользователя нет в БД
+    """
+    preferences = _get_cached(telegram_id)
+    if preferences is not None:
+        return preferences
+
+    row = get_user_preferences(conn, telegram_id)
+    if not row:
+        return None
+    preferences = preferences_from_row(row)
+    _remember(telegram_id, preferences)
+    return preferences
+
+
+async def load_user_preferences_async(database, telegram_id):
+    """
+    Асинхронная версия load_user_preferences() для вызова из хэндлеров бота: если предпочтений нет в кэше, то SELECT
+    запрос выполняется в потоке userDatabase.UserDatabase. Если за время запроса предпочтения попали в кэш, то
+    возвращаются они, а не результат запроса.
+    :param database (userDatabase.UserDatabase): БД бота
+    :param telegram_id (int): идентификатор пользователя в Telegram
+    :return: UserPreferences либо None, если пользователя нет в БД
+    """
+    preferences = _get_cached(telegram_id)
+    if preferences is not None:
+        return preferences
+
+    row = await database.get_user_preferences(telegram_id)
+    # пока шел запрос, save_user_preferences_async() мог сохранить более новые предпочтения, а прочитанная строка
+    # могла быть прочитана еще до сохранения. Поэтому запомненные в кэше предпочтения важнее результата запроса
+    preferences = _get_cached(telegram_id)
+    if preferences is not None:
+        return preferences
+    if not row:
+        return None
+    preferences = preferences_from_row(row)
+    _remember(telegram_id, preferences)
+    return preferences
+
+
+def save_user_preferences(conn, preferences):
+    """
+    Сохраняет предпочтения пользователя в БД (исключения передаются в dbOperations строками) и, если запрос удался,
+    в кэш. Пользователь добавляется или обновляется одним upsert запросом, поэтому не важно, есть ли он уже в БД.
+    :param conn: подключение к БД
+    :param preferences (UserPreferences): предпочтения пользователя
+    :return: bool
+    """
+    isSaved = upsert_user_preferences(conn, *_to_row(preferences))
+    if isSaved:
+        _remember(preferences.telegram_id, preferences)
+    return isSaved
+
+
+async def save_user_preferences_async(database, preferences):
+    """
+    Асинхронная версия save_user_preferences() для вызова из хэндлеров бота.
+    :param database (userDatabase.UserDatabase): БД бота
+    :param preferences (UserPreferences): предпочтения пользователя
+    :return: bool
+    """
+    isSaved = await database.upsert_user_preferences(*_to_row(preferences))
+    if isSaved:
+        _remember(preferences.telegram_id, preferences)
+    return isSaved
@@ -3,8 +3,18 @@
 
 Модули:
     conftest.py - fixture-функции
+    test_barIndex.py - тест-кейсы для модуля ./src/barIndex.py
+    test_browserPool.py - тест-кейсы для модуля ./src/browserPool.py
     test_dbOperations.py - тест-кейсы для модуля ./tests/dbOperations.py
+    test_httpClient.py - тест-кейсы для модуля ./src/httpClient.py
     test_quizAggregator.py - тест-кейсы для модуля ./tests/quizAggregator.py
+    test_quizGame.py - тест-кейсы для модуля ./src/quizGame.py
+    test_scheduleCache.py - тест-кейсы для модуля ./src/scheduleCache.py
+    test_scheduleIndex.py - тест-кейсы для модуля ./src/scheduleIndex.py
+    test_seleniumWaits.py - тест-кейсы для модуля ./src/seleniumWaits.py
+    test_telegramBot.py - тест-кейсы для модуля ./src/telegramBot.py
+    test_userDatabase.py - тест-кейсы для модуля ./src/userDatabase.py
+    test_userPreferences.py - тест-кейсы для модуля ./src/userPreferences.py
 
 Текстовое описание стратегии тестирования хранится в файле testing_strategy.txt
 Локальные копии веб-страниц различных организаторов квизов лежат в папке ./tests/saved_web_pages
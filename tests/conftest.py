@@ -29,7 +29,9 @@ import requests
 sys.path.insert(1, sys.path[0] + '/src')
 import config
 import dbOperations
+import httpClient
 import quizAggregator
+from quizGame import make_game
 
 # применяем глобальную конфигурацию логирования, операция должна быть выполнена при запуске приложения
 logging.config.dictConfig(config.LOGGING_CONFIG)
@@ -113,10 +115,10 @@ def quiz_from_local_files():
         pathToLocalHTML = config.ROOT_DIR / 'tests/saved_web_pages' / value
         if os.path.exists(pathToLocalHTML):
             localURI = pathToLocalHTML.as_uri()
-            # создаем сессию до локального файла с помощью кастомного адаптера LocalFileAdapter
-            requests_session = requests.session()
-            requests_session.mount('file://', LocalFileAdapter())
-            response = requests_session.get(f'file://{localURI}')
+            # запрашиваем локальный файл через общий HTTP-клиент бота, подключив к нему кастомный адаптер
+            # LocalFileAdapter в качестве транспорта для ссылок file://
+            httpClient.mount_transport('file://', LocalFileAdapter())
+            response = httpClient.fetch(localURI)
             responsesDict[key] = response
         else:
             raise FileExistsError(f'File {pathToLocalHTML} does not exist')
@@ -124,6 +126,21 @@ def quiz_from_local_files():
     return games, organizatorErrors
 
 
+@pytest.fixture(scope='session')
+@freezegun.freeze_time("2023-12-13")  # в качестве datetime.now() устанавливаем дату сохранения локального HTML файла
+def mama_quiz_from_local_files():
+    """Запрашивает расписание Мама Квиз из локальной копии страницы mamaquiz_schedule_2023-12-14.html через
+    LocalFileAdapter. Функция возвращает tulpe с содержимым (games, organizatorErrors), извлеченным из локального файла.
+    """
+    cityOrganizators = ['Оставить всех организаторов', 'Мама Квиз']
+    cityLinks = ['placeholder', 'https://nsk.mamaquiz.ru/']
+    pathToLocalHTML = config.ROOT_DIR / 'tests/saved_web_pages' / 'mamaquiz_schedule_2023-12-14.html'
+    httpClient.mount_transport('file://', LocalFileAdapter())
+    responsesDict = {'Мама Квиз': httpClient.fetch(pathToLocalHTML.as_uri())}
+    games, organizatorErrors = quizAggregator.collect_quiz_data(cityOrganizators, cityLinks, responsesDict)
+    return games, organizatorErrors
+
+
 @pytest.fixture(scope='session')
 def quiz_from_real_web_sites():
     """Запрашиваем инфорамцию по квизам с настоящих веб сайтов на время фактического запуска теста"""
@@ -146,30 +163,46 @@ def expected_games():
     Порядок организаторов должен быть в том же порядке, в каком организаторы указаны в config.ORGANIZATORS_DICT
     """
     return {
-        'qp0': {'game': 'Квиз, плиз! NSK #567', 'date': datetime.datetime(2023, 12, 14, 20, 0), 'bar': 'Арт П.А.Б.',
-                'tag': ['Классика']},
-        'qp4': {'game': 'Квиз, плиз! NSK #569', 'date': datetime.datetime(2023, 12, 19, 20, 0), 'bar': 'Арт П.А.Б.',
-                'tag': ['Классика']},
-        'qp6': {'game': 'Квиз, плиз! NSK #570', 'date': datetime.datetime(2023, 12, 21, 20, 0), 'bar': 'Арт П.А.Б.',
-                'tag': ['Классика']},
-        'li0': {'game': 'Новый год СССР', 'date': datetime.datetime(2023, 12, 18, 19, 30), 'bar': 'Три Лося',
-                'tag': ['Ностальгия']},
-        'ein2': {'game': 'Кино', 'date': datetime.datetime(2024, 1, 23, 19, 30), 'bar': 'Типография',
-                 'tag': ['Мультимедиа']},
-        'ein3': {'game': 'Нулевые (00е)', 'date': datetime.datetime(2024, 1, 28, 16, 0), 'bar': 'Типография',
-                 'tag': ['Ностальгия']},
-        'wow5': {'game': 'Обо всём. Похмельно-новогодняя #47 ', 'date': datetime.datetime(2024, 1, 2, 16, 0),
-                 'bar': 'Три Лося', 'tag': ['Классика']},
-        'wow6': {'game': 'Угадай мелодию. Русское (туры по жанрам)', 'date': datetime.datetime(2024, 1, 3, 16, 0),
-                 'bar': 'Три Лося', 'tag': ['Мультимедиа']},
-        'wow7': {'game': 'Топовые кино, мультфильмы, сериалы #4', 'date': datetime.datetime(2024, 1, 4, 16, 0),
-                 'bar': 'Три Лося', 'tag': ['Мультимедиа']},
-        'wow8': {'game': 'Советское кино #2 (туры по 5 фильмам)', 'date': datetime.datetime(2024, 1, 5, 16, 0),
-                 'bar': 'Три Лося', 'tag': ['Мультимедиа', 'Ностальгия']},
-        'wow9': {'game': 'РУсская музыка 90-х и 00-х #2', 'date': datetime.datetime(2024, 1, 6, 16, 0),
-                 'bar': 'Три Лося', 'tag': ['Мультимедиа', 'Ностальгия']},
-        'wow10': {'game': 'Гарри Поттер лайт #29 (с туром про рождество)', 'date': datetime.datetime(2024, 1, 7, 16, 0),
-                  'bar': 'Три Лося', 'tag': ['Мультимедиа']}
+        'qp0': make_game('qp', 0, 'Квиз, плиз! NSK #567', datetime.datetime(2023, 12, 14, 20, 0), 'Арт П.А.Б.',
+                         ['Классика']),
+        'qp4': make_game('qp', 4, 'Квиз, плиз! NSK #569', datetime.datetime(2023, 12, 19, 20, 0), 'Арт П.А.Б.',
+                         ['Классика']),
+        'qp6': make_game('qp', 6, 'Квиз, плиз! NSK #570', datetime.datetime(2023, 12, 21, 20, 0), 'Арт П.А.Б.',
+                         ['Классика']),
+        'li0': make_game('li', 0, 'Новый год СССР', datetime.datetime(2023, 12, 18, 19, 30), 'Три Лося',
+                         ['Ностальгия']),
+        'ein2': make_game('ein', 2, 'Кино', datetime.datetime(2024, 1, 23, 19, 30), 'Типография', ['Мультимедиа']),
+        'ein3': make_game('ein', 3, 'Нулевые (00е)', datetime.datetime(2024, 1, 28, 16, 0), 'Типография',
+                          ['Ностальгия']),
+        'wow5': make_game('wow', 5, 'Обо всём. Похмельно-новогодняя #47 ', datetime.datetime(2024, 1, 2, 16, 0),
+                          'Три Лося', ['Классика']),
+        'wow6': make_game('wow', 6, 'Угадай мелодию. Русское (туры по жанрам)', datetime.datetime(2024, 1, 3, 16, 0),
+                          'Три Лося', ['Мультимедиа']),
+        'wow7': make_game('wow', 7, 'Топовые кино, мультфильмы, сериалы #4', datetime.datetime(2024, 1, 4, 16, 0),
+                          'Три Лося', ['Мультимедиа']),
+        'wow8': make_game('wow', 8, 'Советское кино #2 (туры по 5 фильмам)', datetime.datetime(2024, 1, 5, 16, 0),
+                          'Три Лося', ['Мультимедиа', 'Ностальгия']),
+        'wow9': make_game('wow', 9, 'РУсская музыка 90-х и 00-х #2', datetime.datetime(2024, 1, 6, 16, 0), 'Три Лося',
+                          ['Мультимедиа', 'Ностальгия']),
+        'wow10': make_game('wow', 10, 'Гарри Поттер лайт #29 (с туром про рождество)',
+                           datetime.datetime(2024, 1, 7, 16, 0), 'Три Лося', ['Мультимедиа'])
+    }
+
+
+@pytest.fixture(scope='session')
+def expected_games_mama_quiz():
+    """Словарь заведомо корректных игр на основании запроса от 2023-12-13 в файл mamaquiz_schedule_2023-12-14.html.
+    Все 5 игр еще не прошли, первая из них - 13 декабря.
+    """
+    return {
+        'mama0': make_game('mama', 0, 'Квизанутый Новый год 2024', datetime.datetime(2023, 12, 13, 19, 30),
+                           'MISHKIN&MISHKIN', []),
+        'mama1': make_game('mama', 1, 'АлкоКвиз #2', datetime.datetime(2024, 1, 3, 14, 0), '"Mishkin&Mishkin"', []),
+        'mama2': make_game('mama', 2, 'Киномьюзик: Новогодний #2', datetime.datetime(2024, 1, 4, 14, 0),
+                           'MISHKIN&MISHKIN', ['Мультимедиа']),
+        'mama3': make_game('mama', 3, 'Логика где? #14', datetime.datetime(2024, 1, 5, 14, 0), 'MISHKIN&MISHKIN', []),
+        'mama4': make_game('mama', 4, 'Классика #128', datetime.datetime(2024, 1, 6, 14, 0), 'MISHKIN&MISHKIN',
+                           ['Классика'])
     }
 
 
@@ -180,26 +213,20 @@ def expected_games_2():
     Порядок организаторов должен быть в том же порядке, в каком организаторы указаны в config.ORGANIZATORS_DICT
     """
     return {
-'qp0': {'game': 'Квиз, плиз! NSK #458', 'date': datetime.datetime(2023, 1, 25, 20, 0), 'bar': 'Типография',
-        'tag': ['Классика']},
-'qp2': {'game': 'Квиз, плиз! [железные яйца] NSK #5', 'date': datetime.datetime(2023, 1, 26, 20, 0),
-        'bar': 'Руки ВВерх!', 'tag': ['Классика']},
-'qp4': {'game': '[новички] NSK #459', 'date': datetime.datetime(2023, 1, 28, 16, 0), 'bar': 'Максимилианс',
-        'tag': ['Классика', 'Новички']},
-'qp5': {'game': '[новички] NSK #459', 'date': datetime.datetime(2023, 1, 29, 16, 0), 'bar': 'Арт П.А.Б.',
-        'tag': ['Классика', 'Новички']},
-'qp6': {'game': '[кино и музыка] NSK #93', 'date': datetime.datetime(2023, 1, 29, 18, 0), 'bar': 'Максимилианс',
-        'tag': ['Мультимедиа']},
-'qp7': {'game': '[литература] NSK #3', 'date': datetime.datetime(2023, 1, 31, 20, 0), 'bar': 'Арт П.А.Б.',
-        'tag': ['Мультимедиа']},
-'li0': {'game': 'Игра №3 Сезон №7', 'date': datetime.datetime(2023, 1, 30, 19, 30), 'bar': 'Три Лося',
-        'tag': ['Классика']},
-'wow2': {'game': 'СССР vs 90ые!', 'date': datetime.datetime(2023, 1, 28, 16, 0), 'bar': 'Три Лося',
-         'tag': ['Ностальгия']},
-'wow3': {'game': 'Черный квиз 18+ #2', 'date': datetime.datetime(2023, 1, 29, 18, 0), 'bar': 'Три Лося',
-         'tag': ['18+']},
-'wow17': {'game': '18+ #16 За гранью приличия', 'date': datetime.datetime(2023, 2, 19, 18, 0), 'bar': 'Три Лося',
-          'tag': ['18+']}
+'qp0': make_game('qp', 0, 'Квиз, плиз! NSK #458', datetime.datetime(2023, 1, 25, 20, 0), 'Типография', ['Классика']),
+'qp2': make_game('qp', 2, 'Квиз, плиз! [железные яйца] NSK #5', datetime.datetime(2023, 1, 26, 20, 0), 'Руки ВВерх!',
+                 ['Классика']),
+'qp4': make_game('qp', 4, '[новички] NSK #459', datetime.datetime(2023, 1, 28, 16, 0), 'Максимилианс',
+                 ['Классика', 'Новички']),
+'qp5': make_game('qp', 5, '[новички] NSK #459', datetime.datetime(2023, 1, 29, 16, 0), 'Арт П.А.Б.',
+                 ['Классика', 'Новички']),
+'qp6': make_game('qp', 6, '[кино и музыка] NSK #93', datetime.datetime(2023, 1, 29, 18, 0), 'Максимилианс',
+                 ['Мультимедиа']),
+'qp7': make_game('qp', 7, '[литература] NSK #3', datetime.datetime(2023, 1, 31, 20, 0), 'Арт П.А.Б.', ['Мультимедиа']),
+'li0': make_game('li', 0, 'Игра №3 Сезон №7', datetime.datetime(2023, 1, 30, 19, 30), 'Три Лося', ['Классика']),
+'wow2': make_game('wow', 2, 'СССР vs 90ые!', datetime.datetime(2023, 1, 28, 16, 0), 'Три Лося', ['Ностальгия']),
+'wow3': make_game('wow', 3, 'Черный квиз 18+ #2', datetime.datetime(2023, 1, 29, 18, 0), 'Три Лося', ['18+']),
+'wow17': make_game('wow', 17, '18+ #16 За гранью приличия', datetime.datetime(2023, 2, 19, 18, 0), 'Три Лося', ['18+'])
 }
 
 
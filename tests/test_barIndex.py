@@ -0,0 +1,59 @@
+"""
+Тест-кейсы для модуля ./src/barIndex.py для pytest.
+
+Содержит классы:
+    TestFoldBarName
+        test_punctuation_folded(self)
+
+    TestBarIndex
+        test_bar_from_city_dict(self)
+        test_bars_of_other_city(self)
+        test_result_is_memoized(self)
+        test_unknown_bars_counted(self)
+"""
+
+import barIndex
+
+
+class TestFoldBarName:
+    """Класс для тестирования функции barIndex.fold_bar_name()"""
+
+    def test_punctuation_folded(self):
+        """Название приводится к нижнему регистру, знаки препинания и повторяющиеся пробелы заменяются одним пробелом"""
+        assert barIndex.fold_bar_name('Арт П.А.Б.') == 'арт п а б'
+        assert barIndex.fold_bar_name('Harat`s  pub') == barIndex.fold_bar_name("Harat's pub") == 'harat s pub'
+
+
+class TestBarIndex:
+    """Класс для тестирования класса barIndex.BarIndex"""
+
+    def test_bar_from_city_dict(self):
+        """Название бара приводится к написанию из config.CITY_DICT, даже если на сайте знаки препинания другие"""
+        index = barIndex.BarIndex('Новосибирск')
+        assert index.normalize('Бар Три Лося') == 'Три лося'
+        assert index.normalize('Harat`s pub') == "Harat's pub"
+        assert index.normalize('Арт П.А.Б') == 'Арт П.А.Б.'
+        assert index.get_unknown() == {}
+
+    def test_bars_of_other_city(self):
+        """Бары нормализуются по config.CITY_DICT переданного города, а не Новосибирска"""
+        novosibirsk = barIndex.BarIndex('Новосибирск')
+        kemerovo = barIndex.BarIndex('Кемерово')
+        assert kemerovo.normalize('Бар Мюнхен') == 'Мюнхен'
+        assert novosibirsk.normalize('Бар Мюнхен') == 'Бар Мюнхен'
+        assert kemerovo.normalize('Бар Три Лося') == 'Бар Три Лося'
+
+    def test_result_is_memoized(self):
+        """Одно и то же название с сайта разбирается один раз"""
+        index = barIndex.BarIndex('Новосибирск')
+        index.normalize('Бар Три Лося')
+        index.bars = ()
+        assert index.normalize('Бар Три Лося') == 'Три лося'
+
+    def test_unknown_bars_counted(self):
+        """Названия баров, которых нет в config.CITY_DICT, остаются как есть и подсчитываются"""
+        index = barIndex.BarIndex('Новосибирск')
+        for bar in ['MISHKIN&MISHKIN', 'Три Лося', 'MISHKIN&MISHKIN', 'Бар #5']:
+            index.normalize(bar)
+        assert index.normalize('MISHKIN&MISHKIN') == 'MISHKIN&MISHKIN'
+        assert index.get_unknown() == {'MISHKIN&MISHKIN': 3, 'Бар #5': 1}
@@ -0,0 +1,263 @@
+"""
+Тест-кейсы для модуля ./src/browserPool.py для pytest.
+Вместо настоящего Google Chrome пул запускает фейковые браузеры FakeDriver. Для проверки поиска процессов-сирот
+запускаются настоящие процессы с именем chromedriver - копии системной утилиты sleep.
+
+Содержит классы:
+    TestCheckout
+        test_browser_is_reused(self)
+        test_pool_size_is_limited(self)
+        test_waiting_thread_gets_returned_browser(self)
+        test_idle_crashed_browser_is_replaced(self)
+        test_health_check_does_not_block_pool(self)
+
+    TestCheckin
+        test_browser_recycled_after_max_uses(self)
+        test_crashed_browser_is_recycled(self)
+        test_failed_scrape_quits_browser(self)
+        test_leftover_processes_are_killed(self, fake_chromedriver)
+        test_close_quits_browsers(self)
+
+    TestReapOrphans
+        test_orphan_is_killed(self, pool, fake_chromedriver)
+        test_pool_browser_is_kept(self, fake_chromedriver)
+        test_no_browser_started_during_reap(self, pool, created_drivers)
+"""
+
+import shutil
+import subprocess
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import browserPool
+
+
+class FakeDriver:
+    """Фейковый браузер: отвечает на команды, пока не 'упадет', и запоминает, что его закрыли.
+    Если передан процесс, то он используется как процесс chromedriver этого браузера."""
+    def __init__(self, process=None):
+        self.crashed = False
+        self.quitted = False
+        self.pages = []
+        if process is not None:
+            self.service = SimpleNamespace(process=process)
+
+    def execute_script(self, script):
+        if self.crashed:
+            raise ConnectionError('browser crashed')
+        return 1
+
+    def delete_all_cookies(self):
+        if self.crashed:
+            raise ConnectionError('browser crashed')
+
+    def get(self, url):
+        if self.crashed:
+            raise ConnectionError('browser crashed')
+        self.pages.append(url)
+
+    def quit(self):
+        self.quitted = True
+
+
+@pytest.fixture()
+def fake_chromedriver(tmp_path):
+    """Возвращает функцию, которая запускает дочерний процесс с именем chromedriver. После теста процессы завершаются"""
+    executable = tmp_path / 'chromedriver'
+    shutil.copy(shutil.which('sleep'), executable)
+    processes = []
+
+    def start():
+        process = subprocess.Popen([str(executable), '30'])
+        processes.append(process)
+        return process
+
+    yield start
+    for process in processes:
+        process.kill()
+        process.wait()
+
+
+@pytest.fixture()
+def created_drivers():
+    """Список фейковых браузеров, запущенных пулом"""
+    return []
+
+
+@pytest.fixture()
+def pool(created_drivers):
+    """Пул на 2 браузера, который перезапускает браузер после 3 использований"""
+    def factory():
+        driver = FakeDriver()
+        created_drivers.append(driver)
+        return driver
+    return browserPool.BrowserPool(size=2, maxUses=3, driverFactory=factory)
+
+
+class TestCheckout:
+    """Класс для тестирования метода BrowserPool.checkout()"""
+
+    def test_browser_is_reused(self, pool, created_drivers):
+        """Возвращенный в пул браузер используется повторно, новый браузер не запускается"""
+        driver = pool.checkout()
+        pool.checkin(driver)
+        assert pool.checkout() is driver
+        assert len(created_drivers) == 1
+        assert driver.pages == ['about:blank']
+
+    def test_pool_size_is_limited(self, pool, created_drivers):
+        """Пул не запускает больше size браузеров, при нехватке браузеров checkout завершается по таймауту"""
+        pool.checkout()
+        pool.checkout()
+        with pytest.raises(TimeoutError):
+            pool.checkout(timeout=0.1)
+        assert len(created_drivers) == 2
+        assert pool.get_stats()['running'] == 2
+
+    def test_waiting_thread_gets_returned_browser(self, pool):
+        """Поток, ожидающий свободный браузер, получает браузер, который вернул другой поток"""
+        first = pool.checkout()
+        pool.checkout()
+        received = []
+        waiter = threading.Thread(target=lambda: received.append(pool.checkout(timeout=5)))
+        waiter.start()
+        pool.checkin(first)
+        waiter.join(timeout=5)
+        assert received == [first]
+
+    def test_idle_crashed_browser_is_replaced(self, pool, created_drivers):
+        """Браузер, который упал пока лежал в пуле, закрывается, а вместо него запускается новый"""
+        driver = pool.checkout()
+        pool.checkin(driver)
+        driver.crashed = True
+        newDriver = pool.checkout()
+        assert newDriver is not driver
+        assert driver.quitted
+        assert len(created_drivers) == 2
+
+    def test_health_check_does_not_block_pool(self, pool):
+        """Пока браузер из пула долго отвечает на проверку, другие потоки могут работать с пулом"""
+        driver = pool.checkout()
+        pool.checkin(driver)
+        checkStarted = threading.Event()
+        releaseCheck = threading.Event()
+
+        def hanging_execute_script(script):
+            checkStarted.set()
+            releaseCheck.wait(5)
+            return 1
+
+        driver.execute_script = hanging_execute_script
+        received = []
+        checker = threading.Thread(target=lambda: received.append(pool.checkout()))
+        checker.start()
+        assert checkStarted.wait(5)
+        # пул не заблокирован проверкой: статистика доступна, а второй браузер можно взять
+        assert pool.get_stats()['running'] == 1
+        other = pool.checkout(timeout=1)
+        assert other is not driver
+        releaseCheck.set()
+        checker.join(timeout=5)
+        assert received == [driver]
+
+
+class TestCheckin:
+    """Класс для тестирования методов BrowserPool.checkin() и BrowserPool.close()"""
+
+    def test_browser_recycled_after_max_uses(self, pool, created_drivers):
+        """После maxUses использований браузер закрывается и следующий checkout запускает новый браузер"""
+        driver = pool.checkout()
+        for i in range(2):
+            pool.checkin(driver)
+            assert pool.checkout() is driver
+        pool.checkin(driver)
+        assert driver.quitted
+        assert pool.checkout() is not driver
+        assert pool.get_stats()['recycled'] == 1
+
+    def test_crashed_browser_is_recycled(self, pool):
+        """Упавший во время скрейпинга браузер не возвращается в пул и освобождает место для нового"""
+        driver = pool.checkout()
+        driver.crashed = True
+        pool.checkin(driver)
+        assert driver.quitted
+        stats = pool.get_stats()
+        assert stats['running'] == 0 and stats['idle'] == 0
+
+    def test_failed_scrape_quits_browser(self, pool):
+        """Браузер, скрейпинг с которым завершился ошибкой, закрывается, даже если он отвечает на команды"""
+        driver = pool.checkout()
+        pool.checkin(driver, failed=True)
+        assert driver.quitted
+        assert pool.checkout() is not driver
+
+    def test_leftover_processes_are_killed(self, fake_chromedriver):
+        """Процессы, оставшиеся после driver.quit(), завершаются принудительно"""
+        process = fake_chromedriver()
+        pool = browserPool.BrowserPool(size=1, driverFactory=lambda: FakeDriver(process))
+        driver = pool.checkout()
+        pool.checkin(driver, failed=True)
+        # FakeDriver.quit() не завершает свой процесс, это сделал пул
+        assert process.poll() is not None
+        assert pool.get_stats()['killedOnQuit'] == 1
+
+    def test_close_quits_browsers(self, pool):
+        """close() закрывает свободные браузеры сразу, а занятые - при возврате в пул"""
+        idleDriver = pool.checkout()
+        busyDriver = pool.checkout()
+        pool.checkin(idleDriver)
+        pool.close()
+        assert idleDriver.quitted and not busyDriver.quitted
+        pool.checkin(busyDriver)
+        assert busyDriver.quitted
+        with pytest.raises(RuntimeError):
+            pool.checkout()
+
+
+class TestReapOrphans:
+    """Класс для тестирования метода BrowserPool.reap_orphans()"""
+
+    def test_orphan_is_killed(self, pool, fake_chromedriver):
+        """Дочерний процесс chromedriver, который не принадлежит ни одному браузеру пула, завершается"""
+        orphan = fake_chromedriver()
+        assert pool.reap_orphans() == 1
+        assert orphan.poll() is not None
+        stats = pool.get_stats()
+        assert stats['leaked'] == 1 and stats['reaped'] == 1
+
+    def test_pool_browser_is_kept(self, fake_chromedriver):
+        """Процессы браузеров пула, в том числе занятых скрейпингом, не завершаются"""
+        processes = [fake_chromedriver(), fake_chromedriver()]
+        drivers = iter([FakeDriver(process) for process in processes])
+        pool = browserPool.BrowserPool(size=2, driverFactory=lambda: next(drivers))
+        idleDriver = pool.checkout()
+        busyDriver = pool.checkout()
+        pool.checkin(idleDriver)
+        assert pool.reap_orphans() == 0
+        assert processes[0].poll() is None and processes[1].poll() is None
+
+    def test_no_browser_started_during_reap(self, pool, created_drivers):
+        """Пока ищутся процессы-сироты, новый браузер не запускается, поэтому его процессы не будут приняты за сирот"""
+        listingStarted = threading.Event()
+        releaseListing = threading.Event()
+
+        def slow_children(recursive):
+            listingStarted.set()
+            releaseListing.wait(5)
+            return []
+
+        reaper = threading.Thread(target=pool.reap_orphans, args=(SimpleNamespace(children=slow_children),))
+        reaper.start()
+        assert listingStarted.wait(5)
+        with pytest.raises(TimeoutError):
+            pool.checkout(timeout=0.1)
+        assert created_drivers == []
+        received = []
+        waiter = threading.Thread(target=lambda: received.append(pool.checkout(timeout=5)))
+        waiter.start()
+        releaseListing.set()
+        reaper.join(timeout=5)
+        waiter.join(timeout=5)
+        assert received == created_drivers and len(created_drivers) == 1
@@ -15,7 +15,14 @@
     test_insert_existing_user()
     test_insert_new_incorrect_user()
     test_insert_new_user()
+    test_migrate_user_preferences()
+    test_migrate_user_preferences_without_city()
+    test_sqlite_profile(tmp_path)
     test_update_user_preferences()
+    test_update_user_replaces_exclusions()
+    test_upsert_user_preferences()
+    test_upsert_user_preferences_batch()
+    test_upsert_user_preferences_without_on_conflict(monkeypatch)
     test_update_user_with_incorrect_preferences()
 """
 
@@ -109,6 +116,114 @@ def test_update_user_with_incorrect_preferences():
     assert not updatedUserPreferences
 
 
+def test_update_user_replaces_exclusions():
+    """Проверяет, что исключения хранятся по строке на название и заменяются целиком при обновлении"""
+    from sqlalchemy import select
+    engine, conn = dbOperations.create_connection('sqlite://')
+    dbOperations.create_table(engine)
+    dbOperations.insert_new_user(conn, telegramId, city, 'Типография;Арт П.А.Б.', 'None', excl_org)
+    assert dbOperations.update_user_preferences(conn, telegramId, city, 'Типография', '18+', 'None')
+    assert not dbOperations.update_user_preferences(conn, telegramId + 100, city, 'None', 'None', 'None')
+
+    stmt = select(dbOperations.userExclusions.c.kind, dbOperations.userExclusions.c.name)
+    assert sorted(conn.execute(stmt).fetchall()) == [('bar', 'Типография'), ('theme', '18+')]
+    assert dbOperations.get_user_preferences(conn, telegramId) == (telegramId, city, 'Типография', '18+', 'None')
+
+
+def test_upsert_user_preferences():
+    """Проверяет, что upsert добавляет нового пользователя и обновляет существующего, заменяя его исключения"""
+    engine, conn = dbOperations.create_connection('sqlite://')
+    dbOperations.create_table(engine)
+    assert dbOperations.upsert_user_preferences(conn, telegramId, city, 'Типография;Арт П.А.Б.', 'None', excl_org)
+    assert dbOperations.upsert_user_preferences(conn, telegramId, city_update, 'Типография', '18+', 'None')
+    expected = (telegramId, city_update, 'Типография', '18+', 'None')
+    assert dbOperations.get_user_preferences(conn, telegramId) == expected
+    assert not dbOperations.upsert_user_preferences(conn, telegramId, wrong_param, excl_bar, excl_theme, excl_org)
+    assert dbOperations.get_user_preferences(conn, telegramId) == expected
+
+
+def test_upsert_user_preferences_batch():
+    """Проверяет сохранение нескольких пользователей одной транзакцией: для повторяющегося пользователя сохраняется
+    последняя запись, при ошибке не сохраняется ничего"""
+    engine, conn = dbOperations.create_connection('sqlite://')
+    dbOperations.create_table(engine)
+    dbOperations.insert_new_user(conn, 1, city, 'Типография', 'None', 'None')
+    rows = [(n, city, f'Бар {n}', 'None', 'None') for n in range(1, 1201)] + [(1, city_update, 'None', '18+', 'None')]
+    assert dbOperations.upsert_user_preferences_batch(conn, rows)
+    assert dbOperations.get_user_preferences(conn, 1) == (1, city_update, 'None', '18+', 'None')
+    assert dbOperations.get_user_preferences(conn, 1200) == (1200, city, 'Бар 1200', 'None', 'None')
+
+    assert not dbOperations.upsert_user_preferences_batch(conn, [(2, city_update, 'None', 'None', 'None'),
+                                                                 (3, wrong_param, 'None', 'None', 'None')])
+    assert dbOperations.get_user_preferences(conn, 2) == (2, city, 'Бар 2', 'None', 'None')
+
+
+def test_upsert_user_preferences_without_on_conflict(monkeypatch):
+    """Проверяет, что для СУБД без INSERT ... ON CONFLICT пользователи добавляются и обновляются UPDATE и INSERT
+    запросами"""
+    engine, conn = dbOperations.create_connection('sqlite://')
+    dbOperations.create_table(engine)
+    monkeypatch.setattr(conn.dialect, 'name', 'mssql')
+    assert dbOperations._upsert_users_stmt(conn) is None
+    dbOperations.insert_new_user(conn, 1, city, 'Типография', 'None', 'None')
+    assert dbOperations.upsert_user_preferences_batch(conn, [(1, city_update, 'None', '18+', 'None'),
+                                                             (2, city, 'Бар 2', 'None', 'None')])
+    assert dbOperations.get_user_preferences(conn, 1) == (1, city_update, 'None', '18+', 'None')
+    assert dbOperations.get_user_preferences(conn, 2) == (2, city, 'Бар 2', 'None', 'None')
+
+
+def test_migrate_user_preferences():
+    """Проверяет перенос пользователей из прежней таблицы user_preferences при создании таблиц"""
+    from sqlalchemy import insert, inspect
+    engine, conn = dbOperations.create_connection('sqlite://')
+    dbOperations.legacyUserPreferences.create(engine)
+    conn.execute(insert(dbOperations.legacyUserPreferences), [
+        {'telegram_id': 1, 'city': city, 'exclude_bar': 'Типография;Арт П.А.Б.', 'exclude_theme': 'None',
+         'exclude_org': excl_org},
+        {'telegram_id': 2, 'city': city_update, 'exclude_bar': 'None', 'exclude_theme': 'None',
+         'exclude_org': 'None'},
+    ])
+
+    dbOperations.create_table(engine)
+    assert not inspect(engine).has_table('user_preferences')
+    assert dbOperations.get_user_preferences(conn, 1) == (1, city, 'Арт П.А.Б.;Типография', 'None', excl_org)
+    assert dbOperations.get_user_preferences(conn, 2) == (2, city_update, 'None', 'None', 'None')
+    assert dbOperations.migrate_user_preferences(engine) == 0
+
+
+def test_migrate_user_preferences_without_city():
+    """Проверяет, что пользователь без города в прежней таблице не переносится и не мешает перенести остальных"""
+    from sqlalchemy import insert, inspect
+    engine, conn = dbOperations.create_connection('sqlite://')
+    dbOperations.legacyUserPreferences.create(engine)
+    conn.execute(insert(dbOperations.legacyUserPreferences), [
+        {'telegram_id': 1, 'city': None, 'exclude_bar': 'Типография', 'exclude_theme': 'None', 'exclude_org': 'None'},
+        {'telegram_id': 2, 'city': city, 'exclude_bar': 'None', 'exclude_theme': '18+', 'exclude_org': 'None'},
+    ])
+
+    dbOperations.create_table(engine)
+    assert not inspect(engine).has_table('user_preferences')
+    assert dbOperations.get_user_preferences(conn, 1) is None
+    assert dbOperations.get_user_preferences(conn, 2) == (2, city, 'None', '18+', 'None')
+
+
+def test_sqlite_profile(tmp_path):
+    """Проверяет, что PRAGMA из профиля применяются к каждому подключению пула, а пустой профиль их не меняет"""
+    profile = {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'busy_timeout': 1234, 'cached_statements': 16}
+    engine = dbOperations.create_pooled_engine(f'sqlite:///{tmp_path}/profile.db', poolSize=2, sqliteProfile=profile)
+    with engine.connect() as first, engine.connect() as second:
+        for conn in [first, second]:
+            assert conn.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+            assert conn.exec_driver_sql('PRAGMA synchronous').scalar() == 1  # NORMAL
+            assert conn.exec_driver_sql('PRAGMA busy_timeout').scalar() == 1234
+    engine.dispose()
+
+    engine, conn = dbOperations.create_connection(f'sqlite:///{tmp_path}/default.db', sqliteProfile={})
+    assert conn.exec_driver_sql('PRAGMA journal_mode').scalar() == 'delete'
+    conn.close()
+    engine.dispose()
+
+
 def test_delete_user_with_wrongId():
     """Проверяет удаление несуществующего пользователя"""
     deleteUser = dbOperations.delete_user(testConn, wrong_param)
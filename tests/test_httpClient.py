@@ -0,0 +1,215 @@
+"""
+Тест-кейсы для модуля ./src/httpClient.py для pytest.
+Вместо сети к общей сессии подключается фейковый транспорт RecordingAdapter, который запоминает запросы.
+
+Содержит классы:
+    TestGetSession
+        test_session_is_shared(self)
+        test_pool_is_limited_per_host(self)
+
+    TestFetch
+        test_default_timeout_and_encoding(self)
+        test_custom_headers(self)
+        test_http_error(self)
+
+    TestFetchConditional
+        test_first_request_downloads_page(self, conditional_adapter)
+        test_not_modified_returns_cached_page(self, conditional_adapter)
+        test_changed_page_is_downloaded(self, conditional_adapter)
+        test_page_without_validators_is_not_cached(self, conditional_adapter)
+        test_page_losing_validators_is_removed_from_cache(self, conditional_adapter)
+        test_not_modified_without_cached_page_is_retried(self, conditional_adapter)
+        test_repeated_not_modified_without_cached_page(self, conditional_adapter)
+"""
+
+import pytest
+import requests
+
+import config
+import httpClient
+
+
+class RecordingAdapter(requests.adapters.BaseAdapter):
+    """Фейковый транспорт для requests: запоминает запросы и возвращает ответ с заданным HTTP-статусом"""
+    def __init__(self, statusCode=200):
+        super().__init__()
+        self.statusCode = statusCode
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append((request, kwargs))
+        response = requests.Response()
+        response.status_code = self.statusCode
+        response.url = request.url
+        response.request = request
+        response._content = b'<html></html>'
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture()
+def recording_adapter():
+    """Подключает RecordingAdapter к общей сессии для ссылок mock://"""
+    adapter = RecordingAdapter()
+    httpClient.mount_transport('mock://', adapter)
+    return adapter
+
+
+class ConditionalAdapter(requests.adapters.BaseAdapter):
+    """Фейковый транспорт, который ведет себя как сайт с поддержкой ETag: отвечает 304 на If-None-Match с текущим
+    ETag страницы, иначе отдает страницу целиком"""
+    def __init__(self):
+        super().__init__()
+        self.body = b'<html>v1</html>'
+        self.etag = '"v1"'
+        # на сколько следующих запросов ответить 304, даже если запрос безусловный
+        self.forcedNotModified = 0
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        response.encoding = 'utf-8'
+        if self.etag is not None:
+            response.headers['ETag'] = self.etag
+        if self.forcedNotModified:
+            self.forcedNotModified -= 1
+            response.status_code = 304
+            response._content = b''
+        elif self.etag is not None and request.headers.get('If-None-Match') == self.etag:
+            response.status_code = 304
+            response._content = b''
+        else:
+            response.status_code = 200
+            response._content = self.body
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture()
+def conditional_adapter(tmp_path, monkeypatch):
+    """Подключает ConditionalAdapter к общей сессии для ссылок cond:// и переносит дисковый кэш во временную папку"""
+    monkeypatch.setattr(httpClient, 'HTTP_CACHE_DIR', tmp_path)
+    adapter = ConditionalAdapter()
+    httpClient.mount_transport('cond://', adapter)
+    return adapter
+
+
+class TestGetSession:
+    """Класс для тестирования функции httpClient.get_session()"""
+
+    def test_session_is_shared(self):
+        """Повторные вызовы возвращают одну и ту же сессию, после close_session() создается новая"""
+        session = httpClient.get_session()
+        assert httpClient.get_session() is session
+        httpClient.close_session()
+        assert httpClient.get_session() is not session
+
+    def test_pool_is_limited_per_host(self):
+        """Размер пула соединений к одному хосту ограничен config.HTTP_POOL_MAXSIZE"""
+        adapter = httpClient.get_session().get_adapter('https://ligaindigo.ru/novosibirsk')
+        assert adapter._pool_maxsize == config.HTTP_POOL_MAXSIZE
+        assert adapter._pool_block is True
+
+
+class TestFetch:
+    """Класс для тестирования функции httpClient.fetch()"""
+
+    def test_default_timeout_and_encoding(self, recording_adapter):
+        """Запрос уходит с таймаутом из config.HTTP_TIMEOUT и просит сжатый ответ"""
+        res = httpClient.fetch('mock://test.local/schedule')
+        request, kwargs = recording_adapter.requests[0]
+        assert res.text == '<html></html>'
+        assert kwargs['timeout'] == config.HTTP_TIMEOUT
+        assert 'gzip' in request.headers['Accept-Encoding']
+
+    def test_custom_headers(self, recording_adapter):
+        """Дополнительные заголовки добавляются к заголовкам сессии"""
+        httpClient.fetch('mock://test.local/schedule', headers={'User-agent': 'test'})
+        request, kwargs = recording_adapter.requests[0]
+        assert request.headers['User-agent'] == 'test'
+        assert 'gzip' in request.headers['Accept-Encoding']
+
+    def test_http_error(self):
+        """При HTTP-статусе ошибки fetch выбрасывает исключение, как раньше res.raise_for_status()"""
+        httpClient.mount_transport('mock://', RecordingAdapter(statusCode=404))
+        with pytest.raises(requests.HTTPError):
+            httpClient.fetch('mock://test.local/schedule')
+
+
+class TestFetchConditional:
+    """Класс для тестирования функции httpClient.fetch_conditional()"""
+
+    def test_first_request_downloads_page(self, conditional_adapter):
+        """Первый запрос уходит без условных заголовков и скачивает страницу целиком"""
+        res = httpClient.fetch_conditional('cond://test.local/schedule')
+        assert 'If-None-Match' not in conditional_adapter.requests[0].headers
+        assert res.notModified is False
+        assert res.text == '<html>v1</html>'
+
+    def test_not_modified_returns_cached_page(self, conditional_adapter):
+        """Повторный запрос отправляет ETag, а на ответ 304 возвращается сохраненная на диске страница"""
+        before = httpClient.get_cache_stats()
+        httpClient.fetch_conditional('cond://test.local/schedule')
+        res = httpClient.fetch_conditional('cond://test.local/schedule')
+        after = httpClient.get_cache_stats()
+        assert conditional_adapter.requests[1].headers['If-None-Match'] == '"v1"'
+        assert res.status_code == 304
+        assert res.notModified is True
+        assert res.text == '<html>v1</html>'
+        assert after['notModified'] - before['notModified'] == 1
+        assert after['downloaded'] - before['downloaded'] == 1
+
+    def test_changed_page_is_downloaded(self, conditional_adapter):
+        """Если страница изменилась, то она скачивается заново и заменяет собой версию в дисковом кэше"""
+        httpClient.fetch_conditional('cond://test.local/schedule')
+        conditional_adapter.body, conditional_adapter.etag = b'<html>v2</html>', '"v2"'
+        res = httpClient.fetch_conditional('cond://test.local/schedule')
+        assert res.notModified is False
+        assert res.text == '<html>v2</html>'
+        res = httpClient.fetch_conditional('cond://test.local/schedule')
+        assert res.notModified is True
+        assert res.text == '<html>v2</html>'
+
+    def test_page_without_validators_is_not_cached(self, conditional_adapter):
+        """Страница без ETag и Last-Modified не сохраняется на диск и каждый раз скачивается заново"""
+        conditional_adapter.etag = None
+        httpClient.fetch_conditional('cond://test.local/schedule')
+        res = httpClient.fetch_conditional('cond://test.local/schedule')
+        assert 'If-None-Match' not in conditional_adapter.requests[1].headers
+        assert res.notModified is False
+
+    def test_page_losing_validators_is_removed_from_cache(self, conditional_adapter):
+        """Если страница пришла без ETag и Last-Modified, то её прежняя версия удаляется из дискового кэша"""
+        httpClient.fetch_conditional('cond://test.local/schedule')
+        conditional_adapter.body, conditional_adapter.etag = b'<html>v2</html>', None
+        httpClient.fetch_conditional('cond://test.local/schedule')
+        assert list(httpClient.HTTP_CACHE_DIR.iterdir()) == []
+        conditional_adapter.etag = '"v2"'
+        res = httpClient.fetch_conditional('cond://test.local/schedule')
+        assert 'If-None-Match' not in conditional_adapter.requests[2].headers
+        assert res.text == '<html>v2</html>'
+
+    def test_not_modified_without_cached_page_is_retried(self, conditional_adapter):
+        """На ответ 304 без сохраненной страницы запрос повторяется без условных заголовков, пустое тело не
+        возвращается"""
+        conditional_adapter.forcedNotModified = 1
+        res = httpClient.fetch_conditional('cond://test.local/schedule', headers={'If-None-Match': '"v0"'})
+        assert len(conditional_adapter.requests) == 2
+        assert 'If-None-Match' not in conditional_adapter.requests[1].headers
+        assert conditional_adapter.requests[1].headers['Cache-Control'] == 'no-cache'
+        assert res.status_code == 200
+        assert res.notModified is False
+        assert res.text == '<html>v1</html>'
+
+    def test_repeated_not_modified_without_cached_page(self, conditional_adapter):
+        """Если сайт отвечает 304 и на безусловный запрос, то поднимается исключение requests.HTTPError"""
+        conditional_adapter.forcedNotModified = 2
+        with pytest.raises(requests.HTTPError):
+            httpClient.fetch_conditional('cond://test.local/schedule')
@@ -20,15 +20,57 @@
         test_tag_is_not_classic(self, gamename)
         test_tag_is_not_multimedia(self, gamename)
         test_tag_with_None_input(self)
+        test_cached_tags_are_not_shared(self)
+        test_mapping_changed_at_runtime(self)
+        test_stale_version_uses_its_classifier(self)
+        test_removed_version_uses_current_classifier(self)
 
     TestCollectQuizData
         test_mock_game_params(self, quiz_from_local_files, expected_games, gameParam)
         test_mock_intented_org_error(self)
         test_mock_nonexistent_org(self)
         test_mock_number_of_games(self, quiz_from_local_files)
+        test_mock_not_modified_page_is_not_parsed(self)
+        test_mock_orgs_scraped_concurrently(self)
         test_real_games_collected_some_games(self, quiz_from_real_web_sites)
         test_real_games_no_organizator_errors(self, quiz_from_real_web_sites)
 
+    TestParseWebPage
+        test_mock_strainer_keeps_only_schedule(self)
+        test_mock_encoding_from_headers(self)
+
+    TestScrapeEinsteinParty
+        test_mock_saved_page(self)
+
+    TestScrapeShakerQuiz
+        test_mock_next_data(self)
+        test_mock_first_venue_of_game(self)
+        test_mock_no_next_data(self)
+
+    TestScrapeQuizPlease
+        test_mock_saved_page(self)
+        test_mock_current_layout(self)
+
+    TestScrapeWowQuiz
+        test_mock_saved_page(self)
+        test_mock_current_layout(self)
+
+    TestScrapeOrganizatorInBrowser
+        test_mock_browser_fallback_when_no_games(self)
+        test_mock_no_browser_when_games_found(self)
+
+    TestScrapeMamaQuiz
+        test_mock_game_params(self, mama_quiz_from_local_files, expected_games_mama_quiz)
+        test_mock_past_games_dropped(self)
+        test_mock_card_without_popup(self)
+
+    TestCollectQuizDataAsync
+        test_event_loop_not_blocked(self)
+
+    TestRenderQuizFragment
+        test_fragment_format(self)
+        test_fragment_with_availability(self)
+
     TestCreateFormattedQuizList
         test_dow_1_to_5(self, expected_games)
         test_dow_6_to_7(self, expected_games)
@@ -45,12 +87,19 @@
         test_wrong_kwargs(self, expected_games)
 """
 
+import asyncio
 import datetime
+import json
+import time
 from unittest.mock import patch
 
+import bs4
 import pytest
+import requests
 
+import config
 import quizAggregator
+from quizGame import make_game
 
 class TestCreateInfoByCity:
     """Класс для тестирования функции quizAggregator.create_info_by_city()"""
@@ -200,6 +249,50 @@ class TestAssignThemesToQuiz:
         assert '18+' in tags
 
 
+    def test_cached_tags_are_not_shared(self):
+        """Повторный вызов с тем же названием возвращает равный, но отдельный список тематик"""
+        tags = quizAggregator.assign_themes_to_quiz('Кино и музыка СССР #6', '')
+        tags.append('Новички')
+        assert quizAggregator.assign_themes_to_quiz('Кино и музыка СССР #6', '') == ['Мультимедиа', 'Ностальгия']
+
+
+    def test_mapping_changed_at_runtime(self):
+        """После изменения config.THEME_MAPPING_DICT классификатор перекомпилируется при следующем скрейпинге, старые
+        тематики не используются"""
+        assert 'Новички' not in quizAggregator.assign_themes_to_quiz('Разминка #3', '')
+        with patch.dict(quizAggregator.THEME_MAPPING_DICT, {'Новички': ['новички', 'разминка']}):
+            quizAggregator.collect_quiz_data([], [])
+            assert 'Новички' in quizAggregator.assign_themes_to_quiz('Разминка #3', '')
+        quizAggregator.collect_quiz_data([], [])
+        assert 'Новички' not in quizAggregator.assign_themes_to_quiz('Разминка #3', '')
+
+
+    def test_stale_version_uses_its_classifier(self):
+        """classify_themes(), вызванная с версией, полученной до перекомпиляции, использует классификатор этой версии"""
+        version = quizAggregator.get_theme_classifier()[0]
+        with patch.dict(quizAggregator.THEME_MAPPING_DICT, {'Новички': ['новички', 'разминка']}):
+            newVersion = quizAggregator.get_theme_classifier(checkMapping=True)[0]
+            assert newVersion == version + 1
+            assert 'Новички' not in quizAggregator.classify_themes('Разминка #4', '', version)
+            assert 'Новички' in quizAggregator.classify_themes('Разминка #4', '', newVersion)
+        quizAggregator.get_theme_classifier(checkMapping=True)
+
+
+    def test_removed_version_uses_current_classifier(self):
+        """Для версии классификатора, которая уже удалена, тематики определяются текущей версией и запоминаются под
+        ней"""
+        version = quizAggregator.get_theme_classifier()[0]
+        with patch.dict(quizAggregator.THEME_MAPPING_DICT, {'Новички': ['новички', 'разминка']}):
+            quizAggregator.get_theme_classifier(checkMapping=True)
+        currentVersion = quizAggregator.get_theme_classifier(checkMapping=True)[0]
+        assert version not in quizAggregator.THEME_CLASSIFIER_VERSIONS
+        quizAggregator.classify_themes.cache_clear()
+        assert quizAggregator.classify_themes('Разминка #5', '', version) == ()
+        assert quizAggregator.classify_themes.cache_info().currsize == 2
+        assert quizAggregator.classify_themes('Разминка #5', '', currentVersion) == ()
+        assert quizAggregator.classify_themes.cache_info().hits == 1
+
+
 class TestCollectQuizData:
     """Класс для тестирования функции quizAggregator.collect_quiz_data()"""
 
@@ -232,11 +325,11 @@ class TestCollectQuizData:
         localQuizes = quiz_from_local_files[0]
         assert len(localQuizes) == expected
 
-    @pytest.mark.parametrize('gameParam', ['game', 'date', 'bar', 'tag'])
+    @pytest.mark.parametrize('gameParam', ['name', 'date', 'bar', 'tags'])
     def test_mock_game_params(self, quiz_from_local_files, expected_games, gameParam):
         """Проверяем что названия игр извлеклись правильно, сравнивая с эталонными значениями"""
-        expectedGameParams = [value[gameParam] for key, value in expected_games.items()]
-        returnedGameParams = [value[gameParam] for key, value in quiz_from_local_files[0].items()]
+        expectedGameParams = [getattr(value, gameParam) for key, value in expected_games.items()]
+        returnedGameParams = [getattr(value, gameParam) for key, value in quiz_from_local_files[0].items()]
         assert returnedGameParams == expectedGameParams
 
     def test_real_games_collected_some_games(self, quiz_from_real_web_sites):
@@ -247,6 +340,336 @@ class TestCollectQuizData:
         """Делаем запрос на реальные сайты организаторов и проверяем что ни по одному из организаторов нет ошибок"""
         assert len(quiz_from_real_web_sites[1]) == 0
 
+    def test_mock_orgs_scraped_concurrently(self):
+        """Подменяем скрейпинг организаторов медленной функцией и проверяем, что организаторы скрейпятся параллельно,
+        результат собирается в порядке config.ORGANIZATORS_DICT, а ошибка одного организатора не влияет на остальных"""
+        def slow_scrape_organizator(orgName, orgTag, orgLink, dateParams, localHTMLs):
+            # организаторы, идущие первыми в ORGANIZATORS_DICT, 'скрейпятся' дольше остальных
+            time.sleep({'wow': 0.4, 'qp': 0.3, 'li': 0.2}[orgTag])
+            if orgTag == 'qp':
+                raise ValueError('test error')
+            return {orgTag + '0': None, orgTag + '1': None}, {}
+
+        cityOrganizators = ['Оставить всех организаторов', 'Лига Индиго', 'Квиз Плиз', 'Вау Квиз']
+        cityLinks = ['placeholder', 'https://test.local', 'https://test.local', 'https://test.local']
+        start = time.monotonic()
+        with patch.object(quizAggregator, 'scrape_organizator', slow_scrape_organizator):
+            games, organizatorErrors = quizAggregator.collect_quiz_data(cityOrganizators, cityLinks)
+        elapsed = time.monotonic() - start
+        # последовательный скрейпинг занял бы 0.9 секунды
+        assert elapsed < 0.8
+        assert list(games) == ['wow0', 'wow1', 'li0', 'li1']
+        assert organizatorErrors == {'Квиз Плиз': 'test error'}
+
+    def test_mock_not_modified_page_is_not_parsed(self):
+        """Если сайт ответил 304 Not Modified, то scrape_organizator() не разбирает страницу повторно, а возвращает
+        разобранное ранее расписание без уже прошедших игр"""
+        orgLink = 'https://test.local/schedule'
+        curDT = datetime.datetime(2023, 12, 13)
+        dateParams = [2023, 2024, 12, curDT]
+        parsedGames = {'ein0': make_game('ein', 0, 'Кино', datetime.datetime(2023, 12, 12, 19, 30), 'Типография', []),
+                       'ein1': make_game('ein', 1, 'Нулевые', datetime.datetime(2023, 12, 14, 19, 30), 'Типография',
+                                         [])}
+        notModifiedResponse = requests.Response()
+        notModifiedResponse.notModified = True
+        with patch.dict(quizAggregator.PARSED_GAMES_CACHE, {orgLink: parsedGames}), \
+                patch.object(quizAggregator, 'get_web_page', return_value=notModifiedResponse), \
+                patch.object(quizAggregator, 'scrape_einstein_party') as scrapeMock:
+            games, organizatorErrors = quizAggregator.scrape_organizator('Эйнштейн пати', 'ein', orgLink, dateParams,
+                                                                          {})
+        scrapeMock.assert_not_called()
+        assert list(games) == ['ein1']
+        assert organizatorErrors == {}
+
+
+def load_saved_page(fileName):
+    """Возвращает bs4.BeautifulSoup с HTML-кодом сохраненной страницы из папки ./tests/saved_web_pages"""
+    pathToLocalHTML = config.ROOT_DIR / 'tests/saved_web_pages' / fileName
+    return bs4.BeautifulSoup(pathToLocalHTML.read_text(encoding='utf-8'), 'html.parser')
+
+
+def make_response(content, encoding='utf-8'):
+    """Возвращает requests.Response с HTML-кодом content"""
+    response = requests.Response()
+    response._content = content
+    response.encoding = encoding
+    return response
+
+
+class TestParseWebPage:
+    """Класс для тестирования функции quizAggregator.parse_web_page()"""
+
+    def test_mock_strainer_keeps_only_schedule(self):
+        """Для Лиги Индиго в дерево попадает только блок с расписанием, а результат скрейпинга не отличается от
+        разбора всей страницы"""
+        content = (config.ROOT_DIR / 'tests/saved_web_pages/ligaindigo_schedule_2023-12-14.html').read_bytes()
+        dateParams = [2023, 2024, 12, datetime.datetime(2023, 12, 13)]
+        quizSoup = quizAggregator.parse_web_page(make_response(content), 'li')
+        assert quizSoup.find('head') is None and quizSoup.find('body') is None
+        expected = quizAggregator.scrape_liga_indigo(bs4.BeautifulSoup(content, 'html.parser'), 'Лига Индиго', 'li',
+                                                     dateParams, {'Лига Индиго': None})
+        result = quizAggregator.scrape_liga_indigo(quizSoup, 'Лига Индиго', 'li', dateParams,
+                                                   {'Лига Индиго': None})
+        assert result == expected
+        assert len(result[0]) == 1
+
+    def test_mock_encoding_from_headers(self):
+        """Страница разбирается из байтов в кодировке, которую сайт указал в HTTP-заголовках"""
+        content = '<html><body><div class="game-item__title">Угадай мелодию</div></body></html>'.encode('cp1251')
+        quizSoup = quizAggregator.parse_web_page(make_response(content, encoding='windows-1251'))
+        assert quizSoup.find('div').text == 'Угадай мелодию'
+
+
+class TestScrapeEinsteinParty:
+    """Класс для тестирования функции quizAggregator.scrape_einstein_party()"""
+
+    def test_mock_saved_page(self):
+        """Разбираем сохраненную страницу einstein_party_schedule_2024-01-19.html: ключи квизов соответствуют номерам
+        карточек на странице, начиная с 1, а уже прошедшие квизы отбрасываются"""
+        quizSoup = load_saved_page('einstein_party_schedule_2024-01-19.html')
+        curDT = datetime.datetime(2024, 1, 22)
+        games, organizatorErrors = quizAggregator.scrape_einstein_party(quizSoup, 'Эйнштейн пати', 'ein',
+                                                                        [2024, 2025, 1, curDT])
+        assert organizatorErrors == {}
+        assert games == {
+            'ein2': make_game('ein', 2, 'Кино', datetime.datetime(2024, 1, 23, 19, 30), 'Типография', ['Мультимедиа']),
+            'ein3': make_game('ein', 3, 'Нулевые (00е)', datetime.datetime(2024, 1, 28, 16, 0), 'Типография',
+                              ['Ностальгия'])
+        }
+
+
+class TestScrapeShakerQuiz:
+    """Класс для тестирования функции quizAggregator.scrape_shaker_quiz()"""
+    dateParams = [2023, 2024, 12, datetime.datetime(2023, 12, 13)]
+
+    @staticmethod
+    def make_shaker_page(games, venues):
+        """Возвращает ответ с HTML-кодом страницы Шейкер Квиз, в __NEXT_DATA__ которой лежат игры и места проведения"""
+        nextData = json.dumps({'props': {'pageProps': {'store': [
+            ['GET/games/venue/:venue/search', venues],
+            ['GET/games/search', games]
+        ]}}}, ensure_ascii=False)
+        content = (f'<html><head><script>var a = "<script>";</script></head><body><div id="app">расписание</div>'
+                   f'<script id="__NEXT_DATA__" type="application/json">{nextData}</script></body></html>')
+        return make_response(content.encode('utf-8'))
+
+    def test_mock_next_data(self):
+        """Расписание извлекается из __NEXT_DATA__, бар находится по id игры, прошедшие и неопубликованные игры
+        отбрасываются"""
+        games = [{'id': 7, 'name': 'Кино и музыка', 'number': 3, 'event_time': '2023-12-20T12:00:00.000Z',
+                  'status': 'publish'},
+                 {'id': 8, 'name': 'Классика', 'event_time': '2023-12-01T12:00:00.000Z', 'status': 'publish'},
+                 {'id': 9, 'name': 'Классика', 'event_time': '2023-12-21T12:00:00.000Z', 'status': 'draft'},
+                 {'id': 10, 'name': 'Классика', 'event_time': '2023-12-22T12:00:00.000Z', 'status': 'publish'}]
+        venues = [{'game_id': 10, 'name': 'Арт П.А.Б.'}, {'game_id': 7, 'name': 'Три Лося'}]
+        result = quizAggregator.scrape_shaker_quiz(self.make_shaker_page(games, venues), 'Шейкер Квиз', 'shaker',
+                                                   self.dateParams)
+        assert result == ({'shaker1': make_game('shaker', 1, 'Кино и музыка #3', datetime.datetime(2023, 12, 20, 12, 0),
+                                                'Три Лося', ['Мультимедиа']),
+                           'shaker4': make_game('shaker', 4, 'Классика', datetime.datetime(2023, 12, 22, 12, 0),
+                                                'Арт П.А.Б.', ['Классика'])}, {})
+
+    def test_mock_first_venue_of_game(self):
+        """Если у игры несколько мест проведения, то берется первое, а игра без места проведения получает пустой бар"""
+        games = [{'id': 7, 'name': 'Классика', 'event_time': '2023-12-20T12:00:00.000Z', 'status': 'publish'},
+                 {'id': 8, 'name': 'Классика', 'event_time': '2023-12-20T12:00:00.000Z', 'status': 'publish'}]
+        venues = [{'game_id': 7, 'name': 'Три Лося'}, {'game_id': 7, 'name': 'Арт П.А.Б.'}]
+        games, organizatorErrors = quizAggregator.scrape_shaker_quiz(self.make_shaker_page(games, venues),
+                                                                     'Шейкер Квиз', 'shaker', self.dateParams)
+        assert [game.bar for game in games.values()] == ['Три Лося', '']
+
+    def test_mock_no_next_data(self):
+        """Если на странице нет __NEXT_DATA__, то возвращается ошибка организатора"""
+        games, organizatorErrors = quizAggregator.scrape_shaker_quiz(make_response(b'<html></html>'), 'Шейкер Квиз',
+                                                                     'shaker', self.dateParams)
+        assert games == {}
+        assert 'Шейкер Квиз' in organizatorErrors
+
+
+class TestScrapeQuizPlease:
+    """Класс для тестирования функции quizAggregator.scrape_quiz_please()"""
+    dateParams = [2023, 2024, 12, datetime.datetime(2023, 12, 13)]
+
+    def test_mock_saved_page(self):
+        """Разбираем сохраненную страницу quizplease_schedule_2023-12-14.html без браузера: все 11 игр еще не прошли,
+        на 8 из них запись только в резерв"""
+        games, organizatorErrors = quizAggregator.scrape_quiz_please(
+            load_saved_page('quizplease_schedule_2023-12-14.html'), 'Квиз Плиз', 'qp', self.dateParams)
+        assert organizatorErrors == {}
+        assert len(games) == 11
+        assert games['qp0'] == make_game('qp', 0, 'Квиз, плиз! NSK #567', datetime.datetime(2023, 12, 14, 20, 0),
+                                         'Арт П.А.Б.', ['Классика'])
+        assert [key for key, game in games.items() if not game.availability] == ['qp0', 'qp4', 'qp6']
+
+    def test_mock_current_layout(self):
+        """Карточка игры в текущей верстке сайта разбирается так же, как при скрейпинге в браузере"""
+        quizSoup = bs4.BeautifulSoup(
+            '<div><div><div><div><div></div><div><div><div><div class="content-block"><div class="card-container">'
+            '<div><div><p class="game-card__date">15 декабря, Пятница</p>'
+            '<div class="game-card__name-wrapper"><span>Квиз, плиз! NSK</span><span>#568</span></div>'
+            '<div class="game-card__location"><div><div><p class="game-card__location-text__title">Арт П.А.Б.'
+            '<span>Информация о площадке</span></p></div></div><div><p>в 20:00</p></div></div>'
+            '<div class="game-card__bottom"><div class="game-card__sold"><p>Нет мест! Но можно записаться в резерв'
+            '</p></div></div></div></div>'
+            '</div></div></div></div></div></div></div></div>', 'html.parser')
+        games, organizatorErrors = quizAggregator.scrape_quiz_please(quizSoup, 'Квиз Плиз', 'qp', self.dateParams)
+        assert organizatorErrors == {}
+        assert games == {'qp0': make_game('qp', 0, 'Квиз, плиз! NSK #568', datetime.datetime(2023, 12, 15, 20, 0),
+                                          'Арт П.А.Б.', ['Классика'], 'Резерв')}
+
+
+class TestScrapeWowQuiz:
+    """Класс для тестирования функции quizAggregator.scrape_wow_quiz()"""
+    dateParams = [2023, 2024, 12, datetime.datetime(2023, 12, 13)]
+
+    def test_mock_saved_page(self):
+        """Разбираем сохраненную страницу wowquiz_schedule_2023-12-20.html без браузера: все 10 игр еще не прошли,
+        на первые 4 запись только в резерв, январские игры относятся к следующему году"""
+        games, organizatorErrors = quizAggregator.scrape_wow_quiz(
+            load_saved_page('wowquiz_schedule_2023-12-20.html'), 'Вау Квиз', 'wow', self.dateParams)
+        assert organizatorErrors == {}
+        assert len(games) == 10
+        assert [key for key, game in games.items() if game.availability] == ['wow0', 'wow1', 'wow2', 'wow3']
+        assert games['wow9'] == make_game('wow', 9, 'Гарри Поттер лайт #29 (с туром про рождество)',
+                                          datetime.datetime(2024, 1, 7, 16, 0), 'Три Лося', ['Мультимедиа'])
+
+    def test_mock_current_layout(self):
+        """Карточки игр в текущей верстке сайта разбираются так же, как при скрейпинге в браузере, игры без мест
+        отбрасываются"""
+        card = ('<div class="schedule-card"><div class="schedule-card__title">{}</div>'
+                '<div class="schedule-card__details-item">{}</div><div class="schedule-card__details-item">16:00</div>'
+                '<div class="schedule-card__bar">Три Лося</div><div class="schedule-card__status">{}</div></div>')
+        quizSoup = bs4.BeautifulSoup(
+            '<div id="schedule"><div class="schedule__list">' +
+            card.format('Угадай мультфильм #4', '15 декабря, пятница', 'Мест нет') +
+            card.format('Угадай мультфильм #5', '16 декабря, суббота', 'Резерв') +
+            '</div></div>', 'html.parser')
+        games, organizatorErrors = quizAggregator.scrape_wow_quiz(quizSoup, 'Вау Квиз', 'wow', self.dateParams)
+        assert organizatorErrors == {}
+        assert games == {'wow1': make_game('wow', 1, 'Угадай мультфильм #5', datetime.datetime(2023, 12, 16, 16, 0),
+                                           'Три Лося', ['Мультимедиа'], 'Резерв')}
+
+
+class TestScrapeOrganizatorInBrowser:
+    """Класс для тестирования выбора между разбором HTML-кода страницы и скрейпингом в браузере в
+    quizAggregator.scrape_organizator()"""
+    dateParams = [2023, 2024, 12, datetime.datetime(2023, 12, 13)]
+
+    def test_mock_browser_fallback_when_no_games(self):
+        """Если в HTML-коде страницы не нашлось игр, то сайт скрейпится в браузере, а результат не запоминается"""
+        orgLink = 'https://test.local/wow'
+        response = requests.Response()
+        response._content = b'<html><body>loading...</body></html>'
+        browserResult = ({'wow0': make_game('wow', 0, 'test', datetime.datetime(2023, 12, 14), 'Три Лося', [])}, {})
+        with patch.object(quizAggregator, 'get_web_page', return_value=response), \
+                patch.object(quizAggregator, 'scrape_wow_quiz_in_browser', return_value=browserResult) as browserMock:
+            result = quizAggregator.scrape_organizator('Вау Квиз', 'wow', orgLink, self.dateParams, {})
+        browserMock.assert_called_once_with(orgLink, 'Вау Квиз', 'wow', self.dateParams)
+        assert result == browserResult
+        assert orgLink not in quizAggregator.PARSED_GAMES_CACHE
+
+    def test_mock_no_browser_when_games_found(self):
+        """Если игры нашлись в HTML-коде страницы, то браузер не используется"""
+        orgLink = 'https://test.local/qp'
+        response = requests.Response()
+        response._content = (config.ROOT_DIR / 'tests/saved_web_pages/quizplease_schedule_2023-12-14.html').read_bytes()
+        response.encoding = 'utf-8'
+        with patch.dict(quizAggregator.PARSED_GAMES_CACHE), \
+                patch.object(quizAggregator, 'get_web_page', return_value=response), \
+                patch.object(quizAggregator, 'scrape_quiz_please_in_browser') as browserMock:
+            games, organizatorErrors = quizAggregator.scrape_organizator('Квиз Плиз', 'qp', orgLink, self.dateParams,
+                                                                          {})
+            assert quizAggregator.PARSED_GAMES_CACHE[orgLink] == games
+        browserMock.assert_not_called()
+        assert len(games) == 11 and organizatorErrors == {}
+
+
+class TestScrapeMamaQuiz:
+    """Класс для тестирования функции quizAggregator.scrape_mama_quiz()"""
+
+    def test_mock_game_params(self, mama_quiz_from_local_files, expected_games_mama_quiz):
+        """Проверяем, что из локальной копии страницы все игры извлеклись правильно и без браузера"""
+        games, organizatorErrors = mama_quiz_from_local_files
+        assert organizatorErrors == {}
+        assert games == expected_games_mama_quiz
+
+    def test_mock_past_games_dropped(self):
+        """Разбираем сохраненную страницу mamaquiz_schedule_2024-01-15.html на 15.01.2024: все 3 игры еще не прошли,
+        а игра, которая началась раньше curDT, отбрасывается"""
+        quizSoup = load_saved_page('mamaquiz_schedule_2024-01-15.html')
+        curDT = datetime.datetime(2024, 1, 15)
+        games, organizatorErrors = quizAggregator.scrape_mama_quiz(quizSoup, 'Мама Квиз', 'mama',
+                                                                   [2024, 2025, 1, curDT])
+        assert organizatorErrors == {}
+        assert [game.date for game in games.values()] == [datetime.datetime(2024, 1, 21, 18, 0),
+                                                              datetime.datetime(2024, 1, 28, 18, 0),
+                                                              datetime.datetime(2024, 1, 31, 19, 30)]
+        curDT = datetime.datetime(2024, 1, 22)
+        games, organizatorErrors = quizAggregator.scrape_mama_quiz(quizSoup, 'Мама Квиз', 'mama',
+                                                                   [2024, 2025, 1, curDT])
+        assert list(games) == ['mama1', 'mama2']
+
+    def test_mock_card_without_popup(self):
+        """Кнопка регистрации, для которой на странице нет окна регистрации, пропускается, остальные игры
+        разбираются"""
+        quizSoup = bs4.BeautifulSoup(
+            '<a href="#kviz0101">ЗАРЕГИСТРИРОВАТЬСЯ</a><a href="#kviz0201">ЗАРЕГИСТРИРОВАТЬСЯ</a>'
+            '<div data-tooltip-hook="#kviz0201"><div class="t-text"><strong>Игра:</strong> Классика #1<br/>'
+            '<strong>Место проведения:</strong> MISHKIN&amp;MISHKIN (ул. Нарымская, 37)<br/>'
+            '<strong>Дата: </strong>2 января 2024<br/><strong>Сбор команд:</strong> 17:30<br/>'
+            '<strong>Начало игры: </strong>18:00</div></div>', 'html.parser')
+        curDT = datetime.datetime(2024, 1, 1)
+        games, organizatorErrors = quizAggregator.scrape_mama_quiz(quizSoup, 'Мама Квиз', 'mama',
+                                                                   [2024, 2025, 1, curDT])
+        assert organizatorErrors == {}
+        assert games == {'mama1': make_game('mama', 1, 'Классика #1', datetime.datetime(2024, 1, 2, 18, 0),
+                                            'MISHKIN&MISHKIN', ['Классика'])}
+
+
+class TestCollectQuizDataAsync:
+    """Класс для тестирования функции quizAggregator.collect_quiz_data_async()"""
+
+    def test_event_loop_not_blocked(self):
+        """Пока медленный синхронный скрейпинг выполняется в отдельном потоке, другие корутины продолжают работу"""
+        def slow_collect(cityOrganizators, cityLinks, localHTMLs=None):
+            time.sleep(0.5)
+            return {'li0': None}, {}
+
+        async def ticker(ticks):
+            for i in range(10):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        async def scenario():
+            ticks = []
+            start = time.monotonic()
+            result, tickerResult = await asyncio.gather(
+                quizAggregator.collect_quiz_data_async(['Оставить всех организаторов'], ['placeholder']),
+                ticker(ticks))
+            return result, [tick - start for tick in ticks]
+
+        with patch.object(quizAggregator, 'collect_quiz_data', slow_collect):
+            result, ticks = asyncio.run(scenario())
+        assert result == ({'li0': None}, {})
+        # все 10 тиков прошли раньше, чем закончился 'скрейпинг'
+        assert len(ticks) == 10 and ticks[-1] < 0.5
+
+
+class TestRenderQuizFragment:
+    """Класс для тестирования функции quizAggregator.render_quiz_fragment()"""
+    date = datetime.datetime(2024, 1, 15, 19, 30)
+
+    def test_fragment_format(self):
+        """Строка о квизе форматируется без порядкового номера, бар берется нормализованный"""
+        game = make_game('li', 1, 'Игра №1 Сезон №11', self.date, 'Бар Три Лося', ['Классика'])
+        assert quizAggregator.render_quiz_fragment(game, 'Три лося') == \
+               '<b>Лига Индиго</b>: Игра №1 Сезон №11. Бар: Три лося, понедельник, 15 января, 19:30. \n'
+
+    def test_fragment_with_availability(self):
+        """Доступность квиза выводится жирным шрифтом в верхнем регистре"""
+        game = make_game('wow', 2, 'Кино', self.date, 'Типография', [], 'Резерв')
+        assert quizAggregator.render_quiz_fragment(game, 'Типография').endswith('19:30. <b>РЕЗЕРВ</b>\n')
+
 
 class TestCreateFormattedQuizList:
     """Класс для тестирования функции quizAggregator.create_formatted_quiz_list()"""
@@ -266,9 +689,9 @@ class TestCreateFormattedQuizList:
                        'excl_theme':excl_theme,
                        'excl_orgs':excl_orgs
                        }
-        returnedQuizList1 = quizAggregator.create_formatted_quiz_list(expected_games, organizatorErrors,
+        returnedQuizList1 = quizAggregator.create_formatted_quiz_list(expected_games.values(), organizatorErrors,
                                                                      **insufficientKwargs)
-        returnedQuizList2 = quizAggregator.create_formatted_quiz_list(expected_games, organizatorErrors,
+        returnedQuizList2 = quizAggregator.create_formatted_quiz_list(expected_games.values(), organizatorErrors,
                                                                       **wrongKwargs)
         assert returnedQuizList1 == []
         assert returnedQuizList2 == []
@@ -296,9 +719,10 @@ class TestCreateFormattedQuizList:
 '11. <b>Эйнштейн пати</b>: Кино. Бар: Типография, вторник, 23 января, 19:30\n',
 '12. <b>Эйнштейн пати</b>: Нулевые (00е). Бар: Типография, воскресенье, 28 января, 16:00\n',
 ]
-        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games, organizatorErrors, dow=dow,
-                                                                     selected_theme=selected_theme, excl_bar=excl_bar,
-                                                                     excl_theme=excl_theme, excl_orgs=excl_orgs)
+        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games.values(), organizatorErrors,
+                                                                     dow=dow, selected_theme=selected_theme,
+                                                                     excl_bar=excl_bar, excl_theme=excl_theme,
+                                                                     excl_orgs=excl_orgs)
         assert expectedQuizList == returnedQuizList
 
     def test_dow_1_to_5(self, expected_games):
@@ -307,9 +731,10 @@ class TestCreateFormattedQuizList:
         dow = [1, 2, 3, 4, 5]
         selected_theme = 'Оставить все'
         excl_bar, excl_theme, excl_orgs = 'None', 'None', 'None'
-        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games, organizatorErrors, dow=dow,
-                                                                     selected_theme=selected_theme, excl_bar=excl_bar,
-                                                                     excl_theme=excl_theme, excl_orgs=excl_orgs)
+        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games.values(), organizatorErrors,
+                                                                     dow=dow, selected_theme=selected_theme,
+                                                                     excl_bar=excl_bar, excl_theme=excl_theme,
+                                                                     excl_orgs=excl_orgs)
         for quiz in returnedQuizList:
             assert 'суббота' not in quiz
             assert 'воскресенье' not in quiz
@@ -320,9 +745,10 @@ class TestCreateFormattedQuizList:
         dow = [6, 7]
         selected_theme = 'Оставить все'
         excl_bar, excl_theme, excl_orgs = 'None', 'None', 'None'
-        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games, organizatorErrors, dow=dow,
-                                                                     selected_theme=selected_theme, excl_bar=excl_bar,
-                                                                     excl_theme=excl_theme, excl_orgs=excl_orgs)
+        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games.values(), organizatorErrors,
+                                                                     dow=dow, selected_theme=selected_theme,
+                                                                     excl_bar=excl_bar, excl_theme=excl_theme,
+                                                                     excl_orgs=excl_orgs)
         for quiz in returnedQuizList:
             assert 'понедельник' not in quiz
             assert 'вторник' not in quiz
@@ -342,9 +768,10 @@ class TestCreateFormattedQuizList:
             '3. <b>Квиз Плиз</b>: Квиз, плиз! NSK #570. Бар: Арт П.А.Б., четверг, 21 декабря, 20:00\n',
             '4. <b>WOW Quiz</b>: Обо всём. Похмельно-новогодняя #47 . Бар: Три Лося, вторник, 2 января, 16:00\n',
         ]
-        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games, organizatorErrors, dow=dow,
-                                                                     selected_theme=selected_theme, excl_bar=excl_bar,
-                                                                     excl_theme=excl_theme, excl_orgs=excl_orgs)
+        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games.values(), organizatorErrors,
+                                                                     dow=dow, selected_theme=selected_theme,
+                                                                     excl_bar=excl_bar, excl_theme=excl_theme,
+                                                                     excl_orgs=excl_orgs)
         assert expectedQuizList == returnedQuizList
 
     def test_filter_by_tag_multimedia(self, expected_games):
@@ -362,9 +789,10 @@ class TestCreateFormattedQuizList:
             '16:00\n',
             '6. <b>Эйнштейн пати</b>: Кино. Бар: Типография, вторник, 23 января, 19:30\n',
         ]
-        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games, organizatorErrors, dow=dow,
-                                                                     selected_theme=selected_theme, excl_bar=excl_bar,
-                                                                     excl_theme=excl_theme, excl_orgs=excl_orgs)
+        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games.values(), organizatorErrors,
+                                                                     dow=dow, selected_theme=selected_theme,
+                                                                     excl_bar=excl_bar, excl_theme=excl_theme,
+                                                                     excl_orgs=excl_orgs)
         assert expectedQuizList == returnedQuizList
 
     def test_filter_by_tag_nostalgy(self, expected_games):
@@ -380,9 +808,10 @@ class TestCreateFormattedQuizList:
             '4. <b>Эйнштейн пати</b>: Нулевые (00е). Бар: Типография, воскресенье, 28 января, 16:00\n',
         ]
 
-        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games, organizatorErrors, dow=dow,
-                                                                     selected_theme=selected_theme, excl_bar=excl_bar,
-                                                                     excl_theme=excl_theme, excl_orgs=excl_orgs)
+        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games.values(), organizatorErrors,
+                                                                      dow=dow, selected_theme=selected_theme,
+                                                                      excl_bar=excl_bar, excl_theme=excl_theme,
+                                                                      excl_orgs=excl_orgs)
         assert expectedQuizList == returnedQuizList
 
     def test_filter_by_tag_nsfw(self, expected_games_2):
@@ -397,9 +826,10 @@ class TestCreateFormattedQuizList:
     '2. <b>WOW Quiz</b>: 18+ #16 За гранью приличия. Бар: Три Лося, воскресенье, 19 февраля, 18:00\n'
         ]
 
-        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games_2, organizatorErrors, dow=dow,
-                                                                     selected_theme=selected_theme, excl_bar=excl_bar,
-                                                                     excl_theme=excl_theme, excl_orgs=excl_orgs)
+        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games_2.values(), organizatorErrors,
+                                                                      dow=dow, selected_theme=selected_theme,
+                                                                      excl_bar=excl_bar, excl_theme=excl_theme,
+                                                                      excl_orgs=excl_orgs)
         assert expectedQuizList == returnedQuizList
 
     def test_filter_by_tag_rookie(self, expected_games_2):
@@ -413,9 +843,10 @@ class TestCreateFormattedQuizList:
     '1. <b>Квиз Плиз</b>: [новички] NSK #459. Бар: Максимилианс, суббота, 28 января, 16:00\n',
     '2. <b>Квиз Плиз</b>: [новички] NSK #459. Бар: Арт П.А.Б., воскресенье, 29 января, 16:00\n'
     ]
-        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games_2, organizatorErrors, dow=dow,
-                                                                     selected_theme=selected_theme, excl_bar=excl_bar,
-                                                                     excl_theme=excl_theme, excl_orgs=excl_orgs)
+        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games_2.values(), organizatorErrors,
+                                                                     dow=dow, selected_theme=selected_theme,
+                                                                     excl_bar=excl_bar, excl_theme=excl_theme,
+                                                                     excl_orgs=excl_orgs)
         assert expectedQuizList == returnedQuizList
 
     @pytest.mark.parametrize('excl_bar', ['Три лося', 'Mishkin&Mishkin', 'Арт П.А.Б.', 'Максимилианс',
@@ -427,12 +858,14 @@ class TestCreateFormattedQuizList:
         dow = [1, 2, 3, 4, 5, 6, 7]
         selected_theme = 'Оставить все'
         excl_theme, excl_orgs = 'None', 'None'
-        returnedQuizList1 = quizAggregator.create_formatted_quiz_list(expected_games, organizatorErrors, dow=dow,
-                                                                     selected_theme=selected_theme, excl_bar=excl_bar,
-                                                                     excl_theme=excl_theme, excl_orgs=excl_orgs)
-        returnedQuizList2 = quizAggregator.create_formatted_quiz_list(expected_games_2, organizatorErrors, dow=dow,
-                                                                     selected_theme=selected_theme, excl_bar=excl_bar,
-                                                                     excl_theme=excl_theme, excl_orgs=excl_orgs)
+        returnedQuizList1 = quizAggregator.create_formatted_quiz_list(expected_games.values(), organizatorErrors,
+                                                                      dow=dow, selected_theme=selected_theme,
+                                                                      excl_bar=excl_bar, excl_theme=excl_theme,
+                                                                      excl_orgs=excl_orgs)
+        returnedQuizList2 = quizAggregator.create_formatted_quiz_list(expected_games_2.values(), organizatorErrors,
+                                                                      dow=dow, selected_theme=selected_theme,
+                                                                      excl_bar=excl_bar, excl_theme=excl_theme,
+                                                                      excl_orgs=excl_orgs)
         for quiz in returnedQuizList1:
             assert excl_bar not in quiz
 
@@ -447,12 +880,14 @@ class TestCreateFormattedQuizList:
         dow = [1, 2, 3, 4, 5, 6, 7]
         selected_theme = 'Оставить все'
         excl_bar, excl_orgs = 'None', 'None'
-        returnedQuizList1 = quizAggregator.create_formatted_quiz_list(expected_games, organizatorErrors, dow=dow,
-                                                                     selected_theme=selected_theme, excl_bar=excl_bar,
-                                                                     excl_theme=excl_theme, excl_orgs=excl_orgs)
-        returnedQuizList2 = quizAggregator.create_formatted_quiz_list(expected_games_2, organizatorErrors, dow=dow,
-                                                                     selected_theme=selected_theme, excl_bar=excl_bar,
-                                                                     excl_theme=excl_theme, excl_orgs=excl_orgs)
+        returnedQuizList1 = quizAggregator.create_formatted_quiz_list(expected_games.values(), organizatorErrors,
+                                                                      dow=dow, selected_theme=selected_theme,
+                                                                      excl_bar=excl_bar, excl_theme=excl_theme,
+                                                                      excl_orgs=excl_orgs)
+        returnedQuizList2 = quizAggregator.create_formatted_quiz_list(expected_games_2.values(), organizatorErrors,
+                                                                      dow=dow, selected_theme=selected_theme,
+                                                                      excl_bar=excl_bar, excl_theme=excl_theme,
+                                                                      excl_orgs=excl_orgs)
 
         for quiz in returnedQuizList1:
             assert excl_theme not in quiz
@@ -467,9 +902,10 @@ class TestCreateFormattedQuizList:
         dow = [1, 2, 3, 4, 5, 6, 7]
         selected_theme = 'Оставить все'
         excl_bar, excl_theme = 'None', 'None'
-        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games, organizatorErrors, dow=dow,
-                                                                     selected_theme=selected_theme, excl_bar=excl_bar,
-                                                                     excl_theme=excl_theme, excl_orgs=excl_orgs)
+        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games.values(), organizatorErrors,
+                                                                     dow=dow, selected_theme=selected_theme,
+                                                                     excl_bar=excl_bar, excl_theme=excl_theme,
+                                                                     excl_orgs=excl_orgs)
 
         for quiz in returnedQuizList:
             assert excl_orgs not in quiz
@@ -493,7 +929,8 @@ class TestCreateFormattedQuizList:
             'Мама Квиз',
             '\nПопробуй запросить информацию по ним позже.'
         ]
-        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games, organizatorErrors, dow=dow,
-                                                                     selected_theme=selected_theme, excl_bar=excl_bar,
-                                                                     excl_theme=excl_theme, excl_orgs=excl_orgs)
+        returnedQuizList = quizAggregator.create_formatted_quiz_list(expected_games.values(), organizatorErrors,
+                                                                     dow=dow, selected_theme=selected_theme,
+                                                                     excl_bar=excl_bar, excl_theme=excl_theme,
+                                                                     excl_orgs=excl_orgs)
         assert expectedEnding == returnedQuizList[-6:]
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""
+Тест-кейсы для модуля ./src/quizGame.py для pytest.
+
+Содержит классы:
+    TestThemesMask
+        test_mask_round_trip(self)
+        test_unknown_theme(self)
+
+    TestMakeGame
+        test_game_params(self)
+        test_strings_are_interned(self)
+        test_game_is_immutable(self)
+"""
+
+import dataclasses
+import datetime
+
+import pytest
+
+import quizGame
+
+
+class TestThemesMask:
+    """Класс для тестирования функций quizGame.themes_to_mask() и quizGame.mask_to_themes()"""
+
+    def test_mask_round_trip(self):
+        """Тематики восстанавливаются из битовой маски в порядке config.QUIZ_THEMES, повторы не учитываются"""
+        mask = quizGame.themes_to_mask(['Новички', 'Классика', 'Классика'])
+        assert quizGame.mask_to_themes(mask) == ['Классика', 'Новички']
+
+    def test_unknown_theme(self):
+        """Тематики, которых нет в config.QUIZ_THEMES, в маску не попадают"""
+        assert quizGame.themes_to_mask(['Оставить все', 'Спорт']) == 0
+
+
+class TestMakeGame:
+    """Класс для тестирования функции quizGame.make_game()"""
+    date = datetime.datetime(2024, 1, 7, 16, 0)
+
+    def test_game_params(self):
+        """Идентификатор квиза собирается из тэга организатора и номера карточки"""
+        game = quizGame.make_game('wow', 10, 'Гарри Поттер', self.date, 'Три Лося', ['Мультимедиа'], 'Резерв')
+        assert game.gameId == 'wow10' and game.orgTag == 'wow'
+        assert game.tags == ['Мультимедиа']
+        assert game.availability == 'Резерв'
+
+    def test_strings_are_interned(self):
+        """Записи о квизах в одном баре ссылаются на одну и ту же строку с названием бара"""
+        barFirst = ''.join(['Три ', 'Лося'])
+        barSecond = ''.join(['Три ', 'Лося'])
+        first = quizGame.make_game('wow', 1, 'Кино', self.date, barFirst, [])
+        second = quizGame.make_game('wow', 2, 'Кино', self.date, barSecond, [])
+        assert first.bar is second.bar
+
+    def test_game_is_immutable(self):
+        """Запись о квизе нельзя изменить и у нее нет __dict__"""
+        game = quizGame.make_game('wow', 1, 'Кино', self.date, 'Три Лося', [])
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            game.bar = 'Типография'
+        assert not hasattr(game, '__dict__')
@@ -0,0 +1,324 @@
+"""
+Тест-кейсы для модуля ./src/scheduleCache.py для pytest.
+Вместо настоящего скрейпинга в кэш передается фейковая функция collectFunction, а вместо настоящего времени - clock,
+который тест-кейсы сдвигают вручную.
+
+Содержит классы:
+    TestGetSchedule
+        test_first_call_is_miss(self)
+        test_second_call_is_hit(self)
+        test_snapshot_is_shared(self)
+        test_expired_org_is_refreshed_alone(self)
+        test_errors_use_error_ttl(self)
+        test_past_games_are_skipped(self)
+        test_unknown_city(self)
+        test_snapshot_built_without_lock(self)
+
+    TestRefresh
+        test_refresh_ignores_ttl(self)
+        test_refresh_skips_org_in_flight(self)
+
+    TestGetScheduleAsync
+        test_concurrent_misses_scrape_once(self)
+
+    TestGetQuizList
+        test_same_query_is_hit(self)
+        test_equal_exclusions_share_list(self)
+        test_refresh_drops_lists(self)
+        test_lru_eviction(self)
+
+    TestCacheStats
+        test_stats_hits_misses_and_age(self)
+        test_invalidate(self)
+"""
+
+import asyncio
+import datetime
+import threading
+import time
+
+import pytest
+
+import scheduleCache
+from quizGame import make_game
+
+FUTURE_DT = datetime.datetime.now() + datetime.timedelta(days=3)
+PAST_DT = datetime.datetime.now() - datetime.timedelta(hours=1)
+
+# для тестов используются организаторы, которые есть в config.CITY_DICT['Новосибирск']
+TEST_TTL = {'default': 100, 'qp': 100, 'li': 1000}
+
+
+class FakeClock:
+    """Управляемые вручную часы для проверки времени жизни записей кэша"""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCollect:
+    """Фейковая замена quizAggregator.collect_quiz_data, запоминающая с какими организаторами её вызывали"""
+    def __init__(self, errors=None, date=FUTURE_DT):
+        self.calls = []
+        self.errors = errors or {}
+        self.date = date
+
+    def __call__(self, cityOrganizators, cityLinks, localHTMLs=None):
+        self.calls.append(cityOrganizators[1:])
+        tags = {'Вау Квиз': 'wow', 'Квиз Плиз': 'qp', 'Лига Индиго': 'li', 'Шейкер Квиз': 'shaker',
+                'Эйнштейн пати': 'ein'}
+        games = {}
+        organizatorErrors = {}
+        for orgName in cityOrganizators[1:]:
+            if orgName in self.errors:
+                organizatorErrors[orgName] = self.errors[orgName]
+                continue
+            games[tags[orgName] + '0'] = make_game(tags[orgName], 0, f'{orgName} #1', self.date, 'Три Лося',
+                                                   ['Классика'])
+        return games, organizatorErrors
+
+
+@pytest.fixture()
+def cache_with_fakes():
+    """Создает ScheduleCache с фейковыми часами и фейковой функцией скрейпинга"""
+    clock = FakeClock()
+    collect = FakeCollect()
+    cache = scheduleCache.ScheduleCache(collectFunction=collect, ttl=TEST_TTL, errorTtl=10, clock=clock)
+    return cache, collect, clock
+
+
+class TestGetSchedule:
+    """Класс для тестирования метода ScheduleCache.get_schedule()"""
+
+    def test_first_call_is_miss(self, cache_with_fakes):
+        """Первый запрос по городу скрейпит всех организаторов города одним вызовом"""
+        cache, collect, clock = cache_with_fakes
+        games, organizatorErrors = cache.get_schedule('Новосибирск')
+        assert len(collect.calls) == 1
+        assert set(collect.calls[0]) == {'Вау Квиз', 'Квиз Плиз', 'Лига Индиго', 'Шейкер Квиз', 'Эйнштейн пати'}
+        assert {game.gameId for game in games} == {'wow0', 'qp0', 'li0', 'shaker0', 'ein0'}
+        assert organizatorErrors == {}
+
+    def test_second_call_is_hit(self, cache_with_fakes):
+        """Повторный запрос в пределах TTL не запускает скрейпинг и возвращает тот же результат"""
+        cache, collect, clock = cache_with_fakes
+        first = cache.get_schedule('Новосибирск')
+        clock.now += 50
+        second = cache.get_schedule('Новосибирск')
+        assert len(collect.calls) == 1
+        assert first == second
+        assert cache.is_fresh('Новосибирск')
+
+    def test_snapshot_is_shared(self, cache_with_fakes):
+        """Все запросы получают один и тот же снимок расписания, упорядоченный по дате, пока расписание не обновится"""
+        cache, collect, clock = cache_with_fakes
+        collect.date = FUTURE_DT + datetime.timedelta(days=1)
+        cache.get_schedule('Новосибирск')
+        collect.date = FUTURE_DT
+        cache.refresh('Новосибирск', ['Лига Индиго'])
+        first, organizatorErrors = cache.get_schedule('Новосибирск')
+        second, organizatorErrors = cache.get_schedule('Новосибирск')
+        assert first is second
+        assert [game.gameId for game in first] == ['li0', 'ein0', 'qp0', 'shaker0', 'wow0']
+        cache.refresh('Новосибирск', ['Лига Индиго'])
+        assert cache.get_schedule('Новосибирск')[0] is not first
+
+    def test_expired_org_is_refreshed_alone(self, cache_with_fakes):
+        """После истечения TTL скрейпятся только устаревшие организаторы, у Лиги Индиго TTL больше"""
+        cache, collect, clock = cache_with_fakes
+        cache.get_schedule('Новосибирск')
+        clock.now += 150
+        assert not cache.is_fresh('Новосибирск')
+        games, organizatorErrors = cache.get_schedule('Новосибирск')
+        assert len(collect.calls) == 2
+        assert 'Лига Индиго' not in collect.calls[1]
+        assert {game.gameId for game in games} == {'wow0', 'qp0', 'li0', 'shaker0', 'ein0'}
+
+    def test_errors_use_error_ttl(self):
+        """Организатор с ошибкой скрейпинга перезапрашивается по истечении errorTtl, а не основного TTL"""
+        clock = FakeClock()
+        collect = FakeCollect(errors={'Квиз Плиз': 'timeout'})
+        cache = scheduleCache.ScheduleCache(collectFunction=collect, ttl=TEST_TTL, errorTtl=10, clock=clock)
+        games, organizatorErrors = cache.get_schedule('Новосибирск')
+        assert organizatorErrors == {'Квиз Плиз': 'timeout'}
+        clock.now += 20
+        cache.get_schedule('Новосибирск')
+        assert collect.calls[1] == ['Квиз Плиз']
+
+    def test_past_games_are_skipped(self):
+        """Игры, которые уже начались с момента скрейпинга, не возвращаются из кэша"""
+        collect = FakeCollect(date=PAST_DT)
+        cache = scheduleCache.ScheduleCache(collectFunction=collect, ttl=TEST_TTL, clock=FakeClock())
+        games, organizatorErrors = cache.get_schedule('Новосибирск')
+        assert len(games) == 0
+
+    def test_unknown_city(self, cache_with_fakes):
+        """По городу, которого нет в config.CITY_DICT, скрейпинг не запускается"""
+        cache, collect, clock = cache_with_fakes
+        games, organizatorErrors = cache.get_schedule('Тестовый город')
+        assert len(games) == 0 and organizatorErrors == {}
+        assert collect.calls == []
+
+    def test_snapshot_built_without_lock(self, cache_with_fakes):
+        """Пока собирается снимок расписания, кэш не заблокирован, а снимок, устаревший за время сборки, не
+        сохраняется"""
+        cache, collect, clock = cache_with_fakes
+        cache.refresh('Новосибирск')
+        buildStarted = threading.Event()
+        releaseBuild = threading.Event()
+        builds = []
+
+        def slow_make_snapshot(city, cityEntries, orgsAndLinks):
+            builds.append(city)
+            if len(builds) == 1:
+                buildStarted.set()
+                releaseBuild.wait(5)
+            return scheduleCache.ScheduleCache._make_snapshot(city, cityEntries, orgsAndLinks)
+
+        cache._make_snapshot = slow_make_snapshot
+        results = []
+        reader = threading.Thread(target=lambda: results.append(cache.get_schedule('Новосибирск')))
+        reader.start()
+        assert buildStarted.wait(5)
+        # статистика и сохранение результата скрейпинга не ждут окончания сборки снимка
+        assert cache.get_stats()['refreshes'] == 1
+        collect.date = FUTURE_DT + datetime.timedelta(days=1)
+        cache.refresh('Новосибирск', ['Лига Индиго'])
+        releaseBuild.set()
+        reader.join(timeout=5)
+        assert {game.gameId for game in results[0][0]} == {'wow0', 'qp0', 'li0', 'shaker0', 'ein0'}
+        # снимок собран по записям до обновления, поэтому следующий запрос собирает его заново
+        games, organizatorErrors = cache.get_schedule('Новосибирск')
+        assert len(builds) == 2
+        assert [game.gameId for game in games][-1] == 'li0'
+        cache.get_schedule('Новосибирск')
+        assert len(builds) == 2
+
+
+class TestRefresh:
+    """Класс для тестирования метода ScheduleCache.refresh(), который вызывают фоновые задачи обновления"""
+
+    def test_refresh_ignores_ttl(self, cache_with_fakes):
+        """refresh скрейпит только переданного организатора, даже если его расписание в кэше еще актуально"""
+        cache, collect, clock = cache_with_fakes
+        cache.get_schedule('Новосибирск')
+        cache.refresh('Новосибирск', ['Лига Индиго'])
+        assert collect.calls[1] == ['Лига Индиго']
+        assert cache.get_stats()['refreshes'] == 2
+
+    def test_refresh_skips_org_in_flight(self):
+        """Организатор, которого уже скрейпит другой поток, повторно не скрейпится"""
+        clock = FakeClock()
+        collect = FakeCollect()
+        cache = scheduleCache.ScheduleCache(collectFunction=collect, ttl=TEST_TTL, clock=clock)
+
+        def collect_with_nested_refresh(cityOrganizators, cityLinks, localHTMLs=None):
+            # пока идет скрейпинг, 'другой поток' пытается обновить того же организатора
+            cache.refresh('Новосибирск', ['Квиз Плиз'])
+            return collect(cityOrganizators, cityLinks)
+
+        cache._collectFunction = collect_with_nested_refresh
+        cache.refresh('Новосибирск', ['Квиз Плиз'])
+        assert collect.calls == [['Квиз Плиз']]
+
+
+class TestGetScheduleAsync:
+    """Класс для тестирования метода ScheduleCache.get_schedule_async()"""
+
+    def test_concurrent_misses_scrape_once(self):
+        """Два одновременных запроса по 'холодному' городу запускают один скрейпинг и оба получают полный результат"""
+        collect = FakeCollect()
+
+        def slow_collect(cityOrganizators, cityLinks, localHTMLs=None):
+            time.sleep(0.3)
+            return collect(cityOrganizators, cityLinks)
+
+        cache = scheduleCache.ScheduleCache(collectFunction=slow_collect, ttl=TEST_TTL)
+
+        async def scenario():
+            return await asyncio.gather(cache.get_schedule_async('Новосибирск'),
+                                        cache.get_schedule_async('Новосибирск'))
+
+        first, second = asyncio.run(scenario())
+        assert len(collect.calls) == 1
+        assert first == second
+        assert {game.gameId for game in first[0]} == {'wow0', 'qp0', 'li0', 'shaker0', 'ein0'}
+
+
+class TestGetQuizList:
+    """Класс для тестирования метода ScheduleCache.get_quiz_list()"""
+    ALL_DAYS = [1, 2, 3, 4, 5, 6, 7]
+
+    def test_same_query_is_hit(self, cache_with_fakes):
+        """Повторный запрос возвращает тот же отформатированный список из кэша"""
+        cache, collect, clock = cache_with_fakes
+        first, organizatorErrors = cache.get_quiz_list('Новосибирск', self.ALL_DAYS, 'Оставить все', 'None', 'None',
+                                                       'None')
+        second, organizatorErrors = cache.get_quiz_list('Новосибирск', self.ALL_DAYS, 'Оставить все', 'None', 'None',
+                                                        'None')
+        assert first is second
+        assert len(first) == 5 and first[0].startswith('1. ')
+        assert cache.get_stats()['quizLists'] == {'hits': 1, 'misses': 1, 'size': 1, 'maxSize': 256}
+
+    def test_equal_exclusions_share_list(self, cache_with_fakes):
+        """Запросы с разным написанием исключений, которые отбирают одни и те же квизы, получают один список"""
+        cache, collect, clock = cache_with_fakes
+        first, organizatorErrors = cache.get_quiz_list('Новосибирск', self.ALL_DAYS, 'Классика', 'None', 'None',
+                                                       'Квиз Плиз;Вау Квиз')
+        second, organizatorErrors = cache.get_quiz_list('Новосибирск', self.ALL_DAYS, 'Классика',
+                                                        frozenset({'Типография'}), frozenset({'Ностальгия'}),
+                                                        frozenset({'Вау Квиз', 'Квиз Плиз'}))
+        assert first is second and len(first) == 3
+        third, organizatorErrors = cache.get_quiz_list('Новосибирск', self.ALL_DAYS, 'Классика', 'Три Лося', 'None',
+                                                       'None')
+        assert third == ()
+
+    def test_refresh_drops_lists(self, cache_with_fakes):
+        """После обновления расписания города список формируется заново по новому снимку"""
+        cache, collect, clock = cache_with_fakes
+        first, organizatorErrors = cache.get_quiz_list('Новосибирск', self.ALL_DAYS, 'Оставить все', 'None', 'None',
+                                                       'None')
+        collect.errors = {'Лига Индиго': 'timeout'}
+        cache.refresh('Новосибирск', ['Лига Индиго'])
+        assert cache.get_stats()['quizLists']['size'] == 0
+        second, organizatorErrors = cache.get_quiz_list('Новосибирск', self.ALL_DAYS, 'Оставить все', 'None', 'None',
+                                                        'None')
+        assert organizatorErrors == {'Лига Индиго': 'timeout'}
+        assert len(second) == len(first) - 1 + 3
+        assert 'Лига Индиго #1' not in ''.join(second)
+
+    def test_lru_eviction(self):
+        """При переполнении вытесняется список, который дольше всего не запрашивали"""
+        cache = scheduleCache.ScheduleCache(collectFunction=FakeCollect(), ttl=TEST_TTL, clock=FakeClock(),
+                                            quizListCacheSize=2)
+        for dow in ([1], [2], [1], [3]):
+            cache.get_quiz_list('Новосибирск', dow, 'Оставить все', 'None', 'None', 'None')
+        cache.get_quiz_list('Новосибирск', [1], 'Оставить все', 'None', 'None', 'None')
+        stats = cache.get_stats()['quizLists']
+        # [2] вытеснен запросом [3], а [1] остался, т.к. его запрашивали позже
+        assert stats == {'hits': 2, 'misses': 3, 'size': 2, 'maxSize': 2}
+
+
+class TestCacheStats:
+    """Класс для тестирования методов ScheduleCache.get_stats() и ScheduleCache.invalidate()"""
+
+    def test_stats_hits_misses_and_age(self, cache_with_fakes):
+        """Статистика считает попадания/ промахи по каждому организатору и возраст самой старой записи"""
+        cache, collect, clock = cache_with_fakes
+        cache.get_schedule('Новосибирск')
+        clock.now += 30
+        cache.get_schedule('Новосибирск')
+        stats = cache.get_stats()
+        assert stats['misses'] == 5
+        assert stats['hits'] == 5
+        assert stats['snapshotAge'] == {'Новосибирск': 30}
+
+    def test_invalidate(self, cache_with_fakes):
+        """После сброса кэша по городу следующий запрос снова скрейпит сайты"""
+        cache, collect, clock = cache_with_fakes
+        cache.get_schedule('Новосибирск')
+        cache.invalidate('Новосибирск')
+        cache.get_schedule('Новосибирск')
+        assert len(collect.calls) == 2
@@ -0,0 +1,134 @@
+"""
+Тест-кейсы для модуля ./src/scheduleIndex.py для pytest.
+
+Содержит классы:
+    TestSelect
+        test_sorted_by_date(self)
+        test_dow(self)
+        test_selected_theme(self)
+        test_exclusions(self)
+        test_exclusions_match_whole_names(self)
+        test_empty_and_unknown_bars(self)
+
+    TestSince
+        test_past_games_skipped(self)
+        test_no_past_games(self)
+
+    TestFragments
+        test_fragments_rendered_once(self)
+        test_no_render_function(self)
+"""
+
+import datetime
+
+import scheduleIndex
+from quizGame import make_game
+
+# 1 января 2024 - понедельник
+GAMES = [
+    make_game('wow', 2, 'Советское кино', datetime.datetime(2024, 1, 6, 16, 0), 'Бар Три Лося',
+              ['Мультимедиа', 'Ностальгия']),
+    make_game('qp', 1, '[новички] NSK #459', datetime.datetime(2024, 1, 2, 20, 0), 'Арт П.А.Б.',
+              ['Классика', 'Новички']),
+    make_game('li', 0, 'Игра №3 Сезон №7', datetime.datetime(2024, 1, 2, 20, 0), 'Harat`s pub', ['Классика']),
+    make_game('wow', 1, 'Черный квиз 18+ #2', datetime.datetime(2024, 1, 3, 19, 0), 'Три Лося', ['18+']),
+]
+ALL_DAYS = [1, 2, 3, 4, 5, 6, 7]
+
+
+def selected_ids(index, dow=ALL_DAYS, selected_theme='Оставить все', excl_bar='None', excl_theme='None',
+                 excl_orgs='None'):
+    """Возвращает идентификаторы квизов, которые ScheduleIndex.select() отобрал под запрос"""
+    return [index.games[n].gameId for n in index.select(dow, selected_theme, excl_bar, excl_theme, excl_orgs)]
+
+
+class TestSelect:
+    """Класс для тестирования метода scheduleIndex.ScheduleIndex.select()"""
+
+    def test_sorted_by_date(self):
+        """Квизы упорядочены по дате, квизы с одинаковой датой - по идентификатору, бары нормализованы"""
+        index = scheduleIndex.ScheduleIndex(GAMES, 'Новосибирск')
+        assert selected_ids(index) == ['li0', 'qp1', 'wow1', 'wow2']
+        assert index.bars == ("Harat's pub", 'Арт П.А.Б.', 'Три лося', 'Три лося')
+
+    def test_dow(self):
+        """Отбираются только квизы в выбранные дни недели"""
+        index = scheduleIndex.ScheduleIndex(GAMES, 'Новосибирск')
+        assert selected_ids(index, dow=[6, 7]) == ['wow2']
+        assert selected_ids(index, dow=[1, 2, 3, 4, 5]) == ['li0', 'qp1', 'wow1']
+
+    def test_selected_theme(self):
+        """Отбираются только квизы выбранной тематики"""
+        index = scheduleIndex.ScheduleIndex(GAMES, 'Новосибирск')
+        assert selected_ids(index, selected_theme='Классика') == ['li0', 'qp1']
+        assert selected_ids(index, selected_theme='18+') == ['wow1']
+
+    def test_exclusions(self):
+        """Бары, тематики и организаторы исключаются, если они есть в исключениях пользователя: в строке формата БД
+        или в множестве"""
+        index = scheduleIndex.ScheduleIndex(GAMES, 'Новосибирск')
+        assert selected_ids(index, excl_bar='Три лося') == ['li0', 'qp1']
+        assert selected_ids(index, excl_theme='Ностальгия;18+') == ['li0', 'qp1']
+        assert selected_ids(index, excl_orgs=frozenset({'Квиз Плиз', 'Лига Индиго'})) == ['wow1', 'wow2']
+        assert selected_ids(index, selected_theme='Классика', excl_theme='Новички') == ['li0']
+
+    def test_exclusions_match_whole_names(self):
+        """Исключение сравнивается с названием целиком: бар, организатор или тематика, название которых только входит в
+        название исключенного, не исключаются"""
+        index = scheduleIndex.ScheduleIndex(GAMES, 'Новосибирск')
+        assert selected_ids(index, excl_bar='Три лося и друзья') == ['li0', 'qp1', 'wow1', 'wow2']
+        assert selected_ids(index, excl_orgs='Вау Квиз Плюс') == ['li0', 'qp1', 'wow1', 'wow2']
+        assert selected_ids(index, excl_bar='АРТ П.А.Б') == ['li0', 'wow1', 'wow2']
+
+    def test_empty_and_unknown_bars(self):
+        """Квизы с пустым названием бара и с баром, которого нет в config.CITY_DICT, выводятся, пока их бар не исключен
+        целиком: пустое название не входит ни в одно исключение"""
+        games = GAMES + [make_game('qp', 7, 'Квиз без бара', datetime.datetime(2024, 1, 4, 20, 0), '', ['Классика']),
+                         make_game('li', 8, 'Квиз в новом баре', datetime.datetime(2024, 1, 5, 20, 0),
+                                   'MISHKIN&MISHKIN', ['Классика'])]
+        index = scheduleIndex.ScheduleIndex(games, 'Новосибирск')
+        assert index.bars[3:5] == ('', 'MISHKIN&MISHKIN')
+        assert selected_ids(index) == ['li0', 'qp1', 'wow1', 'qp7', 'li8', 'wow2']
+        assert selected_ids(index, excl_bar='Три лося;Арт П.А.Б.') == ['li0', 'qp7', 'li8']
+        assert selected_ids(index, excl_bar='mishkin&mishkin') == ['li0', 'qp1', 'wow1', 'qp7', 'wow2']
+
+
+class TestSince:
+    """Класс для тестирования метода scheduleIndex.ScheduleIndex.since()"""
+
+    def test_past_games_skipped(self):
+        """Квизы, которые начались раньше curDT, пропускаются, а массивы индекса не копируются"""
+        index = scheduleIndex.ScheduleIndex(GAMES, 'Новосибирск')
+        view = index.since(datetime.datetime(2024, 1, 3))
+        assert [game.gameId for game in view] == ['wow1', 'wow2']
+        assert selected_ids(view) == ['wow1', 'wow2']
+        assert view.masks is index.masks
+
+    def test_no_past_games(self):
+        """Если прошедших квизов нет, то возвращается сам индекс"""
+        index = scheduleIndex.ScheduleIndex(GAMES, 'Новосибирск')
+        assert index.since(datetime.datetime(2024, 1, 1)) is index
+        assert len(index) == 4
+
+
+class TestFragments:
+    """Класс для тестирования строк о квизах scheduleIndex.ScheduleIndex.fragments"""
+
+    def test_fragments_rendered_once(self):
+        """Строки о квизах форматируются при построении индекса, по одному разу на квиз, и не копируются в
+        представлениях индекса"""
+        calls = []
+
+        def render(game, bar):
+            calls.append(game.gameId)
+            return f'{game.gameId}: {bar}'
+
+        index = scheduleIndex.ScheduleIndex(GAMES, 'Новосибирск', render)
+        view = index.since(datetime.datetime(2024, 1, 3))
+        assert index.fragments == ("li0: Harat's pub", 'qp1: Арт П.А.Б.', 'wow1: Три лося', 'wow2: Три лося')
+        assert view.fragments is index.fragments
+        assert sorted(calls) == ['li0', 'qp1', 'wow1', 'wow2']
+
+    def test_no_render_function(self):
+        """Если функция форматирования не передана, то строк о квизах в индексе нет"""
+        assert scheduleIndex.ScheduleIndex(GAMES, 'Новосибирск').fragments == ()
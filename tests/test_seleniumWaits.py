@@ -0,0 +1,99 @@
+"""
+Тест-кейсы для модуля ./src/seleniumWaits.py для pytest.
+Вместо браузера используется фейковый FakeDriver, у которого количество элементов на 'странице' меняется со временем.
+
+Содержит классы:
+    TestGetWaitBudget
+        test_org_budget(self)
+        test_default_budget(self)
+
+    TestWaitForStableCount
+        test_fast_page_returns_quickly(self)
+        test_waits_until_cards_loaded(self)
+        test_budget_exceeded(self, caplog)
+
+    TestWaitForCountChange
+        test_count_changed(self)
+        test_count_not_changed(self)
+
+    TestWaitForValue
+        test_timeout_is_logged(self, caplog)
+"""
+
+import time
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+import config
+import seleniumWaits
+
+
+class FakeDriver:
+    """Фейковый браузер: количество найденных элементов задается функцией от времени, прошедшего с создания"""
+    def __init__(self, countByElapsed):
+        self.countByElapsed = countByElapsed
+        self.start = time.monotonic()
+
+    def find_elements(self, by, value):
+        return [object()] * self.countByElapsed(time.monotonic() - self.start)
+
+
+class TestGetWaitBudget:
+    """Класс для тестирования функции seleniumWaits.get_wait_budget()"""
+
+    def test_org_budget(self):
+        """Для организатора с заданным бюджетом возвращается его бюджет"""
+        assert seleniumWaits.get_wait_budget('wow', 'loadMore') == config.SELENIUM_WAIT_BUDGETS['wow']['loadMore']
+
+    def test_default_budget(self):
+        """Для организатора без заданного бюджета возвращается бюджет по умолчанию"""
+        assert seleniumWaits.get_wait_budget('li', 'pageLoad') == config.SELENIUM_WAIT_BUDGETS['default']['pageLoad']
+
+
+class TestWaitForStableCount:
+    """Класс для тестирования функции seleniumWaits.wait_for_stable_count()"""
+
+    def test_fast_page_returns_quickly(self):
+        """Если карточки уже загружены, ожидание занимает SELENIUM_STABLE_PERIOD, а не весь бюджет"""
+        driver = FakeDriver(lambda elapsed: 5)
+        start = time.monotonic()
+        count = seleniumWaits.wait_for_stable_count(driver, '.card', 10, 'тест')
+        assert count == 5
+        assert time.monotonic() - start < config.SELENIUM_STABLE_PERIOD + 0.5
+
+    def test_waits_until_cards_loaded(self):
+        """Карточки подгружаются порциями, ожидание заканчивается после последней порции"""
+        driver = FakeDriver(lambda elapsed: 0 if elapsed < 0.3 else 3 if elapsed < 0.6 else 6)
+        count = seleniumWaits.wait_for_stable_count(driver, '.card', 10, 'тест')
+        assert count == 6
+
+    def test_budget_exceeded(self, caplog):
+        """Если карточки не появились за бюджет, возвращается 0, а в лог пишется предупреждение"""
+        driver = FakeDriver(lambda elapsed: 0)
+        assert seleniumWaits.wait_for_stable_count(driver, '.card', 0.3, 'тест') == 0
+        assert 'не дождались' in caplog.text
+
+
+class TestWaitForCountChange:
+    """Класс для тестирования функции seleniumWaits.wait_for_count_change()"""
+
+    def test_count_changed(self):
+        """После подгрузки квизов возвращается новое количество карточек"""
+        driver = FakeDriver(lambda elapsed: 3 if elapsed < 0.2 else 6)
+        assert seleniumWaits.wait_for_count_change(driver, '.card', 3, 5, 'тест') == 6
+
+    def test_count_not_changed(self):
+        """Если квизы не подгрузились за бюджет, исключение не выбрасывается, возвращается текущее количество"""
+        driver = FakeDriver(lambda elapsed: 3)
+        assert seleniumWaits.wait_for_count_change(driver, '.card', 3, 0.3, 'тест') == 3
+
+
+class TestWaitForValue:
+    """Класс для тестирования функции seleniumWaits.wait_for_value()"""
+
+    def test_timeout_is_logged(self, caplog):
+        """Если условие не выполнилось за бюджет, выбрасывается TimeoutException и в лог пишется время ожидания"""
+        with pytest.raises(TimeoutException):
+            seleniumWaits.wait_for_value(FakeDriver(lambda elapsed: 0), lambda driver: False, 0.2, 'тестовое условие')
+        assert 'Ожидание "тестовое условие": не дождались' in caplog.text
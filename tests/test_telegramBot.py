@@ -0,0 +1,77 @@
+"""
+Тест-кейсы для модуля ./src/telegramBot.py для pytest.
+Хэндлеры бота вызываются напрямую, объекты Update и Context подменяются mock-объектами, а вместо настоящего
+скрейпинга в общий кэш расписаний передается медленная фейковая функция.
+
+Содержит функции:
+    test_updates_processed_during_slow_scrape()
+"""
+
+import asyncio
+import datetime
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import scheduleCache
+import telegramBot
+from quizGame import make_game
+
+
+class SlowCollect:
+    """Фейковая замена quizAggregator.collect_quiz_data, которая 'скрейпит' сайты заданное время"""
+    def __init__(self, duration):
+        self.duration = duration
+        self.running = threading.Event()
+
+    def __call__(self, cityOrganizators, cityLinks, localHTMLs=None):
+        self.running.set()
+        time.sleep(self.duration)  # синхронная задержка, как у requests.get и Selenium
+        self.running.clear()
+        gameDate = datetime.datetime.now() + datetime.timedelta(days=1)
+        return {'li0': make_game('li', 0, 'Игра №1 Сезон №1', gameDate, 'Три Лося', ['Классика'])}, {}
+
+
+def make_update_and_context(userId, cache, repliesLog, slowCollect):
+    """Создает mock-объекты Update и Context. Каждый ответ бота записывается в repliesLog вместе с признаком того,
+    шел ли в этот момент скрейпинг."""
+    async def reply_text(text, **kwargs):
+        repliesLog.append((userId, text, slowCollect.running.is_set()))
+
+    update = MagicMock()
+    update.message.from_user.id = userId
+    update.message.reply_text = AsyncMock(side_effect=reply_text)
+    context = MagicMock()
+    context.user_data = {'city': 'Новосибирск'}
+    context.bot_data = {'scheduleCache': cache}
+    return update, context
+
+
+def test_updates_processed_during_slow_scrape():
+    """Пока один пользователь ждет скрейпинга по команде /all, бот отвечает двум другим пользователям"""
+    slowCollect = SlowCollect(duration=1)
+    cache = scheduleCache.ScheduleCache(collectFunction=slowCollect)
+    repliesLog = []
+    updateA, contextA = make_update_and_context(1, cache, repliesLog, slowCollect)
+    updateB, contextB = make_update_and_context(2, cache, repliesLog, slowCollect)
+    updateC, contextC = make_update_and_context(3, cache, repliesLog, slowCollect)
+
+    async def scenario():
+        slowTask = asyncio.create_task(telegramBot.send_all_quizzes(updateA, contextA))
+        # ждем пока первый пользователь дойдет до скрейпинга. если скрейпинг заблокирует event loop, то цикл
+        # продолжится только после его окончания, и пользователи 2 и 3 получат ответы уже после скрейпинга
+        for i in range(100):
+            if slowCollect.running.is_set() or slowTask.done():
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.wait_for(asyncio.gather(telegramBot.goodbye(updateB, contextB),
+                                              telegramBot.preferences(updateC, contextC)), timeout=0.5)
+        await slowTask
+
+    asyncio.run(scenario())
+
+    # ответы пользователям 2 и 3 были отправлены, пока шел скрейпинг для пользователя 1
+    assert [running for userId, text, running in repliesLog if userId in (2, 3)] == [True, True]
+    # пользователь 1 получил список квизов после окончания скрейпинга
+    assert 'Игра №1 Сезон №1' in repliesLog[-1][1]
+    assert repliesLog[-1][0] == 1 and not repliesLog[-1][2]
@@ -0,0 +1,101 @@
+"""
+Тест-кейсы для модуля ./src/userDatabase.py для pytest.
+
+Содержит классы:
+    TestUserDatabase
+        test_operations(self, tmp_path)
+        test_concurrent_handlers(self, tmp_path)
+        test_event_loop_not_blocked(self)
+        test_in_memory_database(self)
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import dbOperations
+import userDatabase
+
+
+class TestUserDatabase:
+    """Класс для тестирования класса userDatabase.UserDatabase"""
+
+    def test_operations(self, tmp_path):
+        """Все функции dbOperations доступны через await и работают с файлом БД"""
+        database = userDatabase.UserDatabase(f'sqlite:///{tmp_path}/a4av.db', poolSize=2)
+        database.create_table()
+
+        async def scenario():
+            assert await database.insert_new_user(1, 'Новосибирск', 'Типография', 'None', 'None')
+            assert not await database.insert_new_user(1, 'Новосибирск', 'None', 'None', 'None')
+            assert await database.update_user_preferences(1, 'Новосибирск', 'None', '18+', 'None')
+            assert await database.get_user_preferences(1) == (1, 'Новосибирск', 'None', '18+', 'None')
+            assert await database.upsert_user_preferences(1, 'Новосибирск', 'None', 'None', 'Лига Индиго')
+            assert await database.upsert_user_preferences_batch([(2, 'Новосибирск', 'None', 'None', 'None')])
+            assert await database.get_user_preferences(1) == (1, 'Новосибирск', 'None', 'None', 'Лига Индиго')
+            assert await database.delete_user(1)
+            assert await database.get_user_preferences(1) is None
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            database.close()
+
+    def test_concurrent_handlers(self, tmp_path):
+        """Много одновременных хэндлеров пишут и читают БД через пул подключений без ошибок"""
+        database = userDatabase.UserDatabase(f'sqlite:///{tmp_path}/a4av.db', poolSize=4)
+        database.create_table()
+
+        async def handler(telegramId):
+            isSaved = await database.insert_new_user(telegramId, 'Новосибирск', f'Бар {telegramId}', 'None', 'None')
+            return isSaved, await database.get_user_preferences(telegramId)
+
+        async def scenario():
+            return await asyncio.gather(*(handler(telegramId) for telegramId in range(200)))
+
+        try:
+            results = asyncio.run(scenario())
+        finally:
+            database.close()
+        assert results == [(True, (n, 'Новосибирск', f'Бар {n}', 'None', 'None')) for n in range(200)]
+
+    def test_event_loop_not_blocked(self):
+        """Пока медленный запрос к БД выполняется в потоке пула, другие корутины продолжают работу"""
+        database = userDatabase.UserDatabase('sqlite://')
+
+        def slow_get(conn, telegram_id):
+            time.sleep(0.5)
+            return None
+
+        async def ticker(ticks):
+            for i in range(10):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        async def scenario():
+            ticks = []
+            start = time.monotonic()
+            result, tickerResult = await asyncio.gather(database.get_user_preferences(1), ticker(ticks))
+            return result, [tick - start for tick in ticks]
+
+        with patch.object(dbOperations, 'get_user_preferences', slow_get):
+            result, ticks = asyncio.run(scenario())
+        database.close()
+        assert result is None
+        # все 10 тиков прошли раньше, чем закончился 'запрос'
+        assert len(ticks) == 10 and ticks[-1] < 0.5
+
+    def test_in_memory_database(self):
+        """БД SQLite в памяти общая для всех запросов, поэтому созданные таблицы и данные видны в следующих запросах"""
+        database = userDatabase.UserDatabase('sqlite://', poolSize=4)
+        database.create_table()
+
+        async def scenario():
+            await asyncio.gather(*(database.insert_new_user(n, 'Новосибирск', 'None', 'None', 'None')
+                                   for n in range(10)))
+            return await asyncio.gather(*(database.get_user_preferences(n) for n in range(10)))
+
+        try:
+            assert all(asyncio.run(scenario()))
+        finally:
+            database.close()
@@ -0,0 +1,200 @@
+"""
+Тест-кейсы для модуля ./src/userPreferences.py для pytest.
+
+Содержит классы:
+    TestParseExclusions
+        test_string_from_db(self)
+        test_no_exclusions(self)
+
+    TestFormatExclusions
+        test_format_for_db(self)
+
+    TestPreferencesFromRow
+        test_row_parsed(self)
+
+    TestLoadSaveUserPreferences
+        test_nonexistent_user_not_cached(self, conn)
+        test_saved_preferences_cached(self, conn)
+        test_updated_preferences_replace_cached(self, conn)
+        test_cache_size_limited(self, conn, monkeypatch)
+        test_save_after_row_deleted(self, conn)
+        test_async_load_and_save(self)
+        test_async_load_does_not_overwrite_newer_save(self)
+        test_deleted_user_not_cached(self, conn)
+        test_async_deleted_user_not_cached(self)
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import delete
+
+import dbOperations
+import userDatabase
+import userPreferences
+
+
+@pytest.fixture
+def conn():
+    """Подключение к пустой БД SQLite в памяти с таблицами предпочтений пользователей, кэш предпочтений очищается"""
+    engine, conn = dbOperations.create_connection('sqlite://')
+    dbOperations.create_table(engine)
+    userPreferences.USER_PREFERENCES_CACHE.clear()
+    yield conn
+    userPreferences.USER_PREFERENCES_CACHE.clear()
+    conn.close()
+
+
+def delete_user_row(conn, telegram_id):
+    """Удаляет пользователя из таблицы users, не трогая кэш предпочтений"""
+    with conn.begin():
+        conn.execute(delete(dbOperations.users).where(dbOperations.users.c.telegram_id == telegram_id))
+
+
+class TestParseExclusions:
+    """Класс для тестирования функции userPreferences.parse_exclusions()"""
+
+    def test_string_from_db(self):
+        """Строка из БД разбивается по ';' в множество"""
+        assert userPreferences.parse_exclusions('Арт П.А.Б.;Типография') == frozenset({'Арт П.А.Б.', 'Типография'})
+        assert userPreferences.parse_exclusions('18+') == frozenset({'18+'})
+
+    def test_no_exclusions(self):
+        """'None', пустая строка и None означают, что ничего не исключено, готовое множество возвращается как есть"""
+        assert userPreferences.parse_exclusions('None') == frozenset()
+        assert userPreferences.parse_exclusions('') == frozenset()
+        assert userPreferences.parse_exclusions(None) == frozenset()
+        assert userPreferences.parse_exclusions({'Лига Индиго'}) == frozenset({'Лига Индиго'})
+
+
+class TestFormatExclusions:
+    """Класс для тестирования функции userPreferences.format_exclusions()"""
+
+    def test_format_for_db(self):
+        """Множество собирается в строку через ';' в алфавитном порядке, пустое множество - в 'None'"""
+        assert userPreferences.format_exclusions({'Типография', 'Арт П.А.Б.'}) == 'Арт П.А.Б.;Типография'
+        assert userPreferences.format_exclusions(frozenset()) == 'None'
+
+
+class TestPreferencesFromRow:
+    """Класс для тестирования функции userPreferences.preferences_from_row()"""
+
+    def test_row_parsed(self):
+        """Результат dbOperations.get_user_preferences() превращается в UserPreferences с множествами исключений"""
+        preferences = userPreferences.preferences_from_row((123, 'Новосибирск', 'Арт П.А.Б.;Типография', '18+', 'None'))
+        assert preferences == userPreferences.UserPreferences(123, 'Новосибирск',
+                                                              frozenset({'Арт П.А.Б.', 'Типография'}),
+                                                              frozenset({'18+'}), frozenset())
+
+
+class TestLoadSaveUserPreferences:
+    """Класс для тестирования функций userPreferences.load_user_preferences() и save_user_preferences()"""
+
+    def test_nonexistent_user_not_cached(self, conn):
+        """Для пользователя, которого нет в БД, возвращается None, и это не запоминается"""
+        assert userPreferences.load_user_preferences(conn, 123) is None
+        assert 123 not in userPreferences.USER_PREFERENCES_CACHE
+
+    def test_saved_preferences_cached(self, conn):
+        """Новый пользователь сохраняется в БД в строковом формате, а повторная загрузка не делает запрос в БД"""
+        preferences = userPreferences.UserPreferences(123, 'Новосибирск', frozenset({'Типография', 'Арт П.А.Б.'}))
+        assert userPreferences.save_user_preferences(conn, preferences)
+        assert tuple(dbOperations.get_user_preferences(conn, 123)) == (123, 'Новосибирск', 'Арт П.А.Б.;Типография',
+                                                                       'None', 'None')
+        # строка удаляется в обход dbOperations.delete_user(), которая удалила бы пользователя и из кэша
+        delete_user_row(conn, 123)
+        assert userPreferences.load_user_preferences(conn, 123) is preferences
+
+    def test_updated_preferences_replace_cached(self, conn):
+        """Предпочтения загружаются из БД, а после обновления в кэше и в БД оказываются новые значения"""
+        dbOperations.insert_new_user(conn, 123, 'Новосибирск', 'None', 'Ностальгия;18+', 'None')
+        preferences = userPreferences.load_user_preferences(conn, 123)
+        assert preferences.excl_themes == frozenset({'Ностальгия', '18+'})
+
+        updated = userPreferences.UserPreferences(123, 'Новосибирск', excl_orgs=frozenset({'Лига Индиго'}))
+        assert userPreferences.save_user_preferences(conn, updated)
+        assert userPreferences.load_user_preferences(conn, 123) is updated
+        userPreferences.USER_PREFERENCES_CACHE.clear()
+        assert userPreferences.load_user_preferences(conn, 123) == updated
+
+    def test_cache_size_limited(self, conn, monkeypatch):
+        """Из кэша вытесняется пользователь, к которому дольше всего не обращались"""
+        monkeypatch.setattr(userPreferences, 'USER_PREFERENCES_CACHE_SIZE', 2)
+        for telegramId in [1, 2, 3]:
+            userPreferences.save_user_preferences(conn, userPreferences.UserPreferences(telegramId, 'Новосибирск'))
+            userPreferences.load_user_preferences(conn, 1)
+        assert list(userPreferences.USER_PREFERENCES_CACHE) == [3, 1]
+
+    def test_save_after_row_deleted(self, conn):
+        """Предпочтения сохраняются, даже если запись пользователя удалили после того, как он загрузил предпочтения"""
+        dbOperations.insert_new_user(conn, 123, 'Новосибирск', 'None', '18+', 'None')
+        preferences = userPreferences.load_user_preferences(conn, 123)
+        dbOperations.delete_user(conn, 123)
+        assert userPreferences.save_user_preferences(conn, preferences)
+        assert dbOperations.get_user_preferences(conn, 123) == (123, 'Новосибирск', 'None', '18+', 'None')
+
+    def test_async_load_and_save(self):
+        """Асинхронные версии сохраняют предпочтения через userDatabase.UserDatabase, повторная загрузка берется из
+        кэша"""
+        database = userDatabase.UserDatabase('sqlite://')
+        database.create_table()
+        userPreferences.USER_PREFERENCES_CACHE.clear()
+        preferences = userPreferences.UserPreferences(123, 'Новосибирск', excl_themes=frozenset({'18+'}))
+
+        async def scenario():
+            assert await userPreferences.load_user_preferences_async(database, 123) is None
+            assert await userPreferences.save_user_preferences_async(database, preferences)
+            assert await database.get_user_preferences(123) == (123, 'Новосибирск', 'None', '18+', 'None')
+            with database.engine.connect() as conn:
+                delete_user_row(conn, 123)
+            return await userPreferences.load_user_preferences_async(database, 123)
+
+        try:
+            assert asyncio.run(scenario()) is preferences
+        finally:
+            userPreferences.USER_PREFERENCES_CACHE.clear()
+            database.close()
+
+    def test_async_load_does_not_overwrite_newer_save(self):
+        """Если во время запроса в БД другой хэндлер сохранил новые предпочтения, то устаревшая строка из БД не
+        заменяет их в кэше"""
+        saved = userPreferences.UserPreferences(123, 'Новосибирск', excl_orgs=frozenset({'Лига Индиго'}))
+
+        class SlowDatabase:
+            """БД, в которой пока выполняется запрос, пользователь сохраняет новые предпочтения"""
+            async def get_user_preferences(self, telegram_id):
+                userPreferences._remember(telegram_id, saved)
+                return telegram_id, 'Новосибирск', 'None', '18+', 'None'
+
+        userPreferences.USER_PREFERENCES_CACHE.clear()
+        try:
+            assert asyncio.run(userPreferences.load_user_preferences_async(SlowDatabase(), 123)) is saved
+            assert userPreferences.USER_PREFERENCES_CACHE[123] is saved
+        finally:
+            userPreferences.USER_PREFERENCES_CACHE.clear()
+
+    def test_deleted_user_not_cached(self, conn):
+        """После удаления пользователя его предпочтения удаляются и из кэша, повторная загрузка возвращает None"""
+        preferences = userPreferences.UserPreferences(123, 'Новосибирск', excl_themes=frozenset({'18+'}))
+        assert userPreferences.save_user_preferences(conn, preferences)
+        assert dbOperations.delete_user(conn, 123)
+        assert 123 not in userPreferences.USER_PREFERENCES_CACHE
+        assert userPreferences.load_user_preferences(conn, 123) is None
+
+    def test_async_deleted_user_not_cached(self):
+        """Пользователь, удаленный через userDatabase.UserDatabase, тоже удаляется из кэша"""
+        database = userDatabase.UserDatabase('sqlite://')
+        database.create_table()
+        userPreferences.USER_PREFERENCES_CACHE.clear()
+        preferences = userPreferences.UserPreferences(123, 'Новосибирск')
+
+        async def scenario():
+            assert await userPreferences.save_user_preferences_async(database, preferences)
+            assert await database.delete_user(123)
+            return await userPreferences.load_user_preferences_async(database, 123)
+
+        try:
+            assert asyncio.run(scenario()) is None
+        finally:
+            userPreferences.USER_PREFERENCES_CACHE.clear()
+            database.close()